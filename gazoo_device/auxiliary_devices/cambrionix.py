@@ -86,10 +86,10 @@ Typical commands::
 """
 import fcntl
 import os
-import select
+import threading
 import time
 import typing
-from typing import Any, Callable
+from typing import Any, Callable, Optional, Sequence
 
 from gazoo_device import decorators
 from gazoo_device import errors
@@ -100,6 +100,7 @@ from gazoo_device.base_classes import auxiliary_power_hub_device
 from gazoo_device.capabilities import switch_power_usb_with_charge
 from gazoo_device.detect_criteria import serial_detect_criteria
 from gazoo_device.switchboard.communication_types import serial_comms
+from gazoo_device.utility import cambrionix_utils
 from gazoo_device.utility import deprecation_utils
 from gazoo_device.utility import usb_config
 from gazoo_device.utility import usb_utils
@@ -130,10 +131,17 @@ TIMEOUTS = {
              # ~16 seconds and is likely the longest running command)
     "PING": 3,
     "REBOOT": 3,
-    "REBOOT_WATCHDOG": 15
+    "REBOOT_WATCHDOG": 15,
+    # The control serial port is opened exclusively, so other GDM instances
+    # cannot open it (they retry for up to "OPEN" seconds) until it is closed
+    # after this many seconds without commands.
+    "SESSION_IDLE": 1,
 }
 
 _REBOOT_METHODS = ["watchdog", "shell"]
+# Commands which do not change the state of the hub. Any other command
+# invalidates the cached system status.
+_READ_ONLY_COMMANDS = ("health", "limits", "state", "system")
 
 
 class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
@@ -171,6 +179,11 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
     self._regexes.update(REGEXES)
     self._timeouts.update(TIMEOUTS)
     self._serial_port = None
+    self._session: Optional[cambrionix_utils.CambrionixSession] = None
+    self._session_lock = threading.RLock()
+    self._session_idle_timer: Optional[threading.Timer] = None
+    self._session_idle_deadline = 0.0
+    self._system_status: Optional[dict[str, str]] = None
 
   @decorators.health_check
   def check_clear_flags(self):
@@ -211,8 +224,11 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
   @decorators.LogDecorator(logger, level=decorators.DEBUG)
   def _close(self):
     """Closes the serial port connection."""
-    if self._serial_port is not None and self._serial_port.is_open:
-      self._serial_port.close()
+    with self._session_lock:
+      if self._session_idle_timer is not None:
+        self._session_idle_timer.cancel()
+        self._session_idle_timer = None
+      self._close_session()
 
     super()._close()
 
@@ -431,14 +447,15 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
         regex_dict=self.regexes,
         device_name=self.name,
         serial_number=self.serial_number,
-        total_ports=self.total_ports)
+        total_ports=self.total_ports,
+        batch_shell_fn=self._shell_commands)
 
   @decorators.PersistentProperty
   def valid_modes(self):
     return ["off", "sync", "charge"]
 
   def _command(self, command, close_delay=0.0):
-    """Opens the control serial port and sends a command.
+    """Sends a command over the control serial port session.
 
     Args:
       command (str): Command to send to device
@@ -452,41 +469,116 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
       DeviceError: Error in response to command.
 
     Note:
-      Returns response. Delays closing the port afterwards if close_delay >
-      0.
+      Reboot commands do not return a response. The control port is closed
+      after them, delayed by close_delay if > 0.
 
       With some commands (e.g. reboot), it is necessary to wait before
       closing the control serial port to prevent other GDM instances from
       accessing the control serial port.
     """
-    self._open()
-    try:
-      self.__write_command(
-          typing.cast(serial.serialposix.Serial, self._serial_port), command
-      )
-      if command.startswith("reboot"):
-        return
+    if not command.startswith("reboot"):
+      return self._send_commands([command])[0]
+    with self._session_lock:
+      self._system_status = None
+      try:
+        self._get_session().write_command(command)
+      finally:
+        if close_delay > 0.0:
+          time.sleep(close_delay)
+        self._close_session()
 
-      response = self.__get_response(
-          typing.cast(serial.serialposix.Serial, self._serial_port)
-      )
-      if response[0].startswith("*E"):
+  def _send_commands(self, commands: Sequence[str]) -> list[list[str]]:
+    """Sends the commands over the control serial port session.
+
+    The control serial port stays open until no command has been sent for
+    the "SESSION_IDLE" timeout.
+
+    Args:
+      commands: Commands to send.
+
+    Returns:
+      The lines of the response to each command (without the prompt).
+
+    Raises:
+      DeviceError: Error in response to a command.
+    """
+    with self._session_lock:
+      if any(not command.startswith(_READ_ONLY_COMMANDS)
+             for command in commands):
+        self._system_status = None
+      try:
+        responses = self._get_session().send_commands(commands)
+      except errors.DeviceError:
+        # The responses can no longer be matched to the commands.
+        self._close_session()
+        raise
+      finally:
+        self._schedule_session_close()
+    for command, response in zip(commands, responses):
+      if response and response[0].startswith("*E"):
         raise errors.DeviceError("Device {} command failed. "
                                  "Unable to write command: {} "
                                  "to serial port: {}  Err: {!r}".format(
                                      self.name, command, self._serial_port,
                                      response[0]))
-    finally:
-      if close_delay > 0.0:
-        time.sleep(close_delay)
-      typing.cast(serial.serialposix.Serial, self._serial_port).close()
+    return responses
+
+  def _shell_commands(self, commands: Sequence[str]) -> list[str]:
+    """Sends the commands and returns the responses as strings."""
+    return [
+        self._list_to_str(response)
+        for response in self._send_commands(commands)
+    ]
+
+  def _get_session(self) -> cambrionix_utils.CambrionixSession:
+    """Returns the control serial port session, opening it if necessary."""
+    if self._session is None:
+      self._open()
+      self._session = cambrionix_utils.CambrionixSession(self._serial_port)
+    return self._session
+
+  def _close_session(self) -> None:
+    """Closes the control serial port session and the serial port."""
+    with self._session_lock:
+      self._session = None
+      if self._serial_port is not None and self._serial_port.is_open:
+        self._serial_port.close()
+
+  def _close_idle_session(self) -> None:
+    """Closes the session once the idle deadline has passed."""
+    with self._session_lock:
+      if self._session_idle_timer is not threading.current_thread():
+        return  # Cancelled by _close().
+      self._session_idle_timer = None
+      if self._session is None:
+        return
+      remaining = self._session_idle_deadline - time.time()
+      if remaining > 0:
+        # Commands were sent since the timer started.
+        self._start_session_idle_timer(remaining)
+      else:
+        self._close_session()
+
+  def _schedule_session_close(self) -> None:
+    """Moves the idle deadline of the session and starts the timer if needed.
+
+    Must be called with the session lock held.
+    """
+    self._session_idle_deadline = time.time() + self.timeouts["SESSION_IDLE"]
+    if self._session_idle_timer is None:
+      self._start_session_idle_timer(self.timeouts["SESSION_IDLE"])
 
-    # Discard the last line which is the prompt
-    return response[:-1]
+  def _start_session_idle_timer(self, delay: float) -> None:
+    """Starts the timer checking the idle deadline after delay seconds."""
+    self._session_idle_timer = threading.Timer(delay, self._close_idle_session)
+    self._session_idle_timer.daemon = True
+    self._session_idle_timer.start()
 
   def _get_system_status(self):
     """Gets hardware and firmware information.
 
+    The information is cached until a command changes the state of the hub.
+
     Returns:
       dict: Information regarding the system
 
@@ -501,14 +593,16 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
       Group: -
       Panel ID: Absent
     """
-    sysinfo_strings = self._command(self.commands["SYSTEM_STATUS"])
-    sysinfo_dict = {"name": sysinfo_strings[0]}  # pytype: disable=unsupported-operands
-    for line in sysinfo_strings:  # pytype: disable=attribute-error
-      if ":" in line:
-        key, value = line.split(":", 1)
-        sysinfo_dict[key.lower()] = value.strip()
-
-    return sysinfo_dict
+    with self._session_lock:
+      if self._system_status is None:
+        sysinfo_strings = self._command(self.commands["SYSTEM_STATUS"])
+        sysinfo_dict = {"name": sysinfo_strings[0]}  # pytype: disable=unsupported-operands
+        for line in sysinfo_strings:  # pytype: disable=attribute-error
+          if ":" in line:
+            key, value = line.split(":", 1)
+            sysinfo_dict[key.lower()] = value.strip()
+        self._system_status = sysinfo_dict
+      return dict(self._system_status)
 
   def _get_system_hardware(self):
     """Gets the hardware description of the hub.
@@ -553,73 +647,6 @@ class Cambrionix(auxiliary_power_hub_device.AuxiliaryPowerHubDevice):
                              "Error: {}".format(self.name,
                                                 self.timeouts["OPEN"], error))
 
-  @staticmethod
-  def __write_command(serial_port, command):
-    """Internal helper for writing to the hub.
-
-    Args:
-      serial_port (str): Cambrionix serial port.
-      command (str): command to send to device.
-
-    Raises:
-      DeviceError: no response from device.
-    """
-    line_ending = "\r\n"
-    ctrl_c_cmd = "\x03" + line_ending
-
-    # Clear any existing text by sending a CTRL-C
-    # command and waiting for a prompt
-    serial_port.write(ctrl_c_cmd.encode("utf-8"))
-    Cambrionix.__get_response(serial_port)
-
-    if not command.endswith(line_ending):
-      command += line_ending
-
-    for char in command:
-      serial_port.write(char.encode("utf-8"))
-      if command.startswith("reboot") and char == "\r":
-        break
-
-      while True:
-        ready = select.select([serial_port], [], [], 25)[0]
-        if ready:
-          if serial_port.read(1).decode("utf-8") == char:
-            break
-        else:
-          raise errors.DeviceError("Device cambrionix write command failed. "
-                                   "Read timeout on serial port: {} "
-                                   "while writing command: {}".format(
-                                       serial_port, command))
-
-  @staticmethod
-  def __get_response(serial_port):
-    """Internal helper returning the response from the hub as a list of lines.
-
-    Args:
-      serial_port (str): Cambrionix serial port.
-
-    Returns:
-      str: response.
-
-    Raises:
-      DeviceError: Device not responding.
-
-    Note:
-      The command prompt is always this string: ">> ".
-    """
-    read_data = ""
-    while not read_data.endswith("\n>> "):
-      ready = select.select([serial_port], [], [], 25)[0]
-      if ready:
-        read_data += serial_port.read(serial_port.inWaiting()).decode(
-            "utf-8", "replace")
-      else:
-        raise errors.DeviceError(
-            "Device cambrionix get response failed. "
-            "Read timeout on serial port: {}".format(serial_port))
-
-    return read_data.splitlines()
-
 
 deprecation_utils.add_deprecated_attributes(
     Cambrionix, [("set_mode", "switch_power.set_mode", True),
@@ -264,7 +264,8 @@ class GazooDeviceBase(primary_device_base.PrimaryDeviceBase):
         event_parser_default.EventParserDefault,
         filters=self.filter_paths,
         event_file_path=self.event_file_name,
-        device_name=self.name)
+        device_name=self.name,
+        use_event_index=self.get_manager().use_event_index)
 
   @decorators.PersistentProperty
   def regexes(self):
@@ -58,7 +58,9 @@ class MatterDeviceBase(
                     descriptor_service_pb2,
                     device_service_pb2,
                     wifi_service_pb2),
-      "baudrate": BAUDRATE})
+      "baudrate": BAUDRATE,
+      # Used by the pw_rpc_event_subscription capability.
+      "subscriptions": True})
   # Should be overridden in the derived platform classes which support button
   # RPCs.
   VALID_BUTTON_IDS = ()
@@ -68,6 +70,13 @@ class MatterDeviceBase(
   # overridden in the device class.
   _PIGWEED_PORT = 0
 
+  # Maximum number of pipelined Attributes RPCs awaiting a response in
+  # matter_endpoints.read_many() and write_many(). No platform raises it yet:
+  # it should only be raised in the derived platform classes whose firmware
+  # is verified to echo pw_rpc call IDs, and requires pigweed>=0.0.15 (which
+  # sets call IDs on the client side).
+  _MAX_RPCS_IN_FLIGHT = 1
+
   def __init__(self,
                manager,
                device_config,
@@ -193,6 +202,20 @@ class MatterDeviceBase(
     """The port number on the comm power hub if configured."""
     return self.props["optional"].get("comm_power_port")
 
+  @decorators.OptionalProperty
+  def matter_descriptor_cache(self) -> bool:
+    """Whether the Matter endpoints and clusters are persisted on disk.
+
+    The persisted endpoints and clusters are reused while the device runs the
+    same firmware (device type, serial number and software version). Only the
+    endpoint IDs are read to check them, so builds which change the clusters
+    without changing the software version must call
+    matter_endpoints.invalidate_cache(). Disabled by default; enable with
+    "gdm set-prop <device> matter_descriptor_cache true".
+    """
+    return str(self.props["optional"].get(
+        "matter_descriptor_cache", False)).lower() == "true"
+
   @decorators.DynamicProperty
   def pairing_code(self) -> int:
     """Pairing code of the device."""
@@ -313,7 +336,9 @@ class MatterDeviceBase(
         pwrpc_event_subscription_default.PwRpcEventSubscriptionDefault,
         device_name=self.name,
         switchboard_call=self.switchboard.call,
-        rpc_timeout_s=_RPC_TIMEOUT)
+        rpc_timeout_s=_RPC_TIMEOUT,
+        switchboard_get_update=self.switchboard.get_transport_update,
+        pigweed_port=self._PIGWEED_PORT)
 
   @decorators.CapabilityDecorator(
       matter_endpoints_accessor_pw_rpc.MatterEndpointsAccessorPwRpc)
@@ -324,9 +349,17 @@ class MatterDeviceBase(
         matter_endpoints_accessor_pw_rpc.MatterEndpointsAccessorPwRpc,
         device_name=self.name,
         switchboard_call=self.pw_rpc_common.call,
-        rpc_timeout_s=_RPC_TIMEOUT
+        rpc_timeout_s=_RPC_TIMEOUT,
+        firmware_identity_fn=(self._get_matter_firmware_identity
+                              if self.matter_descriptor_cache else None),
+        max_rpcs_in_flight=self._MAX_RPCS_IN_FLIGHT,
     )
 
+  def _get_matter_firmware_identity(self) -> str:
+    """Returns the identity of the Matter firmware running on the device."""
+    return (f"{self.device_type}:{self.serial_number}:"
+            f"{self.pw_rpc_common.software_version}")
+
   @decorators.CapabilityDecorator(device_power_default.DevicePowerDefault)
   def device_power(self) -> device_power_default.DevicePowerDefault:
     """Capability to manipulate device power through Cambrionix."""
@@ -13,9 +13,13 @@
 # limitations under the License.
 """Device Power Default Capability."""
 
+import concurrent.futures
+import dataclasses
+import threading
 import time
 import typing
-from typing import Any, Callable, Optional, Union
+from typing import (Any, Callable, Collection, Hashable, Mapping, Optional,
+                    TypeVar, Union)
 
 from gazoo_device import decorators
 from gazoo_device import errors
@@ -47,6 +51,11 @@ SUPPORTED_HUB_TYPES = (
     _HUB_TYPE_UNIFI_SWITCH,
 )
 
+_Key = TypeVar("_Key", bound=Hashable)
+# Maximum number of hubs switched or devices waited for at once by
+# cycle_devices().
+_MAX_PARALLEL_CALLS = 32
+
 _HUB_TYPE_PROPS = immutabledict.immutabledict({
     _HUB_TYPE_CAMBRIONIX: ("device_usb_hub_name", "device_usb_port"),
     _HUB_TYPE_POWERSWITCH: ("powerswitch_name", "powerswitch_port"),
@@ -54,6 +63,34 @@ _HUB_TYPE_PROPS = immutabledict.immutabledict({
 })
 
 
+@dataclasses.dataclass
+class PowerCycleTiming:
+  """Timing breakdown of a device power cycled by cycle_devices().
+
+  Attributes:
+    hub_name: Name of the hub the device is attached to.
+    port: Hub port the device is attached to.
+    prepare_s: Seconds spent checking the capability and closing the device
+      transports before powering off.
+    power_off_s: Seconds the hub took to power off the port. Shared by all
+      ports of the hub which were powered off together.
+    stagger_s: Seconds the power on was delayed to stagger power ons.
+    power_on_s: Seconds the hub took to power on the port. Shared by all ports
+      of the hub which were powered on together.
+    boot_s: Seconds spent waiting for the device to reconnect and boot up.
+    total_s: Seconds from the start of the power cycle until the device was
+      ready (or powered on if not waiting for boot up).
+  """
+  hub_name: str
+  port: int
+  prepare_s: float = 0.0
+  power_off_s: float = 0.0
+  stagger_s: float = 0.0
+  power_on_s: float = 0.0
+  boot_s: float = 0.0
+  total_s: float = 0.0
+
+
 class DevicePowerDefault(device_power_base.DevicePowerBase):
   """Base class for device_power."""
 
@@ -244,25 +281,11 @@ class DevicePowerDefault(device_power_base.DevicePowerBase):
     if not self.healthy:
       self.health_check()
     # No-op if port is already off.
-    status = self._hub.switch_power.get_mode(self.port_number)
-    if status == "off":
+    if self._is_port_off():
       return
-    switchboard = self._get_switchboard_if_initialized()
-    if self._change_triggers_reboot:
-      if (switchboard is not None and
-          switchboard.health_checked and
-          switchboard.healthy):
-        switchboard.add_log_note(
-            f"GDM triggered reboot via {self.hub_type} power change.")
-      self._hub.switch_power.power_off(self.port_number)
-      self._wait_for_bootup_complete_fn()
-    else:
-      if (close_transports and
-          switchboard is not None and
-          switchboard.health_checked and
-          switchboard.healthy):
-        switchboard.close_all_transports()
-      self._hub.switch_power.power_off(self.port_number)
+    self._prepare_power_off(close_transports)
+    self._hub.switch_power.power_off(self.port_number)
+    self._finish_power_off()
 
   @decorators.CapabilityLogDecorator(logger)
   def on(self, no_wait=False):
@@ -283,27 +306,224 @@ class DevicePowerDefault(device_power_base.DevicePowerBase):
     status = self._hub.switch_power.get_mode(self.port_number)
     if status in ["sync", "charge", "on"]:
       return
+    self._prepare_power_on()
+    self._hub.switch_power.power_on(self.port_number)
+    if not no_wait:
+      self._finish_power_on()
 
+  def _get_healthy_switchboard(
+      self) -> Optional[switchboard_base.SwitchboardBase]:
+    """Returns the Switchboard if it's initialized and healthy, else None."""
     switchboard = self._get_switchboard_if_initialized()
+    if (switchboard is not None and
+        switchboard.health_checked and
+        switchboard.healthy):
+      return switchboard
+    return None
+
+  def _is_port_off(self) -> bool:
+    """Returns True if the port of the device is already off."""
+    return self._hub.switch_power.get_mode(self.port_number) == "off"
+
+  def _prepare_power_off(self, close_transports: bool) -> None:
+    """Logs the reboot or closes the transports before powering off.
+
+    Args:
+      close_transports: Whether to close transports of devices which don't
+        reboot on power changes.
+    """
+    switchboard = self._get_healthy_switchboard()
+    if switchboard is None:
+      return
     if self._change_triggers_reboot:
-      if (switchboard is not None and
-          switchboard.health_checked and
-          switchboard.healthy):
-        switchboard.add_log_note(
-            f"GDM triggered reboot via {self.hub_type} power change.")
-    self._hub.switch_power.power_on(self.port_number)
+      switchboard.add_log_note(
+          f"GDM triggered reboot via {self.hub_type} power change.")
+    elif close_transports:
+      switchboard.close_all_transports()
 
-    if not no_wait:
-      self._wait_until_connected_fn()
-      # If 'change_triggers_reboot' is True, we didn't close transports during
-      # device_power.off(), so they're already open.
-      if (not self._change_triggers_reboot and
-          switchboard is not None and
-          switchboard.health_checked and
-          switchboard.healthy):
-        switchboard.open_all_transports()
+  def _finish_power_off(self) -> None:
+    """Waits for devices which reboot on power changes to boot up."""
+    if self._change_triggers_reboot:
       self._wait_for_bootup_complete_fn()
 
+  def _prepare_power_on(self) -> None:
+    """Logs the reboot of devices which reboot on power changes."""
+    switchboard = self._get_healthy_switchboard()
+    if self._change_triggers_reboot and switchboard is not None:
+      switchboard.add_log_note(
+          f"GDM triggered reboot via {self.hub_type} power change.")
+
+  def _finish_power_on(self) -> None:
+    """Waits for the device to boot up and reopens its transports."""
+    self._wait_until_connected_fn()
+    switchboard = self._get_healthy_switchboard()
+    # If 'change_triggers_reboot' is True, we didn't close transports during
+    # device_power.off(), so they're already open.
+    if not self._change_triggers_reboot and switchboard is not None:
+      switchboard.open_all_transports()
+    self._wait_for_bootup_complete_fn()
+
+
+def cycle_devices(
+    device_powers: Mapping[str, DevicePowerDefault],
+    off_time: float = 2,
+    stagger: float = 0,
+    no_wait: bool = False) -> dict[str, PowerCycleTiming]:
+  """Power cycles several devices together, grouping the ports by hub.
+
+  The ports of each hub are switched with one command where the hub supports
+  it (see SwitchPowerBase.power_off_ports()) and the hubs are switched in
+  parallel. The devices are then waited for in parallel. A device which fails
+  does not stop the power cycle of the other devices.
+
+  Args:
+    device_powers: device_power capabilities of the devices by device name.
+    off_time: Seconds to keep the devices powered off.
+    stagger: Seconds between powering on consecutive devices (across all
+      hubs) to limit inrush current. If 0, all ports of a hub are powered on
+      together.
+    no_wait: Return without waiting for the devices to boot up and reopening
+      their transports.
+
+  Returns:
+    Timing breakdown of the power cycle by device name.
+
+  Raises:
+    DeviceError: if any device failed to power cycle.
+  """
+  # pylint: disable=protected-access
+  start = time.time()
+  # Devices whose port is already off are only powered on, as by
+  # DevicePowerDefault.off() and on().
+  already_off = set()
+
+  def prepare(name):
+    device_power = device_powers[name]
+    if not device_power.healthy:
+      device_power.health_check()
+    if device_power._is_port_off():
+      already_off.add(name)
+    else:
+      device_power._prepare_power_off(close_transports=True)
+
+  failures = _run_in_parallel(prepare, device_powers)
+  timings = {}
+  # Hub name -> device names of the hub's ports.
+  hub_devices: dict[str, list[str]] = {}
+  for name, device_power in device_powers.items():
+    if name in failures:
+      continue
+    timings[name] = PowerCycleTiming(
+        hub_name=device_power.hub_name,
+        port=device_power.port_number,
+        prepare_s=time.time() - start)
+    hub_devices.setdefault(device_power.hub_name, []).append(name)
+  for names in hub_devices.values():
+    names.sort(key=lambda name: timings[name].port)
+
+  def get_switch_power(hub_name):
+    return device_powers[hub_devices[hub_name][0]]._hub.switch_power
+
+  def power_off_hub(hub_name):
+    names = [name for name in hub_devices[hub_name] if name not in already_off]
+    if not names:
+      return
+    power_off_start = time.time()
+    try:
+      get_switch_power(hub_name).power_off_ports(
+          [timings[name].port for name in names])
+    finally:
+      for name in names:
+        timings[name].power_off_s = time.time() - power_off_start
+
+  for hub_name, error in _run_in_parallel(power_off_hub, hub_devices).items():
+    failures.update((name, error) for name in hub_devices[hub_name])
+  # Devices which reboot on power changes boot up while powered off.
+  failures.update(_run_in_parallel(
+      lambda name: device_powers[name]._finish_power_off(),
+      [name for name in timings
+       if name not in failures and name not in already_off]))
+
+  time.sleep(off_time)
+
+  # Power on even the devices which failed to power off to restore power.
+  power_on_start = time.time()
+  # Device name -> position in the staggered power on order.
+  power_on_slots = {
+      name: slot for slot, name in enumerate(
+          name for names in hub_devices.values() for name in names)
+  }
+  failures_lock = threading.Lock()
+
+  def power_on_hub(hub_name):
+    names = hub_devices[hub_name]
+    switch_power = get_switch_power(hub_name)
+    for name in names:
+      device_powers[name]._prepare_power_on()
+    if not stagger:
+      try:
+        switch_power.power_on_ports([timings[name].port for name in names])
+      finally:
+        for name in names:
+          timings[name].power_on_s = time.time() - power_on_start
+      return
+    for name in names:
+      delay = power_on_start + stagger * power_on_slots[name] - time.time()
+      if delay > 0:
+        time.sleep(delay)
+      timings[name].stagger_s = time.time() - power_on_start
+      try:
+        switch_power.power_on(timings[name].port)
+      except Exception as err:  # pylint: disable=broad-except
+        with failures_lock:
+          failures.setdefault(name, err)
+      finally:
+        timings[name].power_on_s = (
+            time.time() - power_on_start - timings[name].stagger_s)
+
+  for hub_name, error in _run_in_parallel(power_on_hub, hub_devices).items():
+    for name in hub_devices[hub_name]:
+      failures.setdefault(name, error)
+
+  def wait_for_device(name):
+    boot_start = time.time()
+    try:
+      if not no_wait:
+        device_powers[name]._finish_power_on()
+    finally:
+      timings[name].boot_s = time.time() - boot_start
+      timings[name].total_s = time.time() - start
+
+  failures.update(_run_in_parallel(
+      wait_for_device, [name for name in timings if name not in failures]))
+  if failures:
+    raise errors.DeviceError(
+        "Failed to power cycle {} of {} devices: {}".format(
+            len(failures), len(device_powers),
+            "; ".join(f"{name}: {error!r}"
+                      for name, error in sorted(failures.items()))))
+  return timings
+
+
+def _run_in_parallel(function: Callable[[_Key], None],
+                     keys: Collection[_Key]) -> dict[_Key, Exception]:
+  """Calls the function with each key in parallel threads.
+
+  Args:
+    function: Function to call.
+    keys: Arguments to call the function with.
+
+  Returns:
+    Exceptions raised by the function by key.
+  """
+  if not keys:
+    return {}
+  with concurrent.futures.ThreadPoolExecutor(
+      max_workers=min(len(keys), _MAX_PARALLEL_CALLS)) as executor:
+    futures = {key: executor.submit(function, key) for key in keys}
+  return {key: future.exception() for key, future in futures.items()
+          if future.exception() is not None}
+
 
 deprecation_utils.add_deprecated_attributes(DevicePowerDefault,
                                             [("power_off", "off", True),
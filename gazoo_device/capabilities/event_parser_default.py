@@ -98,17 +98,42 @@ commands require the path to the event file to retrieve this information. Event
 history is obtained by using the "tac" and "grep" unix tools to filter matching
 events in the event file and from Python extract and decode each event JSON
 object as described above.
+
+Alternatively, when the Parser is created with use_event_index=True, event
+history is obtained from an in-process index of the event file. The index maps
+each event label to the byte offsets of the events containing it and is updated
+incrementally by reading only the bytes appended to the event file since the
+previous query. Last event, event count and limited history queries then only
+read and decode the matching events instead of scanning the entire event file
+in "tac" and "grep" subprocesses.
 """
+import array
+import collections
 from collections.abc import Collection
+from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import MutableSet
 import datetime
+import heapq
+import itertools
 import json
 import os
 import re
 import subprocess
+import threading
 import time
 from typing import Any
 
+# The regular expression parser is private to the re module. If it changes or
+# is removed, required literals aren't used and every filter is searched.
+try:
+  from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+  try:
+    import sre_parse  # pylint: disable=deprecated-module
+  except ImportError:
+    sre_parse = None
+
 from gazoo_device import decorators
 from gazoo_device import errors
 from gazoo_device import gdm_logger
@@ -549,6 +574,370 @@ def _wait_for_event_file(event_file_path, timeout):
       time.sleep(0.1)
 
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+_ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _get_microseconds(timestamp: datetime.datetime) -> int:
+  """Returns the timestamp as microseconds since the epoch.
+
+  Timezone-aware timestamps are converted to UTC first, so aware timestamps
+  with different UTC offsets compare the same way as datetime objects do.
+  Naive timestamps are used as is.
+
+  Args:
+    timestamp: Timestamp to convert.
+  """
+  if timestamp.utcoffset() is not None:
+    timestamp = timestamp.astimezone(
+        datetime.timezone.utc).replace(tzinfo=None)
+  return (timestamp - _EPOCH) // _ONE_MICROSECOND
+
+
+def _get_timestamp_microseconds(dt_value: str) -> int:
+  """Returns the event timestamp string as microseconds since the epoch.
+
+  Args:
+    dt_value: Timestamp string in one of the formats accepted by _get_datetime.
+  """
+  try:
+    timestamp = datetime.datetime.fromisoformat(dt_value)
+  except ValueError:
+    timestamp = _get_datetime(dt_value)
+  return _get_microseconds(timestamp)
+
+
+class _EventFileIndex:
+  """Incrementally built index of the events in a JSON-lines event file.
+
+  Every complete line of the event file is identified by its sequence number.
+  The index stores the byte offset and the system timestamp of each event as
+  well as the sequence numbers of the events containing each event label, all
+  packed into 64-bit integer arrays. Only the bytes appended to the event file
+  since the previous update are read and decoded, which keeps the cost of each
+  query proportional to the number of new and matching events rather than to
+  the size of the event file.
+  """
+  # Number of event lines to index between deadline checks.
+  _DEADLINE_CHECK_INTERVAL = 1000
+  _NON_LABEL_KEYS = frozenset(
+      ("raw_log_line", "system_timestamp", "matched_timestamp", "log_filename"))
+
+  def __init__(self, event_file_path: str) -> None:
+    self._event_file_path = event_file_path
+    self._lock = threading.Lock()
+    self._reset()
+
+  @property
+  def event_file_path(self) -> str:
+    """Path to the indexed event file."""
+    return self._event_file_path
+
+  def _reset(self) -> None:
+    """Discards all indexed events."""
+    self._file_id = None
+    self._indexed_size = 0
+    # First and last indexed lines, used to detect event file rewrites.
+    self._first_line = b""
+    self._last_line = b""
+    self._offsets = array.array("q")
+    self._timestamps = array.array("q")
+    self._label_to_sequence_numbers = collections.defaultdict(
+        lambda: array.array("q"))
+
+  def _is_indexed_content(self, event_file) -> bool:
+    """Returns whether the indexed lines are still present in the event file.
+
+    Args:
+      event_file: Event file opened in binary mode.
+    """
+    event_file.seek(0)
+    if event_file.read(len(self._first_line)) != self._first_line:
+      return False
+    event_file.seek(self._indexed_size - len(self._last_line))
+    return event_file.read(len(self._last_line)) == self._last_line
+
+  def _update(self, deadline: float) -> bool:
+    """Indexes the events appended to the event file since the last update.
+
+    Args:
+      deadline: Time (as returned by time.time()) by which to stop indexing.
+
+    Returns:
+      True if the deadline expired before all new events were indexed.
+    """
+    try:
+      stat = os.stat(self._event_file_path)
+    except FileNotFoundError:
+      self._reset()
+      return False
+    file_id = (stat.st_dev, stat.st_ino)
+    if file_id != self._file_id or stat.st_size < self._indexed_size:
+      # The event file has been replaced or truncated.
+      self._reset()
+      self._file_id = file_id
+
+    with open(self._event_file_path, "rb") as event_file:
+      if self._indexed_size and not self._is_indexed_content(event_file):
+        # The event file has been truncated and rewritten since last update.
+        self._reset()
+        self._file_id = file_id
+      if stat.st_size == self._indexed_size:
+        return False
+      event_file.seek(self._indexed_size)
+      offset = self._indexed_size
+      for line_count, line in enumerate(event_file, 1):
+        if not line.endswith(b"\n"):
+          break  # Partially written event. It will be indexed on next update.
+        self._add_event(offset, line)
+        if not offset:
+          self._first_line = line
+        self._last_line = line
+        offset += len(line)
+        self._indexed_size = offset
+        if (line_count % self._DEADLINE_CHECK_INTERVAL == 0
+            and time.time() > deadline):
+          return True
+    return False
+
+  def _add_event(self, offset: int, line: bytes) -> None:
+    """Adds the event line starting at the given byte offset to the index."""
+    try:
+      event_dict = json.loads(line)
+    except ValueError as err:
+      logger.info(
+          "Failed to parse event log line; skipping. Err: {!r}".format(err))
+      return
+    sequence_number = len(self._offsets)
+    self._offsets.append(offset)
+    self._timestamps.append(
+        _get_timestamp_microseconds(event_dict["system_timestamp"]))
+    for key in event_dict:
+      if key not in self._NON_LABEL_KEYS:
+        self._label_to_sequence_numbers[key].append(sequence_number)
+
+  def _read_events(self, sequence_numbers: Iterable[int]) -> list[bytes]:
+    """Returns the raw event lines for the given event sequence numbers."""
+    json_events = []
+    with open(self._event_file_path, "rb") as event_file:
+      for sequence_number in sequence_numbers:
+        event_file.seek(self._offsets[sequence_number])
+        json_events.append(event_file.readline())
+    return json_events
+
+  def _iter_sequence_numbers(
+      self, event_labels: list[str] | None) -> Iterator[int]:
+    """Yields sequence numbers of events matching event labels, newest first.
+
+    Args:
+      event_labels: Event labels to look up. If None, all events match.
+    """
+    if event_labels is None:
+      return iter(range(len(self._offsets) - 1, -1, -1))
+    newest_first = heapq.merge(
+        *(reversed(self._label_to_sequence_numbers.get(label, ()))
+          for label in event_labels if label),
+        reverse=True)
+    # An event containing several of the event labels is returned only once.
+    return (sequence_number
+            for sequence_number, _ in itertools.groupby(newest_first))
+
+  def _is_at_or_after(self, sequence_number: int,
+                      start_microseconds: int) -> bool:
+    """Returns whether the event was logged at or after the start time."""
+    return self._timestamps[sequence_number] >= start_microseconds
+
+  def get_last_event(
+      self, event_label: str | None, timeout: float
+  ) -> tuple[dict[str, Any] | None, bool]:
+    """Returns the last event containing the event label.
+
+    Args:
+      event_label: Event label to look up. If None, returns the last event
+        regardless of event label.
+      timeout: Timeout value in seconds.
+
+    Returns:
+      The last matching event or None and whether the index update timed out.
+    """
+    with self._lock:
+      timedout = self._update(time.time() + timeout)
+      if event_label is None:
+        sequence_numbers = range(len(self._offsets))
+        event_labels = None
+      else:
+        sequence_numbers = self._label_to_sequence_numbers.get(
+            event_label, ())
+        event_labels = [event_label]
+      if not sequence_numbers:
+        return None, timedout
+      json_events = self._read_events([sequence_numbers[-1]])
+    events = _get_events_from_json_output(json_events, event_labels)
+    return (events[0] if events else None), timedout
+
+  def get_event_history(
+      self,
+      event_labels: list[str] | None,
+      limit: int | None,
+      start_time: datetime.datetime | None,
+      timeout: float,
+  ) -> tuple[list[dict[str, Any]], bool]:
+    """Returns events matching the event labels, newest first.
+
+    Args:
+      event_labels: Event labels to look up. If None, returns all events.
+      limit: Maximum number of events to return. If None, there is no limit.
+      start_time: If provided, only returns events logged at or after it.
+      timeout: Timeout value in seconds.
+
+    Returns:
+      The list of matching events and whether the index update timed out.
+    """
+    with self._lock:
+      timedout = self._update(time.time() + timeout)
+      sequence_numbers = self._iter_sequence_numbers(event_labels)
+      if start_time is not None:
+        # Host timestamps are added by several processes, so events are not
+        # strictly in chronological order in the event file: check them all.
+        start_microseconds = _get_microseconds(start_time)
+        sequence_numbers = (
+            sequence_number for sequence_number in sequence_numbers
+            if self._is_at_or_after(sequence_number, start_microseconds))
+      json_events = self._read_events(
+          itertools.islice(sequence_numbers, limit))
+    return _get_events_from_json_output(json_events, event_labels), timedout
+
+  def get_event_count(self, event_label: str,
+                      timeout: float) -> tuple[int, bool]:
+    """Returns the number of events containing the event label.
+
+    Args:
+      event_label: Event label to look up.
+      timeout: Timeout value in seconds.
+
+    Returns:
+      The count of matching events and whether the index update timed out.
+    """
+    with self._lock:
+      timedout = self._update(time.time() + timeout)
+      return len(self._label_to_sequence_numbers.get(event_label, ())), timedout
+
+
+def _get_indexed_last_event(event_file_index, event_label, timeout=1.0):
+  """Same as _get_last_event, but uses the event file index."""
+  file_exists, remaining_timeout = _wait_for_event_file(
+      event_file_index.event_file_path, timeout)
+  if not file_exists:
+    return None, True
+  return event_file_index.get_last_event(event_label, remaining_timeout)
+
+
+def _get_indexed_event_history(
+    event_file_index: _EventFileIndex,
+    event_labels: list[str] | None,
+    limit: int | None = None,
+    start_time: datetime.datetime | None = None,
+    timeout: float = 10.0,
+):
+  """Same as _get_all_event_history and _get_limited_event_history, but indexed."""
+  file_exists, remaining_timeout = _wait_for_event_file(
+      event_file_index.event_file_path, timeout)
+  if not file_exists:
+    return [], True
+  return event_file_index.get_event_history(
+      event_labels, limit, start_time, remaining_timeout)
+
+
+def _get_indexed_event_history_count(event_file_index,
+                                     event_label,
+                                     timeout=10.0):
+  """Same as _get_event_history_count, but uses the event file index."""
+  file_exists, remaining_timeout = _wait_for_event_file(
+      event_file_index.event_file_path, timeout)
+  if not file_exists:
+    return 0, True
+  return event_file_index.get_event_count(event_label, remaining_timeout)
+
+
+def _get_required_literal(regex: re.Pattern[str]) -> str:
+  """Returns a substring contained in every string the regex can match.
+
+  Only the literal characters at the top level of the regular expression are
+  considered and the longest run of consecutive literal characters is returned.
+  Relies on the private regular expression parser of the re module: returns ""
+  if it isn't available or fails.
+
+  Args:
+    regex: Compiled regular expression.
+
+  Returns:
+    The required substring or "" if there is none (for example, if the regular
+    expression is case-insensitive or is an alternation).
+  """
+  if regex.flags & re.IGNORECASE or sre_parse is None:
+    return ""
+  longest_literal = ""
+  literal = ""
+  try:
+    for op, value in sre_parse.parse(regex.pattern, regex.flags):
+      if op is sre_parse.LITERAL:
+        literal += chr(value)
+      else:
+        literal = ""
+      if len(literal) > len(longest_literal):
+        longest_literal = literal
+  except Exception as err:  # pylint: disable=broad-except
+    logger.debug("Failed to find the required literal of regex %r: %r",
+                 regex.pattern, err)
+    return ""
+  return longest_literal
+
+
+class _FilterMatcher:
+  """Finds the filters matching a log line.
+
+  Each filter regex is only searched if the log line contains the literal
+  substring required by the regex. The required literals of all filters are
+  also combined into a single regex, which rejects log lines matching none of
+  the filters (the vast majority of log lines) with a single search. The
+  matches are the same as searching every filter regex.
+  """
+
+  def __init__(self, filters_dict: dict[str, re.Pattern[str]]):
+    """Compiles the matcher for the filters.
+
+    Args:
+      filters_dict: Mapping from event label to filter regex.
+    """
+    self._filters = [(filter_name, regex, _get_required_literal(regex))
+                     for filter_name, regex in filters_dict.items()]
+    literals = {literal for _, _, literal in self._filters if literal}
+    # Log lines can only be rejected by the combined search if all filters
+    # have a required literal.
+    self._literals_regex = None
+    if literals and all(literal for _, _, literal in self._filters):
+      self._literals_regex = re.compile("|".join(
+          re.escape(literal) for literal in sorted(literals)))
+
+  def get_matches(self, raw_log_line: str) -> dict[str, tuple[Any, ...]]:
+    """Returns the groups matched by each matching filter, in filter order.
+
+    Args:
+      raw_log_line: Log line to match the filters against.
+    """
+    if not self._filters or (self._literals_regex is not None and
+                             not self._literals_regex.search(raw_log_line)):
+      return {}
+    matches = {}
+    for filter_name, regex, literal in self._filters:
+      if literal not in raw_log_line:
+        continue
+      match = regex.search(raw_log_line)
+      if match:
+        matches[filter_name] = match.groups()
+    return matches
+
+
 class _EventMatch:
   """Encapsulates matching events with event time delta."""
 
@@ -585,19 +974,49 @@ class EventParserDefault(event_parser_base.EventParserBase):
   def __init__(self,
                filters: Collection[str],
                event_file_path: str,
-               device_name: str) -> None:
+               device_name: str,
+               use_event_index: bool = False) -> None:
     """Initializes the log event parser.
 
     Args:
         filters: Paths to JSON filter files or filter directories.
         event_file_path: Path to the log event file.
         device_name: The name of the device using this capability.
+        use_event_index: If True, query events through an in-process index of
+          the event file instead of "tac" and "grep" subprocesses.
     """
     super().__init__(device_name=device_name)
     self._filters_dict = {}
+    self._filter_matcher = None
+    self._use_event_index = use_event_index
+    self._event_file_index = None
+    self._event_file_index_lock = threading.Lock()
     self.event_file_path = event_file_path
     self.load_filters(filters)
 
+  def __getstate__(self):
+    """Excludes the event file index when the parser is pickled."""
+    state = self.__dict__.copy()
+    state["_event_file_index"] = None
+    del state["_event_file_index_lock"]
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._event_file_index_lock = threading.Lock()
+
+  def _get_event_file_index(self) -> _EventFileIndex:
+    """Returns the index of the current event file.
+
+    The index of the previous event file is discarded when event_file_path
+    changes (for example, after a new log file is started).
+    """
+    with self._event_file_index_lock:
+      if (self._event_file_index is None or
+          self._event_file_index.event_file_path != self.event_file_path):
+        self._event_file_index = _EventFileIndex(self.event_file_path)
+      return self._event_file_index
+
   def get_event_history(
       self, event_labels=None, count=None, start_time=None, timeout=10.0
   ):
@@ -765,7 +1184,14 @@ class EventParserDefault(event_parser_base.EventParserBase):
           error_message="{} get_event_history failed.".format(
               self._device_name))
     try:
-      if start_time is not None:
+      if self._use_event_index:
+        history_results, timedout = _get_indexed_event_history(
+            self._get_event_file_index(),
+            event_labels,
+            limit=count if start_time is None else None,
+            start_time=start_time,
+            timeout=timeout)
+      elif start_time is not None:
         history_results, timedout = _get_all_event_history(
             self.event_file_path,
             event_labels,
@@ -811,8 +1237,12 @@ class EventParserDefault(event_parser_base.EventParserBase):
         error_message="%s get_event_history_count failed." % self._device_name)
 
     try:
-      count, timedout = _get_event_history_count(
-          self.event_file_path, event_label, timeout=timeout)
+      if self._use_event_index:
+        count, timedout = _get_indexed_event_history_count(
+            self._get_event_file_index(), event_label, timeout=timeout)
+      else:
+        count, timedout = _get_event_history_count(
+            self.event_file_path, event_label, timeout=timeout)
       return ParserResult(timedout=timedout, results_list=[], count=count)
     except Exception as err:
       raise errors.ParserError(
@@ -1005,8 +1435,12 @@ class EventParserDefault(event_parser_base.EventParserBase):
 
     try:
       for event_label in event_labels:
-        event_data, timedout = _get_last_event(self.event_file_path,
-                                               event_label, timeout)
+        if self._use_event_index:
+          event_data, timedout = _get_indexed_last_event(
+              self._get_event_file_index(), event_label, timeout)
+        else:
+          event_data, timedout = _get_last_event(self.event_file_path,
+                                                 event_label, timeout)
         if event_data:
           results.append(event_data)
         any_timed_out |= timedout
@@ -1353,12 +1787,9 @@ class EventParserDefault(event_parser_base.EventParserBase):
     Returns:
         A dictionary of event data.
     """
-    event_data = {}
-    for filter_name, regex in self._filters_dict.items():
-      match = regex.search(raw_log_line)
-      if match:
-        match_data = match.groups()
-        event_data[filter_name] = match_data
+    if self._filter_matcher is None:
+      self._filter_matcher = _FilterMatcher(self._filters_dict)
+    event_data = self._filter_matcher.get_matches(raw_log_line)
 
     if event_data:
       if log_filename:
@@ -1643,6 +2074,7 @@ class EventParserDefault(event_parser_base.EventParserBase):
     try:
       self._filters_dict[full_filter_name] = re.compile(
           filter_list["regex_match"])
+      self._filter_matcher = None  # Recompiled with the new filter when used.
       logger.debug("Added filter %s from filter file %s", full_filter_name,
                    filter_path)
     except re.error as err:
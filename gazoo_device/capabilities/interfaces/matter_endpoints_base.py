@@ -14,13 +14,14 @@
 
 """Interface for Matter endpoint capability wrapper."""
 import abc
-from typing import Any, Collection, Mapping, List, Optional
+from typing import Any, Callable, Collection, Mapping, List, Optional
 from gazoo_device import decorators
 from gazoo_device import errors
 from gazoo_device import gdm_logger
 from gazoo_device.capabilities.interfaces import capability_base
 from gazoo_device.capabilities.matter_clusters.interfaces import cluster_base
 from gazoo_device.capabilities.matter_endpoints.interfaces import endpoint_base
+from gazoo_device.utility import matter_descriptor_cache
 import immutabledict
 
 ROOT_NODE_ENDPOINT_ID = 0
@@ -31,16 +32,30 @@ logger = gdm_logger.get_logger()
 class MatterEndpointsBase(capability_base.CapabilityBase):
   """Capability wrapper for accessing the Matter endpoint instances."""
 
-  def __init__(self, device_name: str, **cluster_kwargs: Any):
+  def __init__(
+      self,
+      device_name: str,
+      firmware_identity_fn: Optional[Callable[[], str]] = None,
+      descriptor_cache_directory: str = (
+          matter_descriptor_cache.DEFAULT_DIRECTORY),
+      **cluster_kwargs: Any):
     """Initializes an instance of MatterEndpoints capability.
 
     Args:
       device_name: Name of the device instance the capability is attached to.
+      firmware_identity_fn: Method returning the identity (device type, serial
+        number and software version) of the firmware running on the device.
+        If provided, the endpoints and clusters are persisted on disk for this
+        firmware and reused by later instances.
+      descriptor_cache_directory: Directory of the persisted endpoints and
+        clusters.
       **cluster_kwargs: Keyword arguments for initializing PigweedRPC/ChipTool
         based cluster capability.
     """
     super().__init__(device_name=device_name)
     self._cluster_kwargs = cluster_kwargs
+    self._firmware_identity_fn = firmware_identity_fn
+    self._descriptor_cache_directory = descriptor_cache_directory
 
     # Endpoint ID to endpoint instance mapping
     self._endpoints = {}
@@ -117,27 +132,94 @@ class MatterEndpointsBase(capability_base.CapabilityBase):
     """Retrieves the supported endpoints and clusters from descriptor cluster.
 
     The descriptor cluster should only be queried if it has not previously been
-    called or the reset method is called.
+    called or the reset method is called. If the endpoints and clusters of the
+    running firmware are persisted, only the endpoint IDs are read to
+    revalidate them.
     """
     if not self._endpoint_id_to_class:
+      firmware_identity = None
+      if self._firmware_identity_fn is not None:
+        firmware_identity = self._firmware_identity_fn()
+        if self._load_descriptor_cache(firmware_identity):
+          return
       for endpoint_id in self.get_supported_endpoint_ids():
         endpoint_cls, device_type_id = (
             self.get_endpoint_class_and_device_type_id(endpoint_id))
+        self._add_endpoint(endpoint_id, endpoint_cls, device_type_id,
+                           self.get_supported_clusters(endpoint_id))
+      if firmware_identity is not None:
+        self._save_descriptor_cache(firmware_identity)
+
+  def _add_endpoint(
+      self,
+      endpoint_id: int,
+      endpoint_cls: type[endpoint_base.EndpointBase],
+      device_type_id: int,
+      clusters: set[type[cluster_base.ClusterBase]]) -> None:
+    """Stores the endpoint in the endpoint and cluster mappings."""
+    # Store the endpoint ID to endpoint class mapping.
+    self._endpoint_id_to_class[endpoint_id] = endpoint_cls
+
+    # Store the endpoint ID to device type ID mapping.
+    self._endpoint_id_to_device_type_id[endpoint_id] = device_type_id
+
+    # Ensuring we store the first endpoint ID handled by this class.
+    # This mapping will be used in get_endpoint_instance_by_class method
+    if endpoint_cls not in self._endpoint_class_to_id:
+      self._endpoint_class_to_id[endpoint_cls] = endpoint_id
+
+    # Store the endpoint ID to clusters mapping.
+    self._endpoint_id_to_clusters[endpoint_id] = clusters
+
+  def _load_descriptor_cache(self, firmware_identity: str) -> bool:
+    """Loads the endpoints and clusters persisted for the firmware.
 
-        # Store the endpoint ID to endpoint class mapping.
-        self._endpoint_id_to_class[endpoint_id] = endpoint_cls
-
-        # Store the endpoint ID to device type ID mapping.
-        self._endpoint_id_to_device_type_id[endpoint_id] = device_type_id
+    Args:
+      firmware_identity: Identity of the firmware running on the device.
 
-        # Ensuring we store the first endpoint ID handled by this class.
-        # This mapping will be used in get_endpoint_instance_by_class method
-        if endpoint_cls not in self._endpoint_class_to_id:
-          self._endpoint_class_to_id[endpoint_cls] = endpoint_id
+    Returns:
+      True if the mappings were loaded, False if they need to be discovered.
+    """
+    topology = matter_descriptor_cache.load(
+        self._descriptor_cache_directory, self._device_name, firmware_identity)
+    if topology is None:
+      return False
+    flavors = {flavor.__name__: flavor
+               for flavor in self.get_sub_capability_flavors()}
+    try:
+      endpoints = [
+          (int(endpoint_id), flavors[endpoint["endpoint_class"]],
+           endpoint["device_type_id"],
+           {flavors[cluster] for cluster in endpoint["clusters"]})
+          for endpoint_id, endpoint in topology.items()
+      ]
+    except (AttributeError, KeyError, TypeError, ValueError):
+      # Persisted by a GDM version with different endpoint or cluster flavors.
+      return False
+    # The endpoint IDs are a single descriptor read: use them to check that the
+    # persisted topology still matches the device.
+    cached_endpoint_ids = [endpoint[0] for endpoint in endpoints]
+    if sorted(cached_endpoint_ids) != sorted(self.get_supported_endpoint_ids()):
+      logger.info(f"{self._device_name} endpoints differ from the persisted "
+                  "Matter descriptor cache. Reading them from the device.")
+      return False
+    for endpoint in endpoints:
+      self._add_endpoint(*endpoint)
+    return True
 
-        # Store the endpoint ID to clusters mapping.
-        self._endpoint_id_to_clusters[endpoint_id] = (
-            self.get_supported_clusters(endpoint_id))
+  def _save_descriptor_cache(self, firmware_identity: str) -> None:
+    """Persists the endpoints and clusters of the firmware."""
+    topology = {
+        str(endpoint_id): {
+            "endpoint_class": endpoint_cls.__name__,
+            "device_type_id": self._endpoint_id_to_device_type_id[endpoint_id],
+            "clusters": sorted(
+                cluster.__name__
+                for cluster in self._endpoint_id_to_clusters[endpoint_id]),
+        } for endpoint_id, endpoint_cls in self._endpoint_id_to_class.items()
+    }
+    matter_descriptor_cache.save(self._descriptor_cache_directory,
+                                 self._device_name, firmware_identity, topology)
 
   @decorators.CapabilityLogDecorator(logger)
   def get(self, endpoint_id: int) -> endpoint_base.EndpointBase:
@@ -206,6 +288,17 @@ class MatterEndpointsBase(capability_base.CapabilityBase):
     self._endpoint_id_to_device_type_id.clear()
     self._endpoints.clear()
 
+  @decorators.CapabilityLogDecorator(logger)
+  def invalidate_cache(self) -> None:
+    """Resets the mappings and deletes the persisted endpoints and clusters.
+
+    Should be called when the firmware of the device changes (flashing or
+    upgrading a build), as the software version may stay the same.
+    """
+    self.reset()
+    matter_descriptor_cache.delete(self._descriptor_cache_directory,
+                                   self._device_name)
+
   @decorators.CapabilityLogDecorator(logger)
   def has_endpoints(self, endpoint_names: Collection[str]) -> bool:
     """Checks whether the device supports all the given endpoint names.
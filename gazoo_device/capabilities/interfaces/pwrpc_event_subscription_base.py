@@ -15,8 +15,10 @@
 """Interface for a Pigweed RPC Event Subscription capability."""
 
 import abc
+from typing import Any, Callable, Optional
 
 from gazoo_device.capabilities.interfaces import capability_base
+from gazoo_device.protos import attributes_service_pb2
 
 
 class PwRpcEventSubscriptionBase(capability_base.CapabilityBase):
@@ -41,3 +43,83 @@ class PwRpcEventSubscriptionBase(capability_base.CapabilityBase):
     Returns:
       The boolean state.
     """
+
+  @abc.abstractmethod
+  def subscribe(self, service_name: str, event_name: str,
+                **kwargs: Any) -> int:
+    """Subscribes to the responses of a server streaming RPC.
+
+    Args:
+      service_name: PwRPC service name.
+      event_name: Server streaming event name in the given service.
+      **kwargs: Arguments for the event method.
+
+    Returns:
+      The subscription ID. See get_updates().
+    """
+
+  @abc.abstractmethod
+  def subscribe_attribute(
+      self,
+      endpoint_id: int,
+      cluster_id: int,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType) -> int:
+    """Subscribes to the changes of a Matter attribute.
+
+    The first update is the current attribute value.
+
+    Args:
+      endpoint_id: The endpoint ID on the device.
+      cluster_id: The cluster ID on the given endpoint.
+      attribute_id: The attribute ID on the given cluster.
+      attribute_type: The attribute type.
+
+    Returns:
+      The subscription ID. See get_updates().
+    """
+
+  @abc.abstractmethod
+  def get_updates(self, subscription_id: int,
+                  timeout: float) -> list[Optional[bytes]]:
+    """Returns the updates of a subscription received since the last call.
+
+    Args:
+      subscription_id: ID returned by subscribe() or subscribe_attribute().
+      timeout: Maximum seconds to wait for the first update.
+
+    Returns:
+      RPC encoded payloads (None marks the end of a stream) or an empty list
+      if there were no updates within timeout seconds.
+    """
+
+  @abc.abstractmethod
+  def unsubscribe(self, subscription_id: int) -> None:
+    """Cancels a subscription and discards its pending updates.
+
+    Args:
+      subscription_id: ID returned by subscribe() or subscribe_attribute().
+    """
+
+  @abc.abstractmethod
+  def wait_for_attribute(
+      self,
+      endpoint_id: int,
+      cluster_id: int,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType,
+      predicate: Callable[[attributes_service_pb2.AttributeData], bool],
+      timeout: float) -> attributes_service_pb2.AttributeData:
+    """Waits until the data of a Matter attribute satisfies the predicate.
+
+    Args:
+      endpoint_id: The endpoint ID on the device.
+      cluster_id: The cluster ID on the given endpoint.
+      attribute_id: The attribute ID on the given cluster.
+      attribute_type: The attribute type.
+      predicate: Function called with the attribute data.
+      timeout: Maximum seconds to wait.
+
+    Returns:
+      The first attribute data satisfying the predicate.
+    """
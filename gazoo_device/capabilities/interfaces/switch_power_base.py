@@ -17,8 +17,14 @@
 This class defines the required API all flavors of the switch_power capability.
 """
 import abc
+from typing import Collection
+
+from gazoo_device import decorators
+from gazoo_device import gdm_logger
 from gazoo_device.capabilities.interfaces import capability_base
 
+_LOGGER = gdm_logger.get_logger()
+
 
 class SwitchPowerBase(capability_base.CapabilityBase):
   """Abstract base class defining the API for the switch_power capability."""
@@ -44,6 +50,32 @@ class SwitchPowerBase(capability_base.CapabilityBase):
         port (int): Identifies which auxiliary device port to power off.
     """
 
+  @decorators.CapabilityLogDecorator(_LOGGER)
+  def power_on_ports(self, ports: Collection[int]) -> None:
+    """Powers on the ports specified.
+
+    Flavors which can switch several ports with one command override this to
+    do so. By default, the ports are powered on one by one.
+
+    Args:
+        ports: Auxiliary device ports to power on.
+    """
+    for port in ports:
+      self.power_on(port)
+
+  @decorators.CapabilityLogDecorator(_LOGGER)
+  def power_off_ports(self, ports: Collection[int]) -> None:
+    """Powers off the ports specified.
+
+    Flavors which can switch several ports with one command override this to
+    do so. By default, the ports are powered off one by one.
+
+    Args:
+        ports: Auxiliary device ports to power off.
+    """
+    for port in ports:
+      self.power_off(port)
+
   @abc.abstractmethod
   def set_mode(self, mode, port):
     """Sets the given auxiliary device port to the mode specified.
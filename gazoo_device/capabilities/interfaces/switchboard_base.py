@@ -379,10 +379,40 @@ class SwitchboardBase(capability_base.CapabilityBase):
         Flushes the expect queue before and after an expect.
     """
 
+  def flush_log(self) -> None:
+    """Writes all pending log lines (including log notes) to the log file.
+
+    Only needed by switchboards which buffer log writes. Does nothing by
+    default.
+
+    Raises:
+        RuntimeError: if LogWriterProcess is not available or running.
+    """
+
   @abc.abstractmethod
   def get_line_identifier(self) -> line_identifier.LineIdentifier:
     """Returns the line identifier currently used by Switchboard."""
 
+  @abc.abstractmethod
+  def get_transport_update(self,
+                           timeout: Optional[float] = None,
+                           port: int = 0) -> Any:
+    """Returns the next update pushed by a transport.
+
+    Transports push updates to the parent process, such as Pigweed RPC
+    subscription updates.
+
+    Args:
+      timeout: Maximum seconds to wait for an update or indefinitely if None.
+      port: Number of the transport which pushes the updates.
+
+    Raises:
+      DeviceError: the transport doesn't push updates.
+
+    Returns:
+      The update or None if there was none within timeout seconds.
+    """
+
   @property
   @abc.abstractmethod
   def number_transports(self) -> int:
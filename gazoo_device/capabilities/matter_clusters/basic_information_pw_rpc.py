@@ -42,6 +42,25 @@ class BasicInformationClusterPwRpc(
     basic_information_base.BasicInformationClusterBase):
   """Matter Basic Information cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (BasicInformationCluster.ATTRIBUTE_DATA_MODEL_REVISION, UINT16_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_VENDOR_NAME, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_VENDOR_ID, UINT16_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_PRODUCT_NAME, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_PRODUCT_ID, UINT16_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_NODE_LABEL, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_LOCATION, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_HARDWARE_VERSION, UINT16_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_HARDWARE_VERSION_STRING, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_SOFTWARE_VERSION, UINT32_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_SOFTWARE_VERSION_STRING, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_MANUFACTURING_DATE, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_PART_NUMBER, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_PRODUCT_URL, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_SERIAL_NUMBER, STRING_TYPE),
+      (BasicInformationCluster.ATTRIBUTE_UNIQUE_ID, STRING_TYPE),
+  )
+
   @decorators.DynamicProperty
   def data_model_revision(self) -> int:
     """The DataModelRevision attribute."""
@@ -177,7 +196,7 @@ class BasicInformationClusterPwRpc(
     # The returned data only has tlv_data data field.
     else:
       decoder = tlv_utils.TLVReader(data.tlv_data)
-      raw_data = decoder.get()
+      raw_data = decoder.getValues()
       # The structure format of the TLV decoded data, ex:
       # {'Any': {1: [{1: {0: 1982833481, 1: [0, 40, 1], 2: 'TEST_VENDOR'}}]}}
       try:
@@ -33,6 +33,14 @@ ENUM8_ATTRIBUTE_TYPE = (attributes_service_pb2.AttributeType
 class ColorControlClusterPwRpc(color_control_base.ColorControlClusterBase):
   """Matter Color Control cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (ColorControlCluster.ATTRIBUTE_CURRENT_HUE, INT8U_ATTRIBUTE_TYPE),
+      (ColorControlCluster.ATTRIBUTE_CURRENT_SATURATION, INT8U_ATTRIBUTE_TYPE),
+      (ColorControlCluster.ATTRIBUTE_COLOR_TEMPERATURE_MIREDS,
+       INT16U_ATTRIBUTE_TYPE),
+      (ColorControlCluster.ATTRIBUTE_COLOR_MODE, ENUM8_ATTRIBUTE_TYPE),
+  )
+
   @decorators.CapabilityLogDecorator(logger)
   def move_to_hue(self, hue: int, verify: bool = True) -> None:
     """The MoveToHue command.
@@ -29,6 +29,16 @@ UINT8_ATTRIBUTE_TYPE = attributes_service_pb2.AttributeType.ZCL_INT8U_ATTRIBUTE_
 class FanControlClusterPwRpc(fan_control_base.FanControlClusterBase):
   """Matter Fan Control cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (FanControlCluster.ATTRIBUTE_FAN_MODE, ENUM8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_FAN_MODE_SEQUENCE, ENUM8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_PERCENT_SETTING, UINT8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_PERCENT_CURRENT, UINT8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_SPEED_MAX, UINT8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_SPEED_SETTING, UINT8_ATTRIBUTE_TYPE),
+      (FanControlCluster.ATTRIBUTE_SPEED_CURRENT, UINT8_ATTRIBUTE_TYPE),
+  )
+
   @decorators.DynamicProperty
   def fan_mode(self) -> matter_enums.FanMode:
     """The FanMode attribute."""
@@ -13,10 +13,16 @@
 # limitations under the License.
 
 """Interface for the Matter cluster capability."""
+import functools
 import inspect
+import threading
 from typing import Any, Callable, Optional
+from gazoo_device import decorators
+from gazoo_device import gdm_logger
 from gazoo_device.capabilities.interfaces import capability_base
 
+logger = gdm_logger.get_logger()
+
 
 class ClusterBase(capability_base.CapabilityBase):
   """Matter cluster capability interface."""
@@ -24,12 +30,17 @@ class ClusterBase(capability_base.CapabilityBase):
   # Cluster ID defined in the Matter spec.
   CLUSTER_ID = None
 
+  # (attribute ID, attribute type) of the attributes which snapshot() reads
+  # with a single read_many() call.
+  SNAPSHOT_ATTRIBUTES: tuple[tuple[int, int], ...] = ()
+
   def __init__(self,
                device_name: str,
                endpoint_id: int,
                read: Callable[..., Any],
                write: Callable[..., Any],
-               send: Optional[Callable[..., Any]] = None):
+               send: Optional[Callable[..., Any]] = None,
+               read_many: Optional[Callable[..., Any]] = None):
     """Initializes an instance of the Matter cluster capability.
 
     Args:
@@ -38,12 +49,19 @@ class ClusterBase(capability_base.CapabilityBase):
       read: The Ember API or MatterController read method.
       write: The Ember API or MatterController write method.
       send: The MatterController command send method.
+      read_many: The Ember API method reading several attributes at once.
     """
     super().__init__(device_name=device_name)
     self._endpoint_id = endpoint_id
-    self._read = read
     self._write = write
     self._send = send
+    self._read_many = read_many
+    # Attribute data read by snapshot() in the calling thread.
+    self._prefetched = threading.local()
+    if read_many is None:
+      self._read = read
+    else:
+      self._read = functools.partial(self._read_prefetched, read)
 
   def __setattr__(self, name: str, value: Any) -> None:
     """Overrides the __setattr__ to check if setting to the valid attribute."""
@@ -61,3 +79,53 @@ class ClusterBase(capability_base.CapabilityBase):
           f"{valid_attributes}.")
 
     super().__setattr__(name, value)
+
+  @decorators.CapabilityLogDecorator(logger)
+  def snapshot(self) -> dict[str, Any]:
+    """Returns the values of all attributes of the cluster.
+
+    If the cluster supports reading several attributes at once, the attributes
+    listed in SNAPSHOT_ATTRIBUTES are read with a single read_many() call. Any
+    other attribute is read individually.
+
+    Returns:
+      Mapping from attribute property name to its value.
+    """
+    names = [name for name, member in inspect.getmembers(type(self))
+             if isinstance(member, decorators.DynamicProperty) and
+             not hasattr(ClusterBase, name)]
+    if self._read_many is None or not self.SNAPSHOT_ATTRIBUTES:
+      return {name: getattr(self, name) for name in names}
+
+    requests = [(self._endpoint_id, self.CLUSTER_ID, attribute_id,
+                 attribute_type)
+                for attribute_id, attribute_type in self.SNAPSHOT_ATTRIBUTES]
+    self._prefetched.data = dict(zip(requests, self._read_many(requests)))
+    try:
+      return {name: getattr(self, name) for name in names}
+    finally:
+      self._prefetched.data = {}
+
+  def _read_prefetched(self, read: Callable[..., Any], *args: Any,
+                       **kwargs: Any) -> Any:
+    """Returns the data read by snapshot() or reads the attribute."""
+    prefetched = getattr(self._prefetched, "data", {})
+    data = prefetched.get(_get_read_request(kwargs))
+    return read(*args, **kwargs) if data is None else data
+
+
+def _get_read_request(
+    read_kwargs: dict[str, Any]) -> Optional[tuple[int, int, int, int]]:
+  """Returns (endpoint, cluster, attribute, type) of an Ember API read.
+
+  Args:
+    read_kwargs: Keyword arguments of the read.
+
+  Returns:
+    The attribute read or None if it is not an Ember API read.
+  """
+  try:
+    return (read_kwargs["endpoint_id"], read_kwargs["cluster_id"],
+            read_kwargs["attribute_id"], read_kwargs["attribute_type"])
+  except KeyError:
+    return None
@@ -29,6 +29,12 @@ INT8U_ATTRIBUTE_TYPE = attributes_service_pb2.AttributeType.ZCL_INT8U_ATTRIBUTE_
 class LevelControlClusterPwRpc(level_control_base.LevelControlClusterBase):
   """Matter Level Control cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (LevelControlCluster.ATTRIBUTE_CURRENT_LEVEL, INT8U_ATTRIBUTE_TYPE),
+      (LevelControlCluster.ATTRIBUTE_MIN_LEVEL, INT8U_ATTRIBUTE_TYPE),
+      (LevelControlCluster.ATTRIBUTE_MAX_LEVEL, INT8U_ATTRIBUTE_TYPE),
+  )
+
   @decorators.CapabilityLogDecorator(logger)
   def move_to_level(self, level: int, verify: bool = True) -> None:
     """The MoveToLevel command.
@@ -29,6 +29,14 @@ class OccupancySensingClusterPwRpc(
     occupancy_sensing_base.OccupancySensingClusterBase):
   """Matter Occupancy Sensing cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (_OccupancySensingCluster.ATTRIBUTE_OCCUPANCY, INT8U_ATTRIBUTE_TYPE),
+      (_OccupancySensingCluster.ATTRIBUTE_OCCUPANCY_SENSOR_TYPE,
+       BITMAP_ATTRIBUTE_TYPE),
+      (_OccupancySensingCluster.ATTRIBUTE_OCCUPANCY_SENSOR_TYPE_BITMAP,
+       BITMAP_ATTRIBUTE_TYPE),
+  )
+
   @decorators.DynamicProperty
   def occupancy(self) -> int:
     """The Occupancy attribute.
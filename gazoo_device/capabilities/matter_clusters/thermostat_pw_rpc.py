@@ -29,6 +29,19 @@ INT16S_ATTRIBUTE_TYPE = attributes_service_pb2.AttributeType.ZCL_INT16S_ATTRIBUT
 class ThermostatClusterPwRpc(thermostat_base.ThermostatClusterBase):
   """Matter Thermostat cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (ThermostatCluster.ATTRIBUTE_LOCAL_TEMPERATURE, INT16S_ATTRIBUTE_TYPE),
+      (ThermostatCluster.ATTRIBUTE_OCCUPIED_COOLING_SETPOINT,
+       INT16S_ATTRIBUTE_TYPE),
+      (ThermostatCluster.ATTRIBUTE_OCCUPANCY,
+       attributes_service_pb2.AttributeType.ZCL_BITMAP8_ATTRIBUTE_TYPE),
+      (ThermostatCluster.ATTRIBUTE_OCCUPIED_HEATING_SETPOINT,
+       INT16S_ATTRIBUTE_TYPE),
+      (ThermostatCluster.ATTRIBUTE_CONTROL_SEQUENCE_OF_OPERATION,
+       ENUM8_ATTRIBUTE_TYPE),
+      (ThermostatCluster.ATTRIBUTE_SYSTEM_MODE, ENUM8_ATTRIBUTE_TYPE),
+  )
+
   @decorators.DynamicProperty
   def local_temperature(self) -> int:
     """The LocalTemperature attribute.
@@ -38,6 +38,17 @@ class WindowCoveringClusterPwRpc(window_covering_base.WindowCoveringClusterBase
                                 ):
   """Matter Matter Window Covering cluster capability."""
 
+  SNAPSHOT_ATTRIBUTES = (
+      (_WINDOW_COVERING_CLUSTER.ATTRIBUTE_CURRENT_POSITION_LIFT_PERCENTAGE,
+       PERCENT_ATTRIBUTE_TYPE),
+      (_WINDOW_COVERING_CLUSTER.ATTRIBUTE_TARGET_POSITION_LIFT,
+       ATTRIBUTE_TYPE),
+      (_WINDOW_COVERING_CLUSTER.ATTRIBUTE_CURRENT_POSITION_TILT_PERCENTAGE,
+       PERCENT_ATTRIBUTE_TYPE),
+      (_WINDOW_COVERING_CLUSTER.ATTRIBUTE_TARGET_POSITION_TILT,
+       ATTRIBUTE_TYPE),
+  )
+
   @decorators.DynamicProperty
   def current_position_lift_percentage(self) -> int:
     """The CurrentPositionLiftPercentage attribute.
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 """Matter endpoint capability wrapper via Pigweed RPC."""
-from typing import Any, Callable, Union
+from typing import Any, Callable, Mapping, Optional, Sequence, Union
 
 from gazoo_device import decorators
 from gazoo_device import gdm_logger
@@ -24,6 +24,7 @@ from gazoo_device.capabilities.matter_endpoints import unsupported_endpoint
 from gazoo_device.capabilities.matter_endpoints.interfaces import endpoint_base
 from gazoo_device.protos import attributes_service_pb2
 from gazoo_device.protos import descriptor_service_pb2
+from gazoo_device.utility import matter_descriptor_cache
 from gazoo_device.utility import pwrpc_utils
 
 _DESCRIPTOR_SERVICE_NAME = "Descriptor"
@@ -36,6 +37,9 @@ _ATTRIBUTE_WRITE_RPC_NAME = "Write"
 _ATTRIBUTE_DATA_MODULE_PATH = "gazoo_device.protos.attributes_service_pb2.AttributeData"
 _ATTRIBUTE_METADATA_MODULE_PATH = "gazoo_device.protos.attributes_service_pb2.AttributeMetadata"
 
+# (endpoint ID, cluster ID, attribute ID, attribute type) of an attribute.
+AttributeRequest = tuple[int, int, int, int]
+
 logger = gdm_logger.get_logger()
 
 
@@ -44,23 +48,41 @@ class MatterEndpointsAccessorPwRpc(matter_endpoints_base.MatterEndpointsBase):
 
   _SUPPORTED_ENDPOINTS = matter_endpoints_and_clusters.SUPPORTED_ENDPOINTS
 
-  def __init__(self, device_name: str, switchboard_call: Callable[..., Any],
-               rpc_timeout_s: int):
+  def __init__(self,
+               device_name: str,
+               switchboard_call: Callable[..., Any],
+               rpc_timeout_s: int,
+               firmware_identity_fn: Optional[Callable[[], str]] = None,
+               descriptor_cache_directory: str = (
+                   matter_descriptor_cache.DEFAULT_DIRECTORY),
+               max_rpcs_in_flight: int = 1):
     """Constructor of MatterEndpointsAccessorPwRpc.
 
     Args:
       device_name: Device name used for logging.
       switchboard_call: The switchboard.call method.
       rpc_timeout_s: Timeout (s) for RPC calls.
+      firmware_identity_fn: Method returning the identity of the firmware
+        running on the device. If provided, the endpoints and clusters are
+        persisted on disk for this firmware.
+      descriptor_cache_directory: Directory of the persisted endpoints and
+        clusters.
+      max_rpcs_in_flight: Maximum number of pipelined RPCs awaiting a response
+        in read_many() and write_many(). Values above 1 require a device
+        which echoes pw_rpc call IDs in its responses.
     """
     super().__init__(
         device_name=device_name,
+        firmware_identity_fn=firmware_identity_fn,
+        descriptor_cache_directory=descriptor_cache_directory,
         read=self.read,
+        read_many=self.read_many,
         write=self.write,
         send=self.send,
     )
     self._switchboard_call = switchboard_call
     self._rpc_timeout_s = rpc_timeout_s
+    self._max_rpcs_in_flight = max_rpcs_in_flight
 
   @classmethod
   def get_sub_capability_flavors(
@@ -170,18 +192,46 @@ class MatterEndpointsAccessorPwRpc(matter_endpoints_base.MatterEndpointsBase):
     Raises:
       Device error when ack value is false.
     """
-    read_kwargs = {
-        "endpoint": endpoint_id, "cluster": cluster_id,
-        "attribute_id": attribute_id, "type": attribute_type,
-        "pw_rpc_timeout_s": self._rpc_timeout_s}
-
     data_in_bytes = self._switchboard_call(
         method_name=pwrpc_utils.RPC_METHOD_NAME,
         method_args=(_ATTRIBUTE_SERVICE_NAME, _ATTRIBUTE_READ_RPC_NAME),
-        method_kwargs=read_kwargs)
+        method_kwargs=self._get_read_kwargs(
+            endpoint_id, cluster_id, attribute_id, attribute_type))
 
     return attributes_service_pb2.AttributeData.FromString(data_in_bytes)
 
+  @decorators.CapabilityLogDecorator(logger)
+  def read_many(
+      self, requests: Sequence[AttributeRequest]
+  ) -> list[attributes_service_pb2.AttributeData]:
+    """Ember API read method for several attributes.
+
+    The reads are made in a single switchboard call, pipelined over the RPC
+    channel if max_rpcs_in_flight > 1.
+
+    Args:
+      requests: (endpoint ID, cluster ID, attribute ID, attribute type) of
+        each attribute to read.
+
+    Returns:
+      Attribute data of each request, in order.
+
+    Raises:
+      Device error when the ack value of any read is false.
+    """
+    rpc_requests = [
+        (_ATTRIBUTE_SERVICE_NAME, _ATTRIBUTE_READ_RPC_NAME,
+         self._get_read_kwargs(*request)) for request in requests
+    ]
+    if not rpc_requests:
+      return []
+    data_in_bytes = self._switchboard_call(
+        method_name=pwrpc_utils.RPC_BATCH_METHOD_NAME,
+        method_args=(rpc_requests,),
+        method_kwargs={"max_in_flight": self._max_rpcs_in_flight})
+    return [attributes_service_pb2.AttributeData.FromString(data)
+            for data in data_in_bytes]
+
   @decorators.CapabilityLogDecorator(logger)
   def write(
       self,
@@ -210,6 +260,61 @@ class MatterEndpointsAccessorPwRpc(matter_endpoints_base.MatterEndpointsBase):
     Raises:
       Device error when ack value is false.
     """
+    self._switchboard_call(
+        method_name=pwrpc_utils.RPC_METHOD_NAME,
+        method_args=(_ATTRIBUTE_SERVICE_NAME, _ATTRIBUTE_WRITE_RPC_NAME),
+        method_kwargs=self._get_write_kwargs(
+            endpoint_id, cluster_id, attribute_id, attribute_type,
+            data_kwargs))
+
+  @decorators.CapabilityLogDecorator(logger)
+  def write_many(
+      self,
+      requests: Sequence[tuple[int, int, int, int, Mapping[str, Any]]]
+  ) -> None:
+    """Ember API write method for several attributes.
+
+    The writes are made in a single switchboard call, in the given order,
+    pipelined over the RPC channel if max_rpcs_in_flight > 1.
+
+    Args:
+      requests: (endpoint ID, cluster ID, attribute ID, attribute type,
+        attribute data kwargs) of each attribute to write.
+
+    Raises:
+      Device error when the ack value of any write is false.
+    """
+    rpc_requests = [
+        (_ATTRIBUTE_SERVICE_NAME, _ATTRIBUTE_WRITE_RPC_NAME,
+         self._get_write_kwargs(*request)) for request in requests
+    ]
+    if rpc_requests:
+      self._switchboard_call(
+          method_name=pwrpc_utils.RPC_BATCH_METHOD_NAME,
+          method_args=(rpc_requests,),
+          method_kwargs={"max_in_flight": self._max_rpcs_in_flight})
+
+  def _get_read_kwargs(
+      self,
+      endpoint_id: int,
+      cluster_id: attributes_service_pb2.ClusterType,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType
+  ) -> dict[str, Any]:
+    """Returns the kwargs of the Attributes.Read RPC."""
+    return {
+        "endpoint": endpoint_id, "cluster": cluster_id,
+        "attribute_id": attribute_id, "type": attribute_type,
+        "pw_rpc_timeout_s": self._rpc_timeout_s}
+
+  def _get_write_kwargs(
+      self,
+      endpoint_id: int,
+      cluster_id: attributes_service_pb2.ClusterType,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType,
+      data_kwargs: Mapping[str, Any]) -> dict[str, Any]:
+    """Returns the kwargs of the Attributes.Write RPC."""
     data = attributes_service_pb2.AttributeData(**data_kwargs)
     metadata = attributes_service_pb2.AttributeMetadata(
         endpoint=endpoint_id,
@@ -221,17 +326,12 @@ class MatterEndpointsAccessorPwRpc(matter_endpoints_base.MatterEndpointsBase):
         data, _ATTRIBUTE_DATA_MODULE_PATH)
     serialized_metadata = pwrpc_utils.PigweedProtoState(
         metadata, _ATTRIBUTE_METADATA_MODULE_PATH)
-    write_kwargs = {
+    return {
         "data": serialized_data,
         "metadata": serialized_metadata,
         "pw_rpc_timeout_s": self._rpc_timeout_s,
     }
 
-    self._switchboard_call(
-        method_name=pwrpc_utils.RPC_METHOD_NAME,
-        method_args=(_ATTRIBUTE_SERVICE_NAME, _ATTRIBUTE_WRITE_RPC_NAME),
-        method_kwargs=write_kwargs)
-
   @decorators.CapabilityLogDecorator(logger)
   def send(
       self,
@@ -67,7 +67,7 @@ class MatterSampleAppShell(matter_sample_app_base.MatterSampleAppBase):
       pigweed_port: Pigweed RPC port number.
       send_file_to_device_fn: The send_file_to_device method.
       wait_for_bootup_complete_fn: The wait_for_bootup_complete method.
-      reset_endpoints_fn: The matter_endpoinst.reset method.
+      reset_endpoints_fn: The matter_endpoints.invalidate_cache method.
     """
     super().__init__(device_name=device_name)
     self._shell = shell_fn
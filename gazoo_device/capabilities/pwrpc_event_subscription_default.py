@@ -12,19 +12,56 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Pigweed RPC Event Subscription capability."""
+"""Pigweed RPC Event Subscription capability.
 
-from typing import Any, Callable
+Subscriptions live in the Pigweed RPC transport process, which pushes their
+updates to the parent process through the transport's update queue: waiting
+for an update doesn't make any RPC.
+"""
+
+import collections
+import itertools
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
 
 from gazoo_device import decorators
+from gazoo_device import errors
 from gazoo_device import gdm_logger
 from gazoo_device.capabilities.interfaces import pwrpc_event_subscription_base
+from gazoo_device.protos import attributes_service_pb2
 from gazoo_device.protos import boolean_state_service_pb2
 from gazoo_device.utility import pwrpc_utils
 
 
 logger = gdm_logger.get_logger()
 
+_SUBSCRIBE_METHOD_NAME = "subscribe"
+_WATCH_METHOD_NAME = "watch"
+_UNSUBSCRIBE_METHOD_NAME = "unsubscribe"
+# Maximum seconds a caller receives updates for the other callers at a time.
+_UPDATE_RECEIVE_INTERVAL_S = 0.1
+# Shared by all instances: subscriptions outlive the capability instances
+# which made them, so IDs must not be reused.
+_subscription_ids = itertools.count(1)
+
+
+def _attribute_change_log_regex(endpoint_id: int, cluster_id: int) -> str:
+  """Returns the regex of the Matter log line reporting a cluster change.
+
+  The Matter data model increments the data version of a cluster whenever one
+  of its attributes changes and logs "Endpoint <endpoint in hex>, Cluster
+  0x<vendor ID>_<cluster ID> update version to <version>".
+
+  Args:
+    endpoint_id: The endpoint ID on the device.
+    cluster_id: The cluster ID on the given endpoint.
+  """
+  return re.escape(
+      f"Endpoint {endpoint_id:x}, Cluster "
+      f"0x{cluster_id >> 16:04X}_{cluster_id & 0xFFFF:04X} update version")
+
 
 class PwRpcEventSubscriptionDefault(
     pwrpc_event_subscription_base.PwRpcEventSubscriptionBase):
@@ -33,17 +70,28 @@ class PwRpcEventSubscriptionDefault(
   def __init__(self,
                device_name: str,
                switchboard_call: Callable[..., Any],
-               rpc_timeout_s: int):
+               rpc_timeout_s: int,
+               switchboard_get_update: Optional[Callable[..., Any]] = None,
+               pigweed_port: int = 0):
     """Creates an instance of the PwRpcEventSubscriptionDefault capability.
 
     Args:
       device_name: Device name used for logging.
       switchboard_call: The switchboard.call method.
       rpc_timeout_s: Timeout (s) for RPC call.
+      switchboard_get_update: The switchboard.get_transport_update method.
+        Required by subscriptions.
+      pigweed_port: Pigweed RPC transport port number.
     """
     super().__init__(device_name=device_name)
     self._switchboard_call = switchboard_call
     self._rpc_timeout_s = rpc_timeout_s
+    self._switchboard_get_update = switchboard_get_update
+    self._pigweed_port = pigweed_port
+    # Subscription ID -> updates received but not returned yet.
+    self._updates: dict[int, collections.deque[Optional[bytes]]] = {}
+    self._updates_lock = threading.Lock()
+    self._receive_lock = threading.Lock()
 
   @decorators.CapabilityLogDecorator(logger)
   def set_boolean_state(self, state_value: bool) -> None:
@@ -59,7 +107,8 @@ class PwRpcEventSubscriptionDefault(
         method_args=("BooleanState", "Set"),
         method_kwargs={"endpoint_id": 1,
                        "state_value": state_value,
-                       "pw_rpc_timeout_s": self._rpc_timeout_s})
+                       "pw_rpc_timeout_s": self._rpc_timeout_s},
+        port=self._pigweed_port)
 
   @decorators.CapabilityLogDecorator(logger)
   def get_boolean_state(self) -> bool:
@@ -74,7 +123,196 @@ class PwRpcEventSubscriptionDefault(
         method_name=pwrpc_utils.RPC_METHOD_NAME,
         method_args=("BooleanState", "Get"),
         method_kwargs={"endpoint_id": 1,
-                       "pw_rpc_timeout_s": self._rpc_timeout_s})
+                       "pw_rpc_timeout_s": self._rpc_timeout_s},
+        port=self._pigweed_port)
     response = boolean_state_service_pb2.BooleanStateGetResponse.FromString(
         payload)
     return response.state.state_value
+
+  @decorators.CapabilityLogDecorator(logger)
+  def subscribe(self, service_name: str, event_name: str,
+                **kwargs: Any) -> int:
+    """Subscribes to the responses of a server streaming RPC.
+
+    Args:
+      service_name: PwRPC service name.
+      event_name: Server streaming event name in the given service.
+      **kwargs: Arguments for the event method.
+
+    Returns:
+      The subscription ID. See get_updates().
+    """
+    return self._start_subscription(
+        _SUBSCRIBE_METHOD_NAME, service_name, event_name, kwargs)
+
+  @decorators.CapabilityLogDecorator(logger)
+  def subscribe_attribute(
+      self,
+      endpoint_id: int,
+      cluster_id: int,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType) -> int:
+    """Subscribes to the changes of a Matter attribute.
+
+    The transport reads the attribute when the device logs a change of the
+    attribute's cluster (Matter firmware logs the new data version of the
+    cluster), and every few seconds in case the log line was missed or is not
+    logged by the firmware. Each read is an RPC over the device link: other
+    attribute changes in the cluster also cause reads, and other log lines
+    don't. The first update is the current attribute value.
+
+    Args:
+      endpoint_id: The endpoint ID on the device.
+      cluster_id: The cluster ID on the given endpoint.
+      attribute_id: The attribute ID on the given cluster.
+      attribute_type: The attribute type.
+
+    Returns:
+      The subscription ID. See get_updates().
+    """
+    return self._start_subscription(
+        _WATCH_METHOD_NAME, "Attributes", "Read",
+        {"endpoint": endpoint_id, "cluster": cluster_id,
+         "attribute_id": attribute_id, "type": attribute_type,
+         "pw_rpc_timeout_s": self._rpc_timeout_s,
+         "log_regex": _attribute_change_log_regex(endpoint_id, cluster_id)})
+
+  @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
+  def get_updates(self, subscription_id: int,
+                  timeout: float) -> list[Optional[bytes]]:
+    """Returns the updates of a subscription received since the last call.
+
+    Args:
+      subscription_id: ID returned by subscribe() or subscribe_attribute().
+      timeout: Maximum seconds to wait for the first update.
+
+    Returns:
+      RPC encoded payloads (None marks the end of a stream) or an empty list
+      if there were no updates within timeout seconds.
+
+    Raises:
+      DeviceError: the subscription doesn't exist.
+    """
+    deadline = time.time() + timeout
+    while True:
+      while self._receive_update(timeout=0):
+        pass
+      with self._updates_lock:
+        if subscription_id not in self._updates:
+          raise errors.DeviceError(
+              f"{self._device_name} has no subscription {subscription_id}.")
+        updates = self._updates[subscription_id]
+        if updates:
+          updates_list = list(updates)
+          updates.clear()
+          return updates_list
+      remaining = deadline - time.time()
+      if remaining <= 0:
+        return []
+      self._receive_update(min(remaining, _UPDATE_RECEIVE_INTERVAL_S))
+
+  @decorators.CapabilityLogDecorator(logger)
+  def unsubscribe(self, subscription_id: int) -> None:
+    """Cancels a subscription and discards its pending updates.
+
+    Args:
+      subscription_id: ID returned by subscribe() or subscribe_attribute().
+    """
+    with self._updates_lock:
+      self._updates.pop(subscription_id, None)
+    self._switchboard_call(
+        method_name=_UNSUBSCRIBE_METHOD_NAME,
+        method_args=(subscription_id,),
+        method_kwargs={},
+        port=self._pigweed_port)
+
+  @decorators.CapabilityLogDecorator(logger)
+  def wait_for_attribute(
+      self,
+      endpoint_id: int,
+      cluster_id: int,
+      attribute_id: int,
+      attribute_type: attributes_service_pb2.AttributeType,
+      predicate: Callable[[attributes_service_pb2.AttributeData], bool],
+      timeout: float) -> attributes_service_pb2.AttributeData:
+    """Waits until the data of a Matter attribute satisfies the predicate.
+
+    Args:
+      endpoint_id: The endpoint ID on the device.
+      cluster_id: The cluster ID on the given endpoint.
+      attribute_id: The attribute ID on the given cluster.
+      attribute_type: The attribute type.
+      predicate: Function called with the attribute data.
+      timeout: Maximum seconds to wait.
+
+    Returns:
+      The first attribute data satisfying the predicate.
+
+    Raises:
+      CommunicationTimeoutError: the predicate wasn't satisfied in time.
+    """
+    deadline = time.time() + timeout
+    subscription_id = self.subscribe_attribute(
+        endpoint_id, cluster_id, attribute_id, attribute_type)
+    try:
+      while True:
+        for payload in self.get_updates(
+            subscription_id, timeout=max(deadline - time.time(), 0)):
+          data = attributes_service_pb2.AttributeData.FromString(payload)
+          if predicate(data):
+            return data
+        if time.time() >= deadline:
+          raise errors.CommunicationTimeoutError(
+              f"{self._device_name} attribute {attribute_id} of cluster "
+              f"{cluster_id} on endpoint {endpoint_id} did not satisfy the "
+              f"predicate within {timeout}s.")
+    finally:
+      self.unsubscribe(subscription_id)
+
+  def _start_subscription(self, method_name: str, service_name: str,
+                          event_name: str, kwargs: dict[str, Any]) -> int:
+    """Starts a subscription in the transport and returns its ID."""
+    if self._switchboard_get_update is None:
+      raise errors.DeviceError(
+          f"{self._device_name} does not support Pigweed RPC subscriptions.")
+    subscription_id = next(_subscription_ids)
+    with self._updates_lock:
+      self._updates[subscription_id] = collections.deque()
+    try:
+      self._switchboard_call(
+          method_name=method_name,
+          method_args=(subscription_id, service_name, event_name),
+          method_kwargs=kwargs,
+          port=self._pigweed_port)
+    except Exception:
+      with self._updates_lock:
+        del self._updates[subscription_id]
+      raise
+    return subscription_id
+
+  def _receive_update(self, timeout: float) -> bool:
+    """Receives one update from the transport for its subscription.
+
+    Updates of cancelled subscriptions are dropped. Only one caller receives
+    updates at a time.
+
+    Args:
+      timeout: Maximum seconds to wait for an update.
+
+    Returns:
+      True if an update was received, False otherwise.
+    """
+    if not self._receive_lock.acquire(timeout=timeout):
+      return False
+    try:
+      update = self._switchboard_get_update(
+          timeout=timeout, port=self._pigweed_port)
+    finally:
+      self._receive_lock.release()
+    if update is None:
+      return False
+    subscription_id, payload = update
+    with self._updates_lock:
+      if subscription_id in self._updates:
+        self._updates[subscription_id].append(payload)
+    return True
@@ -151,6 +151,30 @@ class SwitchPowerDliPowerswitch(switch_power_base.SwitchPowerBase):
         headers=self._headers_dict["SET_PROP"],
         data={"value": "false"})
 
+  @decorators.CapabilityLogDecorator(logger)
+  def power_on_ports(self, ports):
+    """Powers on the specified ports with a single request.
+
+    Args:
+        ports (Collection[int]): device port numbers
+
+    Raises:
+        DeviceError: if any port is None, port < 0, or port >= total_ports
+    """
+    self._set_ports_value("power_on_ports", ports, "true")
+
+  @decorators.CapabilityLogDecorator(logger)
+  def power_off_ports(self, ports):
+    """Powers off the specified ports with a single request.
+
+    Args:
+        ports (Collection[int]): device port numbers
+
+    Raises:
+        DeviceError: if any port is None, port < 0, or port >= total_ports
+    """
+    self._set_ports_value("power_off_ports", ports, "false")
+
   @decorators.CapabilityLogDecorator(logger)
   def set_mode(self, mode, port):
     """Sets the given Powerswitch port to the mode specified.
@@ -192,6 +216,35 @@ class SwitchPowerDliPowerswitch(switch_power_base.SwitchPowerBase):
         headers=self._headers_dict["SET_PROP"],
         data={"value": data_value})
 
+  def _set_ports_value(self, method_name, ports, value):
+    """Sets the state of several ports with a matrix URI ("=0,2,5").
+
+    Args:
+        method_name (str): name of the calling method, for error messages.
+        ports (Collection[int]): device port numbers
+        value (str): state to set, "true" or "false".
+
+    Raises:
+        DeviceError: if any port is not valid
+    """
+    ports = sorted(set(ports))
+    if not ports:
+      return
+    for port in ports:
+      self._validate_port(method_name, port)
+    if len(ports) == self._total_ports:
+      selector = "all;"
+    else:
+      selector = "=" + ",".join(str(port) for port in ports)
+    logger.debug("{} Setting powerswitch ports {} to {}".format(
+        self._device_name, ports, value))
+    self._http_fn(
+        "POST",
+        self._command_dict["ADJUST_PORTS_MODE"].format(
+            selector, ip=self._ip_address),
+        headers=self._headers_dict["SET_PROP"],
+        data={"value": value})
+
   def _validate_mode(self, mode):
     """Verify mode given resides in the valid mode list.
 
@@ -12,61 +12,68 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """SNMP implementation of switch_power."""
-import re
-import subprocess
-from typing import Literal
+from typing import Collection, Literal, Sequence
 
 from gazoo_device import decorators
 from gazoo_device import errors
 from gazoo_device import gdm_logger
 from gazoo_device.capabilities.interfaces import switch_power_base
+from gazoo_device.utility import snmp_utils
 
 logger = gdm_logger.get_logger()
 
 PRIVATE_COMMUNITY = "private"
 
-_GET = "snmpget"
-_SET = "snmpset"
-
 _SNMP_TIMEOUT_S = 10
 
 # 1.3.6.1.2.1.2.2.1.7 is the SNMP object identifier (OID) for ifAdminStatus.
 # This OID specifies the SNMP endpoint for the status of the switch's ports.
 # Querying this OID will list all possible ports and their status.
 # ref: https://oidref.com/1.3.6.1.2.1.2.2.1.7
-_GET_MODE_SNMP_COMMAND = (
-    "{snmp_command} -v 2c -c {community} {ip}:161 1.3.6.1.2.1.2.2.1.7.{port}")
-_SET_MODE_SNMP_COMMAND = _GET_MODE_SNMP_COMMAND + " i {mode}"
-_MODE_RESPONSE_REG_EX = r".+INTEGER:.+?(\d+)"
+_PORT_MODE_OID = "1.3.6.1.2.1.2.2.1.7.{port}"
 
 # The ifAdminStatus endpoint defines port statuses as 1 or 2.
 # The states map like: 1 = ON and 2 = OFF.
 _ON = "ON"
 _OFF = "OFF"
-_GET_MODE_MAPPING = {"1": _ON, "2": _OFF}
-_SET_MODE_MAPPING = {_ON: "1", _OFF: "2"}
+_GET_MODE_MAPPING = {1: _ON, 2: _OFF}
+_SET_MODE_MAPPING = {_ON: 1, _OFF: 2}
 
 
 class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
-  """Switch power flavor for snmp switches."""
+  """Switch power flavor for snmp switches.
+
+  The modes of multiple ports are read and written with batched SNMP requests
+  (one round trip per up to 24 ports) over a UDP socket reused across calls.
+  """
 
   def __init__(self,
                device_name: str,
                ip_address: str,
                total_ports: int,
-               community: str = PRIVATE_COMMUNITY):
+               community: str = PRIVATE_COMMUNITY,
+               snmp_port: int = snmp_utils.SNMP_PORT):
     """Initializes switch power with SNMP capability.
 
     Args:
       device_name: Name of the device attached to this capability.
-      ip_address: Function to get port status.
+      ip_address: IP address of the switch.
       total_ports: Number of network ports present on the device.
       community: Community string configured on switch.
+      snmp_port: UDP port of the SNMP agent of the switch.
     """
     super().__init__(device_name=device_name)
     self._ip_address = ip_address
     self._total_ports = total_ports
     self._community = community
+    self._snmp_client = snmp_utils.SnmpClient(
+        ip_address, community, port=snmp_port, timeout=_SNMP_TIMEOUT_S)
+
+  @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
+  def close(self):
+    """Closes the SNMP socket."""
+    self._snmp_client.close()
+    super().close()
 
   @decorators.PersistentProperty
   def supported_modes(self) -> list[str]:
@@ -91,25 +98,19 @@ class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
       DeviceError: Raised if passed invalid port.
     """
     self._validate_port(port)
-    get_mode_command = _GET_MODE_SNMP_COMMAND.format(
-        snmp_command=_GET,
-        community=self._community,
-        ip=self._ip_address,
-        port=port)
-
-    # A command that query's port 1's status looks like:
-    # "snmpget -v 2c -c private 123.45.67.89:161 1.3.6.1.2.1.2.2.1.7.1"
-    # And its expected response should look like:
-    # "iso.3.6.1.2.1.2.2.1.7.1 = INTEGER: 1"
-    response = subprocess.check_output(
-        get_mode_command.split(), text=True, timeout=_SNMP_TIMEOUT_S)
-
-    match = re.search(_MODE_RESPONSE_REG_EX, response)
-    if match and match.group(1) in _GET_MODE_MAPPING.keys():
-      return _GET_MODE_MAPPING[match.group(1)]
-    raise errors.DeviceError(f"{self._device_name} failed to get port status"
-                             f"with command: {get_mode_command}\n"
-                             f"Unexpected output: {response}")
+    return self._get_ports_mode([port])[port]
+
+  @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
+  def get_all_ports_mode(self) -> dict[int, str]:
+    """Gets the modes of all ports with batched SNMP requests.
+
+    Returns:
+      Port mode settings ("OFF" or "ON") by port number.
+
+    Raises:
+      DeviceError: Raised if the switch fails to report the mode of a port.
+    """
+    return self._get_ports_mode(range(1, self._total_ports + 1))
 
   @decorators.CapabilityLogDecorator(logger)
   def set_mode(self, mode: Literal[_ON, _OFF], port: int):
@@ -122,45 +123,15 @@ class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
     Raises:
       DeviceError: Raised if passed an invalid port or mode.
     """
-    self._validate_port(port)
-    if port == 1:
-      raise errors.DeviceError(
-          "Port 1 is reserved as the connection to the host machine. "
-          "Setting this port is disallowed."
-      )
-
-    if mode.upper() not in list(self.supported_modes):
-      raise ValueError(f"Attempting to set invalid mode: {mode}. "
-                       f"Valid modes are: {self.supported_modes()}.")
-
-    mode = mode.upper()
-    set_mode_command = _SET_MODE_SNMP_COMMAND.format(
-        snmp_command=_SET,
-        community=self._community,
-        ip=self._ip_address,
-        port=port,
-        mode=_SET_MODE_MAPPING[mode])
-
-    # A command that sets port 1's mode to OFF looks like:
-    # "snmpset -v 2c -c private 123.45.67.89:161 1.3.6.1.2.1.2.2.1.7.1 i 2"
-    # And it's expected response should look like:
-    # "iso.3.6.1.2.1.2.2.1.7.1 = INTEGER: 2"
-    response = subprocess.check_output(
-        set_mode_command.split(), text=True, timeout=_SNMP_TIMEOUT_S)
-
-    match = re.search(_MODE_RESPONSE_REG_EX, response)
-    if not match or match.group(1) != _SET_MODE_MAPPING[mode]:
-      raise errors.DeviceError(
-          f"{self._device_name} Failed to turn {mode.lower()} "
-          f"the port using command: '{set_mode_command}'. "
-          f"Output: '{response}'")
+    self._validate_settable_port(port)
+    self._set_ports_mode(self._validate_mode(mode), [port])
 
   @decorators.CapabilityLogDecorator(logger)
   def set_all_ports_mode(self, mode: Literal[_ON, _OFF]):
     """Sets all Ethernet switch ports to the mode specified.
 
     Port 1 is skipped here because that port is assumed to be connected
-    to the host machine.
+    to the host machine. The ports are set with batched SNMP requests.
 
     Args:
       mode: Port mode to set. 'on' or 'off'.
@@ -168,8 +139,8 @@ class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
     Raises:
       DeviceError: invalid mode.
     """
-    for port in range(2, self._total_ports + 1):
-      self.set_mode(mode=mode, port=port)
+    self._set_ports_mode(
+        self._validate_mode(mode), range(2, self._total_ports + 1))
 
   @decorators.CapabilityLogDecorator(logger)
   def power_off(self, port: int):
@@ -189,6 +160,28 @@ class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
     """
     self.set_mode(_ON, port)
 
+  @decorators.CapabilityLogDecorator(logger)
+  def power_off_ports(self, ports: Collection[int]):
+    """Powers off the ports specified with batched SNMP requests.
+
+    Args:
+      ports: Hub ports to power off.
+    """
+    for port in ports:
+      self._validate_settable_port(port)
+    self._set_ports_mode(_OFF, sorted(set(ports)))
+
+  @decorators.CapabilityLogDecorator(logger)
+  def power_on_ports(self, ports: Collection[int]):
+    """Powers on the ports specified with batched SNMP requests.
+
+    Args:
+      ports: Hub ports to power on.
+    """
+    for port in ports:
+      self._validate_settable_port(port)
+    self._set_ports_mode(_ON, sorted(set(ports)))
+
   def _validate_port(self, port: int):
     """Ensures port is a valid port number.
 
@@ -201,3 +194,76 @@ class SwitchPowerSnmp(switch_power_base.SwitchPowerBase):
     if not (1 <= port <= self._total_ports):
       raise errors.DeviceError(
           f"Port {port} does not exist on {self._device_name}.")
+
+  def _validate_settable_port(self, port: int):
+    """Ensures port is a valid port number which may be set.
+
+    Args:
+      port: Device port number.
+
+    Raises:
+      DeviceError: if input port is not valid or is port 1.
+    """
+    self._validate_port(port)
+    if port == 1:
+      raise errors.DeviceError(
+          "Port 1 is reserved as the connection to the host machine. "
+          "Setting this port is disallowed."
+      )
+
+  def _validate_mode(self, mode: str) -> str:
+    """Returns the mode in upper case.
+
+    Args:
+      mode: Mode to validate.
+
+    Raises:
+      ValueError: if the mode is not supported.
+    """
+    if mode.upper() not in self.supported_modes:
+      raise ValueError(f"Attempting to set invalid mode: {mode}. "
+                       f"Valid modes are: {self.supported_modes}.")
+    return mode.upper()
+
+  def _get_ports_mode(self, ports: Sequence[int]) -> dict[int, str]:
+    """Gets the modes of the ports with batched SNMP requests.
+
+    Args:
+      ports: Ports to get the mode of.
+
+    Returns:
+      Port mode settings by port number.
+
+    Raises:
+      DeviceError: if the switch fails to report the mode of a port.
+    """
+    values = self._snmp_client.get(
+        [_PORT_MODE_OID.format(port=port) for port in ports])
+    modes = {}
+    for port, value in zip(ports, values):
+      if value not in _GET_MODE_MAPPING:
+        raise errors.DeviceError(
+            f"{self._device_name} failed to get the status of port {port}. "
+            f"Unexpected ifAdminStatus value: {value!r}")
+      modes[port] = _GET_MODE_MAPPING[value]
+    return modes
+
+  def _set_ports_mode(self, mode: str, ports: Sequence[int]) -> None:
+    """Sets the ports to the mode with batched SNMP requests.
+
+    Args:
+      mode: Mode to set ("ON" or "OFF").
+      ports: Ports to set.
+
+    Raises:
+      DeviceError: if the switch fails to set the mode of a port.
+    """
+    values = self._snmp_client.set(
+        [(_PORT_MODE_OID.format(port=port), _SET_MODE_MAPPING[mode])
+         for port in ports])
+    failed_ports = [port for port, value in zip(ports, values)
+                    if value != _SET_MODE_MAPPING[mode]]
+    if failed_ports:
+      raise errors.DeviceError(
+          f"{self._device_name} failed to turn {mode.lower()} ports "
+          f"{failed_ports}. Reported ifAdminStatus values: {values}")
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 """Implementation of the switch_power_usb_default capability."""
-from typing import Any, Callable
+from typing import Any, Callable, Collection, Mapping, Optional, Sequence
 
 from gazoo_device import decorators
 from gazoo_device import errors
@@ -38,7 +38,9 @@ class SwitchPowerUsbDefault(switch_power_base.SwitchPowerBase):
                regex_dict: dict[str, str],
                device_name: str,
                serial_number: str,
-               total_ports: int):
+               total_ports: int,
+               batch_shell_fn: Optional[
+                   Callable[[Sequence[str]], list[str]]] = None):
     """Initializes an instance of SwitchPowerUsbDefault capability.
 
     Args:
@@ -49,9 +51,13 @@ class SwitchPowerUsbDefault(switch_power_base.SwitchPowerBase):
       device_name: name of the device this capability is attached to.
       serial_number: serial number of device this capability is attached to.
       total_ports: Number of ports on the device.
+      batch_shell_fn: Function which sends several commands at once and
+        returns their responses, if the device supports it. Otherwise, the
+        commands of set_modes() are sent one by one with shell_fn.
     """
     super().__init__(device_name=device_name)
     self._shell_fn = shell_fn
+    self._batch_shell_fn = batch_shell_fn
     self._regex_shell_fn = regex_shell_fn
     self._command_dict = command_dict
     self._regex_dict = regex_dict
@@ -151,6 +157,24 @@ class SwitchPowerUsbDefault(switch_power_base.SwitchPowerBase):
     self._shell_fn(self._command_dict["POWER_OFF"].format(
         self._serial_number, port))
 
+  @decorators.CapabilityLogDecorator(logger)
+  def power_on_ports(self, ports: Collection[int]):
+    """Powers on the ports specified (see set_modes()).
+
+    Args:
+      ports: Hub ports to power on.
+    """
+    self.set_modes({port: SYNC for port in ports})
+
+  @decorators.CapabilityLogDecorator(logger)
+  def power_off_ports(self, ports: Collection[int]):
+    """Powers off the ports specified (see set_modes()).
+
+    Args:
+      ports: Hub ports to power off.
+    """
+    self.set_modes({port: OFF for port in ports})
+
   @decorators.CapabilityLogDecorator(logger)
   def set_all_ports_mode(self, mode):
     """Sets all USB hub ports to the mode specified.
@@ -166,6 +190,30 @@ class SwitchPowerUsbDefault(switch_power_base.SwitchPowerBase):
     for port in range(1, self._total_ports + 1):
       self.set_mode(mode=mode, port=port)
 
+  @decorators.CapabilityLogDecorator(logger)
+  def set_modes(self, modes: Mapping[int, str]):
+    """Sets the USB ports to the modes specified.
+
+    All ports and modes are validated before any port is set. The commands
+    are sent together if the device supports it.
+
+    Args:
+      modes: USB mode to set by port number.
+
+    Raises:
+      DeviceError: invalid mode or port.
+    """
+    commands = []
+    for port, mode in modes.items():
+      port = int(port)
+      mode = mode.lower()
+      self._validate_port("set_modes", port)
+      self._validate_mode(mode)
+      commands.append(self._get_set_mode_command(mode, port))
+    logger.debug("{} setting usb port modes {}".format(
+        self._device_name, dict(modes)))
+    self._send_commands(commands)
+
   @decorators.CapabilityLogDecorator(logger)
   def set_mode(self, mode, port):
     """Sets the specified USB port to the mode specified.
@@ -187,6 +235,20 @@ class SwitchPowerUsbDefault(switch_power_base.SwitchPowerBase):
     else:  # "sync"
       self.power_on(port)
 
+  def _get_set_mode_command(self, mode: str, port: int) -> str:
+    """Returns the command which sets the port to the (validated) mode."""
+    if mode == OFF:
+      return self._command_dict["POWER_OFF"].format(self._serial_number, port)
+    return self._command_dict["POWER_ON"].format(self._serial_number, port)
+
+  def _send_commands(self, commands: Sequence[str]) -> list[str]:
+    """Sends the commands together if supported, otherwise one by one."""
+    if not commands:
+      return []
+    if self._batch_shell_fn is not None:
+      return self._batch_shell_fn(commands)
+    return [self._shell_fn(command) for command in commands]
+
   def _validate_mode(self, mode):
     """Verify mode given resides in the valid mode list.
 
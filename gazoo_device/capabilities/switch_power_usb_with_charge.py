@@ -13,7 +13,8 @@
 # limitations under the License.
 
 """Implementation of the switch_power_usb_with_charge capability."""
-from typing import Any, Callable, Literal
+import re
+from typing import Any, Callable, Literal, Optional, Sequence
 
 from gazoo_device import decorators
 from gazoo_device import gdm_logger
@@ -38,7 +39,9 @@ class SwitchPowerUsbWithCharge(switch_power_usb_default.SwitchPowerUsbDefault):
                regex_dict: dict[str, str],
                device_name: str,
                serial_number: str,
-               total_ports: int):
+               total_ports: int,
+               batch_shell_fn: Optional[
+                   Callable[[Sequence[str]], list[str]]] = None):
     """Initializes an instance of SwitchPowerUsbWithCharge capability.
 
     Args:
@@ -49,6 +52,8 @@ class SwitchPowerUsbWithCharge(switch_power_usb_default.SwitchPowerUsbDefault):
       device_name: name of the device this capability is attached to.
       serial_number: serial number of device this capability is attached to.
       total_ports: Number of ports on the device.
+      batch_shell_fn: Function which sends several commands at once and
+        returns their responses, if the device supports it.
     """
     super().__init__(
         shell_fn=shell_fn,
@@ -57,13 +62,37 @@ class SwitchPowerUsbWithCharge(switch_power_usb_default.SwitchPowerUsbDefault):
         regex_dict=regex_dict,
         device_name=device_name,
         serial_number=serial_number,
-        total_ports=total_ports)
+        total_ports=total_ports,
+        batch_shell_fn=batch_shell_fn)
 
   @decorators.PersistentProperty
   def supported_modes(self):
     """Get the USB power modes supported by the USB hub."""
     return [OFF, SYNC, CHARGE]
 
+  def get_all_ports_mode(self):
+    """Gets the USB mode for all ports on this hub.
+
+    The state commands of all ports are sent together if the device supports
+    it. Ports whose response can't be parsed are queried again with retries.
+
+    Returns:
+      list: Returns a list of port modes with port number as index.
+    """
+    if self._batch_shell_fn is None:
+      return super().get_all_ports_mode()
+    ports = range(1, self._total_ports + 1)
+    responses = self._batch_shell_fn(
+        [self._command_dict["GET_MODE"].format(port) for port in ports])
+    mode_list = []
+    for port, response in zip(ports, responses):
+      match = re.search(self._regex_dict["GET_MODE_REGEX"], response)
+      if match:
+        mode_list.append(_get_mode_from_flags(match.group(1)))
+      else:
+        mode_list.append(self.get_mode(port))
+    return mode_list
+
   def get_mode(self, port):
     """Gets the USB mode for the specified port.
 
@@ -83,14 +112,7 @@ class SwitchPowerUsbWithCharge(switch_power_usb_default.SwitchPowerUsbDefault):
         self._command_dict["GET_MODE"].format(port),
         self._regex_dict["GET_MODE_REGEX"],
         tries=5)
-
-    if "O" in flags:
-      mode = OFF
-    elif "S" in flags:
-      mode = SYNC
-    else:
-      mode = CHARGE
-    return mode
+    return _get_mode_from_flags(flags)
 
   @decorators.CapabilityLogDecorator(logger)
   def power_off(self, port):
@@ -148,5 +170,18 @@ class SwitchPowerUsbWithCharge(switch_power_usb_default.SwitchPowerUsbDefault):
     Raises:
       DeviceError: invalid mode.
     """
-    for port in range(1, self._total_ports + 1):
-      self.set_mode(mode=mode, port=port)
+    self.set_modes(
+        {port: mode for port in range(1, self._total_ports + 1)})
+
+  def _get_set_mode_command(self, mode: str, port: int) -> str:
+    """Returns the command which sets the port to the (validated) mode."""
+    return self._command_dict["SET_MODE"].format(mode, port)
+
+
+def _get_mode_from_flags(flags: str) -> str:
+  """Returns the USB mode of a port from the flags of its state."""
+  if "O" in flags:
+    return OFF
+  if "S" in flags:
+    return SYNC
+  return CHARGE
@@ -23,6 +23,9 @@ INSTALL_DIRECTORY = os.path.join(os.path.expanduser("~"), "gazoo", "gdm")
 LAUNCHER_PATH = os.path.join(os.path.expanduser("~"), "gazoo", "bin", "gdm")
 
 ADB_BIN_PATH_CONFIG = "adb_path"
+# GDM config setting for Managers created with connection_status_ttl=0, such
+# as the CLI's.
+CONNECTION_STATUS_TTL_CONFIG = "connection_status_ttl"
 SEARCHWINDOWSIZE = 2000  # Default size of search window for switchboard methods
 
 DEFAULT_LOG_DIRECTORY = os.path.join(INSTALL_DIRECTORY, "log")
@@ -43,6 +46,9 @@ DEFAULT_OPTIONS_FILE = os.path.join(CONFIG_DIRECTORY, "device_options.json")
 DEFAULT_TESTBEDS_FILE = os.path.join(CONFIG_DIRECTORY, "testbeds.json")
 DEFAULT_GDM_CONFIG_FILE = os.path.join(CONFIG_DIRECTORY, "gdm.json")
 DEFAULT_LOG_FILE = os.path.join(DEFAULT_LOG_DIRECTORY, "gdm.txt")
+# Device connection statuses shared by the Managers of all processes.
+CONNECTION_STATUS_FILE = os.path.join(DATA_DIRECTORY,
+                                      "connection_statuses.json")
 
 DEVICES_KEYS = ["devices", "other_devices"]
 OPTIONS_KEYS = ["device_options", "other_device_options"]
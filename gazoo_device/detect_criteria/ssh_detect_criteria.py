@@ -13,8 +13,9 @@
 # limitations under the License.
 
 """SSH queries sent to devices during detection to determine their device type."""
+import contextlib
 import logging
-from typing import Callable
+from typing import Callable, Iterator
 from gazoo_device.capabilities.interfaces import switchboard_base
 from gazoo_device.detect_criteria import base_detect_criteria
 from gazoo_device.keys import raspberry_pi_key
@@ -44,6 +45,25 @@ _SSH_COMMANDS = immutabledict.immutabledict({
 _UNIFI_MODEL_PREFIXES = ("USW-", "US-")
 
 
+@contextlib.contextmanager
+def multiplexed_ssh_connections() -> Iterator[None]:
+  """Shares one SSH connection per address, user and key between SSH queries.
+
+  Uses the process-wide SSH connection pool (see
+  host_utils.enable_ssh_connection_pool()), which is also used by SSH
+  commands and transports. Contexts can be nested or active in several
+  threads at the same time.
+
+  Yields:
+    None.
+  """
+  host_utils.enable_ssh_connection_pool()
+  try:
+    yield
+  finally:
+    host_utils.close_ssh_connection_pool()
+
+
 class SshQuery(base_detect_criteria.QueryEnum):
   """Query names for detection for SshComms Devices."""
   IS_DLI = "is_dli_power_switch"
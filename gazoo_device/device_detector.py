@@ -13,13 +13,16 @@
 # limitations under the License.
 
 """Device detector module."""
+import concurrent.futures
+import contextlib
 import copy
 import logging
 import os
 import re
 import time
 import typing
-from typing import Any, Callable, Collection, Mapping, Optional, Union
+from typing import (Any, Callable, Collection, Iterator, Mapping, Optional,
+                    Sequence, Union)
 import weakref
 
 from gazoo_device import config
@@ -32,6 +35,7 @@ from gazoo_device import gdm_logger
 from gazoo_device.base_classes import auxiliary_device_base
 from gazoo_device.capabilities.interfaces import switchboard_base
 from gazoo_device.detect_criteria import base_detect_criteria
+from gazoo_device.detect_criteria import ssh_detect_criteria
 from gazoo_device.switchboard.communication_types import ssh_comms
 from gazoo_device.utility import common_utils
 from gazoo_device.utility import host_utils
@@ -39,8 +43,12 @@ from gazoo_device.utility import host_utils
 WIKI_URL = (
     "https://github.com/google/gazoo-device/blob/master/docs/device_setup")
 _LOG_FORMAT = "<%(asctime)s> %(filename)-20s:%(lineno)d: %(message)s"
+# Connections of each communication type are detected concurrently by up to
+# this many threads.
+_MAX_WORKERS_PER_COMMUNICATION_TYPE = 16
 
 _DeviceClassType = type[device_types.Device]
+_QueryResponses = dict[base_detect_criteria.QueryEnum, Union[bool, str]]
 
 logger = gdm_logger.get_logger()
 
@@ -49,6 +57,9 @@ def _setup_logger(log_file_path: str) -> logging.Logger:
   """Set up a logger to log device interactions to the detect file."""
   detect_logger = logging.getLogger(log_file_path)
   detect_logger.setLevel(logging.DEBUG)
+  # Connections are detected concurrently. Keep each connection's device
+  # interactions in its own detect file.
+  detect_logger.propagate = False
   handler = logging.FileHandler(log_file_path)
   formatter = logging.Formatter(_LOG_FORMAT)
   handler.setFormatter(formatter)
@@ -57,41 +68,39 @@ def _setup_logger(log_file_path: str) -> logging.Logger:
 
 
 def _get_detect_query_response(
-    address: str, communication_type: str, detect_logger: logging.Logger,
+    query_name: base_detect_criteria.QueryEnum,
+    query: base_detect_criteria.DetectQueryCallable,
+    address: str, detect_logger: logging.Logger,
     create_switchboard_func: Callable[..., switchboard_base.SwitchboardBase]
-) -> dict[base_detect_criteria.QueryEnum, Union[bool, str]]:
-  """Gathers device responses for all queries of that communication type.
+) -> Union[bool, str]:
+  """Gathers the device response to a detect query.
 
   Args:
+    query_name: query enum member.
+    query: query to run.
     address: communication_address
-    communication_type: category of communication.
     detect_logger: logs device interactions.
     create_switchboard_func: Method to create the switchboard.
 
   Returns:
-    Device responses keyed by query enum member.
+    Device response to the query, or the query error if it raised one.
   """
-  query_responses = {}
-  detect_queries = extensions.detect_criteria[communication_type]
-  for query_name, query in detect_queries.items():
-    try:
-      query_responses[query_name] = query(
-          address=address,
-          detect_logger=detect_logger,
-          create_switchboard_func=create_switchboard_func)
-      detect_logger.info("%s response from %s: %r",
-                         query_name, address, query_responses[query_name])
-    except Exception as err:  # pylint: disable=broad-except
-      detect_logger.info("%s failed for %s: %r", query_name, address, err,
-                         exc_info=True)
-      query_responses[query_name] = repr(err)
-
-    if not isinstance(query_responses[query_name], (str, bool)):
-      detect_logger.warning(
-          "%s returned invalid response type %s for %s!",
-          query_name, type(query_responses[query_name]), address)
-
-  return query_responses
+  try:
+    response = query(
+        address=address,
+        detect_logger=detect_logger,
+        create_switchboard_func=create_switchboard_func)
+    detect_logger.info("%s response from %s: %r", query_name, address, response)
+  except Exception as err:  # pylint: disable=broad-except
+    detect_logger.info("%s failed for %s: %r", query_name, address, err,
+                       exc_info=True)
+    response = repr(err)
+
+  if not isinstance(response, (str, bool)):
+    detect_logger.warning(
+        "%s returned invalid response type %s for %s!",
+        query_name, type(response), address)
+  return response
 
 
 def _matches_criteria(
@@ -129,46 +138,76 @@ def _matches_criteria(
 def _find_matching_device_class(
     address: str, communication_type: str, detect_logger: logging.Logger,
     create_switchboard_func: Callable[..., switchboard_base.SwitchboardBase],
-    device_classes: Collection[_DeviceClassType]) -> list[_DeviceClassType]:
+    device_classes: Collection[_DeviceClassType],
+    responses: Optional[_QueryResponses] = None) -> list[_DeviceClassType]:
   """Returns all classes where the device responses match the detect criteria.
 
+  Queries run lazily: a query is only sent to the device if a device class
+  which still matches all previous responses has a criterion for it.
+
   Args:
     address: communication_address.
     communication_type: category of communication.
     detect_logger: logs device interactions.
     create_switchboard_func: Method to create the switchboard.
     device_classes: device classes whose match criteria must be compared to.
+    responses: device responses already collected from the address, keyed by
+      query enum member. Updated with the responses to the queries sent.
 
   Returns:
     list: classes where the device responses match the detect criteria.
   """
-  matching_classes = []
-  responses = _get_detect_query_response(address, communication_type,
-                                         detect_logger, create_switchboard_func)
+  if responses is None:
+    responses = {}
+  detect_queries = extensions.detect_criteria[communication_type]
   detect_logger.info(
       "Possible %s device types: %s",
       communication_type,
       [device_class.DEVICE_TYPE for device_class in device_classes])
+  candidate_classes = []
   for device_class in device_classes:
     if not all(
-        detect_criterion in responses
+        detect_criterion in detect_queries
         for detect_criterion in device_class.DETECT_MATCH_CRITERIA.keys()):
       detect_logger.info(
           "\t%s: No Match. Not all detect criteria had a response. "
           "The device class likely hasn't been registered.\n"
-          "%'s detect criteria: %s\n"
-          "Collected responses: %s",
+          "%s's detect criteria: %s\n"
+          "Registered queries: %s",
+          device_class.DEVICE_TYPE,
           device_class.DEVICE_TYPE,
           list(device_class.DETECT_MATCH_CRITERIA.keys()),
-          list(responses.keys())
+          list(detect_queries.keys())
       )
       continue
-    if _matches_criteria(responses, device_class.DETECT_MATCH_CRITERIA):
-      matching_classes.append(device_class)
-      detect_logger.info("\t%s: Match.", device_class.DEVICE_TYPE)
-    else:
-      detect_logger.info("\t%s: No Match.", device_class.DEVICE_TYPE)
-  return matching_classes
+    candidate_classes.append(device_class)
+
+  skipped_queries = []
+  for query_name, query in detect_queries.items():
+    if not any(query_name in device_class.DETECT_MATCH_CRITERIA
+               for device_class in candidate_classes):
+      skipped_queries.append(query_name)
+      continue
+    if query_name not in responses:
+      responses[query_name] = _get_detect_query_response(
+          query_name, query, address, detect_logger, create_switchboard_func)
+    remaining_classes = []
+    for device_class in candidate_classes:
+      if query_name in device_class.DETECT_MATCH_CRITERIA and (
+          not _matches_criteria(
+              responses,
+              {query_name: device_class.DETECT_MATCH_CRITERIA[query_name]})):
+        detect_logger.info("\t%s: No Match.", device_class.DEVICE_TYPE)
+      else:
+        remaining_classes.append(device_class)
+    candidate_classes = remaining_classes
+  if skipped_queries:
+    detect_logger.info("Skipped queries no possible device type needs: %s",
+                       skipped_queries)
+
+  for device_class in candidate_classes:
+    detect_logger.info("\t%s: Match.", device_class.DEVICE_TYPE)
+  return candidate_classes
 
 
 def _get_communication_type_classes(
@@ -193,7 +232,8 @@ def _get_communication_type_classes(
 
 def _determine_device_class(
     address: str, communication_type: str, log_file_path: str,
-    create_switchboard_func: Callable[..., switchboard_base.SwitchboardBase]
+    create_switchboard_func: Callable[..., switchboard_base.SwitchboardBase],
+    responses: Optional[_QueryResponses] = None
 ) -> list[_DeviceClassType]:
   """Returns the device class(es) that matches the address' responses.
 
@@ -204,6 +244,8 @@ def _determine_device_class(
     communication_type: category of communication.
     log_file_path: local path to write log messages to.
     create_switchboard_func: Method to create the switchboard.
+    responses: device responses already collected from the address, keyed by
+      query enum member. Updated with the responses to the queries sent.
 
   Returns:
     list: classes where the device responses match the detect criteria.
@@ -213,7 +255,7 @@ def _determine_device_class(
     device_classes = _get_communication_type_classes(communication_type)
     return _find_matching_device_class(address, communication_type,
                                        detect_logger, create_switchboard_func,
-                                       device_classes)
+                                       device_classes, responses)
   finally:
     file_handler = detect_logger.handlers[0]
     file_handler.close()
@@ -235,7 +277,9 @@ class DeviceDetector:
       persistent_configs: custom_types.PersistentConfigsDict,
       options_configs: custom_types.OptionalConfigsDict,
       supported_auxiliary_device_classes:
-      list[type[auxiliary_device_base.AuxiliaryDeviceBase]]):
+      list[type[auxiliary_device_base.AuxiliaryDeviceBase]],
+      max_workers_per_communication_type: int = (
+          _MAX_WORKERS_PER_COMMUNICATION_TYPE)):
     """Initializes the device detector.
 
     Args:
@@ -245,13 +289,20 @@ class DeviceDetector:
         options_configs: device options known to the manager.
         supported_auxiliary_device_classes: list of auxiliary device
             classes.
+        max_workers_per_communication_type: maximum number of connections of
+            the same communication type to detect concurrently. 1 detects
+            connections one at a time.
     """
     self.manager_weakref = weakref.ref(manager)
+    self.max_workers_per_communication_type = (
+        max_workers_per_communication_type)
     self.log_directory = log_directory
     self.auxiliary_classes = supported_auxiliary_device_classes
     self.persistent_configs = copy.deepcopy(persistent_configs)
     self.options_configs = copy.deepcopy(options_configs)
     self.known_connections = self._create_known_connections()
+    # Detect query responses by address, reused for the whole detection run.
+    self._query_responses: dict[str, _QueryResponses] = {}
 
   def detect_all_new_devices(
       self, static_ips: Optional[list[str]] = None,
@@ -303,25 +354,41 @@ class DeviceDetector:
     connections_dict = self._filter_out_known_connections(
         connections_dict, self.known_connections)
 
-    possible_device_tuples, errs, no_id_cons = (
-        self._identify_connection_device_class(connections_dict))
+    with ssh_detect_criteria.multiplexed_ssh_connections():
+      possible_device_tuples, errs, no_id_cons = (
+          self._identify_connection_device_class(connections_dict))
     new_names = []
     logger.info(
         "\n##### "
         "Step 3/3: Extract Persistent Info from Detected Devices. #####\n"
     )
     for device_class, connection in possible_device_tuples:
-      try:
-        name, persistent_props, optional_props = self._detect_get_info(
-            device_class, connection)
-        new_names.append(name)
-        self._add_to_configs(device_class, name, persistent_props,
-                             optional_props)
-      except Exception as err:  # pylint: disable=broad-except
-        msg = "Error extracting info from {} {!r}. Err: {!r}".format(
-            device_class.DEVICE_TYPE, connection, err)
-        errs.append(msg)
-        no_id_cons.append(connection)
+      logger.info("Getting info from communication port %s for %s",
+                  connection, device_class.DEVICE_TYPE)
+    info_calls = [
+        (device_class.COMMUNICATION_TYPE.__name__, (device_class, connection))
+        for device_class, connection in possible_device_tuples]
+    with self._run_by_communication_type(
+        self._detect_get_info, info_calls) as info_futures:
+      # Names are generated and added to the configs in connection order so
+      # that name conflicts between new devices resolve as if detected one at a
+      # time.
+      for (device_class, connection), info_future in zip(
+          possible_device_tuples, info_futures):
+        try:
+          persistent_props, optional_props = info_future.result()
+          name = self._generate_name(device_class.DEVICE_TYPE,
+                                     persistent_props["serial_number"],
+                                     device_class)
+          persistent_props["name"] = name
+          new_names.append(name)
+          self._add_to_configs(device_class, name, persistent_props,
+                               optional_props)
+        except Exception as err:  # pylint: disable=broad-except
+          msg = "Error extracting info from {} {!r}. Err: {!r}".format(
+              device_class.DEVICE_TYPE, connection, err)
+          errs.append(msg)
+          no_id_cons.append(connection)
 
     self._print_summary(new_names, errs, no_id_cons)
     return self.persistent_configs, self.options_configs
@@ -390,17 +457,18 @@ class DeviceDetector:
 
   def _detect_get_info(
       self, device_class: _DeviceClassType, connection: str
-  ) -> tuple[str, custom_types.DeviceConfig, custom_types.DeviceConfig]:
-    """Returns name, persistent and optional info from device communication.
+  ) -> tuple[custom_types.DeviceConfig, custom_types.DeviceConfig]:
+    """Returns persistent and optional info from device communication.
 
-    Note: Any errors raised will be caught in parent method.
+    Note: Any errors raised will be caught in parent method. Runs in a detection
+      thread concurrently with other connections.
 
     Args:
         device_class: device class with get_detection_info method.
         connection: path to communication
 
     Returns:
-        (Name, dict of persistent props, dict of options props).
+        (Dict of persistent props, dict of options props).
     """
     device_type = device_class.DEVICE_TYPE
     detect_file = self._get_detect_log_file_name(connection, device_type)
@@ -413,8 +481,6 @@ class DeviceDetector:
         "options": {},
         "make_device_ready": "on"
     }
-    logger.info("Getting info from communication port %s for %s",
-                connection, device_type)
     device = device_class(  # pytype: disable=not-instantiable
         manager=self.manager_weakref(),
         device_config=device_config,
@@ -425,11 +491,10 @@ class DeviceDetector:
       persistent_props, options_props = device.get_detection_info()
     finally:
       device.close()
-
-    name = self._generate_name(device_type, persistent_props["serial_number"],
-                               device_class)
-    persistent_props["name"] = name
-    return name, persistent_props, options_props
+    # The placeholder name above is only used during detection. The real name
+    # is generated by the caller once the serial number is known.
+    persistent_props.pop("name", None)
+    return persistent_props, options_props
 
   def _filter_out_known_connections(
       self, con_dict: dict[str, list[str]], known_cons: list[str]
@@ -526,50 +591,96 @@ class DeviceDetector:
     no_id_cons = []
     logger.info("\n##### Step 2/3 Identify Device Type of Connections. #####\n")
 
+    # Don't use Manager for type annotation to avoid a circular import.
+    create_switchboard_func = typing.cast(
+        Any, self.manager_weakref()).create_switchboard
+    detect_logs = {}
+    calls = []
     for communication_type in sorted(connections_dict.keys()):
-      if not connections_dict[communication_type]:
-        # No connections of that type.
-        continue
-      logger.info("Identifying %s devices..", communication_type)
       for connection in sorted(connections_dict[communication_type]):
-        detect_log = os.path.join(
+        detect_logs[connection] = os.path.join(
             self.log_directory,
             self._get_detect_log_file_name(connection, communication_type))
-        matching_classes = _determine_device_class(
-            connection,
-            communication_type,
-            detect_log,
-            # Don't use Manager for type annotation to avoid a circular import.
-            typing.cast(
-                Any, self.manager_weakref()).create_switchboard
-        )
-        if len(matching_classes) > 1:
-          matching_device_types = [
-              device_class.DEVICE_TYPE for device_class in matching_classes
-          ]
-          warning_msg = (
-              "Warning: Multiple device types matched connection "
-              f"{connection}: {matching_device_types}. "
-              "This is a bug in the registered extension packages: "
-              f"{extensions.get_registered_package_info()}. "
-              f"Returning {matching_device_types[0]}.")
-          logger.warning(warning_msg)
-          errs.append(warning_msg)
-        if matching_classes:
-          logger.info("\t%s is a %s. See %s for details.",
-                      connection, matching_classes[0].DEVICE_TYPE, detect_log)
-          possible_device_tuples.append((matching_classes[0], connection))
-        else:
-          info_msg = (
-              f"\t{connection} responses did not match a known "
-              f"{communication_type} device type. "
-              f"See {detect_log} for details.")
-          logger.info(info_msg)
-          errs.append(info_msg)
-          no_id_cons.append(connection)
-      logger.info("\t%s device_type detection complete.", communication_type)
+        responses = self._query_responses.setdefault(connection, {})
+        calls.append((communication_type,
+                      (connection, communication_type, detect_logs[connection],
+                       create_switchboard_func, responses)))
+    with self._run_by_communication_type(
+        _determine_device_class, calls) as futures:
+      class_futures = iter(futures)
+      for communication_type in sorted(connections_dict.keys()):
+        if not connections_dict[communication_type]:
+          # No connections of that type.
+          continue
+        logger.info("Identifying %s devices..", communication_type)
+        for connection in sorted(connections_dict[communication_type]):
+          detect_log = detect_logs[connection]
+          matching_classes = next(class_futures).result()
+          if len(matching_classes) > 1:
+            matching_device_types = [
+                device_class.DEVICE_TYPE for device_class in matching_classes
+            ]
+            warning_msg = (
+                "Warning: Multiple device types matched connection "
+                f"{connection}: {matching_device_types}. "
+                "This is a bug in the registered extension packages: "
+                f"{extensions.get_registered_package_info()}. "
+                f"Returning {matching_device_types[0]}.")
+            logger.warning(warning_msg)
+            errs.append(warning_msg)
+          if matching_classes:
+            logger.info("\t%s is a %s. See %s for details.",
+                        connection, matching_classes[0].DEVICE_TYPE, detect_log)
+            possible_device_tuples.append((matching_classes[0], connection))
+          else:
+            info_msg = (
+                f"\t{connection} responses did not match a known "
+                f"{communication_type} device type. "
+                f"See {detect_log} for details.")
+            logger.info(info_msg)
+            errs.append(info_msg)
+            no_id_cons.append(connection)
+        logger.info("\t%s device_type detection complete.", communication_type)
     return possible_device_tuples, errs, no_id_cons
 
+  @contextlib.contextmanager
+  def _run_by_communication_type(
+      self,
+      func: Callable[..., Any],
+      calls: Sequence[tuple[str, tuple[Any, ...]]],
+  ) -> Iterator[list[concurrent.futures.Future[Any]]]:
+    """Runs the calls in a thread pool per communication type.
+
+    Each communication type gets its own pool so that slow connections of one
+    type (such as unresponsive SSH addresses) do not delay the others. The
+    pools are shut down on exit from the context. If the context exits with an
+    error (including KeyboardInterrupt), calls which have not started yet are
+    cancelled so that no detection work is left running in the background.
+
+    Args:
+        func: function to call.
+        calls: (communication type, func args) of each call.
+
+    Yields:
+        Futures of the calls in the same order as the calls.
+    """
+    executors = {}
+    futures = []
+    succeeded = False
+    try:
+      for communication_type, args in calls:
+        if communication_type not in executors:
+          executors[communication_type] = (
+              concurrent.futures.ThreadPoolExecutor(
+                  max_workers=self.max_workers_per_communication_type,
+                  thread_name_prefix=f"detect_{communication_type}"))
+        futures.append(executors[communication_type].submit(func, *args))
+      yield futures
+      succeeded = True
+    finally:
+      for executor in executors.values():
+        executor.shutdown(wait=True, cancel_futures=not succeeded)
+
   def _print_summary(
       self, names: list[str], errs: list[str], no_id_cons: list[str]) -> None:
     """Prints summary of detection events.
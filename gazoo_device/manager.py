@@ -19,6 +19,7 @@
 """
 import atexit
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime
@@ -48,13 +49,20 @@ from gazoo_device.capabilities.interfaces import capability_base
 from gazoo_device.capabilities.interfaces import event_parser_base
 from gazoo_device.log_parser import LogParser
 from gazoo_device.switchboard import switchboard
+from gazoo_device.switchboard import switchboard_host
+from gazoo_device.utility import adb_utils
 from gazoo_device.utility import common_utils
 from gazoo_device.utility import faulthandler_utils
 from gazoo_device.utility import host_utils
+from gazoo_device.utility import http_utils
 from gazoo_device.utility import multiprocessing_utils
+from gazoo_device.utility import usb_utils
 
 logger = gdm_logger.get_logger()
 _EXPECTED_FOLDER_PERMISSIONS = "755"
+# Maximum number of devices checked for connectivity at once. Network checks
+# mostly wait for ping replies or timeouts.
+_CONNECTION_CHECK_MAX_WORKERS = 32
 
 
 class Manager:
@@ -78,11 +86,148 @@ class Manager:
                stream_debug=False,
                stdout_logging=True,
                max_log_size=100000000,
-               from_parallel_utils=False):
+               from_parallel_utils=False,
+               buffered_log_writes=False,
+               use_event_index=False,
+               inline_event_filtering=False,
+               ssh_connection_pooling=False,
+               switchboard_host_processes=0,
+               switchboard_forkserver=False,
+               usb_inventory=False,
+               connection_status_ttl=0,
+               network_probes=False,
+               http_session_pooling=False,
+               native_adb_client=False):
+    """Initializes the Manager.
 
+    Args:
+      device_file_name (str): path to the devices config file.
+      device_options_file_name (str): path to the device options config file.
+      testbeds_file_name (str): path to the testbeds config file.
+      gdm_config_file_name (str): path to the GDM config file.
+      log_directory (str): directory for device and GDM log files.
+      gdm_log_file (str): path to the GDM log file.
+      gdm_log_formatter (logging.Formatter): formatter for the GDM log file.
+      adb_path (str): path to the adb binary.
+      debug_level (int): logging level of the GDM logger.
+      stream_debug (bool): whether to stream debug logs to stdout.
+      stdout_logging (bool): whether to log to stdout.
+      max_log_size (int): maximum size in bytes of a device log file before
+        it is rotated. 0 means device logs are never rotated.
+      from_parallel_utils (bool): whether the Manager is created in a
+        parallel_utils subprocess.
+      buffered_log_writes (bool): if True, device log lines are written to the
+        device log file in batches and the log file is flushed periodically
+        (at most every log_process.BUFFERED_FLUSH_INTERVAL seconds) instead of
+        after every log line. A flush is requested after every log note and
+        expect. Call device.switchboard.flush_log() to make device log lines
+        received so far visible to log file readers (including event
+        queries).
+      use_event_index (bool): if True, device event queries (such as
+        device.event_parser.get_last_event()) are answered from an in-process
+        index of the device event file instead of "tac" and "grep"
+        subprocesses.
+      inline_event_filtering (bool): if True, device log lines are filtered
+        for events as they are written to the device log file instead of by
+        a separate process reading the device log file back.
+      ssh_connection_pooling (bool): if True, SSH commands, scp file
+        transfers and SSH transports reuse persistent SSH connections to each
+        device (see host_utils.enable_ssh_connection_pool()) instead of
+        connecting to the device for every command. The pool is shared by
+        all Managers in the process: it is used while any Manager created
+        with ssh_connection_pooling=True is open, and its connections are
+        closed by the close() of the last of them.
+      switchboard_host_processes (int): if > 0, the Switchboard processes
+        (transport, log writer and log filter processes) of the devices
+        created by this Manager run as threads of this many shared host
+        processes instead of in 2-6 processes per device. Devices are
+        assigned to the host processes in turn. See
+        switchboard_host.SwitchboardHost. Ignored on platforms where
+        switchboard_host.HOSTING_SUPPORTED is False.
+      switchboard_forkserver (bool): if True, Switchboard processes (and
+        Switchboard host processes) are forked from a forkserver process
+        which has already imported GDM and the registered extension packages
+        instead of being spawned, which takes seconds per process. The
+        forkserver process is shared by all Managers in the process, is
+        started by the first of them and runs until the process exits (see
+        multiprocessing_utils.enable_switchboard_forkserver()). Ignored on
+        platforms without the forkserver start method.
+      usb_inventory (bool): if True, USB lookups (such as during detection
+        and usb_utils.get_device_info()) read a cached inventory of the
+        connected USB devices which is rebuilt only after udev reports a
+        change, instead of enumerating all udev devices on every lookup. The
+        inventory is shared by all Managers in the process (see
+        usb_utils.enable_usb_inventory()). Linux only.
+      connection_status_ttl (float): number of seconds for which the results
+        of get_device_connection_statuses() (and therefore of
+        get_connected_devices() and devices()) are reused before devices are
+        checked again. The results are shared with the Managers of other
+        processes through config.CONNECTION_STATUS_FILE, so repeated CLI
+        commands reuse them too. 0 (the default) uses the
+        "connection_status_ttl" GDM config setting if set (for example with
+        "gdm set-prop manager connection_status_ttl 10") and otherwise checks
+        the devices on every call. is_device_connected() always checks the
+        device.
+      network_probes (bool): if True, detection probes the static IPs for SSH
+        and SNMP devices concurrently from this process (see
+        host_utils.enable_network_probes()) instead of running ping, nc and
+        snmpget subprocesses for one IP at a time. The setting is shared by
+        all Managers in the process.
+      http_session_pooling (bool): if True, HTTP requests to devices (such
+        as DLI power switch outlet changes) are sent from persistent sessions
+        shared by all device instances (see http_utils.enable_session_pool())
+        instead of a new session per request: connections are kept alive,
+        bounded per host and closed after being idle, and digest
+        authentication nonces are reused. The pool is shared by all Managers
+        in the process and closed by the close() of the last of them.
+      native_adb_client (bool): if True, adb commands (shell commands, device
+        lists, file transfers, package installs and port forwarding) talk to
+        the adb server from this process (see adb_utils.enable_adb_client())
+        instead of running an 'adb' process per command. 'adb' is still run
+        for commands the client cannot serve, such as when the adb server is
+        not running. The setting is shared by all Managers in the process.
+    """
     self._open_devices = {}
     self.max_log_size = max_log_size
+    self.buffered_log_writes = buffered_log_writes
+    self.use_event_index = use_event_index
+    self.inline_event_filtering = inline_event_filtering
+    # Process-wide resources used by this Manager, released by close().
+    self._shared_resources = contextlib.ExitStack()
+    self.ssh_connection_pooling = ssh_connection_pooling
+    if ssh_connection_pooling:
+      host_utils.enable_ssh_connection_pool()
+      self._shared_resources.callback(host_utils.close_ssh_connection_pool)
+    self.switchboard_forkserver = switchboard_forkserver
+    if switchboard_forkserver and (
+        multiprocessing_utils.enable_switchboard_forkserver(preload_modules=[
+            info["import_path"] for info in extensions.package_info.values()
+        ])):
+      self._shared_resources.callback(
+          multiprocessing_utils.disable_switchboard_forkserver)
+    self.usb_inventory = usb_inventory
+    if usb_inventory and usb_utils.enable_usb_inventory():
+      self._shared_resources.callback(usb_utils.close_usb_inventory)
+    self.network_probes = network_probes
+    if network_probes:
+      host_utils.enable_network_probes()
+      self._shared_resources.callback(host_utils.disable_network_probes)
+    self.http_session_pooling = http_session_pooling
+    if http_session_pooling:
+      http_utils.enable_session_pool()
+      self._shared_resources.callback(http_utils.close_session_pool)
+    self.native_adb_client = native_adb_client
+    if native_adb_client:
+      adb_utils.enable_adb_client()
+      self._shared_resources.callback(adb_utils.disable_adb_client)
+    self.connection_status_ttl = connection_status_ttl
+    # Device name -> (time.time() of the check, whether the device is
+    # connected).
+    self._connection_statuses = {}
     self._exception_queue = multiprocessing_utils.get_context().Queue()
+    self.switchboard_host_processes = switchboard_host_processes
+    self._switchboard_hosts = []
+    self._switchboard_host_index = 0
 
     # Backwards compatibility for older debug_level=string style __init__
     if not isinstance(debug_level, int):
@@ -115,6 +260,16 @@ class Manager:
     log_file_name_prefix = "manager_" + log_file_name_prefix
     faulthandler_utils.set_up_faulthandler(
         self.log_directory, log_file_name_prefix=log_file_name_prefix)
+    if switchboard_host_processes and not switchboard_host.HOSTING_SUPPORTED:
+      logger.warning(
+          "Switchboard host processes aren't supported on this platform. "
+          "Switchboard processes run in processes of their own.")
+    else:
+      self._switchboard_hosts = [
+          switchboard_host.SwitchboardHost(
+              f"switchboard_host_{i}", self.log_directory)
+          for i in range(switchboard_host_processes)
+      ]
 
     # Register USR1 signal to get exception messages from exception_queue
     signal.signal(signal.SIGUSR1,
@@ -157,6 +312,11 @@ class Manager:
   def close(self):
     """Stops logger and closes all devices."""
     self.close_open_devices()
+    for host in getattr(self, "_switchboard_hosts", []):
+      host.close()
+    if hasattr(self, "_shared_resources"):
+      # Each resource is released only once: ExitStack drops its callbacks.
+      self._shared_resources.close()
     gdm_logger.flush_queue_messages()
     gdm_logger.silence_progress_messages()
 
@@ -515,6 +675,9 @@ class Manager:
           "parser": event_parser,
           "exception_queue": self._exception_queue,
           "max_log_size": self.max_log_size,
+          "buffered_log_writes": self.buffered_log_writes,
+          "inline_event_filtering": self.inline_event_filtering,
+          "host": self._get_switchboard_host(),
       }
       switchboard_kwargs.update(additional_kwargs)
 
@@ -522,6 +685,19 @@ class Manager:
     except Exception as err:
       raise errors.SwitchboardCreationError(device_name, repr(err))
 
+  def _get_switchboard_host(self):
+    """Returns the host for the next Switchboard or None if hosts are unused.
+
+    Returns:
+      Optional[SwitchboardHost]: host to run the Switchboard processes in.
+    """
+    if not self._switchboard_hosts:
+      return None
+    host = self._switchboard_hosts[
+        self._switchboard_host_index % len(self._switchboard_hosts)]
+    self._switchboard_host_index += 1
+    return host
+
   def delete(self, device_name, save_changes=True):
     """Delete the device from config dict and file.
 
@@ -725,12 +901,105 @@ class Manager:
       If category is not specified then a list of all devices will be
       returned.
     """
+    statuses = self.get_device_connection_statuses(category=category)
+    return [name for name, connected in statuses.items() if connected]
+
+  def get_device_connection_statuses(
+      self,
+      device_names: Optional[Collection[str]] = None,
+      category: str = "all") -> dict[str, bool]:
+    """Checks whether devices are connected, checking the devices concurrently.
+
+    Up to _CONNECTION_CHECK_MAX_WORKERS devices are checked at once, so the
+    time to check all devices is bounded by the slowest checks (such as pings
+    of unreachable network devices) instead of their sum. Results, including
+    the ones recorded by other processes, are reused for connection_status_ttl
+    seconds.
+
+    Args:
+      device_names: names of the devices to check. All devices of the
+        category if not specified.
+      category: device category ('gazoo', 'other', or 'all') of the devices.
+
+    Returns:
+      Device name -> whether the device is connected, in the order of
+      device_names.
+
+    Raises:
+      DeviceError: a device name is not a known device of the category.
+    """
     devices = self.get_devices(category)
-    connected_devices = []
-    for name in devices:
-      if self.is_device_connected(name, category):
-        connected_devices.append(name)
-    return connected_devices
+    if device_names is None:
+      device_names = list(devices)
+    unknown_names = [name for name in device_names if name not in devices]
+    if unknown_names:
+      raise errors.DeviceError(
+          "Devices {} are not known {} devices.".format(
+              unknown_names, category))
+
+    ttl = self._get_connection_status_ttl()
+    if ttl:
+      self._load_connection_statuses()
+    now = time.time()
+    statuses = {}
+    names_to_check = []
+    for name in device_names:
+      if name in self._connection_statuses:
+        checked_at, connected = self._connection_statuses[name]
+        if 0 <= now - checked_at < ttl:
+          statuses[name] = connected
+          continue
+      names_to_check.append(name)
+
+    if names_to_check:
+      max_workers = min(_CONNECTION_CHECK_MAX_WORKERS, len(names_to_check))
+      with concurrent.futures.ThreadPoolExecutor(
+          max_workers=max_workers,
+          thread_name_prefix="connection_check") as executor:
+        futures = {
+            name: executor.submit(self._is_device_connected, name, category)
+            for name in names_to_check
+        }
+        for name, future in futures.items():
+          statuses[name] = future.result()
+          self._connection_statuses[name] = (now, statuses[name])
+      if ttl:
+        self._save_connection_statuses()
+    return {name: statuses[name] for name in device_names}
+
+  def _get_connection_status_ttl(self) -> float:
+    """Returns the number of seconds to reuse connection statuses for."""
+    return float(self.connection_status_ttl or
+                 self.config.get(config.CONNECTION_STATUS_TTL_CONFIG, 0))
+
+  def _load_connection_statuses(self) -> None:
+    """Adds the newer connection statuses recorded by other processes."""
+    try:
+      with open(config.CONNECTION_STATUS_FILE) as status_file:
+        saved_statuses = {
+            name: (float(checked_at), bool(connected))
+            for name, (checked_at, connected) in json.load(status_file).items()
+        }
+    except FileNotFoundError:
+      return
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+      logger.debug(
+          f"Ignoring unreadable {config.CONNECTION_STATUS_FILE}: {e!r}")
+      return
+    for name, (checked_at, connected) in saved_statuses.items():
+      if (name not in self._connection_statuses or
+          checked_at > self._connection_statuses[name][0]):
+        self._connection_statuses[name] = (checked_at, connected)
+
+  def _save_connection_statuses(self) -> None:
+    """Shares the connection statuses with the Managers of other processes."""
+    temp_file_path = f"{config.CONNECTION_STATUS_FILE}.{os.getpid()}.tmp"
+    try:
+      with open(temp_file_path, "w") as status_file:
+        json.dump(self._connection_statuses, status_file)
+      os.replace(temp_file_path, config.CONNECTION_STATUS_FILE)
+    except OSError as e:
+      logger.debug(f"Unable to save {config.CONNECTION_STATUS_FILE}: {e!r}")
 
   def get_device_configuration(self, identifier, category="all"):
     """Returns the configuration for the device.
@@ -928,7 +1197,20 @@ class Manager:
       to find the matching identifier.
     """
     device_name = self._get_device_name(identifier, category, raise_error=True)
+    connected = self._is_device_connected(device_name, category)
+    self._connection_statuses[device_name] = (time.time(), connected)
+    return connected
+
+  def _is_device_connected(self, device_name, category):
+    """Returns whether the device with the given name is connected.
 
+    Args:
+      device_name (str): name of the device.
+      category (str): device category ('gazoo', 'other', or 'all').
+
+    Returns:
+      bool: True if the device is connected. False otherwise.
+    """
     device_config = self._get_device_configuration(device_name, category)
     device_type = device_config["persistent"]["device_type"].lower()
     try:
@@ -977,6 +1259,67 @@ class Manager:
     props_dict = self.get_device_configuration(device_identifier)["persistent"]
     return {key: value for key, value in props_dict.items() if "usb" in key}
 
+  def power_cycle_devices(
+      self,
+      identifiers: Collection[str],
+      off_time: float = 2,
+      stagger: float = 0,
+      no_wait: bool = False) -> dict[str, Any]:
+    """Power cycles several devices together, grouping the ports by hub.
+
+    Instead of power cycling the devices one by one, all devices are powered
+    off, then all devices are powered on. Each hub (Cambrionix, power switch,
+    Ethernet switch) switches all of its ports with one command where the hub
+    supports it and the hubs are switched in parallel. Devices which are not
+    open are created for the power cycle and closed afterwards.
+
+    Args:
+      identifiers: Identifiers of the devices to power cycle.
+      off_time: Seconds to keep the devices powered off.
+      stagger: Seconds between powering on consecutive devices to limit
+        inrush current. If 0, all ports of a hub are powered on together.
+      no_wait: Return without waiting for the devices to boot up.
+
+    Returns:
+      Timing breakdown of the power cycle (device_power_default.
+      PowerCycleTiming) by device name.
+
+    Raises:
+      DeviceError: if a device does not have the device_power capability or
+        any device failed to power cycle.
+    """
+    # Imported here: device_power_default imports auxiliary devices, which
+    # import this module.
+    from gazoo_device.capabilities import device_power_default  # pylint: disable=g-import-not-at-top
+    device_names = list(dict.fromkeys(
+        self._get_device_name(identifier, raise_error=True)
+        for identifier in identifiers))
+    created_devices = []
+    try:
+      device_powers = {}
+      for device_name in device_names:
+        if device_name in self._open_devices:
+          device = self._open_devices[device_name]
+        else:
+          device = self.create_device(device_name, make_device_ready="off")
+          created_devices.append(device)
+        if not device.has_capabilities(["device_power"]):
+          raise errors.DeviceError(
+              f"{device_name} does not support the device_power capability.")
+        device_power = device.device_power
+        if not isinstance(device_power,
+                          device_power_default.DevicePowerDefault):
+          raise errors.DeviceError(
+              f"{device_name}'s device_power flavor "
+              f"{type(device_power).__name__} does not support power cycling "
+              "several devices together.")
+        device_powers[device_name] = device_power
+      return device_power_default.cycle_devices(
+          device_powers, off_time=off_time, stagger=stagger, no_wait=no_wait)
+    finally:
+      for device in created_devices:
+        device.close()
+
   def redetect(self, device_name, log_directory=None):
     """Delete a device from the device configuration and then do a detect to find it again.
 
@@ -1526,6 +1869,7 @@ class Manager:
         DeviceError: failed to load Manager config.
     """
     self.gdm_config_file_name = gdm_config_file_name
+    self._connection_statuses = {}
 
     # create and configure self.config from gdm.conf
     self._load_gdm_configuration()
@@ -1741,13 +2085,15 @@ class Manager:
                            "Communication address"))
     logger.info(
         format_line.format("-" * 30, "-" * 15, "-" * 20, "-" * 11, "-" * 22))
-    for name in sorted(device_dict.keys()):
+    statuses = self.get_device_connection_statuses(
+        sorted(device_dict.keys()), category)
+    for name, connected in statuses.items():
       device_config = device_dict[name]
       communication_address = device_config["persistent"]["console_port_name"]
       model = device_config["persistent"]["model"]
       alias = device_config["options"].get("alias",
                                            "<undefined>") or u"<undefined>"
-      if self.is_device_connected(name, category):
+      if connected:
         status = good_status
       else:
         status = "unavailable"
@@ -67,7 +67,7 @@ class Efr32Matter(matter_device_base.MatterDeviceBase):
         flash_build_commander.FlashBuildCommander,
         device_name=self.name,
         serial_number=self.serial_number,
-        reset_endpoints_fn=self.matter_endpoints.reset,
+        reset_endpoints_fn=self.matter_endpoints.invalidate_cache,
         switchboard=self.switchboard,
         wait_for_bootup_complete_fn=self.wait_for_bootup_complete)
 
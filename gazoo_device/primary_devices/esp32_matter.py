@@ -89,7 +89,7 @@ class Esp32Matter(matter_device_base.MatterDeviceBase):
         serial_port=self.communication_address,
         switchboard=self.switchboard,
         wait_for_bootup_complete_fn=self.wait_for_bootup_complete,
-        reset_endpoints_fn=self.matter_endpoints.reset,
+        reset_endpoints_fn=self.matter_endpoints.invalidate_cache,
         boot_up_time=_DEFAULT_BOOTUP_TIMEOUT_SECONDS,
         baud=_BAUDRATE,
         flash_mode=_FLASH_MODE,
@@ -66,7 +66,7 @@ class NrfMatter(matter_device_base.MatterDeviceBase):
         flash_build_nrfjprog.FlashBuildNrfjprog,
         device_name=self.name,
         serial_number=self.serial_number,
-        reset_endpoints_fn=self.matter_endpoints.reset,
+        reset_endpoints_fn=self.matter_endpoints.invalidate_cache,
         switchboard=self.switchboard,
         wait_for_bootup_complete_fn=self.wait_for_bootup_complete)
 
@@ -84,6 +84,8 @@ class RaspberryPiMatter(
       "log_cmd": ssh_device.COMMANDS["LOGGING"],
       "key_info": raspberry_pi_key.SSH_KEY_PRIVATE,
       "username": "ubuntu",
+      # Used by the pw_rpc_event_subscription capability.
+      "subscriptions": True,
   })
   DEVICE_TYPE = "rpimatter"
   # Overrides to recover from the successive recoverable health check failures
@@ -208,7 +210,7 @@ class RaspberryPiMatter(
         pigweed_port=self._PIGWEED_PORT,
         send_file_to_device_fn=self.file_transfer.send_file_to_device,
         wait_for_bootup_complete_fn=self.wait_for_bootup_complete,
-        reset_endpoints_fn=self.matter_endpoints.reset,
+        reset_endpoints_fn=self.matter_endpoints.invalidate_cache,
     )
 
   @decorators.LogDecorator(logger)
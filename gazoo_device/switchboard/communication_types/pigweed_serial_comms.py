@@ -60,10 +60,12 @@ class PigweedSerialComms(base_comms.CommunicationType):
   def __init__(self,
                comms_address: str,
                protobufs: Collection[types.ModuleType],
-               baudrate: int = serial_transport.DEFAULT_BAUDRATE):
+               baudrate: int = serial_transport.DEFAULT_BAUDRATE,
+               subscriptions: bool = False):
     super().__init__(comms_address)
     self.protobufs = protobufs
     self.baudrate = baudrate
+    self.subscriptions = subscriptions
 
   def get_transport_list(self) -> list[transport_base.TransportBase]:
     protobuf_import_paths = [module.__name__ for module in self.protobufs]
@@ -71,7 +73,8 @@ class PigweedSerialComms(base_comms.CommunicationType):
         pigweed_rpc_transport.PigweedRpcSerialTransport(
             comms_address=self.comms_address,
             protobuf_import_paths=protobuf_import_paths,
-            baudrate=self.baudrate)
+            baudrate=self.baudrate,
+            subscriptions=self.subscriptions)
     ]
 
   def get_identifier(self) -> line_identifier.AllLogIdentifier:  # pytype: disable=signature-mismatch  # overriding-return-type-checks
@@ -34,10 +34,12 @@ class PigweedSocketComms(ssh_comms.SshComms):
                                          "/var/log/messages"),
                args: Sequence[str] = host_utils.DEFAULT_SSH_OPTIONS,
                key_info: Optional[data_types.KeyInfo] = None,
-               username: str = "ubuntu") -> None:
+               username: str = "ubuntu",
+               subscriptions: bool = False) -> None:
     super().__init__(comms_address, log_cmd, args, key_info, username)
     self.protobufs = protobufs
     self.port = port
+    self.subscriptions = subscriptions
 
   def get_transport_list(self) -> list[transport_base.TransportBase]:  # pytype: disable=signature-mismatch  # overriding-return-type-checks
     """Transports for Pigweed Socket communication types.
@@ -52,7 +54,8 @@ class PigweedSocketComms(ssh_comms.SshComms):
     rpc_socket_transport = pigweed_rpc_transport.PigweedRpcSocketTransport(
         comms_address=self.comms_address,
         protobuf_import_paths=protobuf_import_paths,
-        port=self.port)
+        port=self.port,
+        subscriptions=self.subscriptions)
     transport_list.append(rpc_socket_transport)
     return transport_list
 
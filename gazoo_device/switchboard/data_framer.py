@@ -124,27 +124,32 @@ def split_newlines_only(string,
   if end is None:
     end = string_len
   start_index = 0
+  end_offset = 1 if keepends else 0
   if cleanends:
+    # Position after the last character (other than the first one) before
+    # begin which isn't a line return or line feed character.
     pre_line_return = begin
-    # If begin > 0 might need to find pre_line_return spot in string
-    for i in range(begin, 0, -1):
-      if string[i] != "\r" and string[i] != "\n":
-        pre_line_return = i + 1
-        break
-  end_offset = 1 if keepends else 0
-  for i in range(begin, end):
-    if cleanends and string[i] != "\r" and string[i] != "\n":
-      pre_line_return = i + 1
-    if string[i] == "\n":
-      if cleanends:
-        yield string[start_index:pre_line_return] + string[i:i + end_offset]
-      else:
-        yield string[start_index:i + end_offset]
-      start_index = i + 1
-      if start_index == end:
-        break
-  else:
-    yield string[start_index:]
+    if begin:
+      line_len = len(string[1:begin + 1].rstrip("\r\n"))
+      if line_len:
+        pre_line_return = line_len + 1
+  newline_index = string.find("\n", begin, end)
+  while newline_index != -1:
+    if cleanends:
+      # Only line return characters can precede the newline character.
+      search_start = max(start_index, begin)
+      line_len = len(string[search_start:newline_index].rstrip("\r"))
+      if line_len:
+        pre_line_return = search_start + line_len
+      yield (string[start_index:pre_line_return] +
+             string[newline_index:newline_index + end_offset])
+    else:
+      yield string[start_index:newline_index + end_offset]
+    start_index = newline_index + 1
+    if start_index == end:
+      return
+    newline_index = string.find("\n", start_index, end)
+  yield string[start_index:]
 
 
 class InterwovenLogFramer(DataFramer):
@@ -36,19 +36,37 @@ according to the following assumptions:
 
     * Log lines are queued in the correct order to be written to the log file
 
+By default the LogWriterProcess writes and flushes every log line as soon as it
+is received. For chatty devices it can instead drain up to max_batch_lines log
+lines from the log_queue at a time and buffer the encoded log lines until
+flush_size bytes are buffered, flush_interval seconds have passed since the
+oldest buffered log line was received, the log file is rotated or switched, a
+flush request queued by request_flush() is read from the log_queue or a
+CMD_FLUSH command is received.
+
+The LogWriterProcess can also be given the event parser. It then filters each
+log line for device events as it is written and records them to the event file
+itself, so no LogFilterProcess is needed: events become available as soon as
+the log line is received instead of after the log file is flushed and read back,
+and the log file is no longer read by a second process.
+
 """
 import codecs
 import datetime
 import os
 import re
+import threading
 import time
 
+from gazoo_device import errors
 from gazoo_device.switchboard import data_framer
 from gazoo_device.switchboard import switchboard_process
+from gazoo_device.utility import multiprocessing_utils
 
 CMD_NEW_LOG_FILE = "NEW_LOG_FILE"
 CMD_MAX_LOG_SIZE = "MAX_LOG_SIZE"
 CMD_ADD_NEW_FILTER = "ADD_NEW_FILTER"
+CMD_FLUSH = "FLUSH"
 CHANGE_MAX_LOG_SIZE = "Changing max_log_size"
 NEW_LOG_FILE_MESSAGE = "Starting new log file at"
 ROTATE_LOG_MESSAGE = "Rotating from log file"
@@ -59,7 +77,18 @@ HOST_TIMESTAMP_FORMAT = "<%Y-%m-%d %H:%M:%S.%f>"
 _MAX_READ_BYTES = 4096
 _VALID_COMMON_COMMANDS = [CMD_NEW_LOG_FILE]
 _VALID_FILTER_COMMANDS = [CMD_ADD_NEW_FILTER] + _VALID_COMMON_COMMANDS
-_VALID_WRITER_COMMANDS = [CMD_MAX_LOG_SIZE] + _VALID_COMMON_COMMANDS
+_VALID_WRITER_COMMANDS = [CMD_MAX_LOG_SIZE, CMD_FLUSH
+                         ] + _VALID_COMMON_COMMANDS
+_VALID_FILTERING_WRITER_COMMANDS = [CMD_ADD_NEW_FILTER
+                                   ] + _VALID_WRITER_COMMANDS
+_LOG_QUEUE_POLL_TIMEOUT = 0.01
+# LogWriterProcess settings used for buffered log writes.
+BUFFERED_MAX_BATCH_LINES = 1000
+BUFFERED_FLUSH_SIZE = 64 * 1024
+BUFFERED_FLUSH_INTERVAL = 0.05
+# Queued by request_flush(). Log lines start with a host timestamp, so a flush
+# request can't be mistaken for a log line.
+_FLUSH_REQUEST = "\x00FLUSH\n"
 
 
 def get_event_filename(log_path):
@@ -134,6 +163,18 @@ def log_message(log_queue, raw_log_line, port):
                                   _add_log_header(raw_log_line, port))
 
 
+def request_flush(log_queue):
+  """Asks the log writer process to flush the log lines queued so far.
+
+  Doesn't wait for the flush. The request is queued behind the log lines, so
+  they are all written before the log file is flushed.
+
+  Args:
+      log_queue (Queue): log queue of the log writer process.
+  """
+  switchboard_process.put_message(log_queue, _FLUSH_REQUEST)
+
+
 def _add_log_header(raw_log_line, port="M"):
   """Add host system timestamp and GDM log header to raw_log_line.
 
@@ -368,6 +409,10 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
   It expects each log line to be prepended with a host system timestamp.
   Log lines that are missing a newline character will have one added.
   Partial log lines should be handled by log line producers.
+
+  If a parser is provided, it also filters each log line written to find device
+  events and records them to the event file, taking over the work of the
+  LogFilterProcess.
   """
 
   def __init__(self,
@@ -376,7 +421,11 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
                command_queue,
                log_queue,
                log_path,
-               max_log_size=0):
+               max_log_size=0,
+               max_batch_lines=1,
+               flush_size=0,
+               flush_interval=0.0,
+               parser=None):
     """Initialize LogWriterProcess with the arguments provided.
 
     Args:
@@ -389,25 +438,100 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
         log_path (str): path and filename to write log messages to
         max_log_size (int): maximum size in bytes before performing log
           rotation
+        max_batch_lines (int): maximum number of log lines to retrieve from
+          log_queue per loop iteration.
+        flush_size (int): number of buffered bytes which triggers a write and
+          flush of the log file.
+        flush_interval (float): maximum time in seconds a log line stays
+          buffered before the log file is written and flushed.
+        parser (Parser): object to use for filtering log lines. If None, log
+          lines are not filtered for events.
 
     Note: A max_log_size of 0 means no log rotation should ever occur.
+      A flush_size of 0 means every log line is written and flushed as soon as
+      it is received.
     """
 
+    if parser is None:
+      valid_commands = _VALID_WRITER_COMMANDS
+    else:
+      valid_commands = _VALID_FILTERING_WRITER_COMMANDS
     super(LogWriterProcess, self).__init__(
         device_name,
         device_name + "-LogWriter",
         exception_queue,
         command_queue,
         log_path,
-        valid_commands=_VALID_WRITER_COMMANDS)
+        valid_commands=valid_commands)
     self._log_queue = log_queue
+    self._parser = parser
+    self._framer = data_framer.NewlineFramer()
+    self._header_length = HOST_TIMESTAMP_LENGTH + LOG_LINE_HEADER_LENGTH
+    self._event_file = None
+    self._event_path = get_event_filename(log_path)
     self._log_filename = os.path.basename(log_path)
     self._log_file = None
+    self._log_size = 0
     self._max_log_size = max_log_size
+    self._max_batch_lines = max(max_batch_lines, 1)
+    self._flush_size = flush_size
+    self._flush_interval = flush_interval
+    self._write_buffer = []
+    self._write_buffer_size = 0
+    self._flush_deadline = None
+    # Flush requests sent by flush() are numbered to match them with their
+    # completion in the child process.
+    self._flush_lock = threading.Lock()
+    self._flush_request_id = 0
+    self._flushed_request_id = multiprocessing_utils.get_context().Value("i", 0)
+    self._flush_done = multiprocessing_utils.get_context().Event()
+
+  def __getstate__(self):
+    """Excludes the flush lock, which is only used by the parent process."""
+    state = super().__getstate__()
+    del state["_flush_lock"]
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._flush_lock = threading.Lock()
+
+  def flush(self, timeout: float) -> None:
+    """Writes all log lines in the log queue and flushes the log file.
+
+    Args:
+        timeout: maximum time in seconds to wait for the flush to complete.
+
+    Raises:
+        ProcessCommunicationError: if the flush didn't complete in time.
+    """
+    with self._flush_lock:
+      self._flush_request_id += 1
+      flush_request_id = self._flush_request_id
+      deadline = time.time() + timeout
+      self._flush_done.clear()
+      self.send_command(CMD_FLUSH, flush_request_id)
+      while self._flushed_request_id.value != flush_request_id:
+        remaining_time = deadline - time.time()
+        if remaining_time <= 0 or not self._flush_done.wait(remaining_time):
+          raise errors.ProcessCommunicationError(
+              self.device_name,
+              "Device {} Process {} did not flush the log file within {}s."
+              .format(self.device_name, self.process_name, timeout))
+        self._flush_done.clear()
+
+  def _close_event_file(self):
+    if hasattr(self, "_event_file") and self._event_file:
+      self._event_file.close()
+      # Remove the event file if it's empty (no event ever written)
+      # to avoid creating unnecessary artifacts.
+      if os.path.getsize(self._event_file.name) == 0:
+        os.remove(self._event_file.name)
+      self._event_file = None
 
   def _close_file(self):
     if hasattr(self, "_log_file") and self._log_file:
-      self._log_file.flush()
+      self._flush()
       self._log_file.close()
 
   def _do_log_rotation(self):
@@ -415,8 +539,7 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
     if self._log_file is None:
       raise ValueError("log_file is not set")
     if self._max_log_size:
-      log_size = self._log_file.tell()
-      if log_size >= self._max_log_size:
+      if self._log_size >= self._max_log_size:
         new_log_filename = get_next_log_filename(self._log_filename)
         raw_log_message = "{} {} to {}\n".format(ROTATE_LOG_MESSAGE,
                                                  self._log_filename,
@@ -438,20 +561,31 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
         self._command_queue, timeout=0)
     if command_message:
       self._process_command_message(command_message)
-    log_line = switchboard_process.get_message(self._log_queue, timeout=0.01)
-    if log_line:
-      self._write_log_line(log_line)
-      self._do_log_rotation()
-    else:
-      time.sleep(0.01)
+    timeout = _LOG_QUEUE_POLL_TIMEOUT
+    if self._flush_deadline is not None:
+      timeout = max(min(timeout, self._flush_deadline - time.time()), 0)
+    self._write_queued_log_lines(self._max_batch_lines, timeout)
+    if (self._flush_deadline is not None and
+        time.time() >= self._flush_deadline):
+      self._flush()
 
     return True
 
+  def _flush(self):
+    """Writes all buffered log lines to the log file and flushes it."""
+    if self._write_buffer and hasattr(self, "_log_file") and self._log_file:
+      self._log_file.write(b"".join(self._write_buffer))
+      self._log_file.flush()
+    self._write_buffer = []
+    self._write_buffer_size = 0
+    self._flush_deadline = None
+
   def _open_file(self):
     if self._log_directory and not os.path.exists(self._log_directory):
       os.makedirs(self._log_directory)
     log_path = os.path.join(self._log_directory, self._log_filename)
-    self._log_file = codecs.open(log_path, "a", encoding="utf-8")
+    self._log_file = open(log_path, "ab")
+    self._log_size = self._log_file.tell()
 
   def _open_new_log_file(self, new_log_path):
     self._close_file()
@@ -459,11 +593,17 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
     self._log_filename = os.path.basename(new_log_path)
     self._open_file()
 
+  def _open_event_file(self):
+    if self._parser is not None:
+      self._event_file = codecs.open(self._event_path, "a", encoding="utf-8")
+
   def _post_run_hook(self):
     self._close_file()
+    self._close_event_file()
 
   def _pre_run_hook(self):
     self._open_file()
+    self._open_event_file()
     return hasattr(self, "_log_file") and self._log_file
 
   def _process_command_message(self, command_message):
@@ -486,15 +626,68 @@ class LogWriterProcess(switchboard_process.SwitchboardProcess):
       raw_log_message = "{} {}\n".format(NEW_LOG_FILE_MESSAGE, data)
       self._write_log_line(_add_log_header(raw_log_message))
       self._open_new_log_file(data)
+      # Unlike log rotation, a new log file also starts a new event file.
+      if self._parser is not None:
+        self._close_event_file()
+        self._event_path = get_event_filename(data)
+        self._open_event_file()
+    elif CMD_ADD_NEW_FILTER == command and self._parser is not None:
+      self._parser.load_filter_file(data)
+    elif CMD_FLUSH == command:
+      # Only write log lines queued before the flush request: a device which
+      # never stops logging would otherwise keep the flush from completing.
+      try:
+        queued_lines = self._log_queue.qsize()
+      except NotImplementedError:  # Not supported on Mac OS
+        queued_lines = self._max_batch_lines
+      if queued_lines:
+        self._write_queued_log_lines(queued_lines, timeout=0)
+      self._flush()
+      self._flushed_request_id.value = data
+      self._flush_done.set()
     else:
       raise RuntimeError("Device {} received an unknown command {}.".format(
           self.device_name, command))
 
+  def _write_queued_log_lines(self, max_lines, timeout):
+    """Writes up to max_lines log lines retrieved from the log queue.
+
+    Args:
+        max_lines (int): maximum number of log lines to write.
+        timeout (float): time to wait in seconds for the first log line.
+    """
+    log_line = switchboard_process.get_message(self._log_queue, timeout=timeout)
+    lines_written = 0
+    while log_line:
+      if log_line == _FLUSH_REQUEST:
+        self._flush()
+      else:
+        self._write_log_line(log_line)
+        self._do_log_rotation()
+      lines_written += 1
+      if lines_written >= max_lines:
+        break
+      log_line = switchboard_process.get_message(self._log_queue, timeout=0)
+
   def _write_log_line(self, log_line):
     if hasattr(self, "_log_file") and self._log_file:
       if log_line[-1] != "\n":
         # Write log line with newline added
-        self._log_file.write(log_line + "[NO EOL]\n")
-      else:
-        self._log_file.write(log_line)
-      self._log_file.flush()
+        log_line += "[NO EOL]\n"
+      if self._event_file:
+        # Log notes can span several lines: frame them as the LogFilterProcess
+        # frames the log file.
+        for framed_line in self._framer.get_lines(log_line):
+          self._parser.process_line(
+              self._event_file,
+              framed_line,
+              header_length=self._header_length,
+              log_filename=self._log_filename)
+      log_data = log_line.encode("utf-8")
+      self._write_buffer.append(log_data)
+      self._write_buffer_size += len(log_data)
+      self._log_size += len(log_data)
+      if self._write_buffer_size >= self._flush_size:
+        self._flush()
+      elif self._flush_deadline is None:
+        self._flush_deadline = time.time() + self._flush_interval
@@ -41,6 +41,7 @@ from gazoo_device.switchboard import data_framer
 from gazoo_device.switchboard import expect_response
 from gazoo_device.switchboard import line_identifier
 from gazoo_device.switchboard import log_process
+from gazoo_device.switchboard import switchboard_host
 from gazoo_device.switchboard import switchboard_process
 from gazoo_device.switchboard import transport_process
 from gazoo_device.switchboard import transport_properties
@@ -208,6 +209,9 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
       partial_line_timeout_list: Optional[list[int]] = None,
       force_slow: bool = False,
       max_log_size: int = 0,
+      buffered_log_writes: bool = False,
+      inline_event_filtering: bool = False,
+      host: Optional[switchboard_host.SwitchboardHost] = None,
   ):
     """Initialize the Switchboard with the parameters provided.
 
@@ -230,6 +234,17 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
       force_slow: flag indicating all sends should assume slow=True.
       max_log_size: maximum size in bytes before performing log rotation.
         max_log_size of 0 means no log rotation should ever occur.
+      buffered_log_writes: if True, the log writer process writes log lines in
+        batches and flushes the log file periodically instead of after every
+        log line. A flush is requested without waiting for it after every log
+        note and expect. Other device log lines may stay buffered for up to
+        log_process.BUFFERED_FLUSH_INTERVAL seconds: call flush_log() before
+        querying events for them.
+      inline_event_filtering: if True, the log writer process filters log
+        lines for events with the parser as it writes them and no log filter
+        process is started.
+      host: if provided, the loops of the Switchboard processes run as threads
+        of this host process instead of in processes of their own.
     """
     super().__init__(
         log_path=log_path, button_list=button_list, device_name=device_name)
@@ -241,7 +256,6 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
     self._force_slow = force_slow
     self._identifier = identifier or line_identifier.AllUnknownIdentifier()
     self._log_queue = multiprocessing_utils.get_context().Queue()
-    self._call_result_queue = multiprocessing_utils.get_context().Queue()
     self._raw_data_queue = multiprocessing_utils.get_context().Queue()
     self._raw_data_queue_users = 0
     self._transport_process_id = 0
@@ -252,7 +266,10 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
     self._framer_list = framer_list
     self._partial_line_timeout_list = partial_line_timeout_list
     self._max_log_size = max_log_size
+    self._buffered_log_writes = buffered_log_writes
+    self._inline_event_filtering = inline_event_filtering
     self._parser = parser
+    self._host = host
 
     self._transport_processes_cache = []
     self._log_writer_process_cache = None
@@ -279,11 +296,15 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
       log_process.log_message(self._log_queue, log_message, "M")
     except (AttributeError, IOError):  # manager shutdown or close called
       pass
+    self._request_log_flush()
 
   @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
   def add_new_filter(self, filter_path: str) -> None:
     """Adds new log filter at path specified to LogFilterProcess.
 
+    With inline event filtering the filter is added to LogWriterProcess
+    instead.
+
     Args:
         filter_path: filter file to add
 
@@ -294,13 +315,16 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
     if not os.path.exists(filter_path):
       raise ValueError("Filter path {} doesn't exist.".format(filter_path))
 
-    if (not self._log_filter_process or
-        not self._log_filter_process.is_running()):
+    if self._inline_event_filtering and self._parser is not None:
+      filter_process = self._log_writer_process
+    else:
+      filter_process = self._log_filter_process
+    if not filter_process or not filter_process.is_running():
       raise RuntimeError("Log filter process is not currently running.")
 
-    self._log_filter_process.send_command(log_process.CMD_ADD_NEW_FILTER,
-                                          filter_path,
-                                          wait_for_command_consumption=True)
+    filter_process.send_command(log_process.CMD_ADD_NEW_FILTER,
+                                filter_path,
+                                wait_for_command_consumption=True)
 
   def call(self,
            method_name: str,
@@ -337,10 +361,8 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
 
     self.add_log_note("Executing {!r} in transport {}".format(
         method.__qualname__, port))
-    self._transport_processes[port].send_command(
-        transport_process.CMD_TRANSPORT_CALL,
-        (method_name, method_args, method_kwargs))
-    success, response = self._call_result_queue.get()
+    success, response = self._transport_processes[port].call(
+        method_name, method_args, method_kwargs)
     if success:
       return response
     raise errors.DeviceError(
@@ -495,8 +517,6 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
                      self._device_name, button_no + 1, len(self.button_list))
       self.button_list = []
     # Delete queues to release shared memory file descriptors.
-    if hasattr(self, "_call_result_queue") and self._call_result_queue:
-      delattr(self, "_call_result_queue")
     if hasattr(self, "_raw_data_queue") and self._raw_data_queue:
       delattr(self, "_raw_data_queue")
     if hasattr(self, "_log_queue") and self._log_queue:
@@ -627,6 +647,7 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
         return expect_ret
     finally:
       self._disable_raw_data_queue()
+      self._request_log_flush()
 
   @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
   def ensure_serial_paths_unlocked(self,
@@ -699,11 +720,55 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
           raise_for_timeout=raise_for_timeout)
     finally:
       self._disable_raw_data_queue()
+      self._request_log_flush()
+
+  @decorators.CapabilityLogDecorator(logger, level=decorators.DEBUG)
+  def flush_log(self) -> None:
+    """Writes all pending log lines (including log notes) to the log file.
+
+    Only needed when log writes are buffered: makes log lines queued so far
+    available to log file readers such as the log filter process.
+
+    Raises:
+        RuntimeError: if LogWriterProcess is not available or running.
+    """
+    if (not self._log_writer_process or
+        not self._log_writer_process.is_running()):
+      raise RuntimeError("Log writer process is not currently running.")
+    self._flush_log_writer()
 
   def get_line_identifier(self) -> line_identifier.LineIdentifier:
     """Returns the line identifier currently used by Switchboard."""
     return self._identifier
 
+  def get_transport_update(self,
+                           timeout: Optional[float] = None,
+                           port: int = 0) -> Any:
+    """Returns the next update pushed by a transport.
+
+    Transports push updates from the transport process to the parent process
+    through their "update_queue" multiprocessing queue.
+
+    Args:
+      timeout: Maximum seconds to wait for an update or indefinitely if None.
+      port: Number of the transport which pushes the updates.
+
+    Raises:
+      DeviceError: the transport doesn't push updates.
+
+    Returns:
+      The update or None if there was none within timeout seconds.
+    """
+    self._validate_port(port, self.get_transport_update.__name__)
+    transport = self._transport_processes[port].transport
+    update_queue = getattr(transport, "update_queue", None)
+    if update_queue is None:
+      raise errors.DeviceError(
+          f"{self._device_name} Switchboard.get_transport_update failed. "
+          f"Transport {port} ({type(transport).__name__!r}) does not push "
+          "updates.")
+    return switchboard_process.get_message(update_queue, timeout=timeout)
+
   @decorators.DynamicProperty
   def _transport_processes(
       self) -> MutableSequence[transport_base.TransportBase]:
@@ -1313,18 +1378,18 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
         int: position of newly added transport process in list of transport
         processes("port")
     """
-    self._transport_processes_cache.append(
-        transport_process.TransportProcess(
-            self._device_name,
-            self._exception_queue,
-            multiprocessing_utils.get_context().Queue(),
-            self._log_queue,
-            self.log_path,
-            transport,
-            call_result_queue=self._call_result_queue,
-            raw_data_queue=self._raw_data_queue,
-            raw_data_id=self._transport_process_id,
-            **transport_process_kwargs))
+    process = transport_process.TransportProcess(
+        self._device_name,
+        self._exception_queue,
+        multiprocessing_utils.get_context().Queue(),
+        self._log_queue,
+        self.log_path,
+        transport,
+        raw_data_queue=self._raw_data_queue,
+        raw_data_id=self._transport_process_id,
+        **transport_process_kwargs)
+    process.set_host(self._host)
+    self._transport_processes_cache.append(process)
     self._transport_process_id += 1
     return len(
         self._transport_processes_cache) - 1  # The added process is always last
@@ -1347,22 +1412,52 @@ class SwitchboardDefault(switchboard_base.SwitchboardBase):
         kwargs["partial_line_timeout"] = partial_line_timeout_list[idx]
       self.add_transport_process(transport, **kwargs)
 
+  def _flush_log_writer(self):
+    """Waits for the log writer process to write all queued log lines."""
+    switchboard_process.wait_for_queue_writes(self._log_queue)
+    self._log_writer_process.flush(
+        timeout=config.SWITCHBOARD_PROCESS_COMMAND_CONSUMPTION_TIMEOUT_S)
+
+  def _request_log_flush(self):
+    """Asks the log writer process to flush buffered log lines without waiting.
+
+    Does nothing if log writes are not buffered.
+    """
+    if not self._buffered_log_writes:
+      return
+    try:
+      log_process.request_flush(self._log_queue)
+    except (AttributeError, IOError):  # manager shutdown or close called
+      pass
+
   def _add_log_writer_process(self, log_path, max_log_size):
     """Creates log writer process. Should only be called from health_check()."""
+    writer_kwargs = {}
+    if self._buffered_log_writes:
+      writer_kwargs = {
+          "max_batch_lines": log_process.BUFFERED_MAX_BATCH_LINES,
+          "flush_size": log_process.BUFFERED_FLUSH_SIZE,
+          "flush_interval": log_process.BUFFERED_FLUSH_INTERVAL,
+      }
+    if self._inline_event_filtering:
+      writer_kwargs["parser"] = self._parser
     self._log_writer_process_cache = log_process.LogWriterProcess(
         self._device_name,
         self._exception_queue,
         multiprocessing_utils.get_context().Queue(),
         self._log_queue,
         log_path,
-        max_log_size=max_log_size)
+        max_log_size=max_log_size,
+        **writer_kwargs)
+    self._log_writer_process_cache.set_host(self._host)
 
   def _add_log_filter_process(self, parser, log_path):
     """Creates log filter process. Should only be called from health_check()."""
-    if parser is not None:
+    if parser is not None and not self._inline_event_filtering:
       self._log_filter_process_cache = log_process.LogFilterProcess(
           self._device_name, self._exception_queue,
           multiprocessing_utils.get_context().Queue(), parser, log_path)
+      self._log_filter_process_cache.set_host(self._host)
 
   def _check_button_args(self,
                          func_name: str,
@@ -0,0 +1,292 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Defines the host process which runs Switchboard processes of many devices.
+
+Each Switchboard process (TransportProcess, LogWriterProcess, LogFilterProcess)
+normally runs in a process of its own, which takes ~1.5s to start with "spawn".
+A device uses 2-6 of them. A SwitchboardHost instead runs the loops of many
+Switchboard processes, possibly of many devices, as threads of a single
+process according to the following assumptions:
+
+    * The host process is started when the first Switchboard process is run in
+      it and stops when closed or when the main process exits.
+
+    * Switchboard processes keep their own queues, events, log files and
+      event files. Only the process running their loop changes.
+
+    * Switchboard processes are sent to the host process over a pipe.
+      Multiprocessing only allows sharing queues, events and shared memory
+      with a process when spawning it, so they are pickled as if the host
+      process was being spawned and their file descriptors are sent with
+      multiprocessing.resource_sharer (POSIX only).
+
+    * Threads can't be terminated: terminating a hosted Switchboard process
+      only stops waiting for it. Its loop exits when its terminate event is
+      set, when the main process exits or when the host is closed. A host with
+      a loop which had to be terminated is marked unhealthy: Switchboard
+      processes started afterwards run in processes of their own.
+
+    * Sending Switchboard processes to a running process relies on
+      multiprocessing internals (set_spawning_popen() and
+      resource_sharer.DupFd). If they are unavailable, HOSTING_SUPPORTED is
+      False and Switchboard processes run in processes of their own.
+"""
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.context
+import multiprocessing.reduction
+import multiprocessing.synchronize
+import os
+import signal
+import threading
+from typing import Any, Optional
+
+from gazoo_device import gdm_logger
+from gazoo_device.switchboard import switchboard_process
+from gazoo_device.utility import faulthandler_utils
+from gazoo_device.utility import multiprocessing_utils
+
+try:
+  import multiprocessing.resource_sharer  # pylint: disable=g-import-not-at-top
+  _set_spawning_popen = multiprocessing.context.set_spawning_popen
+  _DupFd = multiprocessing.resource_sharer.DupFd  # pylint: disable=invalid-name
+except (ImportError, AttributeError):
+  _set_spawning_popen = None
+  _DupFd = None  # pylint: disable=invalid-name
+
+logger = gdm_logger.get_logger()
+
+# Whether Switchboard processes can be sent to a running host process.
+HOSTING_SUPPORTED = (
+    os.name == "posix" and _set_spawning_popen is not None and
+    _DupFd is not None)
+
+# Seconds between checks that the main process is alive in the host process.
+_PARENT_CHECK_INTERVAL = 1
+# Seconds to wait for the host process to exit when closed.
+_CLOSE_TIMEOUT = 5
+# Seconds to wait for the loops still running in a closing host process.
+_LOOP_EXIT_TIMEOUT = 1
+
+
+class _ResourceSharingPopen:
+  """Stands in for a spawning Popen when pickling objects for the host.
+
+  File descriptors of pipes and shared memory are sent with
+  multiprocessing.resource_sharer instead of being inherited by a new process.
+  """
+
+  def duplicate_for_child(self, fd: int) -> int:
+    return fd
+
+  def DupFd(self, fd: int) -> Any:  # pylint: disable=invalid-name
+    return _DupFd(fd)
+
+
+def _dumps_for_host(obj: Any) -> bytes:
+  """Pickles obj, including multiprocessing objects, for the host process."""
+  _set_spawning_popen(_ResourceSharingPopen())
+  try:
+    return bytes(multiprocessing.reduction.ForkingPickler.dumps(obj))
+  finally:
+    _set_spawning_popen(None)
+
+
+def _run_hosted_process(process: switchboard_process.SwitchboardProcess,
+                        parent_pid: int,
+                        exited_event: multiprocessing.synchronize.Event) -> None:
+  """Runs the process loop and signals the main process when it exits."""
+  try:
+    switchboard_process.run_hosted_process_loop(process, parent_pid)
+  finally:
+    exited_event.set()
+
+
+def _host_loop(connection: multiprocessing.connection.Connection,
+               parent_pid: int,
+               logging_queue: multiprocessing.Queue,
+               log_directory: str,
+               name: str) -> None:
+  """Host process loop which runs the loops of the processes received."""
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  faulthandler_utils.set_up_faulthandler(
+      log_directory, log_file_name_prefix=f"{name}_parent_{parent_pid}_child")
+  gdm_logger.initialize_child_process_logging(logging_queue)
+  hosted_processes = []
+  while switchboard_process._parent_is_alive(parent_pid):  # pylint: disable=protected-access
+    if not connection.poll(_PARENT_CHECK_INTERVAL):
+      continue
+    try:
+      message = multiprocessing.reduction.ForkingPickler.loads(
+          connection.recv_bytes())
+    except EOFError:  # The main process closed the host.
+      break
+    if message is None:
+      break
+    process, exited_event = message
+    thread = threading.Thread(
+        name=f"{process.device_name}-{process.process_name}",
+        target=_run_hosted_process,
+        args=(process, parent_pid, exited_event),
+        daemon=True)
+    thread.start()
+    hosted_processes.append((process, thread))
+
+  for process, thread in hosted_processes:
+    if thread.is_alive():
+      process._terminate_event.set()  # pylint: disable=protected-access
+  for _, thread in hosted_processes:
+    thread.join(timeout=_LOOP_EXIT_TIMEOUT)
+
+
+class HostedProcess:
+  """Handle of a Switchboard process loop running in a SwitchboardHost.
+
+  Provides the multiprocessing.Process methods used by SwitchboardProcess.
+  """
+
+  def __init__(self,
+               host: "SwitchboardHost",
+               exited_event: multiprocessing.synchronize.Event,
+               name: str):
+    self._host = host
+    self._exited_event = exited_event
+    self._name = name
+
+  @property
+  def pid(self) -> Optional[int]:
+    """Process ID of the host process."""
+    return self._host.pid
+
+  def is_alive(self) -> bool:
+    return self._host.is_alive() and not self._exited_event.is_set()
+
+  def join(self, timeout: Optional[float] = None) -> None:
+    self._exited_event.wait(timeout=timeout)
+
+  def terminate(self) -> None:
+    """Stops waiting for the process loop and marks the host unhealthy.
+
+    Threads can't be terminated: the loop keeps its thread and file
+    descriptors until it exits or the host is closed.
+    """
+    if self._exited_event.is_set():
+      return
+    logger.warning(
+        "Switchboard process loop %s in host %s did not stop and can't be "
+        "terminated. Its thread and file descriptors are released when the "
+        "host is closed. New Switchboard processes won't run in the host.",
+        self._name, self._host.name)
+    self._host.mark_unhealthy()
+
+
+class SwitchboardHost:
+  """Runs the loops of many Switchboard processes in a single process."""
+
+  def __init__(self, name: str, log_directory: str):
+    """Initializes the host. The host process is started on first use.
+
+    Args:
+      name: name of the host process.
+      log_directory: directory for fault handler logs of the host process.
+    """
+    self.name = name
+    self._log_directory = log_directory
+    self._lock = threading.Lock()
+    self._process = None
+    self._connection = None
+    self._healthy = True
+
+  @property
+  def pid(self) -> Optional[int]:
+    """Process ID of the host process or None if it isn't started."""
+    process = self._process
+    return process.pid if process is not None else None
+
+  def is_alive(self) -> bool:
+    """Returns True if the host process is running."""
+    process = self._process
+    return process is not None and process.is_alive()
+
+  def is_usable(self) -> bool:
+    """Returns True if new Switchboard processes can run in the host."""
+    return HOSTING_SUPPORTED and self._healthy
+
+  def mark_unhealthy(self) -> None:
+    """Stops running new Switchboard processes in the host."""
+    self._healthy = False
+
+  def run_process(self,
+                  process: switchboard_process.SwitchboardProcess,
+                  parent_pid: int) -> HostedProcess:
+    """Starts running the loop of the Switchboard process in the host.
+
+    Starts the host process if it isn't running.
+
+    Args:
+      process: Switchboard process to run the loop of.
+      parent_pid: process ID of the main process.
+
+    Returns:
+      Handle of the running process loop.
+    """
+    exited_event = multiprocessing_utils.get_context().Event()
+    message = _dumps_for_host((process, exited_event))
+    with self._lock:
+      if not self.is_alive():
+        self._start(parent_pid)
+      self._connection.send_bytes(message)
+    return HostedProcess(
+        self, exited_event, f"{process.device_name}-{process.process_name}")
+
+  def close(self) -> None:
+    """Stops the host process and the process loops still running in it."""
+    with self._lock:
+      if self._process is None:
+        return
+      try:
+        self._connection.send_bytes(_dumps_for_host(None))
+      except OSError:  # The host process has exited.
+        pass
+      self._process.join(timeout=_CLOSE_TIMEOUT)
+      if self._process.is_alive():
+        logger.warning("Switchboard host %s did not stop in %ss. Terminating.",
+                       self.name, _CLOSE_TIMEOUT)
+        self._process.terminate()
+        self._process.join(timeout=1)
+      self._connection.close()
+      self._process = None
+      self._connection = None
+      self._healthy = True
+
+  def _start(self, parent_pid: int) -> None:
+    """Starts the host process. Must be called with self._lock held."""
+    if self._connection is not None:  # The host process exited on its own.
+      self._connection.close()
+    gdm_logger.switch_to_multiprocess_logging()
+    reader, writer = multiprocessing_utils.get_context().Pipe(duplex=False)
+    context = multiprocessing_utils.get_switchboard_process_context()
+    with multiprocessing_utils.configure_switchboard_multiprocessing():
+      process = context.Process(
+          name=self.name,
+          target=_host_loop,
+          args=(reader, parent_pid, gdm_logger.get_logging_queue(),
+                self._log_directory, self.name))
+      process.start()
+    reader.close()
+    self._process = process
+    self._connection = writer
+    logger.debug("Started Switchboard host %s (pid %s).", self.name,
+                 process.pid)
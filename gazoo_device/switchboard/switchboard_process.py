@@ -14,11 +14,14 @@
 
 """The minimum base class for switchboard subprocesses."""
 import contextlib
+import dataclasses
 import multiprocessing
 import os
 import queue
+import select
 import signal
 import socket
+import threading
 import time
 import traceback
 import typing
@@ -31,6 +34,37 @@ from gazoo_device.utility import multiprocessing_utils
 from gazoo_device.utility import retry
 import psutil
 
+# Seconds between checks that the main process is alive where it can't be
+# waited on.
+_PARENT_CHECK_INTERVAL = 1
+# Seconds between updates of the loop statistics of a running process.
+_LOOP_STATS_INTERVAL = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class LoopStats:
+  """Statistics of the loop of a Switchboard process.
+
+  Attributes:
+    iterations: number of _do_work() calls.
+    run_time: seconds the loop has run for.
+    cpu_time: CPU seconds used by the process while running the loop. Only the
+      thread running the loop is counted for a process run in a
+      SwitchboardHost.
+  """
+  iterations: int = 0
+  run_time: float = 0.0
+  cpu_time: float = 0.0
+
+  @property
+  def iterations_per_second(self) -> float:
+    return self.iterations / self.run_time if self.run_time else 0.0
+
+  @property
+  def cpu_percent(self) -> float:
+    """CPU usage in percent of a core."""
+    return self.cpu_time / self.run_time * 100 if self.run_time else 0.0
+
 
 def get_message(message_queue, timeout=None):
   """Returns next message from message_queue.
@@ -104,9 +138,10 @@ def wait_for_queue_writes(
 
 @contextlib.contextmanager
 def _child_process_wrapper(parent_pid, process_name, device_name,
-                           exception_queue):
+                           exception_queue, ignore_interrupts=True):
   """Wrapper to ignore interrupts in child processes; the main process handles cleanup."""
-  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  if ignore_interrupts:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
 
   try:
     yield
@@ -135,15 +170,111 @@ def _parent_is_alive(parent_pid):
   return status
 
 
-def _process_loop(cls, parent_pid):
-  """Child process loop which handles start/stop events and exceptions."""
+class _ParentWatcher:
+  """Detects the exit of the main process in a background thread.
+
+  The thread waits on a pidfd of the main process, which becomes readable when
+  the main process exits (Linux 5.3+). Elsewhere it checks the main process
+  every _PARENT_CHECK_INTERVAL seconds. is_alive() only reads a flag, so the
+  process loop doesn't check the main process on every iteration.
+  """
+
+  def __init__(self, parent_pid):
+    self._parent_pid = parent_pid
+    self._parent_alive = _parent_is_alive(parent_pid)
+    self._pidfd = None
+    self._stop_read_fd = None
+    self._stop_write_fd = None
+    self._thread = None
+    if not self._parent_alive:
+      return
+    try:
+      self._pidfd = os.pidfd_open(parent_pid)
+    except (AttributeError, OSError):  # Not supported by Python or the OS.
+      pass
+    self._stop_read_fd, self._stop_write_fd = os.pipe()
+    self._thread = threading.Thread(
+        name=f"parent_watcher_{parent_pid}", target=self._watch, daemon=True)
+    self._thread.start()
+
+  def is_alive(self):
+    """Returns False once the main process has exited."""
+    return self._parent_alive
+
+  def close(self):
+    """Stops the watcher thread and closes its file descriptors."""
+    if self._thread is None:
+      return
+    os.write(self._stop_write_fd, b"\0")
+    self._thread.join()
+    self._thread = None
+    for fd in (self._pidfd, self._stop_read_fd, self._stop_write_fd):
+      if fd is not None:
+        os.close(fd)
+
+  def _watch(self):
+    """Sets the main process as exited when it exits or the watcher stops."""
+    fds = [self._stop_read_fd]
+    timeout = _PARENT_CHECK_INTERVAL
+    if self._pidfd is not None:
+      fds.append(self._pidfd)
+      timeout = None
+    while True:
+      readable, _, _ = select.select(fds, [], [], timeout)
+      if self._stop_read_fd in readable:
+        return
+      if self._pidfd in readable or not _parent_is_alive(self._parent_pid):
+        self._parent_alive = False
+        return
+
+
+class _LoopStatsRecorder:
+  """Counts process loop iterations and publishes them every second."""
+
+  def __init__(self, process, hosted):
+    self._process = process
+    # Threads of a SwitchboardHost process run the loops of other processes.
+    self._cpu_clock = time.thread_time if hosted else time.process_time
+    self._iterations = 0
+    self._start_time = time.monotonic()
+    self._start_cpu_time = self._cpu_clock()
+    self._next_publish_time = self._start_time + _LOOP_STATS_INTERVAL
+
+  def record_iteration(self):
+    self._iterations += 1
+    if time.monotonic() >= self._next_publish_time:
+      self.publish()
+
+  def publish(self):
+    """Publishes the statistics and returns them."""
+    now = time.monotonic()
+    self._next_publish_time = now + _LOOP_STATS_INTERVAL
+    stats = LoopStats(iterations=self._iterations,
+                      run_time=now - self._start_time,
+                      cpu_time=self._cpu_clock() - self._start_cpu_time)
+    self._process._set_loop_stats(stats)  # pylint: disable=protected-access
+    return stats
+
+
+def _process_loop(cls, parent_pid, hosted=False):
+  """Child process loop which handles start/stop events and exceptions.
+
+  Args:
+      cls (SwitchboardProcess): process to run the loop of.
+      parent_pid (int): process ID of the main process.
+      hosted (bool): True if the loop runs in a thread of a SwitchboardHost
+        process, which sets up interrupt handling, the fault handler and
+        logging once for all the loops it runs.
+  """
   with _child_process_wrapper(parent_pid, cls.process_name, cls.device_name,
-                              cls._exception_queue):
-    faulthandler_utils.set_up_faulthandler(
-        typing.cast(str, cls._log_directory),  # pylint: disable=protected-access
-        log_file_name_prefix=f"{cls.device_name}_{type(cls).__name__}_parent_"
-                             f"{parent_pid}_child")
-    gdm_logger.initialize_child_process_logging(cls.logging_queue)
+                              cls._exception_queue,
+                              ignore_interrupts=not hosted):
+    if not hosted:
+      faulthandler_utils.set_up_faulthandler(
+          typing.cast(str, cls._log_directory),  # pylint: disable=protected-access
+          log_file_name_prefix=f"{cls.device_name}_{type(cls).__name__}_"
+                               f"parent_{parent_pid}_child")
+      gdm_logger.initialize_child_process_logging(cls.logging_queue)
     try:
       cls._start_event.set()
     except Exception as err:
@@ -152,14 +283,28 @@ def _process_loop(cls, parent_pid):
           "Device {} Process {} error {!r} start event error. {}".format(
               cls.device_name, cls.process_name, err, stack_trace))
     running = cls._pre_run_hook()
-    while running and _parent_is_alive(parent_pid):
+    if running:
+      parent_watcher = _ParentWatcher(parent_pid)
+      loop_stats = _LoopStatsRecorder(cls, hosted)
       try:
-        if cls._terminate_event.is_set():
-          cls._terminate_event.clear()
-          break
-      except IOError:  # manager shutdown
-        break
-      running = cls._do_work()
+        while running and parent_watcher.is_alive():
+          try:
+            if cls._terminate_event.is_set():
+              cls._terminate_event.clear()
+              break
+          except IOError:  # manager shutdown
+            break
+          running = cls._do_work()
+          loop_stats.record_iteration()
+      finally:
+        parent_watcher.close()
+        stats = loop_stats.publish()
+        gdm_logger.get_logger().debug(
+            "Device {} Process {} loop stats: {:.1f} iterations/s, "
+            "{:.2f}% CPU over {:.1f}s.".format(
+                cls.device_name, cls.process_name,
+                stats.iterations_per_second, stats.cpu_percent,
+                stats.run_time))
   try:
     cls._stop_event.set()
   except IOError:  # manager shutdown
@@ -167,6 +312,16 @@ def _process_loop(cls, parent_pid):
   cls._post_run_hook()
 
 
+def run_hosted_process_loop(process, parent_pid):
+  """Runs the loop of a SwitchboardProcess in a SwitchboardHost thread.
+
+  Args:
+      process (SwitchboardProcess): process to run the loop of.
+      parent_pid (int): process ID of the main process.
+  """
+  _process_loop(process, parent_pid, hosted=True)
+
+
 class SwitchboardProcess:
   """Simplifies creating Switchboard processes.
 
@@ -212,12 +367,31 @@ class SwitchboardProcess:
     self._stop_event = multiprocessing_utils.get_context().Event()
     self._terminate_event = multiprocessing_utils.get_context().Event()
     self._valid_commands = valid_commands or ()
+    # Iterations, run time and CPU time of the process loop. See LoopStats.
+    self._loop_stats = multiprocessing_utils.get_context().Array("d", 3)
     self._process = None
+    self._host = None
 
   def __del__(self):
     if self.is_started():
       self.stop()
 
+  def __getstate__(self):
+    """Excludes the host, which is only used by the parent process."""
+    state = self.__dict__.copy()
+    state["_host"] = None
+    return state
+
+  def set_host(self, host):
+    """Runs the process loop in the host when started instead of a new process.
+
+    Args:
+        host (Optional[SwitchboardHost]): host to run the process loop in or
+          None to run it in a process of its own. The loop also runs in a
+          process of its own if the host isn't usable when started.
+    """
+    self._host = host
+
   def start(self, wait_for_start: bool = True) -> None:
     """Starts the process.
 
@@ -231,13 +405,18 @@ class SwitchboardProcess:
     if not self.is_started():
       self._start_event.clear()
       self._stop_event.clear()
+      self._set_loop_stats(LoopStats())
       parent_pid = os.getpid()
-      with multiprocessing_utils.configure_switchboard_multiprocessing():
-        process = multiprocessing_utils.get_context().Process(  # pytype: disable=attribute-error  # re-none
-            name=self.process_name,
-            target=_process_loop,
-            args=(self, parent_pid))
-        process.start()
+      if self._host is not None and self._host.is_usable():
+        process = self._host.run_process(self, parent_pid)
+      else:
+        context = multiprocessing_utils.get_switchboard_process_context()
+        with multiprocessing_utils.configure_switchboard_multiprocessing():
+          process = context.Process(  # pytype: disable=attribute-error  # re-none
+              name=self.process_name,
+              target=_process_loop,
+              args=(self, parent_pid))
+          process.start()
       if wait_for_start:
         self.wait_for_start()
       self._process = process
@@ -311,6 +490,22 @@ class SwitchboardProcess:
       return self._process.is_alive()
     return False
 
+  def get_loop_stats(self) -> LoopStats:
+    """Returns statistics of the process loop since the process was started.
+
+    The statistics are updated every _LOOP_STATS_INTERVAL seconds while the
+    process runs and when its loop exits.
+    """
+    with self._loop_stats.get_lock():
+      iterations, run_time, cpu_time = self._loop_stats[:]
+    return LoopStats(
+        iterations=int(iterations), run_time=run_time, cpu_time=cpu_time)
+
+  def _set_loop_stats(self, stats: LoopStats) -> None:
+    """Publishes the loop statistics. Called by the process loop."""
+    with self._loop_stats.get_lock():
+      self._loop_stats[:] = [stats.iterations, stats.run_time, stats.cpu_time]
+
   def send_command(self, command, data=None,
                    wait_for_command_consumption: bool = False):
     """Sends command with optional data provided.
@@ -20,6 +20,18 @@ the transport class provided and according to the following assumptions:
     * Transport commands from the main process are received using the
       send_command() method.
 
+    * Transport method calls from the main process are received on a
+      dedicated call pipe using the call() method, bypassing the command
+      queue. Calls are tagged with a call ID so that several threads can have
+      calls in flight. Calls sent while the process isn't running fail and are
+      discarded when the process starts.
+
+    * Transports which provide a file descriptor (see TransportBase.fileno())
+      are waited on together with the call pipe and the command queue instead
+      of being read with a timeout. The process only wakes up for device data,
+      calls, commands, pending writes and partial lines. Transports without a
+      file descriptor are polled with the read timeout.
+
     * Raw transport data is (optionally) detokenized.
 
     * Raw/detokenized data is queued in the expect queue provided.
@@ -35,10 +47,12 @@ the transport class provided and according to the following assumptions:
     * Custom log messages received as commands will only be added to the log
       queue between full device log messages.
 """
+import multiprocessing.connection
 import queue
+import threading
 import time
 import traceback
-from typing import Any
+from typing import Any, Optional
 
 from gazoo_device.switchboard import data_framer
 from gazoo_device.switchboard import log_process
@@ -46,7 +60,6 @@ from gazoo_device.switchboard import switchboard_process
 from gazoo_device.switchboard import transport_properties as props
 from gazoo_device.utility import multiprocessing_utils
 
-CMD_TRANSPORT_CALL = "TRANSPORT_CALL"
 CMD_TRANSPORT_CLOSE = "TRANSPORT_CLOSE"
 CMD_TRANSPORT_OPEN = "TRANSPORT_OPEN"
 CMD_TRANSPORT_WRITE = "TRANSPORT_WRITE"
@@ -55,11 +68,18 @@ PARTIAL_LINE_TIMEOUT = 0.1  # time in seconds before publishing partial lines
 _MAX_WRITE_BYTES = 32
 _MAX_READ_BYTES = 11520  # 115200 / 10
 _READ_TIMEOUT = 0.01  # ((115200 / 10) / 100ms) = ~115 bytes per 10ms read
+# Maximum time in seconds to wait for events when the process can be woken up.
+_IDLE_WAIT_TIMEOUT = 1
+# How often a caller waiting for a call result checks that the process is alive.
+_CALL_LIVENESS_CHECK_INTERVAL = 1
+# TransportProcess attributes which are only used in the parent process.
+_PARENT_CALL_ATTRIBUTES = ("_call_connection", "_call_send_lock",
+                           "_call_condition", "_pending_calls",
+                           "_call_results")
 _ALL_VALID_COMMANDS = (
     CMD_TRANSPORT_CLOSE,
     CMD_TRANSPORT_OPEN,
     CMD_TRANSPORT_WRITE,
-    CMD_TRANSPORT_CALL
 )
 
 
@@ -99,7 +119,6 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
                log_queue,
                log_path,
                transport,
-               call_result_queue,
                raw_data_queue=None,
                raw_data_id=0,
                framer=None,
@@ -117,7 +136,6 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
       log_queue (Queue): to write each log line with host stamp added
       log_path (str): path and filename to write log messages to
       transport (Transport): to use to receive and send raw data
-      call_result_queue (Queue): to write transport call responses to.
       raw_data_queue (Queue): to put raw (if applicable, detokenized) data
         into when enabled.
       raw_data_id (int): unique identifier for data published by this
@@ -149,12 +167,101 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
     self._partial_log_time = time.time()
     self._pending_writes: queue.Queue[str] = None
     self._raw_data_enabled = multiprocessing_utils.get_context().Event()
-    self._call_result_queue = call_result_queue
     self._raw_data_id = raw_data_id
     self._raw_data_queue = raw_data_queue
     self._read_timeout = read_timeout
     self._transport_open = multiprocessing_utils.get_context().Event()
     self.transport = transport
+    # Both ends of the call pipe are created here so that the pipe survives
+    # process restarts. Only the process end is used in the child process.
+    self._call_connection, self._process_call_connection = (
+        multiprocessing_utils.get_context().Pipe())
+    self._call_send_lock = threading.Lock()
+    self._call_condition = threading.Condition()
+    self._call_id = 0
+    # Call ID -> self._start_count when sent, for calls awaiting their result.
+    self._pending_calls: dict[int, int] = {}
+    self._call_results: dict[int, tuple[bool, Any]] = {}
+    self._receiving_call_results = False
+    # Incremented by start(): calls sent to an earlier process are abandoned.
+    self._start_count = 0
+
+  def __getstate__(self):
+    """Excludes the call state, which is only used by the parent process."""
+    state = super().__getstate__()
+    for attribute in _PARENT_CALL_ATTRIBUTES:
+      del state[attribute]
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._call_connection = None
+    self._call_send_lock = threading.Lock()
+    self._call_condition = threading.Condition()
+    self._pending_calls = {}
+    self._call_results = {}
+
+  def start(self, wait_for_start: bool = True) -> None:
+    """Starts the process, discarding calls sent while it wasn't running.
+
+    Args:
+        wait_for_start: Whether to wait for the process to start. If False, the
+            caller is responsible for calling wait_for_start() separately.
+    """
+    with self._call_send_lock:
+      if not self.is_started():
+        while self._process_call_connection.poll():
+          self._process_call_connection.recv()
+        self._start_count += 1
+      super().start(wait_for_start=wait_for_start)
+
+  def stop(self):
+    """Stops the process, waking it up if it is waiting for events."""
+    if self._process is not None and self._process.is_alive():
+      try:
+        self._terminate_event.set()
+      except IOError:  # manager shutdown
+        pass
+      with self._call_send_lock:
+        self._call_connection.send(None)
+    super().stop()
+
+  def call(self,
+           method_name: str,
+           method_args: tuple[Any, ...],
+           method_kwargs: dict[str, Any]) -> tuple[bool, Any]:
+    """Calls a transport method in the transport process.
+
+    Safe to call from several threads at once: each caller receives the result
+    of its own call.
+
+    Args:
+      method_name: name of the transport method to call.
+      method_args: positional arguments for the call.
+      method_kwargs: keyword arguments for the call.
+
+    Returns:
+      (True, return value of the method) if the call succeeded,
+      (False, error traceback) if it failed or (False, error message) if the
+      process isn't running.
+    """
+    with self._call_condition:
+      self._call_id += 1
+      call_id = self._call_id
+    with self._call_send_lock:
+      if not self.is_running():
+        return self._get_not_running_result()
+      with self._call_condition:
+        self._pending_calls[call_id] = self._start_count
+      self._call_connection.send(
+          (call_id, method_name, method_args, method_kwargs))
+    with self._call_condition:
+      while call_id not in self._call_results:
+        if self._receiving_call_results:
+          self._call_condition.wait()
+        else:
+          self._receive_call_result(call_id)
+      return self._call_results.pop(call_id)
 
   def get_raw_data(self, timeout=None):
     """Returns raw data message from optional raw data queue.
@@ -226,6 +333,7 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
         self._command_queue, timeout=0)
     if command_message:
       self._process_command_message(command_message)
+    self._process_transport_calls()
     if self.transport.is_open():
       self._transport_open.set()
       self._transport_write()
@@ -242,7 +350,8 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
       if closed_unexpectedly and can_reopen:
         self._open_transport()
       else:
-        time.sleep(self._read_timeout)
+        # Wake up as soon as a call or a command arrives rather than sleeping.
+        self._wait_for_events()
     return True
 
   def _is_line_published(self, line):
@@ -298,8 +407,6 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
     elif CMD_TRANSPORT_WRITE == command:
       _enqueue_command_writes(
           self._pending_writes, data, max_write_bytes=self._max_write_bytes)
-    elif CMD_TRANSPORT_CALL == command:
-      self._transport_call(data)
     else:
       raise RuntimeError("Device {} received an unknown command {}.".format(
           self.device_name, command))
@@ -310,25 +417,91 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
           self._raw_data_queue, (self._raw_data_id, line), timeout=0)
     log_process.log_message(self._log_queue, line, self._raw_data_id)
 
-  def _transport_call(self, data: tuple[str,
-                                        tuple[Any],
-                                        dict[str, Any]]) -> None:
-    """Calls the transport method and puts result into call_result_queue."""
+  def _process_transport_calls(self) -> None:
+    """Executes the transport calls received on the call pipe."""
+    while self._process_call_connection.poll():
+      call = self._process_call_connection.recv()
+      if call is None:  # Sent by stop() to wake up the process.
+        continue
+      call_id, method_name, method_args, method_kwargs = call
+      success, return_value = self._transport_call(
+          method_name, method_args, method_kwargs)
+      try:
+        self._process_call_connection.send((call_id, success, return_value))
+      except Exception:  # pylint: disable=broad-except
+        # The return value can't be pickled.
+        self._process_call_connection.send(
+            (call_id, False, traceback.format_exc()))
+
+  def _get_not_running_result(self) -> tuple[bool, str]:
+    """Returns the result of calls which the process can't answer."""
+    return (False, f"Device {self.device_name} process {self.process_name} "
+            "is not running.")
+
+  def _receive_call_result(self, call_id: int) -> None:
+    """Receives one call result from the call pipe for the waiting callers.
+
+    Must be called with self._call_condition held. The condition is released
+    while waiting so that other callers can send their calls. Calls sent to a
+    process which is no longer running fail. Results of calls whose caller is
+    no longer waiting are dropped.
+
+    Args:
+      call_id: ID of the call of the caller receiving the result.
+    """
+    start_count = self._pending_calls[call_id]
+    self._receiving_call_results = True
+    self._call_condition.release()
+    result = None
+    try:
+      while result is None:
+        if self._call_connection.poll(_CALL_LIVENESS_CHECK_INTERVAL):
+          result = self._call_connection.recv()
+        elif not self.is_running() or self._start_count != start_count:
+          break
+    finally:
+      self._call_condition.acquire()
+      self._receiving_call_results = False
+      self._call_condition.notify_all()
+    if result is None:
+      is_running = self.is_running()
+      for pending_call_id, call_start_count in list(
+          self._pending_calls.items()):
+        if not is_running or call_start_count != self._start_count:
+          del self._pending_calls[pending_call_id]
+          self._call_results[pending_call_id] = self._get_not_running_result()
+      return
+    result_call_id, success, return_value = result
+    if self._pending_calls.pop(result_call_id, None) is not None:
+      self._call_results[result_call_id] = (success, return_value)
+
+  def _transport_call(
+      self,
+      method_name: str,
+      method_args: tuple[Any, ...],
+      method_kwargs: dict[str, Any]) -> tuple[bool, Any]:
+    """Calls the transport method and returns (success, return value)."""
     try:
-      method_name, method_args, method_kwargs = data
       method = getattr(self.transport, method_name)
-      return_value = method(*method_args, **method_kwargs)
-      success = True
+      return True, method(*method_args, **method_kwargs)
     except Exception:  # pylint: disable=broad-except
-      return_value = traceback.format_exc()
-      success = False
-    self._call_result_queue.put((success, return_value))
+      return False, traceback.format_exc()
 
   def _transport_read(self):
-    """Reads and processing incoming bytes from transport."""
+    """Reads and processing incoming bytes from transport.
 
-    bytes_in = self.transport.read(
-        size=self._max_read_bytes, timeout=self._read_timeout)
+    Transports with a file descriptor are waited on together with calls and
+    commands (see _wait_for_events()), so that these don't wait for the read
+    timeout. Transports without one are read with the read timeout.
+    """
+    transport_fd = self.transport.fileno()
+    if transport_fd is None:
+      bytes_in = self.transport.read(
+          size=self._max_read_bytes, timeout=self._read_timeout)
+    elif transport_fd in self._wait_for_events(transport_fd):
+      bytes_in = self.transport.read(size=self._max_read_bytes, timeout=0)
+    else:
+      bytes_in = None
     if bytes_in:
       if isinstance(bytes_in, bytes):
         unicode_in = bytes_in.decode("utf-8", "replace")
@@ -348,6 +521,40 @@ class TransportProcess(switchboard_process.SwitchboardProcess):
       if self._is_line_published(self._buffered_unicode):
         self._buffered_unicode = u""
 
+  def _wait_for_events(
+      self,
+      transport_fd: Optional[int] = None) -> list[Any]:
+    """Waits until there is work to do and returns the ready wait objects.
+
+    Waits for a call, a command or data on transport_fd. Doesn't wait if
+    writes are pending and only waits for the rest of the partial line timeout
+    if a partial line is buffered. Falls back to waiting for the read timeout
+    if the command queue can't be waited on.
+
+    Args:
+      transport_fd: File descriptor of the open transport, if any.
+
+    Returns:
+      The wait objects (call pipe, command queue reader or transport_fd)
+      which are ready.
+    """
+    wait_objects = [self._process_call_connection]
+    timeout = self._read_timeout
+    command_queue_reader = multiprocessing_utils.get_queue_reader(
+        self._command_queue)
+    if command_queue_reader is not None:
+      wait_objects.append(command_queue_reader)
+      timeout = max(timeout, _IDLE_WAIT_TIMEOUT)
+    if transport_fd is not None:
+      wait_objects.append(transport_fd)
+      if not self._pending_writes.empty():
+        timeout = 0
+      elif self._buffered_unicode:
+        partial_line_time_left = self._partial_line_timeout - (
+            time.time() - self._partial_log_time)
+        timeout = min(timeout, max(partial_line_time_left, 0))
+    return multiprocessing.connection.wait(wait_objects, timeout=timeout)
+
   def _transport_write(self):
     """Writes previously split commands into transport."""
     if not self._pending_writes.empty():
@@ -13,17 +13,24 @@
 # limitations under the License.
 
 """Pigweed RPC transport class."""
+import collections
+import contextlib
 import fcntl
 import importlib
+import os
 import queue
+import re
 import select
 import socket
 import threading
+import time
 import typing
-from typing import Any, Collection, Optional, Union
+from typing import (Any, Callable, Collection, ContextManager, Optional,
+                    Sequence, Union)
 from gazoo_device import errors
 from gazoo_device import gdm_logger
 from gazoo_device.switchboard.transports import transport_base
+from gazoo_device.utility import multiprocessing_utils
 from gazoo_device.utility import pwrpc_utils
 import serial
 
@@ -47,6 +54,18 @@ _SELECT_TIMEOUT_SEC = 0.1  # seconds
 _SERIAL_TIMEOUT_SEC = 0.01  # seconds
 _RPC_CALLBACK_TIMEOUT_SEC = 1  # seconds
 _NUM_OF_READ_BYTES = 4096
+# Default maximum number of RPCs awaiting a response in rpc_batch(). Devices
+# must echo pw_rpc call IDs for more than one call of the same method to be in
+# flight, so pipelining is opt-in.
+_MAX_RPCS_IN_FLIGHT = 1
+# Seconds between calls of all watched RPCs, whether or not their log
+# patterns matched.
+_WATCH_REFRESH_INTERVAL_SEC = 5
+# Seconds to wait after a log pattern matches before calling the watched RPCs,
+# so that the matches of a burst of logs cause a single call.
+_WATCH_DEBOUNCE_SEC = 0.05
+# Minimum seconds between calls of watched RPCs.
+_WATCH_MIN_INTERVAL_SEC = 0.2
 logger = gdm_logger.get_logger()
 
 
@@ -73,6 +92,14 @@ def _serialize(payload: Any) -> Any:
   return [_serialize(content) for content in payload]
 
 
+def _decode_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+  """Decodes the PigweedProtoState values of RPC kwargs."""
+  return {
+      param_name:
+      param.decode() if isinstance(param, pwrpc_utils.PigweedProtoState)
+      else param for param_name, param in kwargs.items()}
+
+
 class PwHdlcRpcClient:
   """Pigweed HDLC RPC Client.
 
@@ -99,6 +126,11 @@ class PwHdlcRpcClient:
     self._stop_event = None
     self._worker = None
     self.log_queue = None
+    # Self-pipe with one byte per log queue entry so that log reads can be
+    # waited for with select() (see get_log_fileno()).
+    self._log_read_fd = None
+    self._log_write_fd = None
+    self._log_listener = None
 
     # The read / write methods for 2 types of file descriptors
     if isinstance(self._file_object, serial.Serial):
@@ -123,6 +155,9 @@ class PwHdlcRpcClient:
     if self._worker is None:
       self._stop_event = threading.Event()
       self.log_queue = queue.Queue()
+      self._log_read_fd, self._log_write_fd = os.pipe()
+      os.set_blocking(self._log_read_fd, False)
+      os.set_blocking(self._log_write_fd, False)
       proto_modules = [importlib.import_module(import_path)
                        for import_path in self._protobuf_import_paths]
       # Load compiled proto modules instead of the raw protos to avoid a
@@ -151,6 +186,56 @@ class PwHdlcRpcClient:
       self._client = None
       self._stop_event = None
       self.log_queue = None
+      for fd in (self._log_read_fd, self._log_write_fd):
+        if fd is not None:
+          os.close(fd)
+      self._log_read_fd = None
+      self._log_write_fd = None
+
+  def get_log_fileno(self) -> Optional[int]:
+    """Returns a file descriptor which is readable when logs are queued."""
+    return self._log_read_fd
+
+  def get_logs(self, timeout: Optional[float]) -> bytes:
+    """Returns all queued logs, waiting up to timeout seconds for the first.
+
+    Args:
+      timeout: Maximum seconds to wait for a log or indefinitely if None.
+
+    Returns:
+      The queued logs or b"" if there were none within timeout seconds.
+    """
+    if self.log_queue is None:
+      raise ValueError("log_queue is not initialized")
+    if self._log_read_fd is not None:
+      # Drain before taking the logs: logs queued from now on signal again.
+      try:
+        while os.read(self._log_read_fd, _NUM_OF_READ_BYTES):
+          pass
+      except BlockingIOError:
+        pass
+    try:
+      logs = [self.log_queue.get(timeout=timeout)]
+    except queue.Empty:
+      return b""
+    while True:
+      try:
+        logs.append(self.log_queue.get_nowait())
+      except queue.Empty:
+        return b"".join(logs)
+
+  def set_log_listener(
+      self, listener: Optional[Callable[[bytes], None]]) -> None:
+    """Sets the function called with each device log line, or removes it.
+
+    The listener is called from the worker thread, which also handles the RPC
+    responses: it must not block. Unlike get_logs(), it doesn't take the logs
+    from the log queue.
+
+    Args:
+      listener: Function called with each log line, or None.
+    """
+    self._log_listener = listener
 
   def rpcs(self, channel_id: Optional[int] = None) -> Any:
     """Returns object for accessing services on the specified channel.
@@ -213,6 +298,14 @@ class PwHdlcRpcClient:
     if self.log_queue is None:
       raise ValueError("log_queue is not initialized")
     self.log_queue.put(frame.data + b"\n")
+    listener = self._log_listener
+    if listener is not None:
+      listener(frame.data)
+    if self._log_write_fd is not None:
+      try:
+        os.write(self._log_write_fd, b"\0")
+      except BlockingIOError:
+        pass  # The pipe is full, so it is readable already.
 
   def _handle_frame(self, frame: Any) -> None:
     """Private method for processing HDLC frame.
@@ -256,10 +349,7 @@ def _rpc(hdlc_client: PwHdlcRpcClient,
   client_channel = hdlc_client.rpcs().chip.rpc
   service = getattr(client_channel, service_name)
   event = getattr(service, event_name)
-  kwargs = {
-      param_name:
-      param.decode() if isinstance(param, pwrpc_utils.PigweedProtoState)
-      else param for param_name, param in kwargs.items()}
+  kwargs = _decode_kwargs(kwargs)
   ack, payload = event(**kwargs)
   if not ack.ok():
     raise errors.DeviceError(
@@ -268,6 +358,231 @@ def _rpc(hdlc_client: PwHdlcRpcClient,
   return _serialize(payload)
 
 
+def _rpc_batch(hdlc_client: PwHdlcRpcClient,
+               requests: Sequence[tuple[str, str, dict[str, Any]]],
+               max_in_flight: int = _MAX_RPCS_IN_FLIGHT) -> list[Any]:
+  """Pipelined RPC calls to the Matter endpoint.
+
+  Up to max_in_flight requests are sent before waiting for the oldest
+  response. Responses are matched to requests by their call IDs, so
+  max_in_flight > 1 requires pigweed>=0.0.15 (which gives each call its own
+  ID) and a device which echoes call IDs in its responses.
+
+  Args:
+    hdlc_client: HDLC client instance.
+    requests: (service name, event name, event kwargs) of each RPC. The kwargs
+      may include "pw_rpc_timeout_s", the timeout of the RPC's response.
+    max_in_flight: Maximum number of RPCs awaiting a response.
+
+  Returns:
+    RPC encoded payload of each request, in order.
+
+  Raises:
+    DeviceError when the HDLC client is not alive or an RPC ack value is not
+    OK. Pending RPCs are cancelled.
+  """
+  if not hdlc_client.is_alive():
+    raise errors.DeviceError("HLDC client is not alive.")
+  client_channel = hdlc_client.rpcs().chip.rpc
+  payloads = []
+  calls = collections.deque()
+  try:
+    for service_name, event_name, kwargs in requests:
+      if len(calls) >= max(1, max_in_flight):
+        payloads.append(_wait_for_call(*calls.popleft()))
+      event = getattr(getattr(client_channel, service_name), event_name)
+      request_args = _decode_kwargs(kwargs)
+      invoke_kwargs = {}
+      if "pw_rpc_timeout_s" in request_args:
+        invoke_kwargs["timeout_s"] = request_args.pop("pw_rpc_timeout_s")
+      call = event.invoke(request_args=request_args, **invoke_kwargs)
+      calls.append((call, f"{service_name} {event_name} {request_args}"))
+    while calls:
+      payloads.append(_wait_for_call(*calls.popleft()))
+  finally:
+    for call, _ in calls:
+      call.cancel()
+  return payloads
+
+
+def _wait_for_call(call: Any, description: str) -> Any:
+  """Waits for the response of a unary RPC call and returns its payload."""
+  ack, payload = call.wait()
+  if not ack.ok():
+    raise errors.DeviceError(
+        f"Pigweed RPC call {description} fails: "
+        f"Error message: {ack.name}. Error code: {ack.value}.")
+  return _serialize(payload)
+
+
+class _Subscriptions:
+  """RPC subscriptions of a transport, pushing updates to a queue.
+
+  Updates are (subscription ID, RPC encoded payload) tuples. A subscription
+  is either:
+    - a server streaming RPC: each response is an update and the end of the
+      stream is a None payload;
+    - a watched unary RPC: a thread calls the RPC when a device log line
+      matches the watch's log pattern, and every _WATCH_REFRESH_INTERVAL_SEC
+      regardless. Its payload is an update when it differs from the previous
+      one. This is polling triggered by the logs: each match costs an RPC
+      round trip on the device link (calls are debounced and at most one
+      every _WATCH_MIN_INTERVAL_SEC), and each watch costs one call per
+      refresh interval. Log lines not matching any pattern cause no call.
+      Calls are serialized with the unary RPC calls of the transport through
+      call_lock.
+  """
+
+  def __init__(self, hdlc_client: PwHdlcRpcClient, update_queue: Any):
+    """Initializes the subscriptions.
+
+    Args:
+      hdlc_client: HDLC client instance.
+      update_queue: Queue to push the updates to.
+    """
+    self._hdlc_client = hdlc_client
+    self._update_queue = update_queue
+    self._lock = threading.Lock()
+    # Held during unary RPC calls of watches and of the transport.
+    self.call_lock = threading.Lock()
+    self._stream_calls = {}
+    # Subscription ID -> [(service name, event name, kwargs), last payload,
+    # compiled log pattern or None].
+    self._watches = {}
+    # IDs of the watches whose log pattern matched since their last call.
+    self._triggered_watches = set()
+    self._trigger_event = threading.Event()
+    self._stop_event = threading.Event()
+    self._watch_thread = None
+
+  def subscribe(self, subscription_id: int, service_name: str,
+                event_name: str, **kwargs: Any) -> None:
+    """Invokes a server streaming RPC whose responses are updates."""
+    if not self._hdlc_client.is_alive():
+      raise errors.DeviceError("HLDC client is not alive.")
+    event = getattr(
+        getattr(self._hdlc_client.rpcs().chip.rpc, service_name), event_name)
+
+    def on_next(unused_call: Any, payload: Any) -> None:
+      self._update_queue.put((subscription_id, _serialize(payload)))
+
+    def on_completed(unused_call: Any, status: Any) -> None:
+      logger.debug(f"Pigweed RPC subscription {subscription_id} to "
+                   f"{service_name} {event_name} completed: {status}")
+      self._update_queue.put((subscription_id, None))
+
+    def on_error(unused_call: Any, error: Any) -> None:
+      logger.warning(f"Pigweed RPC subscription {subscription_id} to "
+                     f"{service_name} {event_name} failed: {error}")
+      self._update_queue.put((subscription_id, None))
+
+    request_args = _decode_kwargs(kwargs)
+    # Streams have no response timeout: they end when cancelled.
+    request_args.pop("pw_rpc_timeout_s", None)
+    call = event.invoke(
+        request_args=request_args, on_next=on_next,
+        on_completed=on_completed, on_error=on_error)
+    with self._lock:
+      self._stream_calls[subscription_id] = call
+
+  def watch(self, subscription_id: int, service_name: str, event_name: str,
+            log_regex: Optional[str] = None, **kwargs: Any) -> None:
+    """Calls a unary RPC now, on matching device logs and periodically.
+
+    The first payload is pushed before returning.
+    """
+    pattern = None if log_regex is None else re.compile(log_regex.encode())
+    with self.call_lock:
+      payload = _rpc(self._hdlc_client, service_name, event_name, **kwargs)
+    self._update_queue.put((subscription_id, payload))
+    with self._lock:
+      self._watches[subscription_id] = [
+          (service_name, event_name, kwargs), payload, pattern]
+      if self._watch_thread is None:
+        self._hdlc_client.set_log_listener(self._on_log)
+        self._watch_thread = threading.Thread(
+            target=self._run_watches, daemon=True)
+        self._watch_thread.start()
+
+  def unsubscribe(self, subscription_id: int) -> None:
+    """Cancels the subscription. Unknown subscriptions are ignored."""
+    with self._lock:
+      self._watches.pop(subscription_id, None)
+      self._triggered_watches.discard(subscription_id)
+      call = self._stream_calls.pop(subscription_id, None)
+    if call is not None:
+      call.cancel()
+
+  def close(self) -> None:
+    """Cancels all subscriptions and stops the watch thread."""
+    self._stop_event.set()
+    self._trigger_event.set()
+    with self._lock:
+      calls = list(self._stream_calls.values())
+      self._stream_calls.clear()
+      self._watches.clear()
+      watch_thread = self._watch_thread
+    if watch_thread is not None:
+      self._hdlc_client.set_log_listener(None)
+    for call in calls:
+      call.cancel()
+    if watch_thread is not None:
+      watch_thread.join(timeout=_JOIN_TIMEOUT_SEC)
+
+  def _on_log(self, line: bytes) -> None:
+    """Triggers a call of the watches whose log pattern matches the line."""
+    with self._lock:
+      matched = [
+          subscription_id
+          for subscription_id, (_, _, pattern) in self._watches.items()
+          if pattern is not None and pattern.search(line)
+      ]
+      self._triggered_watches.update(matched)
+    if matched:
+      self._trigger_event.set()
+
+  def _run_watches(self) -> None:
+    """Calls the triggered watched RPCs, and all periodically, until stopped."""
+    refresh_time = time.time() + _WATCH_REFRESH_INTERVAL_SEC
+    call_time = 0.0
+    while not self._stop_event.is_set():
+      triggered = self._trigger_event.wait(max(0, refresh_time - time.time()))
+      if self._stop_event.is_set():
+        break
+      refresh = time.time() >= refresh_time
+      if triggered and not refresh:
+        self._stop_event.wait(_WATCH_DEBOUNCE_SEC)
+        self._stop_event.wait(
+            max(0, call_time + _WATCH_MIN_INTERVAL_SEC - time.time()))
+      self._trigger_event.clear()
+      with self._lock:
+        watches = [
+            (subscription_id, watch)
+            for subscription_id, watch in self._watches.items()
+            if refresh or subscription_id in self._triggered_watches
+        ]
+        self._triggered_watches.clear()
+      if refresh:
+        refresh_time = time.time() + _WATCH_REFRESH_INTERVAL_SEC
+      if not watches or self._stop_event.is_set():
+        continue
+      try:
+        with self.call_lock:
+          payloads = _rpc_batch(
+              self._hdlc_client, [watch[0] for _, watch in watches])
+      except errors.DeviceError as e:
+        logger.warning(f"Pigweed RPC watch calls failed: {e}")
+        continue
+      finally:
+        call_time = time.time()
+      with self._lock:
+        for (subscription_id, watch), payload in zip(watches, payloads):
+          if (self._watches.get(subscription_id) is watch and
+              payload != watch[1]):
+            watch[1] = payload
+            self._update_queue.put((subscription_id, payload))
+
+
 class PigweedRpcSerialTransport(transport_base.TransportBase):
   """Pigweed RPC transport over serial connection via UART."""
 
@@ -276,7 +591,8 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
                protobuf_import_paths: Collection[str],
                baudrate: int,
                auto_reopen: bool = True,
-               open_on_start: bool = True):
+               open_on_start: bool = True,
+               subscriptions: bool = False):
     """Initializes a PigweedRpcSerialTransport instance.
 
     Args:
@@ -292,6 +608,8 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
         unexpectedly.
       open_on_start: Whether to open the transport during TransportProcess
         start.
+      subscriptions: Whether to support subscribe() and watch(). Creates the
+        update_queue multiprocessing queue.
     """
     super().__init__(
         comms_address=comms_address,
@@ -302,6 +620,10 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
     self._serial.baudrate = baudrate
     self._serial.timeout = _SERIAL_TIMEOUT_SEC
     self._hdlc_client = PwHdlcRpcClient(self._serial, protobuf_import_paths)
+    # Subscription updates, read by the parent process. See _Subscriptions.
+    self.update_queue = (
+        multiprocessing_utils.get_context().Queue() if subscriptions else None)
+    self._subscriptions = None
 
   def is_open(self) -> bool:
     """Returns True if the PwRPC transport is connected to the target.
@@ -313,6 +635,7 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
 
   def _close(self) -> None:
     """Closes the PwRPC transport."""
+    self._close_subscriptions()
     self._hdlc_client.close()
     fcntl.flock(self._serial.fileno(), fcntl.LOCK_UN)
     self._serial.close()
@@ -324,10 +647,19 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
     flags = fcntl.fcntl(fd, fcntl.F_GETFD)
     fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
     self._hdlc_client.start()
+    if self.update_queue is not None:
+      self._subscriptions = _Subscriptions(
+          self._hdlc_client, self.update_queue)
+
+  def fileno(self) -> Optional[int]:
+    """Returns a file descriptor which is readable when logs can be read."""
+    if not self.is_open():
+      return None
+    return self._hdlc_client.get_log_fileno()
 
   def _read(  # pytype: disable=signature-mismatch  # overriding-parameter-type-checks
       self, size: int, timeout: float) -> bytes:
-    """Returns Pigweed log from the HDLC channel 1.
+    """Returns Pigweed logs from the HDLC channel 1.
 
     Args:
       size: Not used.
@@ -338,12 +670,7 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
     """
     # Retrieving logs from queue doesn't support size configuration.
     del size  # not used
-    if self._hdlc_client.log_queue is None:
-      raise ValueError("log_queue is not initialized")
-    try:
-      return self._hdlc_client.log_queue.get(timeout=timeout)
-    except queue.Empty:
-      return b""
+    return self._hdlc_client.get_logs(timeout)
 
   def _write(self, data: str, timeout: Optional[float] = None) -> int:
     """Dummy method for the abstract parent class."""
@@ -356,7 +683,80 @@ class PigweedRpcSerialTransport(transport_base.TransportBase):
           event_name: str,
           **kwargs: Any) -> bytes:
     """RPC call to the Matter endpoint with given service and event name."""
-    return _rpc(self._hdlc_client, service_name, event_name, **kwargs)
+    with self._get_call_lock():
+      return _rpc(self._hdlc_client, service_name, event_name, **kwargs)
+
+  def rpc_batch(self,
+                requests: Sequence[tuple[str, str, dict[str, Any]]],
+                max_in_flight: int = _MAX_RPCS_IN_FLIGHT) -> list[Any]:
+    """Pipelined RPC calls to the Matter endpoint. See _rpc_batch()."""
+    with self._get_call_lock():
+      return _rpc_batch(self._hdlc_client, requests, max_in_flight)
+
+  def subscribe(self,
+                subscription_id: int,
+                service_name: str,
+                event_name: str,
+                **kwargs: Any) -> None:
+    """Pushes the responses of a server streaming RPC to update_queue.
+
+    Args:
+      subscription_id: ID of the updates of the subscription.
+      service_name: PwRPC service name.
+      event_name: Server streaming event name in the given service instance.
+      **kwargs: Arguments for the event method.
+    """
+    self._get_subscriptions().subscribe(
+        subscription_id, service_name, event_name, **kwargs)
+
+  def watch(self,
+            subscription_id: int,
+            service_name: str,
+            event_name: str,
+            log_regex: Optional[str] = None,
+            **kwargs: Any) -> None:
+    """Pushes the payload of a unary RPC to update_queue when it changes.
+
+    The RPC is called when a device log line matches log_regex and every
+    few seconds (see _Subscriptions).
+
+    Args:
+      subscription_id: ID of the updates of the subscription.
+      service_name: PwRPC service name.
+      event_name: Unary event name in the given service instance.
+      log_regex: Regular expression of the device log lines reporting a
+        change of the payload. If None, the RPC is only called periodically.
+      **kwargs: Arguments for the event method.
+    """
+    self._get_subscriptions().watch(
+        subscription_id, service_name, event_name, log_regex=log_regex,
+        **kwargs)
+
+  def unsubscribe(self, subscription_id: int) -> None:
+    """Cancels a subscription made by subscribe() or watch()."""
+    if self._subscriptions is not None:
+      self._subscriptions.unsubscribe(subscription_id)
+
+  def _get_subscriptions(self) -> _Subscriptions:
+    """Returns the subscriptions of the open transport."""
+    if self.update_queue is None:
+      raise errors.DeviceError(
+          "Transport was created without subscriptions support.")
+    if self._subscriptions is None or not self.is_open():
+      raise errors.DeviceError("HLDC client is not alive.")
+    return self._subscriptions
+
+  def _get_call_lock(self) -> ContextManager[Any]:
+    """Returns the lock serializing unary RPC calls with watches, if any."""
+    if self._subscriptions is None:
+      return contextlib.nullcontext()
+    return self._subscriptions.call_lock
+
+  def _close_subscriptions(self) -> None:
+    """Cancels all subscriptions."""
+    if self._subscriptions is not None:
+      self._subscriptions.close()
+      self._subscriptions = None
 
 
 class PigweedRpcSocketTransport(transport_base.TransportBase):
@@ -367,7 +767,8 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
                protobuf_import_paths: Collection[str],
                port: int,
                auto_reopen: bool = True,
-               open_on_start: bool = False):
+               open_on_start: bool = False,
+               subscriptions: bool = False):
     """Initializes a PigweedRpcSocketTransport instance.
 
     Args:
@@ -380,6 +781,8 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
       open_on_start: Whether to open the transport during TransportProcess
         start. Set to False as the transport should be opened only if the linux
         sample app is already running properly on the device.
+      subscriptions: Whether to support subscribe() and watch(). Creates the
+        update_queue multiprocessing queue.
     """
     super().__init__(
         comms_address=comms_address,
@@ -389,6 +792,10 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
     self._address = (comms_address, port)
     self._socket = None
     self._hdlc_client = None
+    # Subscription updates, read by the parent process. See _Subscriptions.
+    self.update_queue = (
+        multiprocessing_utils.get_context().Queue() if subscriptions else None)
+    self._subscriptions = None
 
   def is_open(self) -> bool:
     """Returns True if the PwRPC transport is connected to the target.
@@ -400,6 +807,7 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
 
   def _close(self) -> None:
     """Closes the PwRPC transport."""
+    self._close_subscriptions()
     # pytype is unable to infer that these conditions hold if is_open is called.
     if self._hdlc_client is not None and self._hdlc_client.is_alive():
       self._hdlc_client.close()
@@ -415,10 +823,19 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
         self._socket, self._protobuf_import_paths)
     self._socket.connect(self._address)
     self._hdlc_client.start()
+    if self.update_queue is not None:
+      self._subscriptions = _Subscriptions(
+          self._hdlc_client, self.update_queue)
+
+  def fileno(self) -> Optional[int]:
+    """Returns a file descriptor which is readable when logs can be read."""
+    if not self.is_open():
+      return None
+    return self._hdlc_client.get_log_fileno()
 
   def _read(  # pytype: disable=signature-mismatch  # overriding-parameter-type-checks
       self, size: int, timeout: float) -> bytes:
-    """Returns Pigweed log from the HDLC channel 1.
+    """Returns Pigweed logs from the HDLC channel 1.
 
     Args:
       size: Not used.
@@ -431,10 +848,7 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
     del size  # not used
     if self._hdlc_client is None:
       raise ValueError("hdlc_client is not initialized")
-    try:
-      return self._hdlc_client.log_queue.get(timeout=timeout)
-    except queue.Empty:
-      return b""
+    return self._hdlc_client.get_logs(timeout)
 
   def _write(self, data: str, timeout: Optional[float] = None) -> int:
     """Dummy method for the abstract parent class."""
@@ -447,4 +861,77 @@ class PigweedRpcSocketTransport(transport_base.TransportBase):
           event_name: str,
           **kwargs: Any) -> bytes:
     """RPC call to the Matter endpoint with given service and event name."""
-    return _rpc(self._hdlc_client, service_name, event_name, **kwargs)
+    with self._get_call_lock():
+      return _rpc(self._hdlc_client, service_name, event_name, **kwargs)
+
+  def rpc_batch(self,
+                requests: Sequence[tuple[str, str, dict[str, Any]]],
+                max_in_flight: int = _MAX_RPCS_IN_FLIGHT) -> list[Any]:
+    """Pipelined RPC calls to the Matter endpoint. See _rpc_batch()."""
+    with self._get_call_lock():
+      return _rpc_batch(self._hdlc_client, requests, max_in_flight)
+
+  def subscribe(self,
+                subscription_id: int,
+                service_name: str,
+                event_name: str,
+                **kwargs: Any) -> None:
+    """Pushes the responses of a server streaming RPC to update_queue.
+
+    Args:
+      subscription_id: ID of the updates of the subscription.
+      service_name: PwRPC service name.
+      event_name: Server streaming event name in the given service instance.
+      **kwargs: Arguments for the event method.
+    """
+    self._get_subscriptions().subscribe(
+        subscription_id, service_name, event_name, **kwargs)
+
+  def watch(self,
+            subscription_id: int,
+            service_name: str,
+            event_name: str,
+            log_regex: Optional[str] = None,
+            **kwargs: Any) -> None:
+    """Pushes the payload of a unary RPC to update_queue when it changes.
+
+    The RPC is called when a device log line matches log_regex and every
+    few seconds (see _Subscriptions).
+
+    Args:
+      subscription_id: ID of the updates of the subscription.
+      service_name: PwRPC service name.
+      event_name: Unary event name in the given service instance.
+      log_regex: Regular expression of the device log lines reporting a
+        change of the payload. If None, the RPC is only called periodically.
+      **kwargs: Arguments for the event method.
+    """
+    self._get_subscriptions().watch(
+        subscription_id, service_name, event_name, log_regex=log_regex,
+        **kwargs)
+
+  def unsubscribe(self, subscription_id: int) -> None:
+    """Cancels a subscription made by subscribe() or watch()."""
+    if self._subscriptions is not None:
+      self._subscriptions.unsubscribe(subscription_id)
+
+  def _get_subscriptions(self) -> _Subscriptions:
+    """Returns the subscriptions of the open transport."""
+    if self.update_queue is None:
+      raise errors.DeviceError(
+          "Transport was created without subscriptions support.")
+    if self._subscriptions is None or not self.is_open():
+      raise errors.DeviceError("HLDC client is not alive.")
+    return self._subscriptions
+
+  def _get_call_lock(self) -> ContextManager[Any]:
+    """Returns the lock serializing unary RPC calls with watches, if any."""
+    if self._subscriptions is None:
+      return contextlib.nullcontext()
+    return self._subscriptions.call_lock
+
+  def _close_subscriptions(self) -> None:
+    """Cancels all subscriptions."""
+    if self._subscriptions is not None:
+      self._subscriptions.close()
+      self._subscriptions = None
@@ -72,6 +72,14 @@ class ProcessTransport(transport_base.TransportBase):
     return (hasattr(self, "_process") and self._process is not None and
             self._process.poll() is None)
 
+  def fileno(self):
+    """Returns the process output file descriptor or None if it isn't open."""
+    if not self.is_open() or self._process.stdout is None:
+      return None
+    stdout = self._process.stdout
+    # PtyTransport replaces stdout with the pty file descriptor.
+    return stdout if isinstance(stdout, int) else stdout.fileno()
+
   def _open(self):
     """Opens or reopens the process using the current property values."""
     if self._is_ready_to_open():
@@ -135,7 +143,7 @@ class ProcessTransport(transport_base.TransportBase):
     Returns:
         str: bytes read from transport or None if no bytes were read
     """
-    if timeout:
+    if timeout is not None:
       return self._read_non_blocking(size, timeout)
     return self._read_data(size)
 
@@ -174,14 +182,18 @@ class ProcessTransport(transport_base.TransportBase):
     count = 0
     result = b""
     end_time = time.time() + timeout
-    while count < size and time.time() < end_time:
+    # Polls at least once so that a timeout of 0 returns the available bytes.
+    while count < size:
       time_left = end_time - time.time()
       readable, _, _ = select.select([self._process.stdout], [], [],
                                      0 if time_left < 0 else time_left)
-      for stream in readable:
-        if stream is self._process.stdout:
-          count += 1
-          result += self._read_data(1)
+      if self._process.stdout not in readable:
+        break
+      data = self._read_data(1)
+      if not data:  # End of file.
+        break
+      count += 1
+      result += data
     return result
 
   def _write_non_blocking(self, data, timeout):
@@ -99,6 +99,12 @@ class SerialTransport(transport_base.TransportBase):
 
     return hasattr(self, "_serial") and self._serial.isOpen()
 
+  def fileno(self):
+    """Returns the serial port file descriptor or None if it isn't open."""
+    if not self.is_open():
+      return None
+    return self._serial.fileno()
+
   def _open(self):
     """Opens or reopens the serial port using the current property values.
 
@@ -111,6 +111,12 @@ class TcpTransport(transport_base.TransportBase):
     """
     return self._socket is not None
 
+  def fileno(self):
+    """Returns the socket file descriptor or None if it isn't open."""
+    if self._socket is None:
+      return None
+    return self._socket.fileno()
+
   def _open(self):
     """Opens or reopens the tcp connection using the current property values.
 
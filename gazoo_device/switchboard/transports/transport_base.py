@@ -102,6 +102,20 @@ class TransportBase(abc.ABC):
     """Closes the transport on garbage collection."""
     self.close()
 
+  def fileno(self) -> Optional[int]:
+    """Returns a file descriptor which is readable when there is data to read.
+
+    TransportProcess waits for the file descriptor to be readable (along with
+    transport calls) and then reads with a timeout of 0 instead of blocking in
+    read() for the read timeout. A read must therefore not block once the
+    file descriptor is readable. Override in derived classes which support it.
+
+    Returns:
+      The file descriptor, or None if the transport isn't open or can't
+      provide one.
+    """
+    return None
+
   def get_property(self, key: str, value: Optional[Any] = None) -> Any:
     """Returns property matching key specified or value if not set.
 
@@ -0,0 +1,105 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares adb commands run by 'adb' processes and by the adb client.
+
+Runs adb_utils.shell() and adb_utils.get_adb_devices() (the commands behind
+Android device health checks and property reads) --commands times each:
+  - with an 'adb' process per command (the default). The adb binary is
+    replaced by a shell script which prints the output without contacting an
+    adb server, so this is a lower bound of the process cost;
+  - with the adb client (adb_utils.enable_adb_client()) talking to a fake adb
+    server on localhost. These commands don't pass adb_path: the client leaves
+    commands for an explicit adb executable to that executable.
+Prints the commands per second.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.adb_client_benchmark \
+      --commands=200
+"""
+import os
+import stat
+import tempfile
+from typing import Callable, Optional
+
+from absl import flags
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.tests.unit_tests.utils import fake_adb_server
+from gazoo_device.utility import adb_utils
+
+_COMMANDS = flags.DEFINE_integer(
+    "commands", 200, "Number of commands of each kind to run.")
+
+_SERIAL = "04576e89"
+_COMMAND = "getprop ro.build.version.sdk"
+_OUTPUT = "33\n"
+_ADB_SCRIPT = f"""#!/bin/sh
+case "$*" in
+  devices) printf 'List of devices attached\\n{_SERIAL}\\tdevice\\n\\n' ;;
+  *) printf '{_OUTPUT}' ;;
+esac
+"""
+
+
+def _time(name: str, adb_path: Optional[str],
+          command: Callable[[Optional[str]], None]) -> None:
+  """Runs the command _COMMANDS times and prints the statistics."""
+  measurement = benchmark_utils.measure(
+      lambda: command(adb_path), runs=_COMMANDS.value)
+  print(f"  {name}: {measurement.rate:.0f} commands/s")
+
+
+def _run_commands(adb_path: Optional[str]) -> None:
+  """Times shell commands and device lists."""
+
+  def shell(adb_path):
+    output = adb_utils.shell(_SERIAL, _COMMAND, adb_path=adb_path)
+    assert output == _OUTPUT, output
+
+  def get_adb_devices(adb_path):
+    devices = adb_utils.get_adb_devices(adb_path=adb_path)
+    assert devices == [_SERIAL], devices
+
+  _time("adb shell", adb_path, shell)
+  _time("adb devices", adb_path, get_adb_devices)
+
+
+def main() -> None:
+  server = fake_adb_server.FakeAdbServer()
+  server.set_device_state(_SERIAL, "device")
+  server.shell_responses[_COMMAND] = (_OUTPUT, "", 0)
+  os.environ["ANDROID_ADB_SERVER_PORT"] = str(server.address[1])
+  try:
+    with tempfile.TemporaryDirectory() as directory:
+      adb_path = os.path.join(directory, "adb")
+      with open(adb_path, "w") as adb_script:
+        adb_script.write(_ADB_SCRIPT)
+      os.chmod(adb_path, os.stat(adb_path).st_mode | stat.S_IXUSR)
+
+      print(f"Running {_COMMANDS.value} commands of each kind:")
+      print("'adb' process per command (no server round trip):")
+      _run_commands(adb_path)
+      adb_utils.enable_adb_client()
+      try:
+        print("adb client:")
+        _run_commands(adb_path=None)
+      finally:
+        adb_utils.disable_adb_client()
+  finally:
+    server.close()
+  print(f"The fake adb server accepted {server.connections} connections.")
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
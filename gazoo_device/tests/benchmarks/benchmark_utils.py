@@ -0,0 +1,126 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Harness shared by the GDM benchmarks.
+
+A benchmark module defines its flags and a main() function without arguments
+and runs it with run():
+
+  def main() -> None:
+    measurement = benchmark_utils.measure(operation, runs=_RUNS.value)
+    print(f"{measurement.rate:.0f} ops/s")
+
+  if __name__ == "__main__":
+    benchmark_utils.run(main)
+"""
+from concurrent import futures
+import dataclasses
+import logging
+import statistics
+import time
+from typing import Any, Callable, Sequence
+
+from absl import app
+from gazoo_device import gdm_logger
+
+
+@dataclasses.dataclass(frozen=True)
+class Measurement:
+  """Timings of an operation run several times.
+
+  Attributes:
+    latencies: Duration of each run in seconds, in order of completion.
+    elapsed: Wall clock duration of all runs in seconds.
+    result: Value returned by the last run to complete.
+  """
+  latencies: list[float]
+  elapsed: float
+  result: Any
+
+  @property
+  def runs(self) -> int:
+    return len(self.latencies)
+
+  @property
+  def rate(self) -> float:
+    """Returns the number of runs per second."""
+    return self.runs / self.elapsed
+
+  @property
+  def mean(self) -> float:
+    """Returns the mean run duration in seconds."""
+    return statistics.mean(self.latencies)
+
+  @property
+  def median(self) -> float:
+    """Returns the median run duration in seconds."""
+    return statistics.median(self.latencies)
+
+  def percentile(self, percent: int) -> float:
+    """Returns the given percentile (1-99) of the run durations in seconds."""
+    if self.runs < 2:
+      return self.latencies[0]
+    return statistics.quantiles(self.latencies, n=100)[percent - 1]
+
+
+def measure(operation: Callable[[], Any],
+            runs: int = 1,
+            threads: int = 1) -> Measurement:
+  """Runs the operation and times each run.
+
+  Args:
+    operation: Function to run.
+    runs: Number of times to run the operation.
+    threads: Number of threads running the operation concurrently.
+
+  Returns:
+    The timings of the runs.
+  """
+  latencies = []
+  results = []
+
+  def timed_run(_):
+    start = time.perf_counter()
+    result = operation()
+    latencies.append(time.perf_counter() - start)
+    results.append(result)
+
+  start = time.perf_counter()
+  if threads == 1:
+    for run_number in range(runs):
+      timed_run(run_number)
+  else:
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+      list(executor.map(timed_run, range(runs)))
+  elapsed = time.perf_counter() - start
+  return Measurement(latencies=latencies, elapsed=elapsed, result=results[-1])
+
+
+def check_same_results(description: str, results: Sequence[Any]) -> None:
+  """Raises RuntimeError if the compared implementations' results differ."""
+  if any(result != results[0] for result in results[1:]):
+    raise RuntimeError(f"{description} returned different results.")
+
+
+def run(main: Callable[[], None]) -> None:
+  """Parses the flags and runs the benchmark with GDM logging quieted."""
+
+  def app_main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+      raise app.UsageError("Too many command-line arguments.")
+    gdm_logger.get_logger().setLevel(logging.WARNING)
+    logging.getLogger("pw_rpc").setLevel(logging.WARNING)
+    main()
+
+  app.run(app_main)
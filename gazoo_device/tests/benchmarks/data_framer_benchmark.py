@@ -0,0 +1,125 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the character loop and str.find based split_newlines_only.
+
+Frames generated device output the way its callers do: small chunks carrying
+over the partial line as serial transports read them, and large chunks as the
+log filter and log parser read log files. Prints the framing throughput in
+MB/s of the character loop split_newlines_only used to run and of the current
+one, and verifies both return the same lines.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.data_framer_benchmark \
+      --data_size_mb=64
+"""
+import random
+from typing import Callable, Iterator, Optional
+
+from absl import flags
+from gazoo_device.switchboard import data_framer
+from gazoo_device.tests.benchmarks import benchmark_utils
+
+_DATA_SIZE_MB = flags.DEFINE_integer(
+    "data_size_mb", 16, "Size of the generated device output in MB.")
+
+# Chunk sizes: a serial transport read and a log file read.
+_CHUNK_SIZES = {"serial-rate": 64, "bulk-file-rate": 4096}
+
+
+def _split_newlines_only_loop(string: str,
+                              begin: int = 0,
+                              end: Optional[int] = None,
+                              keepends: bool = True,
+                              cleanends: bool = False) -> Iterator[str]:
+  """split_newlines_only as it was implemented with a character loop."""
+  if end is None:
+    end = len(string)
+  start_index = 0
+  if cleanends:
+    pre_line_return = begin
+    for i in range(begin, 0, -1):
+      if string[i] != "\r" and string[i] != "\n":
+        pre_line_return = i + 1
+        break
+  end_offset = 1 if keepends else 0
+  for i in range(begin, end):
+    if cleanends and string[i] != "\r" and string[i] != "\n":
+      pre_line_return = i + 1
+    if string[i] == "\n":
+      if cleanends:
+        yield string[start_index:pre_line_return] + string[i:i + end_offset]
+      else:
+        yield string[start_index:i + end_offset]
+      start_index = i + 1
+      if start_index == end:
+        break
+  else:
+    yield string[start_index:]
+
+
+def _generate_data(size: int) -> str:
+  """Returns generated device output with line returns before newlines."""
+  rng = random.Random(0)
+  lines = []
+  data_size = 0
+  while data_size < size:
+    line = "<2022-01-01 00:00:00.000000> GDM-0: [APPL] {} value={}{}\n".format(
+        "x" * rng.randrange(10, 120), rng.randrange(10**6),
+        "\r" * rng.randrange(3))
+    lines.append(line)
+    data_size += len(line)
+  return "".join(lines)
+
+
+def _frame(split: Callable[..., Iterator[str]], data: str,
+           chunk_size: int) -> list[str]:
+  """Frames the data read in chunks, carrying over partial lines."""
+  lines = []
+  partial_line = ""
+  for chunk_start in range(0, len(data), chunk_size):
+    chunk = partial_line + data[chunk_start:chunk_start + chunk_size]
+    partial_line = ""
+    for line in split(chunk, begin=len(chunk) - chunk_size
+                      if len(chunk) > chunk_size else 0, cleanends=True):
+      if line[-1:] == "\n":
+        lines.append(line)
+      else:
+        partial_line = line
+  if partial_line:
+    lines.append(partial_line)
+  return lines
+
+
+def main() -> None:
+  data = _generate_data(_DATA_SIZE_MB.value * 2**20)
+  data_size_mb = len(data) / 2**20
+  for name, chunk_size in _CHUNK_SIZES.items():
+    print(f"{name} ({chunk_size} character chunks):")
+    results = []
+    for implementation, split in (
+        ("character loop", _split_newlines_only_loop),
+        ("str.find", data_framer.split_newlines_only)):
+      measurement = benchmark_utils.measure(
+          lambda split=split, chunk_size=chunk_size: _frame(
+              split, data, chunk_size))
+      results.append(measurement.result)
+      print(f"  {implementation:<15} "
+            f"{data_size_mb / measurement.elapsed:>8.1f} MB/s")
+    benchmark_utils.check_same_results(
+        "split_newlines_only implementations", results)
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,138 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares searching each event filter with the compiled filter matcher.
+
+Loads the event filters with EventParserDefault.load_filters and matches every
+line of a device log against them, once by searching each filter regex (as
+EventParserDefault used to) and once with the compiled filter matcher. Verifies
+both find the same events.
+
+By default, a log and a filter set with hundreds of filters are generated. Pass
+a recorded device log and the device filter files to benchmark real data.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.event_filter_benchmark \
+      --log_file=/path/to/device-log.txt \
+      --filter_paths=/path/to/filters/
+"""
+import json
+import os
+import random
+import tempfile
+from typing import Any, Callable, Sequence
+
+from absl import flags
+from gazoo_device.capabilities import event_parser_default
+from gazoo_device.tests.benchmarks import benchmark_utils
+
+_LOG_FILE = flags.DEFINE_string(
+    "log_file", None, "Recorded device log. Generated if not provided.")
+_FILTER_PATHS = flags.DEFINE_list(
+    "filter_paths", None,
+    "Filter files or directories. Generated if not provided.")
+_LOG_LINES = flags.DEFINE_integer(
+    "log_lines", 200_000, "Number of log lines to generate.")
+_FILTER_FILES = flags.DEFINE_integer(
+    "filter_files", 30, "Number of filter files to generate.")
+_FILTERS_PER_FILE = flags.DEFINE_integer(
+    "filters_per_file", 10, "Number of filters per generated filter file.")
+
+_LOG_LINE_FORMAT = "<2022-01-01 00:00:00.{:06d}> GDM-0: {}\n"
+# One in every _EVENT_INTERVAL generated log lines matches a filter.
+_EVENT_INTERVAL = 50
+
+
+def _generate_filters(directory: str) -> list[str]:
+  """Writes filter files and returns their paths."""
+  filter_paths = []
+  for file_number in range(_FILTER_FILES.value):
+    filters = []
+    for filter_number in range(_FILTERS_PER_FILE.value):
+      filters.append({
+          "name": f"event_{filter_number}",
+          "regex_match": (
+              rf"\[module{file_number}\] event {filter_number}: (\w+)"),
+      })
+    filter_paths.append(os.path.join(directory, f"filters{file_number}.json"))
+    with open(filter_paths[-1], "w") as filter_file:
+      json.dump({"version": {"major": 1, "minor": 0}, "filters": filters},
+                filter_file)
+  return filter_paths
+
+
+def _generate_log_lines() -> list[str]:
+  """Returns generated log lines, some of which match the generated filters."""
+  rng = random.Random(0)
+  log_lines = []
+  for line_number in range(_LOG_LINES.value):
+    if line_number % _EVENT_INTERVAL == 0:
+      message = "[module{}] event {}: value{}".format(
+          rng.randrange(_FILTER_FILES.value),
+          rng.randrange(_FILTERS_PER_FILE.value), line_number)
+    else:
+      message = "[module{}] periodic status update {} ok".format(
+          rng.randrange(_FILTER_FILES.value), line_number)
+    log_lines.append(_LOG_LINE_FORMAT.format(line_number % 1_000_000, message))
+  return log_lines
+
+
+def _search_each_filter(filters_dict, log_line: str) -> dict[str, Any]:
+  """Matches the log line by searching every filter regex."""
+  matches = {}
+  for filter_name, regex in filters_dict.items():
+    match = regex.search(log_line)
+    if match:
+      matches[filter_name] = match.groups()
+  return matches
+
+
+def _time_matching(name: str, get_matches: Callable[[str], dict[str, Any]],
+                   log_lines: Sequence[str]) -> list[dict[str, Any]]:
+  """Matches all log lines, prints the throughput and returns the matches."""
+  measurement = benchmark_utils.measure(
+      lambda: [get_matches(log_line) for log_line in log_lines])
+  print(f"  {name:<25} {len(log_lines) / measurement.elapsed:>12,.0f} lines/s")
+  return measurement.result
+
+
+def main() -> None:
+  with tempfile.TemporaryDirectory() as temp_dir:
+    filter_paths = _FILTER_PATHS.value or _generate_filters(temp_dir)
+    parser = event_parser_default.EventParserDefault(
+        filters=[], event_file_path="unknown.txt", device_name="benchmark")
+    parser.load_filters(filter_paths)
+  if _LOG_FILE.value:
+    with open(_LOG_FILE.value, encoding="utf-8", errors="replace") as log_file:
+      log_lines = log_file.readlines()
+  else:
+    log_lines = _generate_log_lines()
+  filters_dict = parser._filters_dict  # pylint: disable=protected-access
+  print(f"Matching {len(log_lines)} log lines against "
+        f"{len(filters_dict)} filters:")
+
+  expected = _time_matching(
+      "search each filter",
+      lambda log_line: _search_each_filter(filters_dict, log_line), log_lines)
+  matcher = event_parser_default._FilterMatcher(filters_dict)  # pylint: disable=protected-access
+  actual = _time_matching("compiled filter matcher", matcher.get_matches,
+                          log_lines)
+  benchmark_utils.check_same_results(
+      "Searching each filter and the compiled filter matcher",
+      [expected, actual])
+  print(f"  Both found {sum(map(len, actual))} events.")
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,142 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares subprocess-based and indexed event queries of EventParserDefault.
+
+Generates an event file of the requested size and times get_last_event,
+get_event_history (with a count), get_event_history_count and
+wait_for_event_labels with both event query backends. The first indexed query
+includes the cost of indexing the entire event file and is reported separately.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.event_parser_benchmark \
+      --event_file_size_mb=2048
+"""
+import datetime
+import json
+import os
+import tempfile
+from typing import Any, Callable
+
+from absl import flags
+from gazoo_device.capabilities import event_parser_default
+from gazoo_device.tests.benchmarks import benchmark_utils
+
+_EVENT_FILE_SIZE_MB = flags.DEFINE_integer(
+    "event_file_size_mb", 256, "Size of the generated event file in MB.")
+_ITERATIONS = flags.DEFINE_integer(
+    "iterations", 10, "Number of times to run each query.")
+
+_FILTER_FILE_CONTENTS = {
+    "version": {"major": 1, "minor": 0},
+    "filters": [
+        {"name": "state", "regex_match": r"state: (\w+)"},
+        {"name": "frequent", "regex_match": "frequent event"},
+        {"name": "rare", "regex_match": "rare event"},
+    ],
+}
+_RARE_EVENT_INTERVAL = 100_000
+
+
+def _generate_event_file(event_file_path: str, size_bytes: int) -> int:
+  """Writes events to the event file until it reaches the requested size."""
+  start = datetime.datetime(2022, 1, 1)
+  event_count = 0
+  written = 0
+  with open(event_file_path, "w") as event_file:
+    while written < size_bytes:
+      timestamp = (start + datetime.timedelta(milliseconds=event_count)
+                  ).strftime(event_parser_default.TIMESTAMP_FORMAT)
+      if event_count % _RARE_EVENT_INTERVAL == 0:
+        event = {"benchmark.rare": [], "raw_log_line": "rare event"}
+      elif event_count % 2:
+        event = {"benchmark.frequent": [], "raw_log_line": "frequent event"}
+      else:
+        event = {"benchmark.state": [str(event_count)],
+                 "raw_log_line": f"state: {event_count}"}
+      event["system_timestamp"] = timestamp
+      event["matched_timestamp"] = timestamp
+      line = json.dumps(event) + "\n"
+      event_file.write(line)
+      written += len(line)
+      event_count += 1
+  return event_count
+
+
+def _time_query(name: str, query: Callable[[], Any], iterations: int) -> None:
+  """Runs the query and prints its average latency."""
+  measurement = benchmark_utils.measure(query, runs=iterations)
+  print(f"  {name:<45} {measurement.mean * 1000:>10.2f} ms")
+
+
+def _run_queries(parser: event_parser_default.EventParserDefault,
+                 iterations: int) -> None:
+  """Times all benchmarked queries with the given parser."""
+  timeout = 600.0
+  _time_query(
+      "get_last_event(['benchmark.state'])",
+      lambda: parser.get_last_event(["benchmark.state"], timeout=timeout),
+      iterations)
+  _time_query(
+      "get_last_event(['benchmark.rare'])",
+      lambda: parser.get_last_event(["benchmark.rare"], timeout=timeout),
+      iterations)
+  _time_query(
+      "get_event_history(['benchmark.state'], 100)",
+      lambda: parser.get_event_history(
+          ["benchmark.state"], count=100, timeout=timeout),
+      iterations)
+  _time_query(
+      "get_event_history_count('benchmark.frequent')",
+      lambda: parser.get_event_history_count(
+          "benchmark.frequent", timeout=timeout),
+      iterations)
+  _time_query(
+      "wait_for_event_labels(['benchmark.rare'])",
+      lambda: parser.wait_for_event_labels(
+          ["benchmark.rare"], timeout=timeout,
+          start_datetime=datetime.datetime(2000, 1, 1)),
+      iterations)
+
+
+def main() -> None:
+  with tempfile.TemporaryDirectory() as temp_dir:
+    filter_path = os.path.join(temp_dir, "benchmark.json")
+    with open(filter_path, "w") as filter_file:
+      json.dump(_FILTER_FILE_CONTENTS, filter_file)
+    event_file_path = os.path.join(temp_dir, "benchmark-events.txt")
+    event_count = _generate_event_file(
+        event_file_path, _EVENT_FILE_SIZE_MB.value * 1024 * 1024)
+    print(f"Generated {event_count} events "
+          f"({os.path.getsize(event_file_path) / 2**20:.0f} MB).")
+
+    for use_event_index in (False, True):
+      parser = event_parser_default.EventParserDefault(
+          filters=[filter_path],
+          event_file_path=event_file_path,
+          device_name="benchmark",
+          use_event_index=use_event_index)
+      if use_event_index:
+        print("Indexed backend:")
+        _time_query("initial index build",
+                    lambda: parser.get_event_history_count(  # pylint: disable=cell-var-from-loop
+                        "benchmark.rare", timeout=600.0),
+                    iterations=1)
+      else:
+        print("Subprocess (tac/grep) backend:")
+      _run_queries(parser, _ITERATIONS.value)
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,96 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares LogWriterProcess throughput with default and buffered log writes.
+
+Starts a LogWriterProcess, pushes log lines into its log queue as fast as
+possible and measures the resulting log write throughput and the maximum log
+queue depth observed by the producer.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.log_writer_benchmark \
+      --log_lines=500000
+"""
+import os
+import tempfile
+from typing import Any
+
+from absl import flags
+from gazoo_device.switchboard import log_process
+from gazoo_device.switchboard import switchboard_process
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.utility import multiprocessing_utils
+
+_LOG_LINES = flags.DEFINE_integer(
+    "log_lines", 200_000, "Number of log lines to write.")
+_LOG_LINE = log_process._add_log_header(  # pylint: disable=protected-access
+    "<2022-01-01 00:00:00.000000> GDM-0: benchmark log line " + "x" * 60 + "\n")
+_QUEUE_DEPTH_SAMPLE_INTERVAL = 1000
+# Maximum time in seconds for the log writer to catch up with the producer.
+_TIMEOUT = 600.0
+
+_WRITER_SETTINGS = {
+    "default": {},
+    "buffered": {
+        "max_batch_lines": log_process.BUFFERED_MAX_BATCH_LINES,
+        "flush_size": log_process.BUFFERED_FLUSH_SIZE,
+        "flush_interval": log_process.BUFFERED_FLUSH_INTERVAL,
+    },
+}
+
+
+def _run_writer(log_path: str, log_lines: int,
+                writer_kwargs: dict[str, Any]) -> None:
+  """Writes log lines through a LogWriterProcess and prints its throughput."""
+  context = multiprocessing_utils.get_context()
+  exception_queue = context.Queue()
+  log_queue = context.Queue()
+  writer = log_process.LogWriterProcess(
+      "benchmark", exception_queue, context.Queue(), log_queue, log_path,
+      **writer_kwargs)
+  writer.start()
+
+  def write_lines() -> int:
+    """Writes the log lines and returns the maximum log queue depth."""
+    max_queue_depth = 0
+    for line_number in range(log_lines):
+      log_queue.put(_LOG_LINE)
+      if line_number % _QUEUE_DEPTH_SAMPLE_INTERVAL == 0:
+        max_queue_depth = max(max_queue_depth, log_queue.qsize())
+    switchboard_process.wait_for_queue_writes(log_queue, timeout=_TIMEOUT)
+    writer.flush(timeout=_TIMEOUT)
+    return max_queue_depth
+
+  try:
+    measurement = benchmark_utils.measure(write_lines)
+  finally:
+    writer.stop()
+    # Don't block interpreter exit on log lines left over by a failed run.
+    log_queue.cancel_join_thread()
+  log_size_mb = os.path.getsize(log_path) / 2**20
+  print(f"  {log_lines / measurement.elapsed:>12,.0f} lines/s "
+        f"{log_size_mb / measurement.elapsed:>8.1f} MB/s "
+        f"max queue depth {measurement.result:>8,}")
+
+
+def main() -> None:
+  with tempfile.TemporaryDirectory() as temp_dir:
+    for name, writer_kwargs in _WRITER_SETTINGS.items():
+      print(f"{name} log writes:")
+      _run_writer(os.path.join(temp_dir, f"{name}.txt"), _LOG_LINES.value,
+                  writer_kwargs)
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
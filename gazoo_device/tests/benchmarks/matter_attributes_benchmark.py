@@ -0,0 +1,98 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares one-by-one and pipelined Matter attribute reads over PwRPC.
+
+Reads --attributes attributes from a fake Matter device which answers each
+Attributes.Read RPC --latency seconds after receiving it. The RPCs go through
+the same PwHdlcRpcClient as the Pigweed RPC transports. Prints the reads per
+second:
+  - one RPC at a time (the way the rpc() transport method reads);
+  - pipelined with up to --max_in_flight RPCs awaiting a response (the way
+    the rpc_batch() transport method reads when given max_in_flight > 1).
+The fake device echoes call IDs, so this is the speedup available to a device
+whose firmware does too. GDM device classes read with one RPC in flight until
+their firmware is verified to echo call IDs.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.matter_attributes_benchmark \
+      --attributes=32 --latency=0.01 --max_in_flight=4
+"""
+from typing import Any, Callable, Sequence
+
+from absl import flags
+from gazoo_device.switchboard.transports import pigweed_rpc_transport
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.tests.unit_tests.utils import fake_pigweed_hdlc_peer
+
+_ATTRIBUTES = flags.DEFINE_integer(
+    "attributes", 32, "Number of attributes read per round.")
+_LATENCY = flags.DEFINE_float(
+    "latency", 0.01, "Seconds between a request and its response.")
+_MAX_IN_FLIGHT = flags.DEFINE_integer(
+    "max_in_flight", 4, "Maximum number of pipelined RPCs awaiting a response.")
+_ROUNDS = flags.DEFINE_integer("rounds", 5, "Number of rounds of reads.")
+
+_PROTOBUF_IMPORT_PATHS = ("gazoo_device.protos.attributes_service_pb2",)
+_ON_OFF_CLUSTER_ID = 0x0006
+
+
+def _get_requests() -> list[tuple[str, str, dict[str, Any]]]:
+  return [("Attributes", "Read",
+           {"endpoint": 1, "cluster": _ON_OFF_CLUSTER_ID,
+            "attribute_id": attribute_id})
+          for attribute_id in range(_ATTRIBUTES.value)]
+
+
+def _time(name: str,
+          read: Callable[[pigweed_rpc_transport.PwHdlcRpcClient,
+                          Sequence[tuple[str, str, dict[str, Any]]]],
+                         None]) -> None:
+  """Reads the attributes _ROUNDS times and prints the statistics.
+
+  Args:
+    name: Name of the way attributes are read.
+    read: Function called with the HDLC client and the RPC requests.
+  """
+  peer = fake_pigweed_hdlc_peer.FakePigweedHdlcPeer(latency=_LATENCY.value)
+  client = pigweed_rpc_transport.PwHdlcRpcClient(
+      peer.client_socket, _PROTOBUF_IMPORT_PATHS)
+  client.start()
+  try:
+    measurement = benchmark_utils.measure(
+        lambda: read(client, _get_requests()), runs=_ROUNDS.value)
+  finally:
+    client.close()
+    peer.close()
+  reads = _ROUNDS.value * _ATTRIBUTES.value
+  print(f"{name}: {reads / measurement.elapsed:.0f} reads/s, "
+        f"at most {peer.max_pending} RPCs in flight")
+
+
+def main() -> None:
+  def one_by_one(client, requests):
+    for service_name, event_name, kwargs in requests:
+      pigweed_rpc_transport._rpc(client, service_name, event_name, **kwargs)  # pylint: disable=protected-access
+
+  def pipelined(client, requests):
+    pigweed_rpc_transport._rpc_batch(client, requests, _MAX_IN_FLIGHT.value)  # pylint: disable=protected-access
+
+  print(f"Reading {_ATTRIBUTES.value} attributes {_ROUNDS.value} times, "
+        f"{_LATENCY.value} s latency:")
+  _time("One by one", one_by_one)
+  _time("Pipelined", pipelined)
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
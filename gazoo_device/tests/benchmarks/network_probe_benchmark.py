@@ -0,0 +1,131 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares probing IP addresses for SSH and SNMP one at a time and at once.
+
+Sets up fake hosts on loopback addresses (127.0.1.0/24 and up): some accept
+connections to a fake SSH port, some run a fake SNMP agent and the others only
+respond to pings. Addresses in 198.51.100.0/24 (TEST-NET-2) stand in for
+unreachable hosts. Prints the time network_probe takes to probe all addresses
+with max_concurrency=1 (one address at a time, as host_utils.get_all_ssh_ips()
+and host_utils.get_all_snmp_ips() do without network probes, minus the cost of
+a ping, nc or snmpget subprocess per probe) and with the default concurrency.
+
+Pinging needs an ICMP socket (root, or a net.ipv4.ping_group_range which
+includes the group of the process) or the ping command.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.network_probe_benchmark \
+      --hosts=200 --ssh_hosts=100 --snmp_hosts=50 --unreachable=5
+"""
+import collections
+import socket
+import threading
+import time
+from typing import Callable, Sequence
+
+from absl import flags
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.utility import network_probe
+from gazoo_device.utility import snmp_utils
+
+_HOSTS = flags.DEFINE_integer(
+    "hosts", 200, "Number of fake hosts which respond to pings.")
+_SSH_HOSTS = flags.DEFINE_integer(
+    "ssh_hosts", 100, "Number of the fake hosts which accept SSH connections.")
+_SNMP_HOSTS = flags.DEFINE_integer(
+    "snmp_hosts", 50, "Number of the fake hosts which run an SNMP agent.")
+_UNREACHABLE = flags.DEFINE_integer(
+    "unreachable", 5, "Number of unreachable addresses to probe.")
+
+_FAKE_SSH_PORT = 2222
+_FAKE_SNMP_PORT = 1161
+
+
+def _get_host_ip(index: int) -> str:
+  return f"127.0.{1 + index // 250}.{1 + index % 250}"
+
+
+def _run_snmp_agents(agent_sockets: Sequence[socket.socket]) -> None:
+  """Responds to SNMP GET requests until the sockets are closed."""
+  while True:
+    try:
+      for agent_socket in agent_sockets:
+        while True:
+          try:
+            data, address = agent_socket.recvfrom(2048)
+          except BlockingIOError:
+            break
+          request = snmp_utils.decode_message(data)
+          agent_socket.sendto(
+              snmp_utils.encode_message(
+                  request.community, snmp_utils.GET_RESPONSE,
+                  request.request_id,
+                  [(oid, b"Fake host") for oid, _ in request.varbinds]),
+              address)
+    except OSError:  # Closed.
+      return
+    time.sleep(0.001)
+
+
+def _time_probes(
+    name: str,
+    probe: Callable[..., dict[str, network_probe.ProbeResult]],
+    ip_addresses: Sequence[str],
+    **kwargs) -> None:
+  """Probes the addresses one at a time and at once and prints the times."""
+  for concurrency in (1, network_probe.DEFAULT_MAX_CONCURRENCY):
+    measurement = benchmark_utils.measure(
+        lambda concurrency=concurrency: probe(
+            ip_addresses, max_concurrency=concurrency, **kwargs))
+    counts = collections.Counter(
+        result.value for result in measurement.result.values())
+    print(f"{name}, max_concurrency={concurrency}: {len(ip_addresses)} "
+          f"addresses in {measurement.elapsed:.2f} s ({dict(counts)})")
+
+
+def main() -> None:
+  host_ips = [_get_host_ip(i) for i in range(_HOSTS.value)]
+  unreachable_ips = [f"198.51.100.{i + 1}" for i in range(_UNREACHABLE.value)]
+  sockets = []
+  try:
+    for ip in host_ips[:_SSH_HOSTS.value]:
+      ssh_socket = socket.socket()
+      sockets.append(ssh_socket)
+      ssh_socket.bind((ip, _FAKE_SSH_PORT))
+      ssh_socket.listen()
+    snmp_sockets = []
+    for ip in host_ips[:_SNMP_HOSTS.value]:
+      snmp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+      sockets.append(snmp_socket)
+      snmp_socket.bind((ip, _FAKE_SNMP_PORT))
+      snmp_socket.setblocking(False)
+      snmp_sockets.append(snmp_socket)
+    threading.Thread(
+        target=_run_snmp_agents, args=(snmp_sockets,), daemon=True).start()
+
+    _time_probes("ssh", network_probe.probe_ssh,
+                 host_ips + unreachable_ips, port=_FAKE_SSH_PORT)
+    # Only probe the SNMP agents: each pingable host without an agent costs a
+    # full SNMP timeout when probed one at a time.
+    _time_probes("snmp", network_probe.probe_snmp,
+                 host_ips[:_SNMP_HOSTS.value] + unreachable_ips,
+                 port=_FAKE_SNMP_PORT)
+  finally:
+    for open_socket in sockets:
+      open_socket.close()
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,141 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares host_utils.ssh_command latency with and without connection pooling.
+
+Starts a local OpenSSH server as a stand-in for a device, runs a short command
+over SSH repeatedly with a new connection per command and then with the SSH
+connection pool, and prints the per-command latency of both.
+
+To benchmark against an SSH server which is already running (such as a
+device), pass --port, --user and --key_file.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.ssh_connection_pool_benchmark \
+      --commands=50
+"""
+import contextlib
+import getpass
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Iterator, Optional, Sequence
+
+from absl import app
+from absl import flags
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.utility import host_utils
+
+_COMMANDS = flags.DEFINE_integer(
+    "commands", 50, "Number of SSH commands to run per configuration.")
+_ADDRESS = flags.DEFINE_string("address", "127.0.0.1", "SSH server address.")
+_PORT = flags.DEFINE_integer(
+    "port", None, "Port of a running SSH server. Starts a local sshd if unset.")
+_USER = flags.DEFINE_string("user", None, "User to log in as.")
+_KEY_FILE = flags.DEFINE_string("key_file", None, "Private key to log in with.")
+_SSHD_PATH = flags.DEFINE_string(
+    "sshd_path", None, "Path to the sshd binary. Looked up if unset.")
+
+_SSHD_CONFIG = """\
+ListenAddress 127.0.0.1
+Port {port}
+HostKey {host_key}
+AuthorizedKeysFile {authorized_keys}
+PidFile {directory}/sshd.pid
+StrictModes no
+UsePAM no
+PasswordAuthentication no
+"""
+_SSHD_START_TIMEOUT_S = 10
+
+
+def _get_free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def _run_sshd(directory: str) -> Iterator[tuple[int, str]]:
+  """Runs a local sshd and yields its (port, client key path)."""
+  sshd_path = (_SSHD_PATH.value or shutil.which("sshd") or
+               shutil.which("sshd", path="/usr/sbin:/usr/local/sbin"))
+  if not sshd_path:
+    raise app.UsageError(
+        "sshd not found. Pass --sshd_path or --port of a running SSH server.")
+  host_key = os.path.join(directory, "host_key")
+  client_key = os.path.join(directory, "client_key")
+  for key in (host_key, client_key):
+    subprocess.run(["ssh-keygen", "-q", "-t", "ed25519", "-N", "", "-f", key],
+                   check=True)
+  port = _get_free_port()
+  config_path = os.path.join(directory, "sshd_config")
+  with open(config_path, "w") as config_file:
+    config_file.write(_SSHD_CONFIG.format(
+        port=port, host_key=host_key, authorized_keys=client_key + ".pub",
+        directory=directory))
+  with subprocess.Popen([sshd_path, "-D", "-e", "-f", config_path],
+                        stderr=subprocess.DEVNULL) as process:
+    try:
+      deadline = time.time() + _SSHD_START_TIMEOUT_S
+      while time.time() < deadline:
+        with contextlib.suppress(OSError):
+          socket.create_connection(("127.0.0.1", port), timeout=1).close()
+          break
+        time.sleep(0.1)
+      yield port, client_key
+    finally:
+      process.terminate()
+
+
+def _time_commands(name: str, options: Sequence[str], user: str) -> None:
+  """Runs the SSH commands and prints their latencies."""
+  measurement = benchmark_utils.measure(
+      lambda: host_utils.ssh_command(
+          _ADDRESS.value, ["true"], user=user, options=options),
+      runs=_COMMANDS.value)
+  print(f"  {name:<24} mean {measurement.mean * 1000:7.1f} ms, "
+        f"median {measurement.median * 1000:7.1f} ms")
+
+
+def _benchmark(port: int, user: str, key_file: Optional[str]) -> None:
+  options = [*host_utils.DEFAULT_SSH_OPTIONS, "-p", str(port),
+             "-o", "UserKnownHostsFile=/dev/null", "-o", "LogLevel=ERROR"]
+  if key_file:
+    options += ["-i", key_file]
+  print(f"Running {_COMMANDS.value} SSH commands to "
+        f"{user}@{_ADDRESS.value}:{port}:")
+  _time_commands("new connection each", options, user)
+  host_utils.enable_ssh_connection_pool()
+  try:
+    _time_commands("connection pool", options, user)
+  finally:
+    host_utils.close_ssh_connection_pool()
+
+
+def main() -> None:
+  user = _USER.value or getpass.getuser()
+  if _PORT.value:
+    _benchmark(_PORT.value, user, _KEY_FILE.value)
+    return
+  with tempfile.TemporaryDirectory() as directory:
+    with _run_sshd(directory) as (port, client_key):
+      _benchmark(port, user, client_key)
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
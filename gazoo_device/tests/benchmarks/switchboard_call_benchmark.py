@@ -0,0 +1,126 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares transport call latency through the command queue and the call pipe.
+
+Starts a transport process for a fake transport and calls a transport method
+repeatedly, once by sending the call through the command queue and waiting for
+the result on a result queue (as Switchboard.call used to) and once with
+TransportProcess.call(). Calls through the call pipe are also timed for an idle
+transport with a file descriptor, which the transport process waits on together
+with the call pipe. Prints the p50 and p99 call latency and the call throughput
+of each, with one and several calling threads.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.switchboard_call_benchmark \
+      --calls=2000 --threads=8
+"""
+import os
+import tempfile
+import threading
+from typing import Any, Callable
+
+from absl import flags
+from gazoo_device.switchboard import transport_process
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.tests.unit_tests.utils import fake_transport
+from gazoo_device.utility import multiprocessing_utils
+
+_CALLS = flags.DEFINE_integer(
+    "calls", 1000, "Number of transport calls per configuration.")
+_THREADS = flags.DEFINE_integer(
+    "threads", 8, "Number of calling threads of the concurrent configuration.")
+
+_CMD_TRANSPORT_CALL = "TRANSPORT_CALL"
+
+
+class _CommandQueueTransportProcess(transport_process.TransportProcess):
+  """Transport process which also executes calls sent as commands."""
+
+  def __init__(self, *args, call_result_queue, **kwargs):
+    super().__init__(*args, **kwargs)
+    self._valid_commands += (_CMD_TRANSPORT_CALL,)
+    self._call_result_queue = call_result_queue
+
+  def _process_command_message(self, command_message):
+    command, data = command_message
+    if command == _CMD_TRANSPORT_CALL:
+      self._call_result_queue.put(self._transport_call(*data))
+    else:
+      super()._process_command_message(command_message)
+
+
+class _IdleFdFakeTransport(fake_transport.FakeTransport):
+  """Fake transport with a file descriptor which never becomes readable."""
+
+  def __init__(self):
+    super().__init__()
+    self._idle_read_fd = None
+    self._idle_write_fd = None
+
+  def fileno(self):
+    # Created on first use in the transport process: fds aren't inherited.
+    if self._idle_read_fd is None:
+      self._idle_read_fd, self._idle_write_fd = os.pipe()
+    return self._idle_read_fd
+
+
+def _time_calls(call: Callable[[], Any], threads: int) -> None:
+  """Makes the calls from the threads and prints latency and throughput."""
+  measurement = benchmark_utils.measure(
+      call, runs=_CALLS.value, threads=threads)
+  print(f"    p50 {measurement.percentile(50) * 1000:7.2f} ms, "
+        f"p99 {measurement.percentile(99) * 1000:7.2f} ms, "
+        f"{measurement.rate:8.0f} calls/s")
+
+
+def main() -> None:
+  context = multiprocessing_utils.get_context()
+  with tempfile.TemporaryDirectory() as log_directory:
+    for transport_name, transport in (
+        ("transport without fd", fake_transport.FakeTransport()),
+        ("transport with fd", _IdleFdFakeTransport())):
+      call_result_queue = context.Queue()
+      process = _CommandQueueTransportProcess(
+          "benchmark", context.Queue(), context.Queue(), context.Queue(),
+          os.path.join(log_directory, "benchmark.txt"),
+          transport,
+          call_result_queue=call_result_queue)
+      process.start()
+      try:
+        # Results are not tagged: only one call can be in flight at a time.
+        queue_lock = threading.Lock()
+
+        def call_through_command_queue(process=process,
+                                       call_result_queue=call_result_queue,
+                                       queue_lock=queue_lock):
+          with queue_lock:
+            process.send_command(_CMD_TRANSPORT_CALL, ("test_method", (), {}))
+            return call_result_queue.get()
+
+        def call_through_pipe(process=process):
+          return process.call("test_method", (), {})
+
+        for name, call in (("command queue", call_through_command_queue),
+                           ("call pipe", call_through_pipe)):
+          print(f"{transport_name}, {name}:")
+          for threads in (1, _THREADS.value):
+            print(f"  {threads} thread(s):", end="")
+            _time_calls(call, threads)
+      finally:
+        process.stop()
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,88 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Times encoding and decoding of Matter TLV data with tlv_utils.
+
+Uses two payloads:
+  - attribute reports: a structure of BasicInformation attribute reports like
+    the ones returned by Matter endpoints over PwRPC;
+  - OTA metadata: a structure with a large byte string.
+Each payload is encoded with TLVWriter.put() and decoded with
+TLVReader.get() (values and decodings), TLVReader.getValues() (values only)
+and TLVStreamReader fed --chunk_size bytes at a time, --iterations times each.
+Prints the operations and megabytes per second.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.tlv_codec_benchmark \
+      --iterations=2000 --chunk_size=64
+"""
+from typing import Any, Callable
+
+from absl import flags
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.utility import tlv_utils
+
+_ITERATIONS = flags.DEFINE_integer(
+    "iterations", 2000, "Number of times to encode or decode each payload.")
+_CHUNK_SIZE = flags.DEFINE_integer(
+    "chunk_size", 64, "Number of bytes fed to the stream reader at a time.")
+
+_ATTRIBUTE_REPORT = {
+    1: [{1: {0: tlv_utils.uint(374710975),
+             1: [0, 40, attribute_id],
+             2: "Nordic Semiconductor ASA"}}
+        for attribute_id in range(20)],
+}
+_OTA_METADATA = {
+    0: tlv_utils.uint(0xFFF1),
+    1: "https://example.com/ota/firmware.ota",
+    2: bytes(range(256)) * 64,
+}
+
+
+def _encode(value: Any) -> bytes:
+  writer = tlv_utils.TLVWriter()
+  writer.put(None, value)
+  return bytes(writer.encoding)
+
+
+def _stream(data: bytes) -> None:
+  reader = tlv_utils.TLVStreamReader()
+  for start in range(0, len(data), _CHUNK_SIZE.value):
+    reader.feed(data[start:start + _CHUNK_SIZE.value])
+
+
+def _time(name: str, size: int, operation: Callable[[], Any]) -> None:
+  """Runs the operation _ITERATIONS times and prints the statistics."""
+  measurement = benchmark_utils.measure(operation, runs=_ITERATIONS.value)
+  print(f"  {name}: {measurement.rate:.0f} ops/s, "
+        f"{measurement.rate * size / 1e6:.1f} MB/s")
+
+
+def main() -> None:
+  for name, value in (("Attribute reports", _ATTRIBUTE_REPORT),
+                      ("OTA metadata", _OTA_METADATA)):
+    data = _encode(value)
+    print(f"{name} ({len(data)} bytes):")
+    _time("TLVWriter.put()", len(data), lambda value=value: _encode(value))
+    _time("TLVReader.get()", len(data),
+          lambda data=data: tlv_utils.TLVReader(data).get())
+    _time("TLVReader.getValues()", len(data),
+          lambda data=data: tlv_utils.TLVReader(data).getValues())
+    _time(f"TLVStreamReader.feed() by {_CHUNK_SIZE.value} bytes", len(data),
+          lambda data=data: _stream(data))
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
@@ -0,0 +1,106 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares usb_utils lookups with and without the USB inventory.
+
+Replaces the udev device list with a synthetic tree of USB serial devices and
+their block devices, then looks up the usb information of every device the
+way detection does (device info, serial number, product name and usb hub
+info). Prints the time per lookup with and without
+usb_utils.enable_usb_inventory(). The synthetic tree doesn't include the cost
+of enumerating real udev devices, which makes lookups without the inventory
+slower still.
+
+Usage:
+  python3 -m gazoo_device.tests.benchmarks.usb_inventory_benchmark \
+      --devices=200
+"""
+from typing import Any, Optional, Sequence
+from unittest import mock
+
+from absl import flags
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.utility import usb_info_linux
+from gazoo_device.utility import usb_utils
+
+_DEVICES = flags.DEFINE_integer(
+    "devices", 200, "Number of USB serial devices in the synthetic udev tree.")
+
+
+class _FakeUdevDevice:
+  """Stands in for a pyudev.Device."""
+
+  def __init__(self, properties: dict[str, str]):
+    self.properties = properties
+
+
+def _create_udev_tree(devices: int) -> dict[Optional[str], list[Any]]:
+  """Returns synthetic udev devices by subsystem (None for all devices)."""
+  usb_devices = []
+  block_devices = []
+  for i in range(devices):
+    serial = f"SERIAL{i:04d}"
+    usb_devices.append(_FakeUdevDevice({
+        "ID_BUS": "usb",
+        "DEVLINKS": (f"/dev/serial/by-id/usb-FTDI_Device_{serial}-if00-port0 "
+                     f"/dev/serial/by-path/pci-0000:00:14.0-usb-0:{i}:1.0"),
+        "DEVPATH": f"/devices/pci0000:00/0000:00:14.0/usb1/1-{i}/1-{i}:1.0",
+        "ID_MODEL_ID": "6015",
+        "ID_VENDOR_ID": "0403",
+        "ID_USB_INTERFACE_NUM": "00",
+        "ID_VENDOR": "FTDI",
+        "ID_SERIAL_SHORT": serial,
+        "ID_MODEL": "Device",
+    }))
+    block_devices.append(_FakeUdevDevice({
+        "ID_SERIAL_SHORT": serial,
+        "DEVNAME": f"/dev/sd{i}",
+    }))
+  return {None: usb_devices + block_devices, "block": block_devices}
+
+
+def _time_lookups(name: str, addresses: Sequence[str]) -> None:
+  """Looks up every address and prints the time per lookup."""
+
+  def look_up_all():
+    for address in addresses:
+      usb_utils.get_device_info(address)
+      usb_utils.get_serial_number_from_path(address)
+      usb_utils.get_product_name_from_path(address)
+      usb_utils.get_usb_hub_info(address)  # 2 lookups.
+
+  lookups = len(addresses) * 5
+  elapsed = benchmark_utils.measure(look_up_all).elapsed
+  print(f"{name}: {lookups} lookups in {elapsed:.3f} s "
+        f"({elapsed / lookups * 1e6:.1f} us per lookup)")
+
+
+def main() -> None:
+  udev_tree = _create_udev_tree(_DEVICES.value)
+  with mock.patch.object(
+      usb_info_linux, "get_pyudev_list_of_devices",
+      side_effect=lambda subsystem=None, devtype=None: udev_tree[subsystem]):
+    addresses = list(usb_info_linux.get_address_to_usb_info_dict())
+    print(f"synthetic udev tree: {len(addresses)} USB serial devices")
+    _time_lookups("without inventory", addresses)
+    if not usb_utils.enable_usb_inventory():
+      return
+    try:
+      _time_lookups("with inventory", addresses)
+    finally:
+      usb_utils.close_usb_inventory()
+
+
+if __name__ == "__main__":
+  benchmark_utils.run(main)
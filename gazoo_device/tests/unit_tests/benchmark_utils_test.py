@@ -0,0 +1,64 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for tests/benchmarks/benchmark_utils.py."""
+import itertools
+import threading
+
+from gazoo_device.tests.benchmarks import benchmark_utils
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+
+
+class BenchmarkUtilsTests(unit_test_case.UnitTestCase):
+  """Unit tests for benchmark_utils.py."""
+
+  def test_measure(self):
+    """Tests measuring an operation run several times."""
+    counter = itertools.count()
+    measurement = benchmark_utils.measure(lambda: next(counter), runs=5)
+    self.assertEqual(measurement.runs, 5)
+    self.assertEqual(measurement.result, 4)
+    self.assertGreaterEqual(measurement.elapsed, sum(measurement.latencies))
+    self.assertGreater(measurement.rate, 0)
+    self.assertLessEqual(measurement.percentile(50),
+                         max(measurement.latencies))
+
+  def test_measure_with_threads(self):
+    """Tests measuring an operation run from several threads."""
+    thread_ids = set()
+
+    def operation():
+      thread_ids.add(threading.get_ident())
+
+    measurement = benchmark_utils.measure(operation, runs=20, threads=4)
+    self.assertEqual(measurement.runs, 20)
+    self.assertNotIn(threading.get_ident(), thread_ids)
+
+  def test_percentile_of_single_run(self):
+    """Tests the percentiles of a single run are its duration."""
+    measurement = benchmark_utils.Measurement(
+        latencies=[0.5], elapsed=0.5, result=None)
+    self.assertEqual(measurement.percentile(99), 0.5)
+    self.assertEqual(measurement.median, 0.5)
+
+  def test_check_same_results(self):
+    """Tests comparing the results of several implementations."""
+    benchmark_utils.check_same_results("Implementations", [[1], [1], [1]])
+    with self.assertRaisesRegex(RuntimeError,
+                                "Implementations returned different results"):
+      benchmark_utils.check_same_results("Implementations", [[1], [2]])
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -21,6 +21,7 @@ from gazoo_device import errors
 from gazoo_device import package_registrar
 from gazoo_device.auxiliary_devices import cambrionix
 from gazoo_device.tests.unit_tests.utils import cambrionix_logs
+from gazoo_device.tests.unit_tests.utils import fake_cambrionix_console
 from gazoo_device.tests.unit_tests.utils import fake_device_test_case
 import immutabledict
 import serial
@@ -267,6 +268,73 @@ class CambrionixTest(fake_device_test_case.FakeDeviceTestCase):
     """Verify switch_power capability is supported by Cambrionix."""
     self.assertIn("switch_power", self.uut.get_supported_capabilities())
 
+  def test_300_session_reused_across_commands(self):
+    """Verify commands share one session and system status is cached."""
+    console = self._use_fake_console()
+    self.assertEqual(self.uut.firmware_version, "1.68")
+    self.assertEqual(self.uut._get_system_hardware(), "PP15S")
+    session = self.uut._session
+    self.uut.switch_power.get_mode(2)
+    self.assertIs(self.uut._session, session)
+    self.assertEqual(console.commands, ["system", "state 2"])
+
+  def test_301_system_status_cache_invalidated(self):
+    """Verify commands changing the hub state clear the cached status."""
+    console = self._use_fake_console()
+    self.uut._get_system_status()
+    self.uut.switch_power.get_mode(1)
+    self.uut._get_system_status()
+    self.uut.switch_power.power_off(1)
+    self.uut._get_system_status()
+    self.assertEqual(console.commands,
+                     ["system", "state 1", "mode off 1", "system"])
+
+  def test_302_set_modes_one_session(self):
+    """Verify set_modes() sends all commands over the session."""
+    console = self._use_fake_console()
+    self.uut.switch_power.set_modes({1: "off", 2: "charge"})
+    self.assertEqual(console.modes[1], "off")
+    self.assertEqual(console.modes[2], "charge")
+    self.assertEqual(self.uut.switch_power.get_all_ports_mode()[:3],
+                     ["off", "charge", "sync"])
+
+  def test_303_idle_session_closed(self):
+    """Verify the serial port is closed once the session is idle."""
+    console = self._use_fake_console()
+    self.uut._timeouts["SESSION_IDLE"] = 0.01
+    self.uut._command("cef")
+    self.uut._session_idle_timer.join()
+    self.assertIsNone(self.uut._session)
+    self.assertIsNone(self.uut._session_idle_timer)
+    self.assertFalse(console.serial_port.is_open)
+    self.uut._command("crf")
+    self.assertTrue(console.serial_port.is_open)
+    self.assertEqual(console.commands, ["cef", "crf"])
+
+  def test_304_one_idle_timer_per_session(self):
+    """Verify commands move the idle deadline instead of adding timers."""
+    self._use_fake_console()
+    self.uut._command("cef")
+    timer = self.uut._session_idle_timer
+    deadline = self.uut._session_idle_deadline
+    self.uut._command("crf")
+    self.assertIs(self.uut._session_idle_timer, timer)
+    self.assertGreaterEqual(self.uut._session_idle_deadline, deadline)
+
+  def test_305_error_response(self):
+    """Verify an error response raises an error but keeps the session."""
+    self._use_fake_console()
+    with self.assertRaisesRegex(errors.DeviceError, "Unknown command"):
+      self.uut._command("dude")
+    self.assertIsNotNone(self.uut._session)
+
+  def _use_fake_console(self) -> fake_cambrionix_console.FakeCambrionixConsole:
+    """Connects the hub to a fake console."""
+    console = fake_cambrionix_console.FakeCambrionixConsole()
+    self.addCleanup(console.close)
+    self.addCleanup(self.uut._close)
+    self.uut._serial_port = console.serial_port
+    return console
 
 if __name__ == "__main__":
   fake_device_test_case.main()
@@ -319,5 +319,171 @@ class DevicePowerDefaultTests(unit_test_case.UnitTestCase):
     self.assertEqual(self.uut.port_number, 0)
 
 
+class CycleDevicesTests(unit_test_case.UnitTestCase):
+  """Unit tests for device_power_default.cycle_devices()."""
+
+  def setUp(self):
+    super().setUp()
+    self.add_time_mocks()
+    self.mock_manager = mock.MagicMock(spec=manager.Manager)
+    self.mock_hubs = {}
+    self.mock_manager.create_device.side_effect = self._get_mock_hub
+    self.mock_switchboards = {}
+    self.wait_until_connected_fns = {}
+    self.wait_for_bootup_complete_fns = {}
+
+  def _get_mock_hub(self, hub_name):
+    if hub_name not in self.mock_hubs:
+      self.mock_hubs[hub_name] = mock.MagicMock(spec=cambrionix.Cambrionix)
+    return self.mock_hubs[hub_name]
+
+  def _create_device_powers(self, hub_ports, change_triggers_reboot=False):
+    """Returns device_power capabilities of devices on the hub ports."""
+    device_powers = {}
+    for hub_name, port in hub_ports:
+      name = f"device-{hub_name}-{port}"
+      self.mock_switchboards[name] = mock.MagicMock(
+          spec=switchboard.SwitchboardDefault,
+          health_checked=True,
+          healthy=True)
+      self.wait_until_connected_fns[name] = mock.MagicMock()
+      self.wait_for_bootup_complete_fns[name] = mock.MagicMock()
+      device_powers[name] = device_power_default.DevicePowerDefault(
+          device_name=name,
+          get_manager=lambda: self.mock_manager,
+          default_hub_type="cambrionix",
+          props={
+              "persistent_identifiers": {"name": name},
+              "optional": {
+                  "device_usb_hub_name": hub_name,
+                  "device_usb_port": port,
+              },
+          },
+          usb_ports_discovered=False,
+          wait_until_connected_fn=self.wait_until_connected_fns[name],
+          wait_for_bootup_complete_fn=self.wait_for_bootup_complete_fns[name],
+          get_switchboard_if_initialized=(
+              lambda name=name: self.mock_switchboards[name]),
+          change_triggers_reboot=change_triggers_reboot)
+    return device_powers
+
+  def test_cycle_devices_switches_each_hub_once(self):
+    """Verifies the ports of each hub are switched with one call per hub."""
+    device_powers = self._create_device_powers(
+        [("hub-a", 3), ("hub-a", 1), ("hub-b", 5), ("hub-a", 2)])
+
+    timings = device_power_default.cycle_devices(device_powers, off_time=3)
+
+    self.assertCountEqual(timings, device_powers)
+    self.assertEqual(timings["device-hub-a-3"].hub_name, "hub-a")
+    self.assertEqual(timings["device-hub-a-3"].port, 3)
+    hub_a = self.mock_hubs["hub-a"].switch_power
+    hub_a.power_off_ports.assert_called_once_with([1, 2, 3])
+    hub_a.power_on_ports.assert_called_once_with([1, 2, 3])
+    hub_a.power_off.assert_not_called()
+    hub_a.power_on.assert_not_called()
+    hub_b = self.mock_hubs["hub-b"].switch_power
+    hub_b.power_off_ports.assert_called_once_with([5])
+    hub_b.power_on_ports.assert_called_once_with([5])
+    self.mock_sleep.assert_called_once_with(3)
+    for name in device_powers:
+      self.mock_switchboards[name].close_all_transports.assert_called_once()
+      self.mock_switchboards[name].open_all_transports.assert_called_once()
+      self.wait_until_connected_fns[name].assert_called_once()
+      self.wait_for_bootup_complete_fns[name].assert_called_once()
+
+  def test_cycle_devices_stagger(self):
+    """Verifies staggered power ons are delayed one after the other."""
+    device_powers = self._create_device_powers(
+        [("hub-a", 1), ("hub-a", 2), ("hub-a", 3)])
+
+    timings = device_power_default.cycle_devices(
+        device_powers, off_time=0, stagger=5)
+
+    hub_a = self.mock_hubs["hub-a"].switch_power
+    hub_a.power_on_ports.assert_not_called()
+    self.assertEqual(hub_a.power_on.call_args_list,
+                     [mock.call(1), mock.call(2), mock.call(3)])
+    self.assertEqual(
+        [round(timings[f"device-hub-a-{port}"].stagger_s)
+         for port in (1, 2, 3)],
+        [0, 5, 10])
+
+  def test_cycle_devices_no_wait(self):
+    """Verifies no_wait skips waiting for the devices and their transports."""
+    device_powers = self._create_device_powers([("hub-a", 1)])
+
+    device_power_default.cycle_devices(device_powers, no_wait=True)
+
+    self.mock_hubs["hub-a"].switch_power.power_on_ports.assert_called_once()
+    mock_switchboard = self.mock_switchboards["device-hub-a-1"]
+    mock_switchboard.open_all_transports.assert_not_called()
+    self.wait_until_connected_fns["device-hub-a-1"].assert_not_called()
+    self.wait_for_bootup_complete_fns["device-hub-a-1"].assert_not_called()
+
+  def test_cycle_devices_change_triggers_reboot(self):
+    """Verifies transports stay open if power changes trigger reboots."""
+    device_powers = self._create_device_powers(
+        [("hub-a", 1)], change_triggers_reboot=True)
+
+    device_power_default.cycle_devices(device_powers)
+
+    mock_switchboard = self.mock_switchboards["device-hub-a-1"]
+    # Once before powering off and once before powering on.
+    self.assertEqual(mock_switchboard.add_log_note.call_count, 2)
+    mock_switchboard.close_all_transports.assert_not_called()
+    mock_switchboard.open_all_transports.assert_not_called()
+    # Once after powering off and once after powering on.
+    self.assertEqual(
+        self.wait_for_bootup_complete_fns["device-hub-a-1"].call_count, 2)
+
+  def test_cycle_devices_port_already_off(self):
+    """Verifies ports which are already off are only powered on."""
+    device_powers = self._create_device_powers([("hub-a", 1), ("hub-a", 2)])
+    self._get_mock_hub("hub-a").switch_power.get_mode.side_effect = (
+        lambda port: "off" if port == 2 else "sync")
+
+    device_power_default.cycle_devices(device_powers)
+
+    hub_a = self.mock_hubs["hub-a"].switch_power
+    hub_a.power_off_ports.assert_called_once_with([1])
+    hub_a.power_on_ports.assert_called_once_with([1, 2])
+    mock_switchboard = self.mock_switchboards["device-hub-a-2"]
+    mock_switchboard.close_all_transports.assert_not_called()
+    mock_switchboard.open_all_transports.assert_called_once()
+    self.wait_until_connected_fns["device-hub-a-2"].assert_called_once()
+
+  def test_cycle_devices_hub_failure(self):
+    """Verifies a failing hub does not stop the power cycle of other hubs."""
+    device_powers = self._create_device_powers([("hub-a", 1), ("hub-b", 1)])
+    self._get_mock_hub("hub-b").switch_power.power_off_ports.side_effect = (
+        errors.DeviceError("hub-b is unreachable"))
+
+    with self.assertRaisesRegex(
+        errors.DeviceError,
+        "Failed to power cycle 1 of 2 devices: "
+        "device-hub-b-1: .*unreachable"):
+      device_power_default.cycle_devices(device_powers)
+
+    # Power is restored even though powering off failed.
+    hub_b = self.mock_hubs["hub-b"].switch_power
+    hub_b.power_on_ports.assert_called_once_with([1])
+    self.wait_until_connected_fns["device-hub-b-1"].assert_not_called()
+    self.wait_until_connected_fns["device-hub-a-1"].assert_called_once()
+
+  def test_cycle_devices_health_check_failure(self):
+    """Verifies devices which fail the health check are not power cycled."""
+    device_powers = self._create_device_powers([("hub-a", 1), ("hub-a", 2)])
+    device_powers["device-hub-a-2"]._props["optional"]["device_usb_port"] = (
+        None)
+
+    with self.assertRaisesRegex(errors.DeviceError,
+                                "device-hub-a-2: .*device_usb_port are unset"):
+      device_power_default.cycle_devices(device_powers)
+
+    hub_a = self.mock_hubs["hub-a"].switch_power
+    hub_a.power_off_ports.assert_called_once_with([1])
+
+
 if __name__ == "__main__":
   unit_test_case.main()
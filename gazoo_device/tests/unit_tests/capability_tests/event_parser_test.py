@@ -17,6 +17,7 @@
 import datetime
 import json
 import os
+import re
 import shutil
 from unittest import mock
 
@@ -28,6 +29,8 @@ from gazoo_device.tests.unit_tests.utils import unit_test_case
 
 MockOutSubprocess = unit_test_case.MockOutSubprocess
 TIMESTAMP_INFO = "<2018-02-02 12:00:01.123456>"
+_REPOSITORY_DIRECTORY = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
 _TIMESTAMP_0 = "<2018-02-02 12:00:00.123456>"
 _TIMESTAMP_5 = "<2018-02-02 12:00:05.123456>"
 _TIMESTAMP_10 = "<2018-02-02 12:00:10.123456>"
@@ -1028,6 +1031,274 @@ class EventParserTests(unit_test_case.SwitchboardParserTestCase):
     )
     self.assertLen(filtered_events.results_list, 4)
 
+  def test_1000_indexed_parser_matches_subprocess_parser(self):
+    """Verifies indexed event queries return the same events as subprocesses."""
+    self._populate_event_file(20)
+    indexed_uut = self._create_indexed_parser()
+    queries = (
+        ("get_last_event", (["sample.state"],), {}),
+        ("get_last_event", (None,), {}),
+        ("get_event_history", (["sample.state"],), {}),
+        ("get_event_history", (["sample.state", "sample.message3"],), {}),
+        ("get_event_history", (None,), {}),
+        ("get_event_history", (["sample.message"], 5), {}),
+        ("get_event_history", (None, 7), {}),
+        ("get_event_history_count", ("sample.message",), {}),
+    )
+    for method_name, args, kwargs in queries:
+      with self.subTest(method=method_name, args=args):
+        expected = getattr(self.uut, method_name)(*args, **kwargs)
+        with MockOutSubprocess() as subprocess_mocks:
+          actual = getattr(indexed_uut, method_name)(*args, **kwargs)
+        subprocess_mocks.mock_popen.assert_not_called()
+        subprocess_mocks.mock_check_output.assert_not_called()
+        self.assertFalse(actual.timedout)
+        self.assertEqual(actual.count, expected.count)
+        self.assertEqual(actual.results_list, expected.results_list)
+
+  def test_1001_indexed_parser_indexes_appended_events(self):
+    """Verifies the event index picks up events appended after a query."""
+    indexed_uut = self._create_indexed_parser()
+    with open(self.event_file_path, "w") as event_file:
+      indexed_uut.process_line(
+          event_file, self._STATE_LINE.format(_TIMESTAMP_0, 0))
+      self.assertEqual(
+          indexed_uut.get_event_history_count("sample.state").count, 1)
+      # A partially written event must not be indexed.
+      event_file.write('{"sample.state": ["1"]')
+      event_file.flush()
+      self.assertEqual(
+          indexed_uut.get_event_history_count("sample.state").count, 1)
+      event_file.write(', "raw_log_line": "[APPL] Some other message with '
+                       'group data 1", "system_timestamp": '
+                       '"2018-02-02 12:00:05.123456"}\n')
+      indexed_uut.process_line(
+          event_file, self._STATE_LINE.format(_TIMESTAMP_10, 2))
+
+    result = indexed_uut.get_event_history(["sample.state"])
+    self.assertEqual(
+        [event["sample.state"] for event in result.results_list],
+        [["2"], ["1"], ["0"]])
+    result = indexed_uut.get_event_history(
+        ["sample.state"], start_time=_DATETIME_5)
+    self.assertEqual(
+        [event["system_timestamp"] for event in result.results_list],
+        [_DATETIME_10, _DATETIME_5])
+    self.assertEqual(
+        indexed_uut.get_last_event_state("sample.state"), "2")
+
+  def test_1002_indexed_parser_reindexes_truncated_event_file(self):
+    """Verifies the event index is rebuilt when the event file is truncated."""
+    indexed_uut = self._create_indexed_parser()
+    self._populate_event_file(3)
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, 3)
+    with open(self.event_file_path, "w") as event_file:
+      indexed_uut.process_line(
+          event_file, self._STATE_LINE.format(_TIMESTAMP_0, 5))
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, 1)
+    self.assertEqual(
+        indexed_uut.get_last_event_state("sample.state"), "5")
+
+  def test_1003_indexed_parser_event_file_not_exists(self):
+    """Verifies indexed queries time out if the event file does not exist."""
+    indexed_uut = self._create_indexed_parser()
+    indexed_uut.event_file_path = "some_bogus_file"
+    parser_result = indexed_uut.get_last_event(["sample.message"])
+    self.assertTrue(parser_result.timedout)
+    self.assertFalse(parser_result.results_list)
+    parser_result = indexed_uut.get_event_history(["sample.message"])
+    self.assertTrue(parser_result.timedout)
+    self.assertFalse(parser_result.results_list)
+
+  def test_1004_indexed_parser_reindexes_rewritten_event_file(self):
+    """Verifies the event index is rebuilt when the event file is regrown."""
+    indexed_uut = self._create_indexed_parser()
+    self._populate_event_file(3)
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, 3)
+    old_size = os.path.getsize(self.event_file_path)
+    # Truncate the event file and grow it past its old size between queries.
+    with open(self.event_file_path, "w") as event_file:
+      state = 0
+      while event_file.tell() <= old_size:
+        state += 1
+        indexed_uut.process_line(
+            event_file, self._STATE_LINE.format(_TIMESTAMP_5, state))
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, state)
+    self.assertEqual(
+        indexed_uut.get_last_event_state("sample.state"), str(state))
+
+  def test_1005_indexed_parser_drops_index_of_previous_event_file(self):
+    """Verifies the index is replaced when the event file path changes."""
+    indexed_uut = self._create_indexed_parser()
+    self._populate_event_file(3)
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, 3)
+    old_index = indexed_uut._event_file_index
+    new_event_file_path = self.event_file_path + ".00001"
+    self.addCleanup(os.remove, new_event_file_path)
+    with open(new_event_file_path, "w") as event_file:
+      indexed_uut.process_line(
+          event_file, self._STATE_LINE.format(_TIMESTAMP_10, 7))
+    indexed_uut.event_file_path = new_event_file_path
+    self.assertEqual(
+        indexed_uut.get_event_history_count("sample.state").count, 1)
+    self.assertIsNot(indexed_uut._event_file_index, old_index)
+    self.assertEqual(indexed_uut._event_file_index.event_file_path,
+                     new_event_file_path)
+
+  def test_1006_indexed_parser_compares_aware_timestamps_in_utc(self):
+    """Verifies timezone-aware timestamps are indexed as UTC times."""
+    utc_time = datetime.datetime(
+        2018, 2, 2, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+    local_time = utc_time.astimezone(
+        datetime.timezone(datetime.timedelta(hours=2)))
+    self.assertEqual(
+        event_parser_default._get_microseconds(local_time),
+        event_parser_default._get_microseconds(utc_time))
+    self.assertEqual(
+        event_parser_default._get_timestamp_microseconds(
+            "2018-02-02 12:00:00.123456 +0200"),
+        event_parser_default._get_microseconds(utc_time))
+    self.assertEqual(
+        event_parser_default._get_microseconds(utc_time.replace(tzinfo=None)),
+        event_parser_default._get_microseconds(utc_time))
+
+  def test_1007_indexed_parser_start_time_with_out_of_order_events(self):
+    """Verifies events out of chronological order are filtered by start time."""
+    indexed_uut = self._create_indexed_parser()
+    with open(self.event_file_path, "w") as event_file:
+      for timestamp, state in ((_TIMESTAMP_10, 0), (_TIMESTAMP_0, 1),
+                               (_TIMESTAMP_5, 2)):
+        indexed_uut.process_line(
+            event_file, self._STATE_LINE.format(timestamp, state))
+
+    expected = self.uut.get_event_history(
+        ["sample.state"], start_time=_DATETIME_5)
+    actual = indexed_uut.get_event_history(
+        ["sample.state"], start_time=_DATETIME_5)
+    self.assertEqual(
+        [event["sample.state"] for event in actual.results_list],
+        [["2"], ["0"]])
+    self.assertEqual(actual.results_list, expected.results_list)
+
+  def test_1100_required_literal_of_filter_regex(self):
+    """Verifies required literals are only taken from mandatory literals."""
+    for pattern, expected_literal in (
+        (r"state: (\w+)", "state: "),
+        (r"\[APPL\] Some (.*) message", "[APPL] Some "),
+        (r"x*yz+", "y"),
+        (r"abc|abd", "ab"),
+        (r"(?i)Reboot", ""),
+        (r"a(?i:b)cd", "cd"),
+        (r"(foo|bar)", ""),
+        (r"", ""),
+    ):
+      with self.subTest(pattern=pattern):
+        self.assertEqual(
+            event_parser_default._get_required_literal(re.compile(pattern)),
+            expected_literal)
+
+  def test_1101_required_literal_of_shipped_filters(self):
+    """Verifies required literals of all shipped filters are in their regex."""
+    filter_directories = [
+        self.TEST_FILTER_DIR,
+        os.path.join(_REPOSITORY_DIRECTORY, "examples",
+                     "example_extension_package", "log_event_filters"),
+    ]
+    filter_paths = [
+        os.path.join(directory, file_name)
+        for directory in filter_directories if os.path.isdir(directory)
+        for file_name in sorted(os.listdir(directory))
+        if file_name.endswith(".json")
+    ]
+    filter_count = 0
+    for filter_path in filter_paths:
+      uut = event_parser_default.EventParserDefault(
+          filters=[], event_file_path=self.event_file_path,
+          device_name="device-1234")
+      try:
+        uut.load_filter_file(filter_path)
+      except errors.ParserError:
+        continue  # Invalid filter files used to test filter loading errors.
+      for filter_name, regex in uut._filters_dict.items():
+        with self.subTest(filter_name=filter_name):
+          literal = event_parser_default._get_required_literal(regex)
+          self.assertIsInstance(literal, str)
+          unescaped_pattern = re.sub(r"\\(\W)", r"\1", regex.pattern)
+          self.assertIn(literal, unescaped_pattern)
+          filter_count += 1
+    self.assertGreater(filter_count, 0)
+
+  def test_1102_required_literal_without_regex_parser(self):
+    """Verifies no required literal is used if the regex parser fails."""
+    regex = re.compile(r"state: (\w+)")
+    with mock.patch.object(event_parser_default.sre_parse, "parse",
+                           side_effect=AttributeError("Changed internals")):
+      self.assertEqual(event_parser_default._get_required_literal(regex), "")
+    with mock.patch.object(event_parser_default, "sre_parse", None):
+      self.assertEqual(event_parser_default._get_required_literal(regex), "")
+    matcher = event_parser_default._FilterMatcher({"test.state": regex})
+    with mock.patch.object(event_parser_default.sre_parse, "parse",
+                           side_effect=AttributeError("Changed internals")):
+      matcher = event_parser_default._FilterMatcher({"test.state": regex})
+    self.assertEqual(
+        matcher.get_matches("<2018-02-02 12:00:00.123456> GDM-0: state: on\n"),
+        {"test.state": ("on",)})
+
+  def test_1103_filter_matcher_matches_every_filter_regex(self):
+    """Verifies the filter matcher matches the same filters as each regex."""
+    patterns = {
+        "test.state": r"state: (\w+)",
+        "test.prefix": r"abc|abd",
+        "test.case": r"(?i)reboot",
+        "test.alternation": r"(foo|bar) baz",
+        "test.overlap": r"state",
+        "test.empty": r"",
+    }
+    log_lines = [
+        "<2018-02-02 12:00:00.123456> GDM-0: state: on\n",
+        "<2018-02-02 12:00:00.123456> GDM-0: REBOOT abd\n",
+        "<2018-02-02 12:00:00.123456> GDM-0: bar baz\n",
+        "<2018-02-02 12:00:00.123456> GDM-0: nothing to see\n",
+    ]
+    for filter_names in (list(patterns), ["test.state", "test.prefix"]):
+      filters_dict = {name: re.compile(patterns[name]) for name in filter_names}
+      matcher = event_parser_default._FilterMatcher(filters_dict)
+      for log_line in log_lines:
+        expected_matches = {}
+        for filter_name, regex in filters_dict.items():
+          match = regex.search(log_line)
+          if match:
+            expected_matches[filter_name] = match.groups()
+        with self.subTest(filter_names=filter_names, log_line=log_line):
+          matches = matcher.get_matches(log_line)
+          self.assertEqual(matches, expected_matches)
+          self.assertEqual(list(matches), list(expected_matches))
+
+  def test_1104_filter_matcher_recompiled_after_load_filter_file(self):
+    """Verifies filters loaded after a line was processed are matched."""
+    uut = event_parser_default.EventParserDefault(
+        filters=[],
+        event_file_path=self.event_file_path,
+        device_name="device-1234")
+    log_line = self._STATE_LINE.format(_TIMESTAMP_0, 1)
+    self.assertFalse(uut._generate_event_data_from_raw_log_line(log_line, 29))
+    uut.load_filter_file(self.get_resource("filters/sample.json"))
+    self.assertIn("sample.state",
+                  uut._generate_event_data_from_raw_log_line(log_line, 29))
+
+  def _create_indexed_parser(self):
+    """Returns a parser which uses the event file index for event queries."""
+    return event_parser_default.EventParserDefault(
+        filters=[self.get_resource("filters/sample.json")],
+        event_file_path=self.event_file_path,
+        device_name="device-1234",
+        use_event_index=True)
+
   def _get_event_dictionary(self):
     """Retrieves the event dictionary from the JSON object in the FakeEvent output value."""
     return json.loads(self.fake_file_writer.out)
@@ -80,7 +80,7 @@ class BasicInformationClusterPwRpcTest(
   def test_get_attribute_value(
       self, mock_tlv_value, expected_output, mock_tlv_reader):
     """Verifies _get_attribute_value method on success with TLV data."""
-    mock_tlv_reader.return_value.get.return_value = mock_tlv_value
+    mock_tlv_reader.return_value.getValues.return_value = mock_tlv_value
     mock_data = mock.Mock(tlv_data=0)
     mock_data.HasField.return_value = False
     self.fake_read.return_value = mock_data
@@ -18,6 +18,7 @@ from absl.testing import parameterized
 from gazoo_device.capabilities import matter_endpoints_accessor_pw_rpc
 from gazoo_device.capabilities import matter_enums
 from gazoo_device.capabilities.matter_clusters import thermostat_pw_rpc
+from gazoo_device.protos import attributes_service_pb2
 from gazoo_device.tests.unit_tests.utils import fake_device_test_case
 
 ThermostatCluster = matter_enums.ThermostatCluster
@@ -27,6 +28,17 @@ _FAKE_ENDPOINT_ID = 1
 _FAKE_TEMPERATURE = 2330
 
 
+def _fake_attribute_data(
+    attribute_type: int) -> attributes_service_pb2.AttributeData:
+  """Returns valid data of an attribute of the given type."""
+  if attribute_type == thermostat_pw_rpc.INT16S_ATTRIBUTE_TYPE:
+    return attributes_service_pb2.AttributeData(data_int16=_FAKE_TEMPERATURE)
+  if (attribute_type ==
+      attributes_service_pb2.AttributeType.ZCL_BITMAP8_ATTRIBUTE_TYPE):
+    return attributes_service_pb2.AttributeData(tlv_data=b"\x01")
+  return attributes_service_pb2.AttributeData(data_uint8=1)
+
+
 class ThermostatClusterPwRpcTest(fake_device_test_case.FakeDeviceTestCase):
   """Unit test for ThermostatClusterPwRpc."""
 
@@ -133,6 +145,42 @@ class ThermostatClusterPwRpcTest(fake_device_test_case.FakeDeviceTestCase):
           new_setpoints[ThermostatCluster.ATTRIBUTE_OCCUPIED_COOLING_SETPOINT],
           expected_cooling_setpoint)
 
+  def test_snapshot_reads_attributes_at_once(self):
+    """Tests snapshot reads all attributes with a single read_many call."""
+    fake_read_many = mock.Mock(
+        spec=matter_endpoints_accessor_pw_rpc.MatterEndpointsAccessorPwRpc
+        .read_many)
+    fake_read_many.side_effect = lambda requests: [
+        _fake_attribute_data(attribute_type)
+        for _, _, _, attribute_type in requests]
+    uut = thermostat_pw_rpc.ThermostatClusterPwRpc(
+        device_name=_FAKE_DEVICE_NAME,
+        endpoint_id=_FAKE_ENDPOINT_ID,
+        read=self.fake_read,
+        write=self.fake_write,
+        read_many=fake_read_many)
+
+    snapshot = uut.snapshot()
+
+    fake_read_many.assert_called_once()
+    self.assertLen(fake_read_many.call_args.args[0], len(snapshot))
+    self.fake_read.assert_not_called()
+    self.assertEqual(_FAKE_TEMPERATURE, snapshot["local_temperature"])
+    self.assertEqual(_FAKE_TEMPERATURE, snapshot["occupied_heating_setpoint"])
+    self.assertEqual(b"\x01", snapshot["occupancy"])
+    self.assertEqual(matter_enums.ThermostatSystemMode(1),
+                     snapshot["system_mode"])
+
+  def test_snapshot_without_read_many(self):
+    """Tests snapshot reads the attributes one by one without read_many."""
+    self.fake_read.side_effect = (
+        lambda **kwargs: _fake_attribute_data(kwargs["attribute_type"]))
+
+    snapshot = self.uut.snapshot()
+
+    self.assertEqual(_FAKE_TEMPERATURE, snapshot["local_temperature"])
+    self.assertEqual(len(snapshot), self.fake_read.call_count)
+
 
 if __name__ == "__main__":
   fake_device_test_case.main()
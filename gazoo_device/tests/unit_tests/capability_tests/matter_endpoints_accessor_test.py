@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Capability unit test for matter_endpoints_accessor module."""
+import os
 from unittest import mock
 
 from absl.testing import parameterized
@@ -20,7 +21,10 @@ from gazoo_device import package_registrar
 from gazoo_device.capabilities import matter_endpoints_accessor_pw_rpc
 from gazoo_device.capabilities import matter_endpoints_and_clusters
 from gazoo_device.capabilities.interfaces import matter_endpoints_base
+from gazoo_device.capabilities.matter_clusters import basic_information_pw_rpc
+from gazoo_device.capabilities.matter_clusters import on_off_pw_rpc
 from gazoo_device.capabilities.matter_endpoints import on_off_light
+from gazoo_device.capabilities.matter_endpoints import root_node
 from gazoo_device.capabilities.matter_endpoints import unsupported_endpoint
 from gazoo_device.capabilities.matter_endpoints.interfaces import endpoint_base
 from gazoo_device.protos import attributes_service_pb2
@@ -48,6 +52,12 @@ _FAKE_NOT_IMPLEMENTED_CLUSTER_ID = 1
 _FAKE_ATTRIBUTE_ID = 0
 _FAKE_ATTRIBUTE_TYPE = (
     attributes_service_pb2.AttributeType.ZCL_BOOLEAN_ATTRIBUTE_TYPE)
+_FAKE_FIRMWARE_IDENTITY = "fakedevice:123456:v1"
+_FAKE_TOPOLOGY = {
+    0: (root_node.RootNodeEndpoint, 22,
+        {basic_information_pw_rpc.BasicInformationClusterPwRpc}),
+    1: (on_off_light.OnOffLightEndpoint, 256, {on_off_pw_rpc.OnOffClusterPwRpc}),
+}
 
 
 class MatterEndpointsAccessorPwPpcTest(
@@ -107,6 +117,81 @@ class MatterEndpointsAccessorPwPpcTest(
     mock_get_endpoint_cls.assert_called_once()
     mock_get_supported_clusters.assert_called_once()
 
+  def test_descriptor_cache_reused_by_new_instance(self):
+    """Verifies persisted endpoints are revalidated with one descriptor read."""
+    cache_directory = os.path.join(self.artifacts_directory, self.id())
+    first_uut, first_mocks = self._create_uut_with_descriptor_cache(
+        cache_directory)
+    first_uut.list()
+    second_uut, second_mocks = self._create_uut_with_descriptor_cache(
+        cache_directory)
+
+    self.assertEqual(second_uut.list(), first_uut.list())
+    self.assertEqual(second_uut.endpoint_id_to_clusters,
+                     first_uut.endpoint_id_to_clusters)
+    self.assertEqual(second_uut.endpoint_id_to_device_type_id,
+                     {0: 22, 1: 256})
+    self.assertEqual(second_uut.endpoint_class_to_id,
+                     first_uut.endpoint_class_to_id)
+    self.assertEqual(first_mocks["get_supported_clusters"].call_count, 2)
+    second_mocks["get_supported_endpoint_ids"].assert_called_once()
+    second_mocks["get_endpoint_class_and_device_type_id"].assert_not_called()
+    second_mocks["get_supported_clusters"].assert_not_called()
+
+  @parameterized.named_parameters(
+      ("new_firmware", "fakedevice:123456:v2", [0, 1]),
+      ("endpoints_changed", _FAKE_FIRMWARE_IDENTITY, [0, 1, 2]))
+  def test_descriptor_cache_not_used(self, firmware_identity, endpoint_ids):
+    """Verifies endpoints are read again if the persisted ones are stale."""
+    cache_directory = os.path.join(self.artifacts_directory, self.id())
+    first_uut, _ = self._create_uut_with_descriptor_cache(cache_directory)
+    first_uut.list()
+    second_uut, second_mocks = self._create_uut_with_descriptor_cache(
+        cache_directory, firmware_identity=firmware_identity,
+        endpoint_ids=endpoint_ids)
+
+    self.assertEqual(list(second_uut.list()), endpoint_ids)
+    self.assertEqual(
+        second_mocks["get_supported_clusters"].call_count, len(endpoint_ids))
+
+  def test_invalidate_cache(self):
+    """Verifies invalidate_cache deletes the persisted endpoints."""
+    cache_directory = os.path.join(self.artifacts_directory, self.id())
+    uut, mocks = self._create_uut_with_descriptor_cache(cache_directory)
+    uut.list()
+    uut.invalidate_cache()
+    uut.list()
+
+    self.assertEqual(mocks["get_supported_endpoint_ids"].call_count, 2)
+    self.assertEqual(mocks["get_supported_clusters"].call_count, 4)
+
+  def _create_uut_with_descriptor_cache(
+      self,
+      cache_directory,
+      firmware_identity=_FAKE_FIRMWARE_IDENTITY,
+      endpoint_ids=(0, 1)):
+    """Returns a capability persisting its endpoints and its descriptor mocks."""
+    uut = matter_endpoints_accessor_pw_rpc.MatterEndpointsAccessorPwRpc(
+        device_name=_FAKE_DEVICE_NAME,
+        switchboard_call=self.fake_switchboard_call,
+        rpc_timeout_s=_FAKE_RPC_TIMEOUT_S,
+        firmware_identity_fn=lambda: firmware_identity,
+        descriptor_cache_directory=cache_directory)
+    topology = dict(_FAKE_TOPOLOGY)
+    for endpoint_id in endpoint_ids:
+      topology.setdefault(endpoint_id, topology[1])
+    mocks = {
+        "get_supported_endpoint_ids": mock.Mock(
+            return_value=list(endpoint_ids)),
+        "get_endpoint_class_and_device_type_id": mock.Mock(
+            side_effect=lambda endpoint_id: topology[endpoint_id][:2]),
+        "get_supported_clusters": mock.Mock(
+            side_effect=lambda endpoint_id: set(topology[endpoint_id][2])),
+    }
+    for method_name, method_mock in mocks.items():
+      setattr(uut, method_name, method_mock)
+    return uut, mocks
+
   def test_get_supported_endpoint_ids(self):
     """Verifies get_supported_endpoint_ids method on success."""
     fake_endpoint = descriptor_service_pb2.Endpoint(endpoint=_FAKE_ENDPOINT_ID)
@@ -340,6 +425,55 @@ class MatterEndpointsAccessorPwPpcTest(
     self.assertEqual(kwargs["method_kwargs"]["pw_rpc_timeout_s"],
                      _FAKE_RPC_TIMEOUT_S)
 
+  def test_ember_api_read_many(self):
+    """Verifies Ember API read_many method makes one switchboard call."""
+    data = [attributes_service_pb2.AttributeData(data_bool=True),
+            attributes_service_pb2.AttributeData(data_uint8=3)]
+    self.fake_switchboard_call.return_value = [
+        attribute_data.SerializeToString() for attribute_data in data]
+
+    self.assertEqual(
+        data,
+        self.uut.read_many([
+            (_FAKE_ENDPOINT_ID, _FAKE_CLUSTER_ID, 0, _FAKE_ATTRIBUTE_TYPE),
+            (_FAKE_ENDPOINT_ID, _FAKE_CLUSTER_ID, 1, _FAKE_ATTRIBUTE_TYPE)]))
+
+    self.fake_switchboard_call.assert_called_once()
+    kwargs = self.fake_switchboard_call.call_args.kwargs
+    self.assertEqual(kwargs["method_name"], "rpc_batch")
+    rpc_requests = kwargs["method_args"][0]
+    self.assertEqual(
+        [("Attributes", "Read", 0), ("Attributes", "Read", 1)],
+        [(service, event, event_kwargs["attribute_id"])
+         for service, event, event_kwargs in rpc_requests])
+    self.assertEqual(rpc_requests[0][2]["pw_rpc_timeout_s"],
+                     _FAKE_RPC_TIMEOUT_S)
+    # Pipelining is opt-in.
+    self.assertEqual(kwargs["method_kwargs"], {"max_in_flight": 1})
+
+  def test_ember_api_read_many_without_requests(self):
+    """Verifies Ember API read_many method without requests."""
+    self.assertEqual([], self.uut.read_many([]))
+    self.fake_switchboard_call.assert_not_called()
+
+  def test_ember_api_write_many(self):
+    """Verifies Ember API write_many method makes one switchboard call."""
+    self.uut.write_many([
+        (_FAKE_ENDPOINT_ID, _FAKE_CLUSTER_ID, 0, _FAKE_ATTRIBUTE_TYPE,
+         {"data_bool": True}),
+        (_FAKE_ENDPOINT_ID, _FAKE_CLUSTER_ID, 1, _FAKE_ATTRIBUTE_TYPE,
+         {"data_uint8": 3})])
+
+    self.fake_switchboard_call.assert_called_once()
+    kwargs = self.fake_switchboard_call.call_args.kwargs
+    self.assertEqual(kwargs["method_name"], "rpc_batch")
+    rpc_requests = kwargs["method_args"][0]
+    self.assertEqual([("Attributes", "Write")] * 2,
+                     [request[:2] for request in rpc_requests])
+    self.assertEqual(
+        attributes_service_pb2.AttributeData(data_uint8=3),
+        rpc_requests[1][2]["data"].decode())
+
   def test_send_success(self):
     """Verifies send method on success."""
     self.uut.send(
@@ -14,15 +14,26 @@
 
 """Capability unit test for pwrpc_event_subscription module."""
 
+import queue
+import re
 from unittest import mock
 
 from absl.testing import parameterized
 
+from gazoo_device import errors
 from gazoo_device.capabilities import pwrpc_event_subscription_default
+from gazoo_device.protos import attributes_service_pb2
 from gazoo_device.protos import boolean_state_service_pb2
 from gazoo_device.switchboard import switchboard
 from gazoo_device.tests.unit_tests.utils import unit_test_case
 
+_FAKE_PIGWEED_PORT = 2
+_ON_OFF_CLUSTER_ID = 6
+_ON_OFF_ATTRIBUTE_ID = 0
+_BOOLEAN_ATTRIBUTE_TYPE = (
+    attributes_service_pb2.AttributeType.ZCL_BOOLEAN_ATTRIBUTE_TYPE)
+_FAKE_TIMEOUT = 1
+
 
 class PwRpcEventSubscriptionTest(parameterized.TestCase):
   """Unit test for PwRpcEventSubscriptionDefault."""
@@ -31,10 +42,32 @@ class PwRpcEventSubscriptionTest(parameterized.TestCase):
     super().setUp()
     self.switchboard_call_mock = mock.Mock(
         spec=switchboard.SwitchboardDefault.call)
+    self.update_queue = queue.Queue()
+    self.switchboard_get_update_mock = mock.Mock(
+        spec=switchboard.SwitchboardDefault.get_transport_update)
+    self.switchboard_get_update_mock.side_effect = self._get_update
     self.uut = pwrpc_event_subscription_default.PwRpcEventSubscriptionDefault(
         device_name="fake_device_name",
         switchboard_call=self.switchboard_call_mock,
-        rpc_timeout_s=3)
+        rpc_timeout_s=3,
+        switchboard_get_update=self.switchboard_get_update_mock,
+        pigweed_port=_FAKE_PIGWEED_PORT)
+
+  def _get_update(self, timeout, port):
+    """Returns the next update of the fake transport's update queue."""
+    del port  # Unused.
+    try:
+      return self.update_queue.get(timeout=timeout)
+    except queue.Empty:
+      return None
+
+  def _subscribe_on_off(self):
+    """Subscribes to the OnOff attribute and returns the subscription ID."""
+    return self.uut.subscribe_attribute(
+        endpoint_id=1,
+        cluster_id=_ON_OFF_CLUSTER_ID,
+        attribute_id=_ON_OFF_ATTRIBUTE_ID,
+        attribute_type=_BOOLEAN_ATTRIBUTE_TYPE)
 
   @parameterized.parameters((True,), (False,))
   def test_set_boolean_state(self, state_value):
@@ -53,6 +86,123 @@ class PwRpcEventSubscriptionTest(parameterized.TestCase):
     self.switchboard_call_mock.return_value = response_byte
 
     self.assertEqual(state_value, self.uut.get_boolean_state())
+    self.assertEqual(_FAKE_PIGWEED_PORT,
+                     self.switchboard_call_mock.call_args.kwargs["port"])
+
+  def test_subscribe(self):
+    """Verifies subscribe starts a stream subscription in the transport."""
+    subscription_id = self.uut.subscribe(
+        "Descriptor", "PartsList", endpoint=0)
+
+    self.switchboard_call_mock.assert_called_once()
+    self.assertEqual(
+        {"method_name": "subscribe",
+         "method_args": (subscription_id, "Descriptor", "PartsList"),
+         "method_kwargs": {"endpoint": 0},
+         "port": _FAKE_PIGWEED_PORT},
+        self.switchboard_call_mock.call_args.kwargs)
+
+  def test_subscribe_attribute(self):
+    """Verifies subscribe_attribute watches the attribute read."""
+    subscription_id = self._subscribe_on_off()
+
+    self.switchboard_call_mock.assert_called_once()
+    kwargs = self.switchboard_call_mock.call_args.kwargs
+    self.assertEqual("watch", kwargs["method_name"])
+    self.assertEqual((subscription_id, "Attributes", "Read"),
+                     kwargs["method_args"])
+    self.assertEqual(_ON_OFF_CLUSTER_ID, kwargs["method_kwargs"]["cluster"])
+    log_regex = re.compile(kwargs["method_kwargs"]["log_regex"])
+    self.assertTrue(log_regex.search(
+        "[DMG] Endpoint 1, Cluster 0x0000_0006 update version to 5bd1f2a1"))
+    self.assertFalse(log_regex.search(
+        "[DMG] Endpoint 1, Cluster 0x0000_0008 update version to 5bd1f2a2"))
+    self.assertFalse(log_regex.search(
+        "[DMG] Endpoint 11, Cluster 0x0000_0006 update version to 5bd1f2a3"))
+
+  def test_subscribe_without_switchboard_get_update(self):
+    """Verifies subscriptions fail without switchboard_get_update."""
+    uut = pwrpc_event_subscription_default.PwRpcEventSubscriptionDefault(
+        device_name="fake_device_name",
+        switchboard_call=self.switchboard_call_mock,
+        rpc_timeout_s=3)
+    with self.assertRaisesRegex(errors.DeviceError,
+                                "does not support Pigweed RPC subscriptions"):
+      uut.subscribe("Descriptor", "PartsList")
+    self.switchboard_call_mock.assert_not_called()
+
+  def test_get_updates_sorts_updates_by_subscription(self):
+    """Verifies get_updates returns the updates of its subscription only."""
+    first_id = self.uut.subscribe("Descriptor", "PartsList")
+    second_id = self.uut.subscribe("Descriptor", "PartsList")
+    for update in [(second_id, b"b1"), (first_id, b"a1"), (second_id, None),
+                   (-1, b"unknown")]:
+      self.update_queue.put(update)
+
+    self.assertEqual([b"a1"], self.uut.get_updates(first_id, _FAKE_TIMEOUT))
+    self.assertEqual([b"b1", None],
+                     self.uut.get_updates(second_id, _FAKE_TIMEOUT))
+    self.assertEqual([], self.uut.get_updates(first_id, timeout=0.01))
+
+  def test_get_updates_unknown_subscription(self):
+    """Verifies get_updates raises an error for unknown subscriptions."""
+    with self.assertRaisesRegex(errors.DeviceError, "has no subscription 0"):
+      self.uut.get_updates(0, _FAKE_TIMEOUT)
+
+  def test_unsubscribe(self):
+    """Verifies unsubscribe cancels the subscription in the transport."""
+    subscription_id = self.uut.subscribe("Descriptor", "PartsList")
+
+    self.uut.unsubscribe(subscription_id)
+
+    self.assertEqual(
+        {"method_name": "unsubscribe",
+         "method_args": (subscription_id,),
+         "method_kwargs": {},
+         "port": _FAKE_PIGWEED_PORT},
+        self.switchboard_call_mock.call_args.kwargs)
+    with self.assertRaisesRegex(errors.DeviceError, "has no subscription"):
+      self.uut.get_updates(subscription_id, _FAKE_TIMEOUT)
+
+  def test_wait_for_attribute(self):
+    """Verifies wait_for_attribute returns the first satisfying data."""
+
+    def fake_call(method_name, method_args, method_kwargs, port):
+      del method_kwargs, port  # Unused.
+      if method_name == "watch":
+        subscription_id = method_args[0]
+        for value in (False, True):
+          self.update_queue.put(
+              (subscription_id, attributes_service_pb2.AttributeData(
+                  data_bool=value).SerializeToString()))
+
+    self.switchboard_call_mock.side_effect = fake_call
+
+    data = self.uut.wait_for_attribute(
+        endpoint_id=1,
+        cluster_id=_ON_OFF_CLUSTER_ID,
+        attribute_id=_ON_OFF_ATTRIBUTE_ID,
+        attribute_type=_BOOLEAN_ATTRIBUTE_TYPE,
+        predicate=lambda data: data.data_bool,
+        timeout=_FAKE_TIMEOUT)
+
+    self.assertTrue(data.data_bool)
+    self.assertEqual("unsubscribe",
+                     self.switchboard_call_mock.call_args.kwargs["method_name"])
+
+  def test_wait_for_attribute_timeout(self):
+    """Verifies wait_for_attribute raises an error on timeout."""
+    with self.assertRaisesRegex(errors.CommunicationTimeoutError,
+                                "did not satisfy the predicate"):
+      self.uut.wait_for_attribute(
+          endpoint_id=1,
+          cluster_id=_ON_OFF_CLUSTER_ID,
+          attribute_id=_ON_OFF_ATTRIBUTE_ID,
+          attribute_type=_BOOLEAN_ATTRIBUTE_TYPE,
+          predicate=lambda data: data.data_bool,
+          timeout=0.1)
+    self.assertEqual("unsubscribe",
+                     self.switchboard_call_mock.call_args.kwargs["method_name"])
 
 
 if __name__ == "__main__":
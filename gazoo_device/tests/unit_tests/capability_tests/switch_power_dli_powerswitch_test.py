@@ -187,6 +187,47 @@ class SwitchPowerDliPowerswitchCapabilityTests(unit_test_case.UnitTestCase):
         f" {self.uut.total_ports} which does not match the specified"
         f"{self._total_ports}")
 
+  def test_015_power_off_ports(self):
+    """Verifies power_off_ports switches the ports with one request."""
+    self.uut.power_off_ports([5, 1, 3])
+    self._write_command.assert_called_once_with(
+        "POST",
+        f"http://{self._ip_address}/restapi/relay/outlets/=1,3,5/state/",
+        headers={
+            "Accept": "application/json",
+            "X-CSRF": "x",
+            "X-HTTP-Method": "PUT"
+        },
+        data={
+            "value": "false"
+        },
+    )
+
+  def test_016_power_on_ports_all(self):
+    """Verifies power_on_ports with all ports uses the "all;" selector."""
+    self.uut.power_on_ports(range(self._total_ports))
+    self._write_command.assert_called_once_with(
+        "POST",
+        f"http://{self._ip_address}/restapi/relay/outlets/all;/state/",
+        headers={
+            "Accept": "application/json",
+            "X-CSRF": "x",
+            "X-HTTP-Method": "PUT"
+        },
+        data={
+            "value": "true"
+        },
+    )
+
+  def test_017_power_on_ports_bad_port(self):
+    """Verifies power_on_ports with a bad port causes error."""
+    bad_port = 8
+    err_msg = "Device {} power_on_ports failed. Port {} is invalid.".format(
+        self._name, bad_port)
+    with self.assertRaisesRegex(errors.DeviceError, err_msg):
+      self.uut.power_on_ports([1, bad_port])
+    self._write_command.assert_not_called()
+
 
 if __name__ == "__main__":
   unit_test_case.main()
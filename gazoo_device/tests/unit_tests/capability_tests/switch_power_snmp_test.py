@@ -12,23 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for switch_power_snmp capability."""
-import subprocess
 from unittest import mock
 
 from gazoo_device import errors
 from gazoo_device.capabilities import switch_power_snmp
+from gazoo_device.tests.unit_tests.utils import fake_snmp_agent
 from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import snmp_utils
 
 _DEVICE_NAME = "DLINK_SWITCH"
-_IP_ADDRESS = "0.0.0.0"
+_IP_ADDRESS = "127.0.0.1"
 _TOTAL_PORTS = 5
 _PORT = 2
-_GET = "snmpget -v 2c -c private 0.0.0.0:161 1.3.6.1.2.1.2.2.1.7.2"
-_SET_ON = "snmpset -v 2c -c private 0.0.0.0:161 1.3.6.1.2.1.2.2.1.7.2 i 1"
-_SET_OFF = "snmpset -v 2c -c private 0.0.0.0:161 1.3.6.1.2.1.2.2.1.7.2 i 2"
-_ON_STATUS = "iso.3.6.1.2.1.2.2.1.7.2 = INTEGER: 1"
-_OFF_STATUS = "iso.3.6.1.2.1.2.2.1.7.2 = INTEGER: 2"
-_RETURNCODE = 0
+_ON_STATUS = 1
+_OFF_STATUS = 2
+
+
+def _port_mode_oid(port):
+  return f"1.3.6.1.2.1.2.2.1.7.{port}"
 
 
 class SwitchPowerSnmpTests(unit_test_case.UnitTestCase):
@@ -36,8 +37,15 @@ class SwitchPowerSnmpTests(unit_test_case.UnitTestCase):
 
   def setUp(self):
     super().setUp()
-    self.uut = switch_power_snmp.SwitchPowerSnmp(_DEVICE_NAME, _IP_ADDRESS,
-                                                 _TOTAL_PORTS)
+    # Fake switch with all ports ON.
+    self.agent = fake_snmp_agent.FakeSnmpAgent({
+        _port_mode_oid(port): _ON_STATUS
+        for port in range(1, _TOTAL_PORTS + 1)
+    })
+    self.addCleanup(self.agent.close)
+    self.uut = switch_power_snmp.SwitchPowerSnmp(
+        _DEVICE_NAME, _IP_ADDRESS, _TOTAL_PORTS, snmp_port=self.agent.port)
+    self.addCleanup(self.uut.close)
 
   def test_supported_modes(self):
     self.assertEqual(
@@ -49,55 +57,85 @@ class SwitchPowerSnmpTests(unit_test_case.UnitTestCase):
     """Test that get_mode recognizes an invalid port."""
     with self.assertRaises(errors.DeviceError):
       self.uut.get_mode(0)
+    self.assertEmpty(self.agent.requests)
 
-  @mock.patch.object(subprocess, "check_output", return_value=_ON_STATUS)
-  def test_get_mode__port_on(self, mock_check_output):
+  def test_get_mode__port_on(self):
     """Test get_mode recognizes an ON status."""
     self.assertEqual(self.uut.get_mode(_PORT), switch_power_snmp._ON)
-    mock_check_output.assert_called_once_with(
-        _GET.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
+    self.assertLen(self.agent.requests, 1)
+    self.assertEqual(self.agent.requests[0].pdu_type, snmp_utils.GET_REQUEST)
+    self.assertEqual(self.agent.requests[0].varbinds,
+                     ((_port_mode_oid(_PORT), None),))
 
-  @mock.patch.object(subprocess, "check_output", return_value=_OFF_STATUS)
-  def test_get_mode__port_off(self, mock_check_output):
+  def test_get_mode__port_off(self):
     """Test get_mode recognizes an OFF status."""
+    self.agent.values[_port_mode_oid(_PORT)] = _OFF_STATUS
     self.assertEqual(self.uut.get_mode(_PORT), switch_power_snmp._OFF)
-    mock_check_output.assert_called_once_with(
-        _GET.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
+
+  def test_get_mode__unexpected_value(self):
+    """Test get_mode raises an error if the port has no valid status."""
+    del self.agent.values[_port_mode_oid(_PORT)]
+    with self.assertRaisesRegex(errors.DeviceError,
+                                "failed to get the status of port 2"):
+      self.uut.get_mode(_PORT)
+
+  def test_get_all_ports_mode(self):
+    """Test get_all_ports_mode reads all ports in a single request."""
+    self.agent.values[_port_mode_oid(_PORT)] = _OFF_STATUS
+    self.assertEqual(
+        self.uut.get_all_ports_mode(), {
+            1: switch_power_snmp._ON,
+            2: switch_power_snmp._OFF,
+            3: switch_power_snmp._ON,
+            4: switch_power_snmp._ON,
+            5: switch_power_snmp._ON,
+        })
+    self.assertLen(self.agent.requests, 1)
 
   def test_set_mode__invalid_port(self):
     """Test that set_mode recognizes an invalid port."""
     with self.assertRaises(errors.DeviceError):
       self.uut.set_mode(switch_power_snmp._ON, _TOTAL_PORTS + 1)
 
-  @mock.patch.object(subprocess, "check_output", return_value=_ON_STATUS)
-  def test_set_mode_on__pass(self, mock_check_output):
+  def test_set_mode__invalid_mode(self):
+    """Test that set_mode recognizes an invalid mode."""
+    with self.assertRaisesRegex(errors.DeviceError, "invalid mode"):
+      self.uut.set_mode("SYNC", _PORT)
+    self.assertEmpty(self.agent.requests)
+
+  def test_set_mode_on__pass(self):
     """Test set_mode successfully sets port ON."""
+    self.agent.values[_port_mode_oid(_PORT)] = _OFF_STATUS
     self.uut.set_mode(switch_power_snmp._ON, _PORT)
-    mock_check_output.assert_called_once_with(
-        _SET_ON.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
+    self.assertEqual(self.agent.values[_port_mode_oid(_PORT)], _ON_STATUS)
+    self.assertLen(self.agent.requests, 1)
+    self.assertEqual(self.agent.requests[0].pdu_type, snmp_utils.SET_REQUEST)
+    self.assertEqual(self.agent.requests[0].varbinds,
+                     ((_port_mode_oid(_PORT), _ON_STATUS),))
 
-  @mock.patch.object(subprocess, "check_output", return_value=_OFF_STATUS)
-  def test_set_mode_on__fail(self, mock_check_output):
+  def test_set_mode_on__fail(self):
     """Test set_mode fails to set port ON."""
-    with self.assertRaises(errors.DeviceError):
-      self.uut.set_mode(switch_power_snmp._ON, _PORT)
-    mock_check_output.assert_called_once_with(
-        _SET_ON.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
-
-  @mock.patch.object(subprocess, "check_output", return_value=_OFF_STATUS)
-  def test_set_mode_off__pass(self, mock_check_output):
+    self.agent.close()
+    self.agent = fake_snmp_agent.FakeSnmpAgent(
+        {_port_mode_oid(_PORT): _OFF_STATUS},
+        set_values={_port_mode_oid(_PORT): _OFF_STATUS})
+    self.addCleanup(self.agent.close)
+    uut = switch_power_snmp.SwitchPowerSnmp(
+        _DEVICE_NAME, _IP_ADDRESS, _TOTAL_PORTS, snmp_port=self.agent.port)
+    self.addCleanup(uut.close)
+    with self.assertRaisesRegex(errors.DeviceError, r"turn on ports \[2\]"):
+      uut.set_mode(switch_power_snmp._ON, _PORT)
+
+  def test_set_mode_off__pass(self):
     """Test set_mode successfully sets port OFF."""
-    self.uut.set_mode(switch_power_snmp._OFF, _PORT)
-    mock_check_output.assert_called_once_with(
-        _SET_OFF.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
+    self.uut.set_mode("off", _PORT)
+    self.assertEqual(self.agent.values[_port_mode_oid(_PORT)], _OFF_STATUS)
 
-  @mock.patch.object(subprocess, "check_output", return_value=_ON_STATUS)
-  def test_set_mode_off__fail(self, mock_check_output):
-    """Test set_mode fails to set port OFF."""
-    with self.assertRaises(errors.DeviceError):
+  def test_set_mode_off__fail(self):
+    """Test set_mode fails to set port OFF if the switch reports an error."""
+    del self.agent.values[_port_mode_oid(_PORT)]
+    with self.assertRaisesRegex(errors.DeviceError, "noSuchName"):
       self.uut.set_mode(switch_power_snmp._OFF, _PORT)
-    mock_check_output.assert_called_once_with(
-        _SET_OFF.split(), text=True, timeout=switch_power_snmp._SNMP_TIMEOUT_S)
 
   @mock.patch.object(switch_power_snmp.SwitchPowerSnmp, "set_mode")
   def test_power_off(self, mock_set_mode):
@@ -109,18 +147,79 @@ class SwitchPowerSnmpTests(unit_test_case.UnitTestCase):
     self.uut.power_on(_PORT)
     mock_set_mode.assert_called_once_with(switch_power_snmp._ON, _PORT)
 
-  @mock.patch.object(switch_power_snmp.SwitchPowerSnmp, "set_mode")
-  def test_set_all_ports_mode(self, mock_set_mode):
+  def test_set_all_ports_mode(self):
+    """Test set_all_ports_mode sets all ports but port 1 in a single request."""
     self.uut.set_all_ports_mode(switch_power_snmp._OFF)
-    mock_set_mode.assert_has_calls([
-        mock.call(mode=switch_power_snmp._OFF, port=port)
-        for port in range(2, _TOTAL_PORTS + 1)
-    ])
+    self.assertEqual(
+        self.agent.values, {
+            _port_mode_oid(1): _ON_STATUS,
+            _port_mode_oid(2): _OFF_STATUS,
+            _port_mode_oid(3): _OFF_STATUS,
+            _port_mode_oid(4): _OFF_STATUS,
+            _port_mode_oid(5): _OFF_STATUS,
+        })
+    self.assertLen(self.agent.requests, 1)
+
+  def test_set_all_ports_mode_48_ports(self):
+    """Test the ports of a 48-port switch are set in 2 round trips."""
+    self.agent.values.update(
+        {_port_mode_oid(port): _ON_STATUS for port in range(1, 49)})
+    uut = switch_power_snmp.SwitchPowerSnmp(
+        _DEVICE_NAME, _IP_ADDRESS, 48, snmp_port=self.agent.port)
+    self.addCleanup(uut.close)
+    uut.set_all_ports_mode(switch_power_snmp._OFF)
+    self.assertEqual(
+        uut.get_all_ports_mode(),
+        {1: switch_power_snmp._ON,
+         **{port: switch_power_snmp._OFF for port in range(2, 49)}})
+    self.assertEqual([len(request.varbinds) for request in self.agent.requests],
+                     [24, 23, 24, 24])
+
+  def test_set_all_ports_mode_invalid_mode(self):
+    with self.assertRaisesRegex(errors.DeviceError, "invalid mode"):
+      self.uut.set_all_ports_mode("SYNC")
+    self.assertEmpty(self.agent.requests)
 
   def test_set_mode_port_1(self):
     with self.assertRaisesRegex(errors.DeviceError, "Port 1 is reserved"):
       self.uut.set_mode(mode=switch_power_snmp._OFF, port=1)
 
+  def test_power_off_ports(self):
+    """Test power_off_ports sets the ports in a single request."""
+    self.uut.power_off_ports([4, 2])
+    self.assertEqual(
+        self.uut.get_all_ports_mode(),
+        {1: switch_power_snmp._ON, 2: switch_power_snmp._OFF,
+         3: switch_power_snmp._ON, 4: switch_power_snmp._OFF,
+         5: switch_power_snmp._ON})
+    self.assertEqual(self.agent.requests[0].pdu_type, snmp_utils.SET_REQUEST)
+    self.assertEqual(self.agent.requests[0].varbinds,
+                     ((_port_mode_oid(2), _OFF_STATUS),
+                      (_port_mode_oid(4), _OFF_STATUS)))
+
+  def test_power_on_ports(self):
+    """Test power_on_ports sets the ports in a single request."""
+    for port in range(2, _TOTAL_PORTS + 1):
+      self.agent.values[_port_mode_oid(port)] = _OFF_STATUS
+    self.uut.power_on_ports([2, 3, 5])
+    self.assertEqual(
+        self.uut.get_all_ports_mode(),
+        {1: switch_power_snmp._ON, 2: switch_power_snmp._ON,
+         3: switch_power_snmp._ON, 4: switch_power_snmp._OFF,
+         5: switch_power_snmp._ON})
+    self.assertLen(self.agent.requests, 2)  # The SET and the GET.
+
+  def test_power_off_ports_port_1(self):
+    with self.assertRaisesRegex(errors.DeviceError, "Port 1 is reserved"):
+      self.uut.power_off_ports([2, 1])
+    self.assertEmpty(self.agent.requests)
+
+  def test_close(self):
+    """Test close closes the SNMP socket and later requests reopen it."""
+    self.uut.get_mode(_PORT)
+    self.uut.close()
+    self.assertEqual(self.uut.get_mode(_PORT), switch_power_snmp._ON)
+
 
 if __name__ == "__main__":
   unit_test_case.main()
@@ -116,6 +116,15 @@ class SwitchPowerUsbDefaultCapabilityTests(unit_test_case.UnitTestCase):
         f" {self.uut.total_ports} which does not match the specified"
         f"{self._total_ports}")
 
+  def test_015_power_ports_one_by_one(self):
+    """Verifies power_off_ports and power_on_ports switch each port."""
+    self.uut.power_off_ports([1, 3])
+    self.uut.power_on_ports([1, 3])
+    commands = [call[0][0] for call in self._shell_func.call_args_list]
+    self.assertLen(commands, 4)
+    for command, option in zip(commands, ["-d 1", "-d 3", "-u 1", "-u 3"]):
+      self.assertIn(option, command)
+
   def test_050_supported_modes(self):
     """Verify the supported_modes property returns off and sync."""
     modes = self.uut.supported_modes
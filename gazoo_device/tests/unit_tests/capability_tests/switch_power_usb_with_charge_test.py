@@ -109,15 +109,66 @@ class SwitchPowerUsbWithChargeCapabilityTests(unit_test_case.UnitTestCase):
     modes = self.uut.supported_modes
     self.assertTrue("off" and "sync" and "charge" in modes)
 
-  @mock.patch.object(
-      switch_power_usb_with_charge.SwitchPowerUsbWithCharge, "set_mode")
-  def test_set_all_ports_mode(self, mock_set_mode):
+  def test_set_all_ports_mode(self):
+    """Verifies set_all_ports_mode sends one set mode command per port."""
     self.uut.set_all_ports_mode("off")
-    mock_set_mode.assert_has_calls([
-        mock.call(mode="off", port=port)
-        for port in range(1, self._total_ports + 1)
+    self.assertEqual(
+        self._shell_func.call_args_list,
+        [mock.call(f"mode off {port}")
+         for port in range(1, self._total_ports + 1)])
+
+  def test_set_modes_batch(self):
+    """Verifies set_modes sends all commands in one batch if supported."""
+    uut = self._create_uut_with_batch_shell_fn()
+    uut.set_modes({3: "off", 1: "charge", 2: "sync"})
+    self._batch_shell_func.assert_called_once_with(
+        ["mode off 3", "mode charge 1", "mode sync 2"])
+    self._shell_func.assert_not_called()
+
+  def test_set_modes_invalid_port(self):
+    """Verifies set_modes validates all ports before sending commands."""
+    uut = self._create_uut_with_batch_shell_fn()
+    with self.assertRaisesRegex(errors.DeviceError, "Port 16 is invalid"):
+      uut.set_modes({1: "off", 16: "off"})
+    self._batch_shell_func.assert_not_called()
+
+  def test_power_ports_batch(self):
+    """Verifies power_off_ports and power_on_ports use one batch each."""
+    uut = self._create_uut_with_batch_shell_fn()
+    uut.power_off_ports([1, 2])
+    uut.power_on_ports([1, 2])
+    self.assertEqual(self._batch_shell_func.call_args_list, [
+        mock.call(["mode off 1", "mode off 2"]),
+        mock.call(["mode sync 1", "mode sync 2"]),
     ])
 
+  def test_get_all_ports_mode_batch(self):
+    """Verifies get_all_ports_mode sends all state commands in one batch."""
+    uut = self._create_uut_with_batch_shell_fn(total_ports=3)
+    self._batch_shell_func.return_value = [
+        "1, 0000, D O, 0, 0, x, 0.00",
+        "2, 0175, e A S, 0, 0, x, 0.00",
+        "garbled",
+    ]
+    self._regex_shell_func.return_value = "R A"
+    self.assertEqual(uut.get_all_ports_mode(), ["off", "sync", "charge"])
+    self._batch_shell_func.assert_called_once_with(
+        ["state 1", "state 2", "state 3"])
+    # The unparsable response is retried.
+    self._regex_shell_func.assert_called_once_with(
+        "state 3", cambrionix.REGEXES["GET_MODE_REGEX"], tries=5)
+
+  def _create_uut_with_batch_shell_fn(self, total_ports=None):
+    self._batch_shell_func = mock.Mock()
+    return switch_power_usb_with_charge.SwitchPowerUsbWithCharge(
+        shell_fn=self._shell_func,
+        regex_shell_fn=self._regex_shell_func,
+        command_dict=cambrionix.COMMANDS.copy(),
+        regex_dict=cambrionix.REGEXES.copy(),
+        device_name="cambrionix-1234",
+        serial_number="1234567890",
+        total_ports=total_ports or self._total_ports,
+        batch_shell_fn=self._batch_shell_func)
 
 if __name__ == "__main__":
   unit_test_case.main()
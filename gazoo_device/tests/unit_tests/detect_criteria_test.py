@@ -36,6 +36,7 @@ from gazoo_device.utility import adb_utils
 from gazoo_device.utility import host_utils
 from gazoo_device.utility import http_utils
 from gazoo_device.utility import pwrpc_utils
+from gazoo_device.utility import ssh_connection_pool
 from gazoo_device.utility import usb_config
 from gazoo_device.utility import usb_utils
 import immutabledict
@@ -431,6 +432,30 @@ class TestDetectCriteria(unit_test_case.UnitTestCase):
             detect_logger=mock.MagicMock(spec=logging.Logger),
             create_switchboard_func=mock.MagicMock()))
 
+  @mock.patch.object(
+      ssh_connection_pool.SshConnectionPool, "close", autospec=True)
+  @mock.patch.object(host_utils, "ssh_command")
+  def test_ssh_query_with_multiplexed_connections(
+      self, mock_ssh_command, mock_close):
+    """Verifies SSH queries use the shared SSH connection pool."""
+    def check_pool_enabled(*args, **kwargs):
+      del args, kwargs  # Unused.
+      self.assertIsNotNone(host_utils._ssh_connection_pool)
+      return "Raspberry Pi 4 Model B Rev 1.1"
+
+    mock_ssh_command.side_effect = check_pool_enabled
+    with ssh_detect_criteria.multiplexed_ssh_connections():
+      with ssh_detect_criteria.multiplexed_ssh_connections():
+        ssh_detect_criteria._is_ubuntu_rpi_query(
+            address=_IP_ADDRESS,
+            detect_logger=mock.MagicMock(spec=logging.Logger),
+            create_switchboard_func=mock.MagicMock())
+      mock_close.assert_not_called()
+
+    mock_ssh_command.assert_called_once()
+    mock_close.assert_called_once()
+    self.assertIsNone(host_utils._ssh_connection_pool)
+
   def test_is_nrf_openthread_return_true(self):
     """Verifies _is_nrf_openthread method returns true."""
     self.fake_detect_playback.responder.behavior_dict = {
@@ -14,11 +14,14 @@
 
 """Unit tests for device detector."""
 import logging
+import threading
+import time
 from unittest import mock
 
 from absl.testing import parameterized
 from gazoo_device import device_detector
 from gazoo_device import errors
+from gazoo_device import extensions
 from gazoo_device import manager
 from gazoo_device import package_registrar
 from gazoo_device.auxiliary_devices import cambrionix
@@ -207,15 +210,13 @@ class TestDeviceDetector(unit_test_case.UnitTestCase):
   @mock.patch.object(fake_devices.FakeSSHDevice, "make_device_ready")
   def test_get_info_success(self, mock_make_device, mock_get_info):
     """Tests _detect_get_info() success."""
-    name, persistent_props, optional_props = self.detector._detect_get_info(
+    persistent_props, optional_props = self.detector._detect_get_info(
         fake_devices.FakeSSHDevice, "12.34.56.123")
-    self.assertEqual(name, "sshdevice-5678")
     self.assertEqual(
         persistent_props, {
             "console_port_name": "12.34.56.123",
             "serial_number": "12345678",
             "device_type": "sshdevice",
-            "name": "sshdevice-5678",
         })
     self.assertEqual(optional_props, {})
 
@@ -408,9 +409,10 @@ class TestDeviceDetector(unit_test_case.UnitTestCase):
     with mock.patch.object(
         self.detector, "_detect_get_info",
         return_value=(
-            "sshdevice-5678",  # already existing name
             {  # new console_port_name
-                "console_port_name": "12.34.56.78"
+                "console_port_name": "12.34.56.78",
+                # Generates an already existing name.
+                "serial_number": "22345678",
             },
             {})):
       with mock.patch.object(
@@ -531,6 +533,73 @@ class TestDeviceDetector(unit_test_case.UnitTestCase):
     self.assertCountEqual(
         ["cambrionix-0123"], option_configs["other_device_options"])
 
+  @mock.patch.object(device_detector, "_find_matching_device_class")
+  def test_identify_connection_device_class_concurrently(
+      self, mock_matching_class):
+    """Tests connections are identified concurrently and reported in order."""
+    addresses = [f"12.34.56.{number}" for number in range(10, 20)]
+    # Earlier connections respond slower to finish out of order.
+    delays = {address: 0.1 * (len(addresses) - index)
+              for index, address in enumerate(addresses)}
+
+    def mock_match(address, *args, **kwargs):
+      del args, kwargs  # Unused.
+      time.sleep(delays[address])
+      if address.endswith(("0", "2", "4", "6", "8")):
+        return [fake_devices.FakeSSHDevice]
+      return []
+
+    mock_matching_class.side_effect = mock_match
+    start_time = time.time()
+    potential_tuples, errs, no_id_cons = (
+        self.detector._identify_connection_device_class(
+            {"SshComms": list(reversed(addresses))}))
+    self.assertLess(time.time() - start_time, sum(delays.values()) / 2)
+    self.assertEqual(
+        potential_tuples,
+        [(fake_devices.FakeSSHDevice, address) for address in addresses[::2]])
+    self.assertEqual(no_id_cons, addresses[1::2])
+    self.assertEqual(
+        [err.split()[0] for err in errs], addresses[1::2])
+
+  @mock.patch.object(
+      device_detector, "_find_matching_device_class",
+      return_value=[fake_devices.FakeSSHDevice])
+  def test_detect_new_devices_name_conflict(
+      self, mock_find_matching_device_class):
+    """Tests new devices with the same short name get distinct names."""
+    serial_numbers = {"12.34.56.78": "11115678", "12.34.56.79": "22225678"}
+
+    def mock_detect_get_info(device_class, connection):
+      del device_class  # Unused.
+      return ({"console_port_name": connection,
+               "serial_number": serial_numbers[connection]}, {})
+
+    with mock.patch.object(
+        self.detector, "_detect_get_info", side_effect=mock_detect_get_info):
+      persistent_configs, _ = self.detector.detect_new_devices(
+          {"SshComms": list(serial_numbers)})
+    self.assertCountEqual(["sshdevice-5678", "sshdevice-22225678"],
+                          persistent_configs["devices"])
+
+  def test_run_by_communication_type_cancels_calls_on_error(self):
+    """Tests calls which have not started are cancelled on errors."""
+    self.detector.max_workers_per_communication_type = 1
+    started = []
+    first_call_started = threading.Event()
+
+    def mock_call(number):
+      started.append(number)
+      first_call_started.set()
+      time.sleep(0.1)
+
+    with self.assertRaises(KeyboardInterrupt):
+      with self.detector._run_by_communication_type(
+          mock_call, [("SshComms", (number,)) for number in range(5)]):
+        first_call_started.wait(timeout=5)
+        raise KeyboardInterrupt
+    self.assertEqual(started, [0])
+
   def test_matches_criteria_missing_response(self):
     """Tests _matches_criteria when a query response is missing."""
     self.assertFalse(
@@ -545,33 +614,34 @@ class TestDeviceDetector(unit_test_case.UnitTestCase):
             }))
     )
 
-  @mock.patch.object(
-      device_detector, "_get_detect_query_response", autospec=True,
-      return_value={
-          # Return detection responses for RPi but not DLI Powerswitch to
-          # simulate detection when RPi is registered but DLI Powerswitch isn't.
-          ssh_detect_criteria.SshQuery.IS_RASPBIAN_RPI: True,
-          ssh_detect_criteria.SshQuery.IS_CHIP_TOOL_PRESENT: False,
-          ssh_detect_criteria.SshQuery.IS_MATTER_LINUX_APP_RUNNING: False,
-      })
-  def test_find_matching_device_class_no_response_for_query(
-      self, mock_get_detect_query_response):
+  def test_find_matching_device_class_no_response_for_query(self):
     """Tests _find_matching_device_class when a query doesn't have a response."""
+    # Register queries for RPi but not DLI Powerswitch to simulate detection
+    # when RPi is registered but DLI Powerswitch isn't.
+    rpi_queries = {
+        ssh_detect_criteria.SshQuery.IS_RASPBIAN_RPI:
+            mock.Mock(return_value=True),
+        ssh_detect_criteria.SshQuery.IS_CHIP_TOOL_PRESENT:
+            mock.Mock(return_value=False),
+        ssh_detect_criteria.SshQuery.IS_MATTER_LINUX_APP_RUNNING:
+            mock.Mock(return_value=False),
+    }
     mock_logger = mock.Mock(spec=logging.getLogger())
-    matching_device_classes = device_detector._find_matching_device_class(
-        address="12.34.56.78",
-        communication_type=fake_devices.FakeSSHDevice.COMMUNICATION_TYPE,
-        detect_logger=mock_logger,
-        create_switchboard_func=self.fake_manager.create_switchboard,
-        device_classes=[
-            dli_powerswitch.DliPowerSwitch, raspberry_pi.RaspberryPi])
+    with mock.patch.dict(extensions.detect_criteria, {"SshComms": rpi_queries}):
+      matching_device_classes = device_detector._find_matching_device_class(
+          address="12.34.56.78",
+          communication_type="SshComms",
+          detect_logger=mock_logger,
+          create_switchboard_func=self.fake_manager.create_switchboard,
+          device_classes=[
+              dli_powerswitch.DliPowerSwitch, raspberry_pi.RaspberryPi])
     self.assertEqual(matching_device_classes, [raspberry_pi.RaspberryPi])
 
-    mock_get_detect_query_response.assert_called_once_with(
-        "12.34.56.78",
-        fake_devices.FakeSSHDevice.COMMUNICATION_TYPE,
-        mock_logger,
-        self.fake_manager.create_switchboard)
+    for query in rpi_queries.values():
+      query.assert_called_once_with(
+          address="12.34.56.78",
+          detect_logger=mock_logger,
+          create_switchboard_func=self.fake_manager.create_switchboard)
     info_logs = [
         call_args[0][0] for call_args in mock_logger.info.call_args_list]
     expected_log_marker = "%s: No Match. Not all detect criteria had a response"
@@ -579,6 +649,55 @@ class TestDeviceDetector(unit_test_case.UnitTestCase):
         any(expected_log_marker in info_log for info_log in info_logs),
         f"Didn't find a log containing {expected_log_marker!r} in {info_logs}")
 
+  def test_find_matching_device_class_skips_unneeded_queries(self):
+    """Tests queries are only sent while a device class can still match."""
+    queries = {
+        ssh_detect_criteria.SshQuery.IS_DLI: mock.Mock(return_value=False),
+        ssh_detect_criteria.SshQuery.IS_RASPBIAN_RPI:
+            mock.Mock(return_value=False),
+        ssh_detect_criteria.SshQuery.IS_CHIP_TOOL_PRESENT:
+            mock.Mock(return_value=False),
+        ssh_detect_criteria.SshQuery.IS_MATTER_LINUX_APP_RUNNING:
+            mock.Mock(return_value=False),
+    }
+    responses = {}
+    with mock.patch.dict(extensions.detect_criteria, {"SshComms": queries}):
+      matching_device_classes = device_detector._find_matching_device_class(
+          address="12.34.56.78",
+          communication_type="SshComms",
+          detect_logger=mock.Mock(spec=logging.getLogger()),
+          create_switchboard_func=self.fake_manager.create_switchboard,
+          device_classes=[
+              dli_powerswitch.DliPowerSwitch, raspberry_pi.RaspberryPi],
+          responses=responses)
+    self.assertEqual(matching_device_classes, [])
+    # Neither device type matches after the first two responses.
+    queries[ssh_detect_criteria.SshQuery.IS_DLI].assert_called_once()
+    queries[ssh_detect_criteria.SshQuery.IS_RASPBIAN_RPI].assert_called_once()
+    queries[
+        ssh_detect_criteria.SshQuery.IS_CHIP_TOOL_PRESENT].assert_not_called()
+    queries[ssh_detect_criteria.SshQuery
+            .IS_MATTER_LINUX_APP_RUNNING].assert_not_called()
+    self.assertEqual(
+        responses,
+        {ssh_detect_criteria.SshQuery.IS_DLI: False,
+         ssh_detect_criteria.SshQuery.IS_RASPBIAN_RPI: False})
+
+  def test_find_matching_device_class_reuses_responses(self):
+    """Tests collected responses are not queried again."""
+    query = mock.Mock(return_value=True)
+    with mock.patch.dict(extensions.detect_criteria,
+                         {"SshComms": {ssh_detect_criteria.SshQuery.IS_DLI:
+                                           query}}):
+      matching_device_classes = device_detector._find_matching_device_class(
+          address="12.34.56.78",
+          communication_type="SshComms",
+          detect_logger=mock.Mock(spec=logging.getLogger()),
+          create_switchboard_func=self.fake_manager.create_switchboard,
+          device_classes=[dli_powerswitch.DliPowerSwitch],
+          responses={ssh_detect_criteria.SshQuery.IS_DLI: True})
+    self.assertEqual(matching_device_classes, [dli_powerswitch.DliPowerSwitch])
+    query.assert_not_called()
 
 if __name__ == "__main__":
   unit_test_case.main()
@@ -385,7 +385,8 @@ class GazooDeviceBaseTests(fake_device_test_case.FakeDeviceTestCase,
     mock_event_parser_class.assert_called_once_with(
         filters=expected_filter_host_paths,
         event_file_path=mock.ANY,
-        device_name=uut.name)
+        device_name=uut.name,
+        use_event_index=False)
 
   def test_get_private_capability_name(self):
     """Test that private capability name generation works."""
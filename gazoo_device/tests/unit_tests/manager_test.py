@@ -23,6 +23,8 @@ import logging
 import os
 import shutil
 import signal
+import threading
+import time
 from unittest import mock
 
 from absl.testing import parameterized
@@ -36,15 +38,20 @@ from gazoo_device import gdm_logger
 from gazoo_device import log_parser
 from gazoo_device import manager
 from gazoo_device.auxiliary_devices import cambrionix
+from gazoo_device.capabilities import device_power_default
 from gazoo_device.capabilities import switch_power_usb_with_charge
 from gazoo_device.switchboard import switchboard
+from gazoo_device.switchboard import switchboard_host
 from gazoo_device.tests.unit_tests.utils import fake_devices
 from gazoo_device.tests.unit_tests.utils import fake_transport
 from gazoo_device.tests.unit_tests.utils import gc_test_utils
 from gazoo_device.tests.unit_tests.utils import manager_test_utils
 from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import adb_utils
 from gazoo_device.utility import host_utils
+from gazoo_device.utility import http_utils
 from gazoo_device.utility import multiprocessing_utils
+from gazoo_device.utility import usb_utils
 
 logger = gdm_logger.get_logger()
 MAX_LOG_LINES = 10
@@ -227,6 +234,144 @@ class ManagerTests(
         self.uut.close()
         mock_close.assert_not_called()
 
+  @mock.patch.object(host_utils, "close_ssh_connection_pool", autospec=True)
+  @mock.patch.object(host_utils, "enable_ssh_connection_pool", autospec=True)
+  def test_manager_ssh_connection_pooling(self, mock_enable, mock_close):
+    """Tests the SSH connection pool is enabled and closed by the Manager."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          ssh_connection_pooling=True)
+    mock_enable.assert_called_once()
+    self.uut.close()
+    mock_close.assert_called_once()
+    self.uut.close()  # The pool is released only once.
+    mock_close.assert_called_once()
+
+  @mock.patch.object(host_utils, "close_ssh_connection_pool", autospec=True)
+  @mock.patch.object(host_utils, "enable_ssh_connection_pool", autospec=True)
+  def test_manager_without_ssh_connection_pooling(self, mock_enable,
+                                                  mock_close):
+    """Tests a Manager without pooling doesn't enable or close the pool."""
+    self.uut = self._create_manager_object()
+    self.uut.close()
+    mock_enable.assert_not_called()
+    mock_close.assert_not_called()
+
+  @mock.patch.object(usb_utils, "close_usb_inventory", autospec=True)
+  @mock.patch.object(
+      usb_utils, "enable_usb_inventory", autospec=True, return_value=True)
+  def test_manager_usb_inventory(self, mock_enable, mock_close):
+    """Tests the USB inventory is enabled and released by the Manager."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          usb_inventory=True)
+    mock_enable.assert_called_once()
+    self.uut.close()
+    mock_close.assert_called_once()
+    self.uut.close()  # The inventory is released only once.
+    mock_close.assert_called_once()
+
+  @mock.patch.object(host_utils, "disable_network_probes", autospec=True)
+  @mock.patch.object(host_utils, "enable_network_probes", autospec=True)
+  def test_manager_network_probes(self, mock_enable, mock_disable):
+    """Tests network probes are enabled and released by the Manager."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          network_probes=True)
+    mock_enable.assert_called_once()
+    self.uut.close()
+    mock_disable.assert_called_once()
+    self.uut.close()  # The probes are released only once.
+    mock_disable.assert_called_once()
+
+  @mock.patch.object(http_utils, "close_session_pool", autospec=True)
+  @mock.patch.object(http_utils, "enable_session_pool", autospec=True)
+  def test_manager_http_session_pooling(self, mock_enable, mock_close):
+    """Tests the HTTP session pool is enabled and released by the Manager."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          http_session_pooling=True)
+    mock_enable.assert_called_once()
+    self.uut.close()
+    mock_close.assert_called_once()
+    self.uut.close()  # The pool is released only once.
+    mock_close.assert_called_once()
+
+  @mock.patch.object(adb_utils, "disable_adb_client", autospec=True)
+  @mock.patch.object(adb_utils, "enable_adb_client", autospec=True)
+  def test_manager_native_adb_client(self, mock_enable, mock_disable):
+    """Tests the adb client is enabled and released by the Manager."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          native_adb_client=True)
+    mock_enable.assert_called_once()
+    self.uut.close()
+    mock_disable.assert_called_once()
+    self.uut.close()  # The client is released only once.
+    mock_disable.assert_called_once()
+
+  @mock.patch.object(
+      multiprocessing_utils, "disable_switchboard_forkserver", autospec=True)
+  @mock.patch.object(
+      multiprocessing_utils, "enable_switchboard_forkserver", autospec=True,
+      return_value=True)
+  def test_manager_switchboard_forkserver(self, mock_enable, mock_disable):
+    """Tests the Switchboard forkserver is enabled and released."""
+    package_info = {
+        "some_package": {"version": "0.0.1", "import_path": "some_package"}
+    }
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"), \
+        mock.patch.dict(extensions.package_info, package_info):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          switchboard_forkserver=True)
+    mock_enable.assert_called_once()
+    mock_enable.assert_called_once()
+    self.assertIn("some_package",
+                  mock_enable.call_args.kwargs["preload_modules"])
+    self.uut.close()
+    mock_disable.assert_called_once()
+    self.uut.close()  # The forkserver is released only once.
+    mock_disable.assert_called_once()
+
+  @mock.patch.object(switchboard_host.SwitchboardHost, "close", autospec=True)
+  def test_manager_switchboard_host_processes(self, mock_close):
+    """Tests Switchboards are assigned to the host processes in turn."""
+    with mock.patch.object(multiprocessing_utils.get_context(), "Queue"):
+      self.uut = manager.Manager(
+          gdm_config_file_name=self.files["gdm_config_file_name"],
+          log_directory=self.artifacts_directory,
+          gdm_log_file=self._create_log_path(),
+          switchboard_host_processes=2)
+    hosts = [self.uut._get_switchboard_host() for _ in range(3)]
+    self.assertIsNot(hosts[0], hosts[1])
+    self.assertIs(hosts[0], hosts[2])
+    self.uut.close()
+    self.assertCountEqual([call.args[0] for call in mock_close.call_args_list],
+                          hosts[:2])
+
+  def test_manager_without_switchboard_host_processes(self):
+    """Tests Switchboards don't use host processes by default."""
+    self.uut = self._create_manager_object()
+    self.assertIsNone(self.uut._get_switchboard_host())
+
   def test_manager_get_device_prop_bad_types_raises_error(self):
     """Testing a bad property types and characters that GDM forbids."""
     self.uut = self._create_manager_object()
@@ -838,6 +983,47 @@ class ManagerTests(
           "user count did not decrease: close() was not called")
       self.assertIn(device_name, self.uut.get_open_device_names())
 
+  @mock.patch.object(device_power_default, "cycle_devices", autospec=True)
+  def test_power_cycle_devices(self, mock_cycle_devices):
+    """Tests power_cycle_devices() power cycles open and closed devices."""
+    self.uut = self._create_manager_object()
+    open_device = mock.MagicMock(
+        device_power=mock.MagicMock(
+            spec=device_power_default.DevicePowerDefault))
+    self.uut._open_devices[self.first_name] = open_device
+    created_device = mock.MagicMock(
+        device_power=mock.MagicMock(
+            spec=device_power_default.DevicePowerDefault))
+    with mock.patch.object(
+        self.uut, "create_device",
+        return_value=created_device) as mock_create_device:
+      self.assertEqual(
+          self.uut.power_cycle_devices(
+              [self.first_name, self.second_name, self.first_name],
+              off_time=1, stagger=0.5),
+          mock_cycle_devices.return_value)
+    mock_create_device.assert_called_once_with(
+        self.second_name, make_device_ready="off")
+    mock_cycle_devices.assert_called_once_with(
+        {self.first_name: open_device.device_power,
+         self.second_name: created_device.device_power},
+        off_time=1, stagger=0.5, no_wait=False)
+    created_device.close.assert_called_once()
+    open_device.close.assert_not_called()
+
+  def test_power_cycle_devices_without_device_power(self):
+    """Tests power_cycle_devices() raises for devices without device_power."""
+    self.uut = self._create_manager_object()
+    created_device = mock.MagicMock()
+    created_device.has_capabilities.return_value = False
+    with mock.patch.object(
+        self.uut, "create_device", return_value=created_device):
+      with self.assertRaisesRegex(
+          errors.DeviceError,
+          f"{self.first_name} does not support the device_power capability"):
+        self.uut.power_cycle_devices([self.first_name])
+    created_device.close.assert_called_once()
+
   def test_manager_create_devices_with_list_of_strings_successful(self):
     self.uut = self._create_manager_object()
     with _MockOutDevices():
@@ -1425,6 +1611,105 @@ class ManagerTests(
         side_effect=errors.DeviceError("Some error")):
       self.assertFalse(self.uut.is_device_connected("sshdevice-0000"))
 
+  def test_get_device_connection_statuses(self):
+    """Tests get_device_connection_statuses() and get_connected_devices()."""
+    self.uut = self._create_manager_object()
+    with mock.patch.object(
+        fake_devices.FakeSSHDevice,
+        "is_connected",
+        side_effect=lambda config: config["persistent"]["name"].endswith("0")):
+      self.assertEqual(
+          self.uut.get_device_connection_statuses(category="gazoo"),
+          {"sshdevice-0000": True, "sshdevice-0001": False})
+      self.assertEqual(self.uut.get_connected_devices(), ["sshdevice-0000"])
+
+  def test_get_device_connection_statuses_checks_concurrently(self):
+    """Tests devices are checked at the same time."""
+    self.uut = self._create_manager_object()
+    # Both checks have to be waiting at the barrier for either to return.
+    barrier = threading.Barrier(2, timeout=5)
+    with mock.patch.object(
+        fake_devices.FakeSSHDevice,
+        "is_connected",
+        side_effect=lambda config: barrier.wait() is not None):
+      self.assertEqual(
+          self.uut.get_device_connection_statuses(
+              ["sshdevice-0000", "sshdevice-0001"]),
+          {"sshdevice-0000": True, "sshdevice-0001": True})
+
+  def test_get_device_connection_statuses_reuses_results(self):
+    """Tests results are reused for connection_status_ttl seconds."""
+    self.uut = self._create_manager_object()
+    with mock.patch.object(
+        config_gdm, "CONNECTION_STATUS_FILE",
+        os.path.join(self.artifacts_directory, "connection_statuses.json")
+    ), mock.patch.object(
+        fake_devices.FakeSSHDevice, "is_connected",
+        return_value=True) as mock_is_connected:
+      # Devices are checked on every call by default.
+      self.uut.get_connected_devices()
+      self.uut.get_connected_devices()
+      self.assertEqual(mock_is_connected.call_count, 4)
+
+      self.uut.connection_status_ttl = 60
+      mock_is_connected.return_value = False
+      self.assertEqual(self.uut.get_connected_devices(),
+                       ["sshdevice-0000", "sshdevice-0001"])
+      self.assertEqual(mock_is_connected.call_count, 4)
+
+  def test_get_device_connection_statuses_shared_between_managers(self):
+    """Tests results are reused by the Managers of other processes."""
+    status_file = os.path.join(self.artifacts_directory,
+                               "connection_statuses.json")
+    self.uut = self._create_manager_object()
+    self.uut.connection_status_ttl = 60
+    with mock.patch.object(config_gdm, "CONNECTION_STATUS_FILE", status_file):
+      with mock.patch.object(
+          fake_devices.FakeSSHDevice, "is_connected",
+          return_value=True) as mock_is_connected:
+        self.uut.get_connected_devices()
+        self.assertEqual(mock_is_connected.call_count, 2)
+
+        # Managers created by CLI commands read the TTL from the GDM config.
+        other_manager = self._create_manager_object()
+        other_manager.config[config_gdm.CONNECTION_STATUS_TTL_CONFIG] = 60
+        try:
+          self.assertEqual(other_manager.get_connected_devices(),
+                           ["sshdevice-0000", "sshdevice-0001"])
+          self.assertEqual(mock_is_connected.call_count, 2)
+
+          # Statuses older than the TTL are checked again.
+          with mock.patch.object(
+              manager.time, "time", return_value=time.time() + 61):
+            other_manager.get_connected_devices()
+          self.assertEqual(mock_is_connected.call_count, 4)
+        finally:
+          other_manager.close()
+
+  def test_get_device_connection_statuses_unreadable_file(self):
+    """Tests an unreadable connection status file is ignored."""
+    status_file = os.path.join(self.artifacts_directory,
+                               "connection_statuses.json")
+    with open(status_file, "w") as open_file:
+      open_file.write("not json")
+    self.uut = self._create_manager_object()
+    self.uut.connection_status_ttl = 60
+    with mock.patch.object(config_gdm, "CONNECTION_STATUS_FILE", status_file):
+      with mock.patch.object(
+          fake_devices.FakeSSHDevice, "is_connected", return_value=True):
+        self.assertEqual(self.uut.get_connected_devices(),
+                         ["sshdevice-0000", "sshdevice-0001"])
+    with open(status_file) as open_file:
+      self.assertCountEqual(json.load(open_file),
+                            ["sshdevice-0000", "sshdevice-0001"])
+
+  def test_get_device_connection_statuses_unknown_device(self):
+    """Tests get_device_connection_statuses() raises for unknown devices."""
+    self.uut = self._create_manager_object()
+    with self.assertRaisesRegex(errors.DeviceError,
+                                r"\['sshdevice-9999'\] are not known"):
+      self.uut.get_device_connection_statuses(["sshdevice-9999"])
+
   def test_get_device_name_not_string(self):
     """Test that get_device_name() raises when identifier is not a string."""
     self.uut = self._create_manager_object()
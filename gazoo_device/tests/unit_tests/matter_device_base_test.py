@@ -239,6 +239,30 @@ class MatterDeviceTest(fake_device_test_case.FakeDeviceTestCase):
     """Verifies get firmware_version on success."""
     self.assertEqual(self.uut.firmware_version, _FAKE_FIRMWARE_VERSION)
 
+  def test_matter_descriptor_cache_disabled_by_default(self):
+    """Verifies the endpoints are not persisted unless enabled."""
+    self.assertFalse(self.uut.matter_descriptor_cache)
+    self.assertIsNone(self.uut.matter_endpoints._firmware_identity_fn)
+
+  def test_matter_descriptor_cache_enabled(self):
+    """Verifies the endpoints are persisted once enabled."""
+    self.uut.props["optional"]["matter_descriptor_cache"] = True
+    self.assertTrue(self.uut.matter_descriptor_cache)
+    self.assertEqual(self.uut.matter_endpoints._firmware_identity_fn,
+                     self.uut._get_matter_firmware_identity)
+
+  @mock.patch.object(
+      pwrpc_common_default.PwRPCCommonDefault,
+      "software_version",
+      new_callable=mock.PropertyMock,
+      return_value=_FAKE_FIRMWARE_VERSION)
+  def test_get_matter_firmware_identity(self, unused_mock_sw_version):
+    """Verifies the persisted endpoints are keyed by the firmware identity."""
+    self.assertEqual(
+        self.uut._get_matter_firmware_identity(),
+        f"{self.uut.device_type}:{self.uut.serial_number}:"
+        f"{_FAKE_FIRMWARE_VERSION}")
+
   @mock.patch.object(
       matter_endpoints_accessor_pw_rpc.MatterEndpointsAccessorPwRpc,
       "get_endpoint_class_and_device_type_id",
@@ -145,6 +145,32 @@ class DataFramerTests(unit_test_case.UnitTestCase):
         double_line_return_string, begin=len(partial_string), cleanends=True)
     self._verify_split(gen, [double_line_return_string.rstrip() + "\n"])
 
+  def test_012_data_framer_split_newlines_only_multiple_lines(self):
+    """Test split_newlines_only splits multiple lines like it always has."""
+    raw_data = "one\r\r\ntwo\n\r\nthree\r\npartial\r"
+    test_cases = [
+        ({}, ["one\r\r\n", "two\n", "\r\n", "three\r\n", "partial\r"]),
+        ({"keepends": False},
+         ["one\r\r", "two", "\r", "three\r", "partial\r"]),
+        ({"cleanends": True},
+         ["one\n", "two\n", "\n", "three\n", "partial\r"]),
+        ({"keepends": False, "cleanends": True},
+         ["one", "two", "", "three", "partial\r"]),
+        # Newlines before begin are not split on.
+        ({"begin": 6}, ["one\r\r\ntwo\n", "\r\n", "three\r\n", "partial\r"]),
+        ({"begin": 7, "cleanends": True},
+         ["one\r\r\ntwo\n", "\n", "three\n", "partial\r"]),
+        # Characters after end are returned as the last line...
+        ({"end": 14}, ["one\r\r\n", "two\n", "\r\n", "three\r\npartial\r"]),
+        # ...unless a newline is the last character before end.
+        ({"end": 10}, ["one\r\r\n", "two\n"]),
+    ]
+    for kwargs, expected_lines in test_cases:
+      with self.subTest(kwargs=kwargs):
+        self.assertEqual(
+            list(data_framer.split_newlines_only(raw_data, **kwargs)),
+            expected_lines)
+
   def test_030_log_framer_yields_partial_line(self):
     """Test LogFramer class yields partial line without newline."""
     log_line = "my custom log line"
@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests the log_process.py module."""
+import codecs
 import datetime
+import json
 import os
 import re
 import time
@@ -38,6 +40,9 @@ _EVENT_LOG_MESSAGE = ("<2017-07-01 12:23:43.123456> GDM-0: [APPL] Some "
 _EVENT_LINE_RETURN_LOG_MESSAGE = (
     "<2017-07-01 12:23:43.123456> GDM-0: \r[APPL] "
     "Some non-existent message with extra line return chars\r")
+_MULTILINE_LOG_MESSAGE = (
+    "<2017-07-01 12:23:43.123456> GDM-M: Note: Some traceback\n"
+    "<2017-07-01 12:23:43.123456> GDM-M: [APPL] Some non-existent message\n")
 _WRITE_TIMEOUT = 1
 
 wait_for_queue_writes = switchboard_process.wait_for_queue_writes
@@ -790,6 +795,363 @@ class LogWriterProcessTests(unit_test_case.MultiprocessingTestCase):
         os.path.exists(next_log_path),
         "Expected no log rotation to {}".format(next_log_path))
 
+  def test_220_log_writer_writes_non_ascii_log_lines_as_utf8(self):
+    """Test LogWriterProcess writes the same bytes as a codecs utf-8 file."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    expected_path = os.path.join(self.artifacts_directory,
+                                 self._testMethodName + "-expected.txt")
+    self.uut = log_process.LogWriterProcess("fake_device",
+                                            self.exception_queue,
+                                            self.command_queue, self.log_queue,
+                                            log_path)
+    switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+    switchboard_process.put_message(self.log_queue, _PARTIAL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    with codecs.open(expected_path, "a", encoding="utf-8") as expected_file:
+      expected_file.write(_EVENT_LOG_MESSAGE)
+      expected_file.write(_PARTIAL_LOG_MESSAGE + "[NO EOL]\n")
+    with open(log_path, "rb") as log_file:
+      log_data = log_file.read()
+    with open(expected_path, "rb") as expected_file:
+      self.assertEqual(expected_file.read(), log_data)
+
+  def test_221_log_writer_rotates_at_log_size_in_bytes(self):
+    """Test LogWriterProcess counts log size in utf-8 bytes for rotation."""
+    log_size = len(_EVENT_LOG_MESSAGE.encode("utf-8"))
+    for max_log_size, expect_rotation in ((log_size, True),
+                                          (log_size + 1, False)):
+      log_dir = os.path.join(self.artifacts_directory, self._testMethodName,
+                             str(max_log_size))
+      old_log_path = os.path.join(log_dir, "fake-device.txt")
+      new_log_path = os.path.join(log_dir, "fake-device.00001.txt")
+      self.uut = log_process.LogWriterProcess(
+          "fake_device",
+          self.exception_queue,
+          self.command_queue,
+          self.log_queue,
+          old_log_path,
+          max_log_size=max_log_size)
+      switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+      wait_for_queue_writes(self.log_queue)
+      self.uut._pre_run_hook()
+      self.uut._do_work()
+      self.uut._post_run_hook()
+      self.assertEqual(expect_rotation, os.path.exists(new_log_path),
+                       "max_log_size {}".format(max_log_size))
+
+  def test_300_log_writer_batches_log_lines(self):
+    """Test buffered LogWriterProcess writes log lines in batches."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        max_batch_lines=2,
+        flush_size=len(_FULL_LOG_MESSAGE) * 2,
+        flush_interval=60)
+    for _ in range(3):
+      switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()  # Writes and flushes 2 log lines
+    self._verify_log_file_and_lines(log_path, 2)
+    self.uut._do_work()  # Buffers the third log line
+    self._verify_log_file_and_lines(log_path, 2)
+    self.uut._post_run_hook()
+    self._verify_log_file_and_lines(log_path, 3)
+
+  def test_301_log_writer_flushes_after_flush_interval(self):
+    """Test buffered LogWriterProcess flushes log lines after flush_interval."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        max_batch_lines=10,
+        flush_size=1024,
+        flush_interval=0.05)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()  # Buffers the log line
+    self._verify_log_file_and_lines(log_path, 0)
+    time.sleep(0.05)
+    self.uut._do_work()  # Flush interval has passed
+    self._verify_log_file_and_lines(log_path, 1)
+    self.uut._post_run_hook()
+
+  def test_302_log_writer_flush_command_drains_log_queue(self):
+    """Test CMD_FLUSH writes all queued and buffered log lines."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        max_batch_lines=1,
+        flush_size=1024,
+        flush_interval=60)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    switchboard_process.put_message(self.log_queue, _SHORT_LOG_MESSAGE)
+    switchboard_process.put_message(self.log_queue, _PARTIAL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()  # Buffers the first log line
+    self._verify_log_file_and_lines(log_path, 0)
+    switchboard_process.put_message(self.command_queue,
+                                    (log_process.CMD_FLUSH, 1))
+    wait_for_queue_writes(self.command_queue)
+    self.uut._do_work()  # Flushes all log lines
+    lines = self._verify_log_file_and_lines(log_path, 3)
+    self.assertEqual(lines[0], _FULL_LOG_MESSAGE)
+    self.assertEqual(lines[1], _SHORT_LOG_MESSAGE)
+    self.assertIn("[NO EOL]", lines[2])
+    self.assertEqual(self.uut._flushed_request_id.value, 1)
+    self.assertTrue(self.uut._flush_done.is_set())
+    self.uut._post_run_hook()
+
+  def test_303_log_writer_buffered_rotates_log_file(self):
+    """Test buffered LogWriterProcess rotates log file inside of a batch."""
+    max_log_size = len(_FULL_LOG_MESSAGE)
+    old_log_path = os.path.join(self.artifacts_directory, self._testMethodName,
+                                "fake-device.txt")
+    new_log_path = os.path.join(self.artifacts_directory, self._testMethodName,
+                                "fake-device.00001.txt")
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        old_log_path,
+        max_log_size=max_log_size,
+        max_batch_lines=10,
+        flush_size=1024,
+        flush_interval=60)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    switchboard_process.put_message(self.log_queue, _SHORT_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    old_lines = self._verify_log_file_and_lines(old_log_path, 2)
+    new_lines = self._verify_log_file_and_lines(new_log_path, 1)
+    self.assertIn(log_process.ROTATE_LOG_MESSAGE, old_lines[1])
+    self.assertEqual(new_lines[0], _SHORT_LOG_MESSAGE)
+
+  def test_304_log_writer_flush_request_in_log_queue(self):
+    """Test a flush request flushes the log lines queued before it."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        max_batch_lines=10,
+        flush_size=1024,
+        flush_interval=60)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    log_process.request_flush(self.log_queue)
+    switchboard_process.put_message(self.log_queue, _SHORT_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    lines = self._verify_log_file_and_lines(log_path, 1)
+    self.assertEqual(lines[0], _FULL_LOG_MESSAGE)
+    self.assertEqual(self.uut._write_buffer,
+                     [_SHORT_LOG_MESSAGE.encode("utf-8")])
+    self.assertEqual(self.uut._flushed_request_id.value, 0)
+    self.uut._post_run_hook()
+
+  def test_400_log_writer_with_parser_writes_events(self):
+    """Test LogWriterProcess with a parser writes events for log lines."""
+    filter_file = os.path.join(self.TEST_FILTER_DIR,
+                               "optional_description.json")
+    parser_obj = event_parser_default.EventParserDefault(
+        [filter_file], event_file_path="/foo.txt", device_name="device-1234")
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    event_path = log_process.get_event_filename(log_path)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        parser=parser_obj)
+    switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    self._verify_log_file_and_lines(log_path, 2)
+    with open(event_path, encoding="utf-8") as event_file:
+      events = event_file.readlines()
+    self.assertLen(events, 1)
+    self.assertIn("optional_description.my_message", events[0])
+    self.assertIn(log_file_name, events[0])
+
+  def test_401_log_writer_without_events_removes_event_file(self):
+    """Test LogWriterProcess with a parser removes an empty event file."""
+    parser_obj = event_parser_default.EventParserDefault(
+        [], event_file_path="/foo.txt", device_name="device-1234")
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    event_path = log_process.get_event_filename(log_path)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        parser=parser_obj)
+    switchboard_process.put_message(self.log_queue, _FULL_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    self._verify_log_file_and_lines(log_path, 1)
+    self.assertFalse(os.path.exists(event_path))
+
+  def test_402_log_writer_with_parser_uses_new_event_file(self):
+    """Test LogWriterProcess switches event file only for a new log file."""
+    filter_file = os.path.join(self.TEST_FILTER_DIR,
+                               "optional_description.json")
+    parser_obj = event_parser_default.EventParserDefault(
+        [filter_file], event_file_path="/foo.txt", device_name="device-1234")
+    log_dir = os.path.join(self.artifacts_directory, self._testMethodName)
+    old_log_path = os.path.join(log_dir, "fake-device.txt")
+    rotated_log_path = os.path.join(log_dir, "fake-device.00001.txt")
+    new_log_path = os.path.join(log_dir, "new-fake-device.txt")
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        old_log_path,
+        max_log_size=len(_EVENT_LOG_MESSAGE.encode("utf-8")),
+        parser=parser_obj)
+    self.uut._pre_run_hook()
+    switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._do_work()  # Writes the event and rotates the log file
+    self.assertTrue(os.path.exists(rotated_log_path))
+    switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._do_work()  # Writes the event and rotates the log file again
+    self.uut.send_command(log_process.CMD_NEW_LOG_FILE, new_log_path)
+    wait_for_queue_writes(self.command_queue)
+    self.uut._do_work()
+    switchboard_process.put_message(self.log_queue, _EVENT_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    with open(log_process.get_event_filename(old_log_path),
+              encoding="utf-8") as event_file:
+      old_events = event_file.readlines()
+    with open(log_process.get_event_filename(new_log_path),
+              encoding="utf-8") as event_file:
+      new_events = event_file.readlines()
+    self.assertLen(old_events, 2)
+    self.assertIn("fake-device.txt", old_events[0])
+    self.assertIn("fake-device.00001.txt", old_events[1])
+    self.assertLen(new_events, 1)
+    self.assertIn("new-fake-device.txt", new_events[0])
+    self.assertFalse(
+        os.path.exists(log_process.get_event_filename(rotated_log_path)))
+
+  def test_403_log_writer_with_parser_adds_new_filter(self):
+    """Test LogWriterProcess with a parser loads filters on command."""
+    mock_parser = mock.MagicMock(spec=event_parser_default.EventParserDefault)
+    filter_file = os.path.join(self.TEST_FILTER_DIR,
+                               "optional_description.json")
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        parser=mock_parser)
+    self.uut._pre_run_hook()
+    self.uut.send_command(log_process.CMD_ADD_NEW_FILTER, filter_file)
+    wait_for_queue_writes(self.command_queue)
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    mock_parser.load_filter_file.assert_called_once_with(filter_file)
+
+  def test_404_log_writer_without_parser_rejects_add_new_filter(self):
+    """Test LogWriterProcess without a parser rejects CMD_ADD_NEW_FILTER."""
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    self.uut = log_process.LogWriterProcess("fake_device", self.exception_queue,
+                                            self.command_queue, self.log_queue,
+                                            log_path)
+    with self.assertRaisesRegex(ValueError, "not a valid command"):
+      self.uut.send_command(log_process.CMD_ADD_NEW_FILTER, "/some/filter")
+
+  def test_405_log_writer_with_parser_frames_multiline_log_notes(self):
+    """Test LogWriterProcess filters multi-line log lines as LogFilterProcess."""
+    filter_file = os.path.join(self.TEST_FILTER_DIR,
+                               "optional_description.json")
+    log_file_name = self._testMethodName + ".txt"
+    log_path = os.path.join(self.artifacts_directory, log_file_name)
+    event_path = log_process.get_event_filename(log_path)
+    parser_obj = event_parser_default.EventParserDefault(
+        [filter_file], event_file_path=event_path, device_name="device-1234")
+    self.uut = log_process.LogWriterProcess(
+        "fake_device",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        log_path,
+        parser=parser_obj)
+    switchboard_process.put_message(self.log_queue, _MULTILINE_LOG_MESSAGE)
+    wait_for_queue_writes(self.log_queue)
+    self.uut._pre_run_hook()
+    self.uut._do_work()
+    self.uut._post_run_hook()
+    with open(event_path, encoding="utf-8") as event_file:
+      inline_events = event_file.readlines()
+    os.remove(event_path)
+
+    filter_process = log_process.LogFilterProcess(
+        "fake_device", self.exception_queue, self.command_queue, parser_obj,
+        log_path)
+    filter_process._pre_run_hook()
+    filter_process._do_work()  # Opens the log file.
+    filter_process._do_work()  # Filters the log lines.
+    filter_process._post_run_hook()
+    del filter_process  # Release shared memory file descriptors.
+    with open(event_path, encoding="utf-8") as event_file:
+      filtered_events = event_file.readlines()
+    self.assertLen(inline_events, 1)
+    self.assertLen(filtered_events, 1)
+    inline_event = json.loads(inline_events[0])
+    filtered_event = json.loads(filtered_events[0])
+    del inline_event["matched_timestamp"]
+    del filtered_event["matched_timestamp"]
+    self.assertEqual(inline_event, filtered_event)
+    self.assertEqual(inline_event["raw_log_line"],
+                     "[APPL] Some non-existent message")
+
   def _verify_log_file_and_lines(self, log_path, count):
     filesize = os.path.getsize(log_path)
     if count > 0:
@@ -14,15 +14,21 @@
 
 """Switchboard unit test for pigweed_rpc_transport module."""
 import fcntl
+import functools
 import importlib
+import os
 import queue
 import select
 import socket
 import threading
+import time
 from unittest import mock
 
 from gazoo_device import errors
+from gazoo_device.protos import attributes_service_pb2
+from gazoo_device.protos import descriptor_service_pb2
 from gazoo_device.switchboard.transports import pigweed_rpc_transport
+from gazoo_device.tests.unit_tests.utils import fake_pigweed_hdlc_peer
 from gazoo_device.tests.unit_tests.utils import unit_test_case
 import serial
 
@@ -42,6 +48,14 @@ _DEFAULT_ADDRESS = ord("R")
 _FAKE_FILENO = 0
 _FAKE_SIZE = 0
 _FAKE_TIMEOUT = 0.01
+_ATTRIBUTES_PROTO_IMPORT_PATH = ("gazoo_device.protos.attributes_service_pb2",)
+_FAKE_DEVICE_PROTO_IMPORT_PATHS = (
+    "gazoo_device.protos.attributes_service_pb2",
+    "gazoo_device.protos.descriptor_service_pb2")
+_ON_OFF_READ_KWARGS = {"endpoint": 1, "cluster": 6, "attribute_id": 0,
+                       "type": 16, "pw_rpc_timeout_s": 1}
+_ON_OFF_LOG_REGEX = r"Endpoint 1, Cluster 0x0000_0006 update version"
+_UPDATE_TIMEOUT = 2
 
 _FAKE_PROTO_MODULE_PATH = (
     "gazoo_device.switchboard.transports.pigweed_rpc_transport.python_protos")
@@ -222,6 +236,37 @@ class PwHdlcRpcClientTest(unit_test_case.UnitTestCase):
     self.assertFalse(self.uut.log_queue.empty())
     self.assertEqual(_FAKE_FRAME + b"\n", self.uut.log_queue.queue[-1])
 
+  def test_log_listener(self):
+    """Verifies the log listener is called with each log line until removed."""
+    self.uut.log_queue = queue.Queue()
+    listener = mock.Mock()
+    self.uut.set_log_listener(listener)
+    self.uut._push_to_log_queue(mock.Mock(data=_FAKE_DATA.encode()))
+    listener.assert_called_once_with(_FAKE_DATA.encode())
+
+    self.uut.set_log_listener(None)
+    self.uut._push_to_log_queue(mock.Mock(data=_FAKE_DATA.encode()))
+    listener.assert_called_once()
+    self.assertEqual(2, self.uut.log_queue.qsize())
+
+  def test_get_logs_returns_all_queued_logs(self):
+    """Verifies get_logs returns queued logs and signals them on the fd."""
+    self.uut.log_queue = queue.Queue()
+    self.uut._log_read_fd, self.uut._log_write_fd = os.pipe()
+    os.set_blocking(self.uut._log_read_fd, False)
+    self.addCleanup(os.close, self.uut._log_read_fd)
+    self.addCleanup(os.close, self.uut._log_write_fd)
+    fileno = self.uut.get_log_fileno()
+    self.assertEqual(([], [], []), select.select([fileno], [], [], 0))
+
+    self.uut._push_to_log_queue(mock.Mock(data=b"first"))
+    self.uut._push_to_log_queue(mock.Mock(data=b"second"))
+
+    self.assertEqual([fileno], select.select([fileno], [], [], 0)[0])
+    self.assertEqual(b"first\nsecond\n", self.uut.get_logs(_FAKE_TIMEOUT))
+    self.assertEqual(([], [], []), select.select([fileno], [], [], 0))
+    self.assertEqual(b"", self.uut.get_logs(0))
+
   @mock.patch.object(
       pigweed_rpc_transport.PwHdlcRpcClient, "_handle_rpc_packet")
   def test_handle_frame_default_address_on_success(self, mock_handle):
@@ -342,6 +387,228 @@ class PigweedRpcModuleMethodsTest(unit_test_case.UnitTestCase):
           service_name=_FAKE_SERVICE,
           event_name=_FAKE_EVENT)
 
+  def test_rpc_batch_returns_payloads_in_order(self):
+    """Verifies _rpc_batch keeps at most max_in_flight calls pending."""
+    fake_ack = mock.Mock()
+    fake_ack.ok.return_value = True
+    fake_channel = mock.Mock()
+    invoke = fake_channel.fake_service.fake_event.invoke
+    invocations_at_wait = []
+
+    def fake_wait(i):
+      invocations_at_wait.append(invoke.call_count)
+      return fake_ack, f"payload-{i}"
+
+    fake_calls = [mock.Mock() for _ in range(3)]
+    for i, fake_call in enumerate(fake_calls):
+      fake_call.wait.side_effect = functools.partial(fake_wait, i)
+    invoke.side_effect = fake_calls
+    fake_client = mock.Mock(spec=pigweed_rpc_transport.PwHdlcRpcClient)
+    fake_client.is_alive.return_value = True
+    fake_client.rpcs.return_value.chip.rpc = fake_channel
+    requests = [(_FAKE_SERVICE, _FAKE_EVENT, {"key": i}) for i in range(3)]
+    requests[2][2]["pw_rpc_timeout_s"] = _FAKE_TIMEOUT
+
+    payloads = pigweed_rpc_transport._rpc_batch(
+        fake_client, requests, max_in_flight=2)
+
+    self.assertEqual(["payload-0", "payload-1", "payload-2"], payloads)
+    self.assertEqual([2, 3, 3], invocations_at_wait)
+    invoke.assert_has_calls([
+        mock.call(request_args={"key": 0}),
+        mock.call(request_args={"key": 1}),
+        mock.call(request_args={"key": 2}, timeout_s=_FAKE_TIMEOUT)])
+    for fake_call in fake_calls:
+      fake_call.cancel.assert_not_called()
+
+  def test_rpc_batch_ack_value_not_ok_cancels_pending_calls(self):
+    """Verifies _rpc_batch cancels the pending calls when an RPC fails."""
+    fake_ack = mock.Mock()
+    fake_ack.ok.return_value = False
+    fake_ack.name = "fake-error-message"
+    fake_ack.value = "fake-error-code"
+    fake_calls = [mock.Mock() for _ in range(2)]
+    fake_calls[0].wait.return_value = fake_ack, None
+    fake_channel = mock.Mock()
+    fake_channel.fake_service.fake_event.invoke.side_effect = fake_calls
+    fake_client = mock.Mock(spec=pigweed_rpc_transport.PwHdlcRpcClient)
+    fake_client.is_alive.return_value = True
+    fake_client.rpcs.return_value.chip.rpc = fake_channel
+
+    with self.assertRaisesRegex(
+        errors.DeviceError,
+        "Error message: fake-error-message. Error code: fake-error-code"):
+      pigweed_rpc_transport._rpc_batch(
+          fake_client, [(_FAKE_SERVICE, _FAKE_EVENT, {})] * 2, max_in_flight=2)
+
+    fake_calls[0].cancel.assert_not_called()
+    fake_calls[1].cancel.assert_called_once()
+    fake_calls[1].wait.assert_not_called()
+
+  def test_rpc_batch_one_call_in_flight_by_default(self):
+    """Verifies _rpc_batch waits for each response before the next call."""
+    fake_ack = mock.Mock()
+    fake_ack.ok.return_value = False
+    fake_channel = mock.Mock()
+    fake_channel.fake_service.fake_event.invoke.return_value.wait.return_value = (
+        fake_ack, None)
+    fake_client = mock.Mock(spec=pigweed_rpc_transport.PwHdlcRpcClient)
+    fake_client.is_alive.return_value = True
+    fake_client.rpcs.return_value.chip.rpc = fake_channel
+
+    with self.assertRaises(errors.DeviceError):
+      pigweed_rpc_transport._rpc_batch(
+          fake_client, [(_FAKE_SERVICE, _FAKE_EVENT, {})] * 2)
+
+    fake_channel.fake_service.fake_event.invoke.assert_called_once()
+
+  def test_rpc_batch_hdlc_client_not_alive(self):
+    """Verifies _rpc_batch on failure with not alive hdlc client."""
+    fake_client = mock.Mock(spec=pigweed_rpc_transport.PwHdlcRpcClient)
+    fake_client.is_alive.return_value = False
+
+    with self.assertRaisesRegex(errors.DeviceError, "HLDC client is not alive"):
+      pigweed_rpc_transport._rpc_batch(
+          fake_client, [(_FAKE_SERVICE, _FAKE_EVENT, {})])
+
+  def test_rpc_batch_with_fake_device(self):
+    """Verifies _rpc_batch pipelines RPCs over HDLC to a fake device."""
+    peer = fake_pigweed_hdlc_peer.FakePigweedHdlcPeer(latency=0.01)
+    self.addCleanup(peer.close)
+    client = pigweed_rpc_transport.PwHdlcRpcClient(
+        file_object=peer.client_socket,
+        protobuf_import_paths=_ATTRIBUTES_PROTO_IMPORT_PATH)
+    client.start()
+    self.addCleanup(client.close)
+    writes = [
+        ("Attributes", "Write", {
+            "data": {"data_uint8": value},
+            "metadata": {"endpoint": 1, "cluster": 8, "attribute_id": value}})
+        for value in range(6)]
+    reads = [
+        ("Attributes", "Read", {"endpoint": 1, "cluster": 8,
+                                "attribute_id": value})
+        for value in reversed(range(6))]
+
+    payloads = pigweed_rpc_transport._rpc_batch(
+        client, writes + reads, max_in_flight=3)
+
+    values = [attributes_service_pb2.AttributeData.FromString(payload)
+              .data_uint8 for payload in payloads[len(writes):]]
+    self.assertEqual([5, 4, 3, 2, 1, 0], values)
+    self.assertEqual(12, peer.requests)
+    self.assertEqual(3, peer.max_pending)
+
+
+class SubscriptionsTest(unit_test_case.UnitTestCase):
+  """Unit test for Pigweed RPC subscriptions with a fake device."""
+
+  def setUp(self):
+    super().setUp()
+    self.peer = fake_pigweed_hdlc_peer.FakePigweedHdlcPeer(latency=0.01)
+    self.addCleanup(self.peer.close)
+    self.client = pigweed_rpc_transport.PwHdlcRpcClient(
+        file_object=self.peer.client_socket,
+        protobuf_import_paths=_FAKE_DEVICE_PROTO_IMPORT_PATHS)
+    self.client.start()
+    self.addCleanup(self.client.close)
+    self.update_queue = queue.Queue()
+    self.uut = pigweed_rpc_transport._Subscriptions(
+        self.client, self.update_queue)
+    self.addCleanup(self.uut.close)
+
+  def test_subscribe_pushes_stream_responses(self):
+    """Verifies each stream response is an update and None ends the stream."""
+    self.peer.endpoints = [1, 2]
+    self.uut.subscribe(7, "Descriptor", "PartsList", endpoint=0,
+                       pw_rpc_timeout_s=1)
+
+    updates = [self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+               for _ in range(3)]
+
+    self.assertEqual(
+        [(7, descriptor_service_pb2.Endpoint(endpoint=1).SerializeToString()),
+         (7, descriptor_service_pb2.Endpoint(endpoint=2).SerializeToString()),
+         (7, None)],
+        updates)
+
+  def test_watch_pushes_changes_on_matching_logs(self):
+    """Verifies a watched RPC is only called again on matching logs."""
+    self.uut.watch(8, "Attributes", "Read", log_regex=_ON_OFF_LOG_REGEX,
+                   **_ON_OFF_READ_KWARGS)
+    self.assertEqual((8, b""), self.update_queue.get(timeout=_UPDATE_TIMEOUT))
+    requests = self.peer.requests
+
+    for _ in range(10):
+      self.peer.log("<inf> chip: [DL]Unrelated log line")
+    self.peer.set_attribute(
+        2, 6, 0, attributes_service_pb2.AttributeData(data_bool=True))
+    time.sleep(0.2)
+    self.assertTrue(self.update_queue.empty())
+    self.assertEqual(requests, self.peer.requests)
+    self.peer.set_attribute(
+        1, 6, 0, attributes_service_pb2.AttributeData(data_bool=True))
+
+    subscription_id, payload = self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+    self.assertEqual(8, subscription_id)
+    self.assertTrue(
+        attributes_service_pb2.AttributeData.FromString(payload).data_bool)
+    self.assertEqual(requests + 1, self.peer.requests)
+
+  def test_watch_ignores_unchanged_payloads(self):
+    """Verifies changes of other attributes of the cluster push no update."""
+    self.uut.watch(9, "Attributes", "Read", log_regex=_ON_OFF_LOG_REGEX,
+                   **_ON_OFF_READ_KWARGS)
+    self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+
+    self.peer.set_attribute(
+        1, 6, 1, attributes_service_pb2.AttributeData(data_uint8=1))
+    time.sleep(0.1)
+    self.peer.set_attribute(
+        1, 6, 0, attributes_service_pb2.AttributeData(data_bool=True))
+
+    _, payload = self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+    self.assertTrue(
+        attributes_service_pb2.AttributeData.FromString(payload).data_bool)
+
+  @mock.patch.object(pigweed_rpc_transport, "_WATCH_REFRESH_INTERVAL_SEC", 0.1)
+  def test_watch_refreshed_periodically(self):
+    """Verifies watched RPCs are called periodically without matching logs."""
+    self.uut.watch(12, "Attributes", "Read", **_ON_OFF_READ_KWARGS)
+    self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+
+    self.peer.attributes[(1, 6, 0)] = attributes_service_pb2.AttributeData(
+        data_bool=True)
+
+    _, payload = self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+    self.assertTrue(
+        attributes_service_pb2.AttributeData.FromString(payload).data_bool)
+
+  def test_unsubscribe(self):
+    """Verifies unsubscribed watches don't push updates."""
+    self.uut.watch(10, "Attributes", "Read", log_regex=_ON_OFF_LOG_REGEX,
+                   **_ON_OFF_READ_KWARGS)
+    self.update_queue.get(timeout=_UPDATE_TIMEOUT)
+
+    self.uut.unsubscribe(10)
+    self.uut.unsubscribe(10)
+    self.peer.set_attribute(
+        1, 6, 0, attributes_service_pb2.AttributeData(data_bool=True))
+
+    with self.assertRaises(queue.Empty):
+      self.update_queue.get(timeout=0.1)
+
+  def test_watch_hdlc_client_not_alive(self):
+    """Verifies watch on failure with not alive hdlc client."""
+    fake_client = mock.Mock(spec=pigweed_rpc_transport.PwHdlcRpcClient)
+    fake_client.is_alive.return_value = False
+    uut = pigweed_rpc_transport._Subscriptions(fake_client, queue.Queue())
+
+    with self.assertRaisesRegex(errors.DeviceError, "HLDC client is not alive"):
+      uut.watch(11, "Attributes", "Read", **_ON_OFF_READ_KWARGS)
+    with self.assertRaisesRegex(errors.DeviceError, "HLDC client is not alive"):
+      uut.subscribe(11, "Descriptor", "PartsList", endpoint=0)
+
 
 class PigweedRpcSerialTransportTest(unit_test_case.UnitTestCase):
   """Unit test for Pigweed RPC serial transport."""
@@ -360,7 +627,8 @@ class PigweedRpcSerialTransportTest(unit_test_case.UnitTestCase):
     self.uut = pigweed_rpc_transport.PigweedRpcSerialTransport(
         comms_address=_FAKE_DEVICE_ADDRESS,
         protobuf_import_paths=_FAKE_PROTO_IMPORT_PATH,
-        baudrate=_FAKE_BAUDRATE)
+        baudrate=_FAKE_BAUDRATE,
+        subscriptions=True)
 
   def test_transport_is_open(self):
     """Verifies PwRPC transport is_open method on success."""
@@ -390,9 +658,18 @@ class PigweedRpcSerialTransportTest(unit_test_case.UnitTestCase):
 
   def test_transport_read(self):
     """Verifies PwRPC transport read method."""
-    self.fake_client.log_queue.get.side_effect = [_FAKE_HDLC_LOG, queue.Empty]
+    self.fake_client.get_logs.side_effect = [_FAKE_HDLC_LOG, b""]
     self.assertEqual(_FAKE_HDLC_LOG, self.uut.read(_FAKE_SIZE, _FAKE_TIMEOUT))
     self.assertEqual(b"", self.uut.read(_FAKE_SIZE, _FAKE_TIMEOUT))
+    self.fake_client.get_logs.assert_called_with(_FAKE_TIMEOUT)
+
+  def test_transport_fileno(self):
+    """Verifies PwRPC transport fileno method."""
+    self.fake_client.get_log_fileno.return_value = _FAKE_FILENO
+    self.fake_client.is_alive.return_value = False
+    self.assertIsNone(self.uut.fileno())
+    self.fake_client.is_alive.return_value = True
+    self.assertEqual(_FAKE_FILENO, self.uut.fileno())
 
   def test_transport_write(self):
     """Verifies PwRPC transport write method."""
@@ -404,6 +681,53 @@ class PigweedRpcSerialTransportTest(unit_test_case.UnitTestCase):
     self.uut.rpc(service_name=_FAKE_SERVICE, event_name=_FAKE_EVENT)
     mock_rpc.assert_called_once()
 
+  @mock.patch.object(pigweed_rpc_transport, "_Subscriptions")
+  def test_transport_subscriptions(self, mock_subscriptions_class):
+    """Verifies the transport subscription methods on success."""
+    self.fake_client.is_alive.return_value = True
+    self.fake_serial.isOpen.return_value = True
+    with mock.patch.object(fcntl, "fcntl"):
+      self.uut._open()
+    mock_subscriptions = mock_subscriptions_class.return_value
+    mock_subscriptions_class.assert_called_once_with(
+        self.fake_client, self.uut.update_queue)
+
+    self.uut.subscribe(1, _FAKE_SERVICE, _FAKE_EVENT, key="value")
+    self.uut.watch(2, _FAKE_SERVICE, _FAKE_EVENT)
+    self.uut.unsubscribe(1)
+    with mock.patch.object(fcntl, "flock"):
+      self.uut._close()
+
+    mock_subscriptions.subscribe.assert_called_once_with(
+        1, _FAKE_SERVICE, _FAKE_EVENT, key="value")
+    mock_subscriptions.watch.assert_called_once_with(
+        2, _FAKE_SERVICE, _FAKE_EVENT, log_regex=None)
+    mock_subscriptions.unsubscribe.assert_called_once_with(1)
+    mock_subscriptions.close.assert_called_once()
+
+  def test_transport_without_subscriptions(self):
+    """Verifies subscriptions are unavailable unless requested."""
+    uut = pigweed_rpc_transport.PigweedRpcSerialTransport(
+        comms_address=_FAKE_DEVICE_ADDRESS,
+        protobuf_import_paths=_FAKE_PROTO_IMPORT_PATH,
+        baudrate=_FAKE_BAUDRATE)
+    self.assertIsNone(uut.update_queue)
+    with self.assertRaisesRegex(errors.DeviceError, "without subscriptions"):
+      uut.subscribe(1, _FAKE_SERVICE, _FAKE_EVENT)
+
+  def test_transport_subscribe_not_open(self):
+    """Verifies the transport subscribe method when it is not open."""
+    with self.assertRaisesRegex(errors.DeviceError, "HLDC client is not alive"):
+      self.uut.subscribe(1, _FAKE_SERVICE, _FAKE_EVENT)
+
+  @mock.patch.object(pigweed_rpc_transport, "_rpc_batch")
+  def test_transport_rpc_batch(self, mock_rpc_batch):
+    """Verifies the transport rpc_batch method on success."""
+    requests = [(_FAKE_SERVICE, _FAKE_EVENT, {})]
+    self.uut.rpc_batch(requests)
+    mock_rpc_batch.assert_called_once_with(
+        self.fake_client, requests, pigweed_rpc_transport._MAX_RPCS_IN_FLIGHT)
+
 
 class PigweedRpcSocketTransportTest(unit_test_case.UnitTestCase):
   """Unit test for Pigweed RPC socket transport."""
@@ -421,7 +745,8 @@ class PigweedRpcSocketTransportTest(unit_test_case.UnitTestCase):
     self.uut = pigweed_rpc_transport.PigweedRpcSocketTransport(
         comms_address=_FAKE_DEVICE_ADDRESS,
         protobuf_import_paths=_FAKE_PROTO_IMPORT_PATH,
-        port=_FAKE_PORT)
+        port=_FAKE_PORT,
+        subscriptions=True)
 
   def test_transport_is_open(self):
     """Verifies if the transport is_open method on success."""
@@ -447,9 +772,10 @@ class PigweedRpcSocketTransportTest(unit_test_case.UnitTestCase):
   def test_transport_read(self):
     """Verifies the transport read method on success."""
     self.uut._open()
-    self.fake_client.log_queue.get.side_effect = [_FAKE_HDLC_LOG, queue.Empty]
+    self.fake_client.get_logs.side_effect = [_FAKE_HDLC_LOG, b""]
     self.assertEqual(_FAKE_HDLC_LOG, self.uut.read(_FAKE_SIZE, _FAKE_TIMEOUT))
     self.assertEqual(b"", self.uut.read(_FAKE_SIZE, _FAKE_TIMEOUT))
+    self.fake_client.get_logs.assert_called_with(_FAKE_TIMEOUT)
 
   def test_transport_write(self):
     """Verifies the transport write method on success.."""
@@ -461,6 +787,30 @@ class PigweedRpcSocketTransportTest(unit_test_case.UnitTestCase):
     self.uut.rpc(service_name=_FAKE_SERVICE, event_name=_FAKE_EVENT)
     mock_rpc.assert_called_once()
 
+  @mock.patch.object(pigweed_rpc_transport, "_Subscriptions")
+  def test_transport_subscriptions(self, mock_subscriptions_class):
+    """Verifies the transport subscription methods on success."""
+    self.uut._open()
+    self.fake_client.is_alive.return_value = True
+    mock_subscriptions = mock_subscriptions_class.return_value
+
+    self.uut.watch(2, _FAKE_SERVICE, _FAKE_EVENT, log_regex="changed",
+                   key="value")
+    self.uut._close()
+
+    mock_subscriptions.watch.assert_called_once_with(
+        2, _FAKE_SERVICE, _FAKE_EVENT, log_regex="changed", key="value")
+    mock_subscriptions.close.assert_called_once()
+
+  @mock.patch.object(pigweed_rpc_transport, "_rpc_batch")
+  def test_transport_rpc_batch(self, mock_rpc_batch):
+    """Verifies the transport rpc_batch method on success."""
+    self.uut._open()
+    requests = [(_FAKE_SERVICE, _FAKE_EVENT, {})]
+    self.uut.rpc_batch(requests)
+    mock_rpc_batch.assert_called_once_with(
+        self.fake_client, requests, pigweed_rpc_transport._MAX_RPCS_IN_FLIGHT)
+
 
 if __name__ == "__main__":
   unit_test_case.main()
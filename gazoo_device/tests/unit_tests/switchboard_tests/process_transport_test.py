@@ -14,6 +14,7 @@
 
 """Tests the process_transport.py module."""
 import os
+import select
 import time
 from unittest import mock
 
@@ -232,6 +233,21 @@ class ProcessTransportTests(unit_test_case.MultiprocessingTestCase):
         "", out.decode(),
         "Expected Empty string for read timeout found {!r}.".format(out))
 
+  def test_112_transport_fileno_read_without_blocking(self):
+    """Process transport data can be read without blocking once fd is ready."""
+    self.uut = self._create_transport("cat", ["-"])
+    self.assertIsNone(self.uut.fileno())
+    self.uut.open()
+    self.assertEqual(self.uut.read(size=1024, timeout=0), b"")
+    data = b"SOME DATA\n"
+    self.uut.write(data)
+    readable, _, _ = select.select([self.uut.fileno()], [], [], 5)
+    self.assertTrue(readable)
+    time.sleep(0.1)
+    self.assertIn(data.strip(), self.uut.read(size=1024, timeout=0))
+    self.uut.close()
+    self.assertIsNone(self.uut.fileno())
+
 
 class PtyProcessTransportTests(ProcessTransportTests):
   """Tests the pty_transport.py module."""
@@ -0,0 +1,196 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the switchboard_host.py module."""
+import multiprocessing.resource_sharer
+import os
+import time
+
+from gazoo_device.switchboard import log_process
+from gazoo_device.switchboard import switchboard_host
+from gazoo_device.switchboard import switchboard_process
+from gazoo_device.switchboard import transport_process
+from gazoo_device.tests.unit_tests.utils import fake_transport
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import multiprocessing_utils
+
+_WAIT_TIMEOUT = 5
+
+
+class SwitchboardHostTests(unit_test_case.MultiprocessingTestCase):
+  """Tests for SwitchboardHost."""
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    # The resource sharer opens a listening socket on first use, which stays
+    # open. Use it before the FD leak check starts.
+    read_fd, write_fd = os.pipe()
+    os.close(multiprocessing.resource_sharer.DupFd(read_fd).detach())
+    os.close(read_fd)
+    os.close(write_fd)
+
+  def setUp(self):
+    super().setUp()
+    self.command_queues = []
+    self.log_queue = multiprocessing_utils.get_context().Queue()
+    self.uut = switchboard_host.SwitchboardHost(
+        "switchboard_host", self.artifacts_directory)
+
+  def tearDown(self):
+    self.uut.close()
+    del self.uut
+    del self.command_queues
+    del self.log_queue
+    super().tearDown()
+
+  def _create_transport_process(self, device_name, transport):
+    command_queue = multiprocessing_utils.get_context().Queue()
+    self.command_queues.append(command_queue)
+    process = transport_process.TransportProcess(
+        device_name,
+        self.exception_queue,
+        command_queue,
+        self.log_queue,
+        os.path.join(self.artifacts_directory, device_name + ".txt"),
+        transport)
+    process.set_host(self.uut)
+    return process
+
+  def test_processes_of_several_devices_run_in_one_host_process(self):
+    """Verifies hosted transport processes work and share the host process."""
+    transports = [fake_transport.FakeTransport() for _ in range(2)]
+    processes = [
+        self._create_transport_process(f"device-{i}", transport)
+        for i, transport in enumerate(transports)
+    ]
+    for process in processes:
+      process.start()
+    try:
+      self.assertTrue(all(process.is_running() for process in processes))
+      self.assertEqual(processes[0]._process.pid, processes[1]._process.pid)
+      self.assertEqual(processes[0]._process.pid, self.uut.pid)
+      self.assertNotEqual(self.uut.pid, os.getpid())
+
+      for i, process in enumerate(processes):
+        self.assertEqual(process.call("test_method", (), {}),
+                         (True, "Some return"))
+        process.send_command(transport_process.CMD_TRANSPORT_WRITE,
+                             f"command {i}")
+        self.assertEqual(
+            switchboard_process.get_message(
+                transports[i].writes, timeout=_WAIT_TIMEOUT),
+            f"command {i}")
+    finally:
+      for process in processes:
+        process.stop()
+    self.assertFalse(any(process.is_started() for process in processes))
+    self.assertTrue(self.uut.is_alive())
+    # Each transport is opened on start and closed on stop.
+    for transport in transports:
+      self.assertEqual(transport.open_count.value, 1)
+      self.assertEqual(transport.close_count.value, 1)
+
+  def test_process_can_be_restarted_in_host(self):
+    """Verifies a hosted process can be stopped and started again."""
+    transport = fake_transport.FakeTransport()
+    process = self._create_transport_process("device", transport)
+    for _ in range(2):
+      process.start()
+      self.assertTrue(process.is_running())
+      process.stop()
+    self.assertEqual(transport.open_count.value, 2)
+    self.assertEqual(transport.close_count.value, 2)
+
+  def test_log_writer_process_writes_log_in_host(self):
+    """Verifies a hosted log writer process writes the device log file."""
+    command_queue = multiprocessing_utils.get_context().Queue()
+    self.command_queues.append(command_queue)
+    log_path = os.path.join(self.artifacts_directory, "device.txt")
+    process = log_process.LogWriterProcess(
+        "device", self.exception_queue, command_queue, self.log_queue,
+        log_path)
+    process.set_host(self.uut)
+    process.start()
+    try:
+      self.assertEqual(process._process.pid, self.uut.pid)
+      self.log_queue.put("some log line\n")
+      deadline = time.time() + _WAIT_TIMEOUT
+      while time.time() < deadline:
+        if os.path.exists(log_path):
+          with open(log_path) as log_file:
+            if "some log line" in log_file.read():
+              break
+        time.sleep(0.01)
+      else:
+        self.fail(f"The log line was not written to {log_path}.")
+    finally:
+      process.stop()
+
+  def test_close_stops_running_processes(self):
+    """Verifies closing the host stops the process loops running in it."""
+    transport = fake_transport.FakeTransport()
+    process = self._create_transport_process("device", transport)
+    process.start()
+    self.uut.close()
+    self.assertFalse(self.uut.is_alive())
+    self.assertIsNone(self.uut.pid)
+    self.assertFalse(process.is_running())
+    deadline = time.time() + _WAIT_TIMEOUT
+    while transport.close_count.value < 1 and time.time() < deadline:
+      time.sleep(0.01)
+    self.assertEqual(transport.close_count.value, 1)
+    process.stop()
+    self.assertFalse(process.is_started())
+
+  def test_host_process_restarts_after_close(self):
+    """Verifies the host process is started again when it is used again."""
+    process = self._create_transport_process(
+        "device", fake_transport.FakeTransport())
+    process.start()
+    first_pid = self.uut.pid
+    process.stop()
+    self.uut.close()
+    process.start()
+    try:
+      self.assertTrue(process.is_running())
+      self.assertIsNotNone(self.uut.pid)
+      self.assertNotEqual(self.uut.pid, first_pid)
+    finally:
+      process.stop()
+
+  def test_unhealthy_host_is_not_used_for_new_processes(self):
+    """Verifies processes don't run in a host with an unterminated loop."""
+    hosted_process = self._create_transport_process(
+        "device-0", fake_transport.FakeTransport())
+    hosted_process.start()
+    # Emulate a loop which did not stop when asked to.
+    hosted_process._process.terminate()
+    self.assertFalse(self.uut.is_usable())
+
+    process = self._create_transport_process(
+        "device-1", fake_transport.FakeTransport())
+    process.start()
+    try:
+      self.assertTrue(process.is_running())
+      self.assertNotEqual(process._process.pid, self.uut.pid)
+    finally:
+      process.stop()
+      hosted_process.stop()
+    self.uut.close()
+    self.assertTrue(self.uut.is_usable())
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -14,7 +14,10 @@
 
 """Tests the switchboard_process.py module."""
 import multiprocessing
+import multiprocessing.forkserver
+import os
 import queue
+import subprocess
 import time
 from unittest import mock
 
@@ -545,6 +548,31 @@ class SwitchboardProcessTests(unit_test_case.MultiprocessingTestCase):
     self.assertFalse(self.uut.is_started(),
                      "Expected process not started, found started")
 
+  def test_105_switchboard_process_start_stop_forkserver(self):
+    """Test starting and stopping a child process forked from a forkserver."""
+    if not multiprocessing_utils.enable_switchboard_forkserver():
+      self.skipTest("The forkserver start method isn't available.")
+    try:
+      self.uut = RunningProcess("fake_device",
+                                "fake_process",
+                                self.exception_queue,
+                                self.command_queue,
+                                self.artifacts_directory)
+      self.uut.start()
+      self.assertTrue(self.uut.is_running(),
+                      "Expected process running, found not running")
+      # The process is a child of the forkserver process.
+      self.assertNotEqual(psutil.Process(self.uut._process.pid).ppid(),
+                          os.getpid())
+      self.uut.stop()
+      self.assertFalse(self.uut.is_started(),
+                       "Expected process not started, found started")
+    finally:
+      multiprocessing_utils.disable_switchboard_forkserver()
+      multiprocessing.forkserver._forkserver._stop()
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  multiprocessing_utils.get_context())
+
   def test_110_switchboard_process_exception_handler_works(self):
     """Test exceptions raised end up in exception queue."""
     self.uut = ErrorProcess("fake_device", "error_process",
@@ -646,6 +674,82 @@ class SwitchboardProcessTests(unit_test_case.MultiprocessingTestCase):
     with self.assertRaisesRegex(RuntimeError, "Start event was not set"):
       self.uut.wait_for_start()
 
+  def test_loop_stats(self):
+    """Tests the loop statistics are published when the loop exits."""
+    self.uut = RunningProcess("fake_device",
+                              "fake_process",
+                              self.exception_queue,
+                              self.command_queue,
+                              self.artifacts_directory)
+    self.assertEqual(self.uut.get_loop_stats(), switchboard_process.LoopStats())
+    self.uut.start()
+    time.sleep(0.1)
+    self.uut.stop()
+    stats = self.uut.get_loop_stats()
+    self.assertGreater(stats.iterations, 0)
+    self.assertGreater(stats.run_time, 0)
+    self.assertGreaterEqual(stats.cpu_time, 0)
+    self.assertGreater(stats.iterations_per_second, 0)
+    self.assertGreaterEqual(stats.cpu_percent, 0)
+
+  def test_loop_stats_rates_without_run_time(self):
+    """Tests the rates of loop statistics of a loop which hasn't run."""
+    stats = switchboard_process.LoopStats()
+    self.assertEqual(stats.iterations_per_second, 0)
+    self.assertEqual(stats.cpu_percent, 0)
+    stats = switchboard_process.LoopStats(
+        iterations=100, run_time=2, cpu_time=0.1)
+    self.assertEqual(stats.iterations_per_second, 50)
+    self.assertAlmostEqual(stats.cpu_percent, 5)
+
+
+class ParentWatcherTests(unit_test_case.UnitTestCase):
+  """Tests detecting the exit of the main process."""
+
+  def _assert_detects_exit(self):
+    parent = subprocess.Popen(["sleep", "30"])
+    try:
+      watcher = switchboard_process._ParentWatcher(parent.pid)
+      try:
+        self.assertTrue(watcher.is_alive())
+        parent.kill()
+        deadline = time.time() + 5
+        while watcher.is_alive() and time.time() < deadline:
+          time.sleep(0.01)
+        self.assertFalse(watcher.is_alive())
+      finally:
+        watcher.close()
+    finally:
+      parent.kill()
+      parent.wait()
+
+  def test_parent_watcher_detects_exit(self):
+    """Tests the watcher detects the exit of the watched process."""
+    self._assert_detects_exit()
+
+  @mock.patch.object(switchboard_process, "_PARENT_CHECK_INTERVAL", 0.01)
+  @mock.patch.object(os, "pidfd_open", side_effect=OSError, create=True)
+  def test_parent_watcher_detects_exit_without_pidfd(self, mock_pidfd_open):
+    """Tests the watcher checks the process periodically without a pidfd."""
+    self._assert_detects_exit()
+    mock_pidfd_open.assert_called_once()
+
+  def test_parent_watcher_of_exited_process(self):
+    """Tests the watcher of a process which has already exited."""
+    with mock.patch.object(
+        switchboard_process, "_parent_is_alive", return_value=False):
+      watcher = switchboard_process._ParentWatcher(os.getpid())
+    self.assertFalse(watcher.is_alive())
+    watcher.close()
+
+  def test_parent_watcher_close(self):
+    """Tests closing the watcher of a running process."""
+    watcher = switchboard_process._ParentWatcher(os.getpid())
+    self.assertTrue(watcher.is_alive())
+    watcher.close()
+    watcher.close()  # No-op.
+    self.assertTrue(watcher.is_alive())
+
 
 if __name__ == "__main__":
   unit_test_case.main()
@@ -19,6 +19,7 @@ import re
 import signal
 import subprocess
 import sys
+import threading
 import time
 from unittest import mock
 
@@ -35,6 +36,7 @@ from gazoo_device.switchboard.transports import tcp_transport
 from gazoo_device.tests.unit_tests.utils import fake_responder
 from gazoo_device.tests.unit_tests.utils import fake_transport
 from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import multiprocessing_utils
 from gazoo_device.utility import retry
 from gazoo_device.utility import usb_utils
 
@@ -252,6 +254,117 @@ class SwitchboardTests(unit_test_case.MultiprocessingTestCase):
     lines = self._verify_log_file_and_lines(1)
     self.assertIn("GDM-M: Note: ", lines[0])
 
+  def test_switchboard_buffered_log_writes_flush_log(self):
+    """Test flush_log writes pending log notes when log writes are buffered."""
+    transport_list = []
+    self.uut = switchboard.SwitchboardDefault("test_device",
+                                              self.exception_queue,
+                                              transport_list, self.log_path,
+                                              buffered_log_writes=True)
+    self.uut.add_log_note(_LOG_MESSAGE)
+    self.uut.flush_log()
+    lines = self._verify_log_file_and_lines(1)
+    self.assertIn("GDM-M: Note: ", lines[0])
+
+  def test_switchboard_buffered_log_writes_concurrent_flush_log(self):
+    """Test concurrent flush_log calls all complete."""
+    self.uut = switchboard.SwitchboardDefault("test_device",
+                                              self.exception_queue,
+                                              [], self.log_path,
+                                              buffered_log_writes=True)
+    errors_raised = []
+
+    def flush_log():
+      try:
+        self.uut.flush_log()
+      except errors.DeviceError as err:
+        errors_raised.append(err)
+
+    threads = [threading.Thread(target=flush_log) for _ in range(5)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertFalse(errors_raised)
+
+  def test_switchboard_buffered_log_writes_event_after_add_log_note(self):
+    """Test events for log notes are available when log writes are buffered."""
+    event_label = "add_this_filter.special_message"
+    parser_obj = event_parser_default.EventParserDefault(
+        filters=[os.path.join(self.TEST_FILTER_DIR, "add_this_filter.json")],
+        event_file_path=log_process.get_event_filename(self.log_path),
+        device_name="device-1234")
+    # Log lines which aren't flushed stay buffered for the entire test.
+    with mock.patch.object(log_process, "BUFFERED_FLUSH_INTERVAL", 60):
+      self.uut = switchboard.SwitchboardDefault("test_device",
+                                                self.exception_queue,
+                                                [], self.log_path,
+                                                parser=parser_obj,
+                                                buffered_log_writes=True)
+      self.uut.add_log_note(_LOG_MESSAGE)
+      # Allow the log filter process to pick up the flushed log note.
+      result = retry.retry(
+          parser_obj.get_last_event, ([event_label],),
+          is_successful=lambda result: result.count == 1,
+          timeout=5,
+          interval=0.1)
+    self.assertIn(_LOG_MESSAGE, result.results_list[0]["raw_log_line"])
+
+  def test_switchboard_inline_event_filtering(self):
+    """Test log writer process filters events with inline event filtering."""
+    event_label = "add_this_filter.special_message"
+    parser_obj = event_parser_default.EventParserDefault(
+        filters=[os.path.join(self.TEST_FILTER_DIR, "add_this_filter.json")],
+        event_file_path=log_process.get_event_filename(self.log_path),
+        device_name="device-1234")
+    self.uut = switchboard.SwitchboardDefault("test_device",
+                                              self.exception_queue,
+                                              [], self.log_path,
+                                              parser=parser_obj,
+                                              inline_event_filtering=True)
+    self.assertIsNone(self.uut._log_filter_process)
+    self.uut.add_log_note(_LOG_MESSAGE)
+    result = retry.retry(
+        parser_obj.get_last_event, ([event_label],),
+        is_successful=lambda result: result.count == 1,
+        timeout=5,
+        interval=0.1)
+    self.assertIn(_LOG_MESSAGE, result.results_list[0]["raw_log_line"])
+
+  def test_switchboard_inline_event_filtering_add_new_filter(self):
+    """Test add_new_filter sends filters to the log writer process."""
+    parser_obj = event_parser_default.EventParserDefault(
+        filters=[],
+        event_file_path=log_process.get_event_filename(self.log_path),
+        device_name="device-1234")
+    self.uut = switchboard.SwitchboardDefault("test_device",
+                                              self.exception_queue,
+                                              [], self.log_path,
+                                              parser=parser_obj,
+                                              inline_event_filtering=True)
+    filter_file = os.path.join(self.TEST_FILTER_DIR, "add_this_filter.json")
+    with mock.patch.object(self.uut._log_writer_process, "send_command",
+                           autospec=True) as mock_send_command:
+      self.uut.add_new_filter(filter_file)
+    mock_send_command.assert_called_once_with(
+        log_process.CMD_ADD_NEW_FILTER,
+        filter_file,
+        wait_for_command_consumption=True)
+
+  def test_switchboard_flush_log_raises_error(self):
+    """Test switchboard flush_log method raises error if closed."""
+    transport_list = []
+    self.uut = switchboard.SwitchboardDefault("test_device",
+                                              self.exception_queue,
+                                              transport_list, self.log_path)
+    self.uut.close()
+
+    # Mock event where processes are closed despite healthy state.
+    self.uut._healthy = True
+    err_regex = "RuntimeError: Log writer process is not currently running"
+    with self.assertRaisesRegex(errors.DeviceError, err_regex):
+      self.uut.flush_log()
+
   def _get_old_new_log_path(self):
     old_log_path = os.path.join(self.artifacts_directory,
                                 self._testMethodName + "-old",
@@ -1841,6 +1954,24 @@ class SwitchboardTests(unit_test_case.MultiprocessingTestCase):
     with self.assertRaisesRegex(AttributeError, regex):
       self.uut.call(serial_transport.SerialTransport.flush_buffers.__name__)
 
+  def test_get_transport_update(self):
+    """Test Switchboard.get_transport_update() returns the queued updates."""
+    self._setup_switchboard_with_fake_transport()
+    self.fake_transport.update_queue = (
+        multiprocessing_utils.get_context().Queue())
+    self.fake_transport.update_queue.put((1, b"payload"))
+    self.assertEqual((1, b"payload"),
+                     self.uut.get_transport_update(timeout=_EXPECT_TIMEOUT))
+    self.assertIsNone(self.uut.get_transport_update(timeout=0.01))
+
+  def test_get_transport_update_error_transport_doesnt_push_updates(self):
+    """Test Switchboard.get_transport_update() without a transport queue."""
+    self._setup_switchboard_with_fake_transport()
+    with self.assertRaisesRegex(
+        errors.DeviceError,
+        r"Transport 0 \('FakeTransport'\) does not push updates"):
+      self.uut.get_transport_update(timeout=0)
+
   @mock.patch.object(switchboard.SwitchboardDefault, "_start_processes")
   @mock.patch.object(switchboard.SwitchboardDefault, "close")
   def test_transport_serial_set_baudrate(
@@ -257,6 +257,17 @@ class TcpTransportTests(unit_test_case.UnitTestCase):
         "Expected empty string in message returned by read, instead got: {}"
         .format(message))
 
+  @mock.patch("socket.socket")
+  def test_109_transport_fileno(self, mock_socket):
+    """TCP transport returns the socket file descriptor only when open."""
+    mock_socket.return_value.fileno.return_value = 5
+    self.assertIsNone(self.uut.fileno())
+    self.uut.open()
+    self.assertEqual(self.uut.fileno(), 5)
+    self.uut.close()
+    self.assertIsNone(self.uut.fileno())
+
+
 
 if __name__ == "__main__":
   unit_test_case.main()
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 """Tests the transport_process.py module."""
+from concurrent import futures
+import os
 import time
 import unittest
 from unittest import mock
@@ -40,7 +42,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
     self.command_queue = multiprocessing_utils.get_context().Queue()
     self.log_queue = multiprocessing_utils.get_context().Queue()
     self.raw_data_queue = multiprocessing_utils.get_context().Queue()
-    self.call_result_queue = multiprocessing_utils.get_context().Queue()
     self.log_path = self.artifacts_directory
 
   def tearDown(self):
@@ -50,7 +51,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
     del self.command_queue
     del self.log_queue
     del self.raw_data_queue
-    del self.call_result_queue
     super().tearDown()
 
   def test_000_transport_construct_destruct(self):
@@ -62,8 +62,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     self.assertFalse(self.uut.is_started(),
                      "Expected process not started, found started")
     self.assertFalse(self.uut.is_running(),
@@ -95,8 +94,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     for command in transport_process._ALL_VALID_COMMANDS:
       self.uut.send_command(command)
       wait_for_queue_writes(self.command_queue)
@@ -116,8 +114,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     with self.assertRaisesRegex(RuntimeError, r"No queue provided"):
       self.uut.toggle_raw_data()
 
@@ -131,7 +128,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         raw_data_queue=self.raw_data_queue)
     self.assertFalse(self.uut.raw_data_enabled(),
                      "Expected raw_data streaming to be disabled")
@@ -151,8 +147,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     with self.assertRaisesRegex(RuntimeError, r"No queue provided"):
       self.uut.get_raw_data()
 
@@ -165,8 +160,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     self.uut.start()
     self.uut.stop()
     self.assertEqual(
@@ -181,14 +175,15 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
   def test_201_transport_closes_transport_on_command(self):
     """Test transport closes transport on command."""
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
+    transport.read.return_value = b""
     self.uut = transport_process.TransportProcess(
         "fake_transport",
         self.exception_queue,
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.command_queue.put((transport_process.CMD_TRANSPORT_CLOSE, None))
     wait_for_queue_writes(self.command_queue)
@@ -208,14 +203,15 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
   def test_202_transport_opens_transport_on_command(self):
     """Test transport opens transport on command."""
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
+    transport.read.return_value = b""
     self.uut = transport_process.TransportProcess(
         "fake_transport",
         self.exception_queue,
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.command_queue.put((transport_process.CMD_TRANSPORT_OPEN, None))
     wait_for_queue_writes(self.command_queue)
@@ -242,8 +238,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     self.uut.start()
     self.uut.stop()
     self.assertEqual(
@@ -258,6 +253,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
   def test_204_transport_auto_reopen_with_close(self):
     """Transport process shouldn't reopen after being closed via close()."""
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
     transport._properties = {}
     transport._properties[transport_properties.AUTO_REOPEN] = True
     transport._transport_open = mock.MagicMock(
@@ -269,8 +265,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.uut._pre_run_hook()
     transport.open.assert_called_once()
@@ -288,6 +283,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
   def test_205_transport_auto_reopen_unexpected_close(self):
     """Test transport process reopens if it closes unexpectedly."""
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
     transport._properties = {}
     transport._properties[transport_properties.AUTO_REOPEN] = True
     transport._transport_open = mock.MagicMock(
@@ -299,8 +295,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.uut._pre_run_hook()
     transport.open.assert_called_once()
@@ -326,8 +321,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.command_queue.put(("invalid cmd", None))
     wait_for_queue_writes(self.command_queue)
@@ -339,6 +333,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
   def test_211_transport_writes_split_commands(self):
     """Test transport writes split commands."""
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
     transport.read.return_value = (b"this will be a really long command that "
                                    b"will be split")
 
@@ -348,8 +343,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     self.uut._pre_run_hook()
     long_command = "this will be a really long command that will be split"
@@ -369,6 +363,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
     device_data1 = b"some device message\n"
     device_data2 = b"other device message\n"
     transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = None
     transport.read.side_effect = iter([device_data1, device_data2])
     raw_data_id = 1
     self.uut = transport_process.TransportProcess(
@@ -378,7 +373,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         raw_data_queue=self.raw_data_queue,
         raw_data_id=raw_data_id)
 
@@ -421,8 +415,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     self.command_queue.put(("Invalid command", None))
     wait_for_queue_writes(self.command_queue)
     self.uut.start()
@@ -460,8 +453,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
     self.uut.start()
     end_time = time.time() + _EXCEPTION_TIMEOUT
     while self.uut.is_running() and time.time() < end_time:
@@ -499,8 +491,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport,
-        call_result_queue=self.call_result_queue)
+        transport)
 
     device_data1 = "partial log line\r"
     transport.reads.put(device_data1)
@@ -536,7 +527,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         framer=framer)
 
     device_data1 = response_start + log_line + response_end
@@ -571,6 +561,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
     log_regex = "({})".format(log_line)
     device_data1 = response_start + log_line + response_end
     transport = mock.MagicMock(fake_transport.FakeTransport)
+    transport.fileno.return_value = None
     transport.read.return_value = device_data1.encode("utf-8", "replace")
     framer = data_framer.InterwovenLogFramer(log_regex)
     self.uut = transport_process.TransportProcess(
@@ -580,7 +571,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         framer=framer)
 
     self.uut._pre_run_hook()
@@ -609,7 +599,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         read_timeout=read_timeout)
 
     device_data1 = "partial log line\r"
@@ -644,7 +633,6 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.log_queue,
         self.log_path,
         transport,
-        call_result_queue=self.call_result_queue,
         raw_data_queue=self.raw_data_queue)
     self.uut.toggle_raw_data()
     start_time = time.time()
@@ -686,8 +674,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport=transport,
-        call_result_queue=self.call_result_queue)
+        transport=transport)
 
     test_data = [
         ((transport_process.CMD_TRANSPORT_CLOSE, None), transport.close),
@@ -709,8 +696,7 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport=transport,
-        call_result_queue=self.call_result_queue)
+        transport=transport)
 
     with mock.patch.object(transport_process,
                            "_enqueue_command_writes") as mock_write:
@@ -719,8 +705,8 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
       mock_write.assert_called_once_with(
           mock.ANY, b"stuff", max_write_bytes=mock.ANY)
 
-  def test_312_transport_process_call_command(self):
-    """Verify transport process processes CALL command correctly."""
+  def test_312_transport_process_call(self):
+    """Verify transport process executes calls received on the call pipe."""
     transport = mock.Mock()
     uut = transport_process.TransportProcess(
         "fake_transport",
@@ -728,22 +714,17 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport=transport,
-        call_result_queue=self.call_result_queue)
+        transport=transport)
 
     transport.some_method.return_value = 123
-    uut._process_command_message((
-        transport_process.CMD_TRANSPORT_CALL,
-        ("some_method",
-         ("a", "b"),
-         {"foo": "bar"})))
+    uut._call_connection.send((1, "some_method", ("a", "b"), {"foo": "bar"}))
+    uut._process_transport_calls()
     transport.some_method.assert_called_once_with("a", "b", foo="bar")
-    success, return_value = self.call_result_queue.get(block=True, timeout=0.1)
-    self.assertTrue(success)
-    self.assertEqual(return_value, 123)
+    self.assertTrue(uut._call_connection.poll(0.1))
+    self.assertEqual(uut._call_connection.recv(), (1, True, 123))
 
-  def test_313_transport_process_call_command_error_handling(self):
-    """Verify exceptions in transport methods are put into the result queue."""
+  def test_313_transport_process_call_error_handling(self):
+    """Verify exceptions in transport methods are returned to the caller."""
     transport = mock.Mock()
     uut = transport_process.TransportProcess(
         "fake_transport",
@@ -751,20 +732,175 @@ class TransportProcessTests(unit_test_case.MultiprocessingTestCase):
         self.command_queue,
         self.log_queue,
         self.log_path,
-        transport=transport,
-        call_result_queue=self.call_result_queue)
+        transport=transport)
 
     transport.some_method.side_effect = RuntimeError("Something failed")
-    uut._process_command_message((
-        transport_process.CMD_TRANSPORT_CALL,
-        ("some_method",
-         ("a", "b"),
-         {"foo": "bar"})))
+    transport.unpicklable_method.return_value = lambda: None
+    uut._call_connection.send((1, "some_method", ("a", "b"), {"foo": "bar"}))
+    uut._call_connection.send((2, "unpicklable_method", (), {}))
+    uut._process_transport_calls()
     transport.some_method.assert_called_once_with("a", "b", foo="bar")
-    success, error_traceback = self.call_result_queue.get(
-        block=True, timeout=0.1)
+    call_id, success, error_traceback = uut._call_connection.recv()
+    self.assertEqual(call_id, 1)
     self.assertFalse(success)
     self.assertIn("RuntimeError: Something failed", error_traceback)
+    call_id, success, error_traceback = uut._call_connection.recv()
+    self.assertEqual(call_id, 2)
+    self.assertFalse(success)
+    self.assertIn("pickle", error_traceback)
+
+  def test_314_transport_process_concurrent_calls(self):
+    """Verify concurrent calls from several threads get their own results."""
+    transport = fake_transport.FakeTransport()
+    self.uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        transport)
+    self.uut.start()
+    try:
+      with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda raise_error: self.uut.call(
+                "test_method", (), {"raise_error": raise_error}),
+            [i % 2 == 1 for i in range(100)]))
+    finally:
+      self.uut.stop()
+    for i, (success, response) in enumerate(results):
+      if i % 2:
+        self.assertFalse(success)
+        self.assertIn("RuntimeError: Something failed.", response)
+      else:
+        self.assertEqual((success, response), (True, "Some return"))
+
+  def test_315_transport_process_call_when_not_running(self):
+    """Verify calls fail without being sent if the process isn't running."""
+    self.uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        fake_transport.FakeTransport())
+    success, response = self.uut.call("test_method", (), {})
+    self.assertFalse(success)
+    self.assertIn("is not running", response)
+    self.assertFalse(self.uut._process_call_connection.poll())
+    self.assertFalse(self.uut._pending_calls)
+    self.assertFalse(self.uut._call_results)
+
+  def test_316_transport_process_start_discards_stale_calls(self):
+    """Verify calls left on the call pipe aren't executed after a start."""
+    transport = fake_transport.FakeTransport()
+    self.uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        transport)
+    self.uut._call_connection.send((1, "close", (), {}))
+    self.uut.start()
+    try:
+      self.assertEqual(
+          self.uut.call("test_method", (), {}), (True, "Some return"))
+    finally:
+      self.uut.stop()
+    self.assertEqual(transport.close_count.value, 1)  # Only close on stop.
+
+  def test_317_transport_process_drops_unknown_call_results(self):
+    """Verify results of calls nobody is waiting for are dropped."""
+    self.uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        fake_transport.FakeTransport())
+    self.uut._process_call_connection.send((10, True, "stale"))
+    self.uut._process_call_connection.send((1, True, "expected"))
+    with mock.patch.object(self.uut, "is_running", return_value=True):
+      result = self.uut.call("test_method", (), {})
+    self.assertEqual(result, (True, "expected"))
+    self.assertFalse(self.uut._pending_calls)
+    self.assertFalse(self.uut._call_results)
+
+  def test_318_transport_process_waits_on_transport_fd_and_events(self):
+    """Verify waits for transport data are interrupted by other work."""
+    read_fd, write_fd = os.pipe()
+    self.addCleanup(os.close, read_fd)
+    self.addCleanup(os.close, write_fd)
+    transport = mock.MagicMock(spec=fake_transport.FakeTransport)
+    transport.fileno.return_value = read_fd
+    transport.read.return_value = b"some data\n"
+    read_timeout = 5
+    self.uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        transport,
+        read_timeout=read_timeout)
+    self.uut._pre_run_hook()
+
+    with self.subTest(ready="call"):
+      self.uut._call_connection.send((1, "some_method", (), {}))
+      start_time = time.time()
+      self.uut._transport_read()
+      self.assertLess(time.time() - start_time, read_timeout)
+      transport.read.assert_not_called()
+      self.uut._process_call_connection.recv()
+
+    with self.subTest(ready="command"):
+      self.command_queue.put((transport_process.CMD_TRANSPORT_OPEN, None))
+      wait_for_queue_writes(self.command_queue)
+      start_time = time.time()
+      self.uut._transport_read()
+      self.assertLess(time.time() - start_time, read_timeout)
+      transport.read.assert_not_called()
+      switchboard_process.get_message(self.command_queue, timeout=0)
+
+    with self.subTest(ready="pending_write"):
+      self.uut._pending_writes.put("some command")
+      start_time = time.time()
+      self.uut._transport_read()
+      self.assertLess(time.time() - start_time, read_timeout)
+      transport.read.assert_not_called()
+      self.uut._transport_write()
+
+    with self.subTest(ready="transport"):
+      os.write(write_fd, b"x")
+      self.uut._transport_read()
+      transport.read.assert_called_once_with(
+          size=transport_process._MAX_READ_BYTES, timeout=0)
+    self.uut._post_run_hook()
+
+  def test_319_transport_process_stop_wakes_up_process(self):
+    """Verify stop() wakes up the process and the wake-up isn't a call."""
+    transport = mock.Mock()
+    uut = transport_process.TransportProcess(
+        "fake_transport",
+        self.exception_queue,
+        self.command_queue,
+        self.log_queue,
+        self.log_path,
+        transport=transport)
+    uut._process = mock.Mock()
+    uut._process.is_alive.return_value = True
+
+    with mock.patch.object(switchboard_process.SwitchboardProcess,
+                           "stop") as mock_stop:
+      uut.stop()
+    mock_stop.assert_called_once()
+    uut._process = None
+    self.assertTrue(uut._terminate_event.is_set())
+    self.assertTrue(uut._process_call_connection.poll())
+    uut._process_transport_calls()
+    self.assertFalse(uut._process_call_connection.poll())
+    self.assertFalse(uut._call_connection.poll())
 
   def _verify_command_split(self, original_command, a_queue):
     count = 0
@@ -0,0 +1,203 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for gazoo_device.utility.adb_client.py."""
+import os
+import socket
+import tempfile
+import time
+from unittest import mock
+
+from gazoo_device.tests.unit_tests.utils import fake_adb_server
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import adb_client
+
+_SERIAL = "04576e89"
+_IP_SERIAL = "12.34.56.78:5555"
+
+
+class AdbClientTests(unit_test_case.UnitTestCase):
+  """Unit tests for gazoo_device.utility.adb_client.py."""
+
+  def setUp(self):
+    super().setUp()
+    self.server = fake_adb_server.FakeAdbServer()
+    self.addCleanup(self.server.close)
+    self.server.set_device_state(_SERIAL, "device")
+    self.client = adb_client.AdbClient(self.server.address)
+    self.addCleanup(self.client.close)
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.temp_dir = temp_dir.name
+
+  def _create_file(self, name, content=""):
+    path = os.path.join(self.temp_dir, name)
+    with open(path, "w") as new_file:
+      new_file.write(content)
+    return path
+
+  def _wait_for_devices(self, expected):
+    deadline = time.monotonic() + 5
+    while self.client.devices() != expected and time.monotonic() < deadline:
+      time.sleep(0.01)
+    self.assertEqual(self.client.devices(), expected)
+
+  def test_default_address(self):
+    """Tests the server port is read from the environment like adb."""
+    with mock.patch.dict(os.environ, {"ANDROID_ADB_SERVER_PORT": "5038"}):
+      client = adb_client.AdbClient()
+    self.assertEqual(client._address, ("127.0.0.1", 5038))
+
+  def test_server_not_running(self):
+    """Tests requests raise AdbClientError if the server is not running."""
+    with socket.socket() as sock:
+      sock.bind(("127.0.0.1", 0))
+      address = sock.getsockname()
+    client = adb_client.AdbClient(address)
+    with self.assertRaisesRegex(adb_client.AdbClientError, "Unable to connect"):
+      client.devices()
+
+  def test_devices_tracked(self):
+    """Tests the device list is pushed by the server on one connection."""
+    self.assertEqual(self.client.devices(), f"{_SERIAL}\tdevice\n")
+    self.server.set_device_state(_IP_SERIAL, "offline")
+    self._wait_for_devices(f"{_SERIAL}\tdevice\n{_IP_SERIAL}\toffline\n")
+    self.server.set_device_state(_SERIAL, None)
+    self._wait_for_devices(f"{_IP_SERIAL}\toffline\n")
+    self.assertEqual(self.server.requests, ["host:track-devices"])
+    self.assertEqual(self.server.connections, 1)
+
+  def test_devices_tracking_restarted(self):
+    """Tests tracking restarts after the tracking connection closed."""
+    self.client.devices()
+    tracker_thread = self.client._tracker_thread
+    self.client._tracker_socket.shutdown(socket.SHUT_RDWR)
+    tracker_thread.join(timeout=5)
+    self.assertEqual(self.client.devices(), f"{_SERIAL}\tdevice\n")
+    self.assertEqual(self.server.requests, ["host:track-devices"] * 2)
+
+  def test_shell(self):
+    """Tests a shell command returns its output and exit code."""
+    self.server.shell_responses["getprop ro.serialno"] = (
+        f"{_SERIAL}\n", "warning\n", 0)
+    self.server.shell_responses["false"] = ("", "", 1)
+    self.assertEqual(self.client.shell(_SERIAL, "getprop ro.serialno"),
+                     (f"{_SERIAL}\nwarning\n", 0))
+    self.assertEqual(self.client.shell(None, "false"), ("", 1))
+    self.assertEqual(self.server.stdin_closed, [True, True])
+    self.assertIn(f"host:transport:{_SERIAL}", self.server.requests)
+    self.assertIn("host:transport-any", self.server.requests)
+
+  def test_shell_features_cached(self):
+    """Tests the device features are queried once per device."""
+    self.server.shell_responses["true"] = ("", "", 0)
+    for _ in range(3):
+      self.client.shell(_SERIAL, "true")
+    self.assertEqual(
+        self.server.requests.count(f"host-serial:{_SERIAL}:features"), 1)
+
+  def test_shell_without_shell_v2(self):
+    """Tests shell raises AdbClientError for devices without shell v2."""
+    self.server.features = "cmd"
+    with self.assertRaisesRegex(adb_client.AdbClientError, "shell_v2"):
+      self.client.shell(_SERIAL, "true")
+
+  def test_shell_device_not_found(self):
+    """Tests shell raises AdbClientError with the server's message."""
+    self.server.set_device_state(_SERIAL, "offline")
+    with self.assertRaisesRegex(adb_client.AdbClientError, "device offline"):
+      self.client.shell(_SERIAL, "true")
+
+  def test_shell_timeout(self):
+    """Tests the output so far is returned with -SIGTERM on timeout."""
+    self.server.shell_responses["sleep 10"] = ("", "", 0)
+    self.server.shell_delay = 5
+    start = time.monotonic()
+    output, return_code = self.client.shell(_SERIAL, "sleep 10", timeout=0.1)
+    self.assertLess(time.monotonic() - start, 2)
+    self.assertEqual(output, "")
+    self.assertEqual(return_code, adb_client._TIMEOUT_RETURN_CODE)
+
+  def test_shell_closed_without_exit_code(self):
+    """Tests shell raises if the connection closes without an exit code."""
+    self.server.shell_responses["reboot"] = ("rebooting\n", "", None)
+    with self.assertRaisesRegex(adb_client.AdbClientError,
+                                "closed without exit code"):
+      self.client.shell(_SERIAL, "reboot")
+
+  def test_push_and_pull(self):
+    """Tests files pushed to the device can be pulled back."""
+    source = self._create_file("data.bin", content="abc" * 100000)
+    output = self.client.push(_SERIAL, [source], "/sdcard/")
+    self.assertIn(f"{source}: 1 file pushed", output)
+    self.assertEqual(self.server.files[_SERIAL]["/sdcard/data.bin"],
+                     b"abc" * 100000)
+
+    destination = os.path.join(self.temp_dir, "copy.bin")
+    output = self.client.pull(_SERIAL, ["/sdcard/data.bin"], destination)
+    self.assertIn("/sdcard/data.bin: 1 file pulled", output)
+    with open(destination, "rb") as copy:
+      self.assertEqual(copy.read(), b"abc" * 100000)
+
+  def test_push_several_files_to_file(self):
+    """Tests pushing several files to a file path raises AdbClientError."""
+    sources = [self._create_file(name) for name in ("a", "b")]
+    with self.assertRaisesRegex(adb_client.AdbClientError, "not a directory"):
+      self.client.push(_SERIAL, sources, "/sdcard/a")
+
+  def test_push_directory_not_supported(self):
+    """Tests pushing a directory raises AdbClientError."""
+    with self.assertRaisesRegex(adb_client.AdbClientError, "not supported"):
+      self.client.push(_SERIAL, [self.temp_dir], "/sdcard")
+
+  def test_push_failure(self):
+    """Tests a push refused by the device raises AdbClientError."""
+    source = self._create_file("app.apk")
+    with self.assertRaisesRegex(adb_client.AdbClientError, "Read-only"):
+      self.client.push(_SERIAL, [source], "/system/app.apk")
+
+  def test_pull_missing_file(self):
+    """Tests pulling a file which does not exist raises AdbClientError."""
+    with self.assertRaisesRegex(adb_client.AdbClientError, "not supported"):
+      self.client.pull(_SERIAL, ["/sdcard/missing"], self.temp_dir)
+
+  def test_install(self):
+    """Tests the package is streamed to the package manager."""
+    package = self._create_file("app.apk", content="apk")
+    self.assertEqual(
+        self.client.install(_SERIAL, package, ["-g", "-r"]),
+        "Success\n")
+    self.assertEqual(self.server.installed_packages, [b"apk"])
+    self.assertIn("exec:cmd package install -S 3 -g -r", self.server.requests)
+
+  def test_install_without_cmd(self):
+    """Tests install raises AdbClientError for devices without cmd."""
+    self.server.features = "shell_v2"
+    package = self._create_file("app.apk", content="apk")
+    with self.assertRaisesRegex(adb_client.AdbClientError, "cmd"):
+      self.client.install(_SERIAL, package)
+
+  def test_forward(self):
+    """Tests adding, listing and removing a port forwarding."""
+    self.client.forward(_SERIAL, "tcp:8080", "tcp:80")
+    self.assertEqual(self.client.list_forward(),
+                     f"{_SERIAL} tcp:8080 tcp:80\n")
+    self.client.kill_forward(_SERIAL, "tcp:8080")
+    self.assertEqual(self.client.list_forward(), "")
+    with self.assertRaisesRegex(adb_client.AdbClientError, "not found"):
+      self.client.kill_forward(_SERIAL, "tcp:8080")
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -19,12 +19,16 @@ import os
 import re
 import shutil
 import subprocess
+import tempfile
+import time
 from unittest import mock
 
 from absl.testing import parameterized
 from gazoo_device import config
 from gazoo_device import errors
+from gazoo_device.tests.unit_tests.utils import fake_adb_server
 from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import adb_client
 from gazoo_device.utility import adb_utils
 from gazoo_device.utility import host_utils
 import immutabledict
@@ -1259,5 +1263,142 @@ class AdbUtilsTests(unit_test_case.UnitTestCase):
     mock_reboot_device.assert_called_once()
 
 
+class AdbUtilsAdbClientTests(unit_test_case.UnitTestCase):
+  """ADB utility tests with the adb client enabled."""
+
+  def setUp(self):
+    super().setUp()
+    self.server = fake_adb_server.FakeAdbServer()
+    self.addCleanup(self.server.close)
+    self.server.set_device_state(DEVICE_ADB_SERIAL, "device")
+    self.client = adb_client.AdbClient(self.server.address)
+    self.addCleanup(self.client.close)
+    client_patcher = mock.patch.object(adb_utils, "_adb_client", self.client)
+    client_patcher.start()
+    self.addCleanup(client_patcher.stop)
+    adb_command_patcher = mock.patch.object(
+        adb_utils, "_adb_command", return_value=("adb output", 0))
+    self.mock_adb_command = adb_command_patcher.start()
+    self.addCleanup(adb_command_patcher.stop)
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.temp_dir = temp_dir.name
+
+  def test_enable_and_disable_adb_client(self):
+    """Tests the client is shared until the last user disables it."""
+    with mock.patch.object(adb_utils, "_adb_client", None):
+      adb_utils.enable_adb_client()
+      client = adb_utils._adb_client
+      adb_utils.enable_adb_client()
+      self.assertIs(adb_utils._adb_client, client)
+      with mock.patch.object(client, "close") as mock_close:
+        adb_utils.disable_adb_client()
+        self.assertIs(adb_utils._adb_client, client)
+        adb_utils.disable_adb_client()
+        mock_close.assert_called_once()
+      self.assertIsNone(adb_utils._adb_client)
+      adb_utils.disable_adb_client()  # Extra calls are ignored.
+
+  def test_adb_devices(self):
+    """Tests the device list is read without running adb."""
+    self.server.set_device_state("04576ee5", "sideload")
+    self.server.set_device_state(
+        "04576bcd", "no permissions (some reason); see [some url]")
+    deadline = time.monotonic() + 5
+    while (len(adb_utils.adb_devices()) < 3 and time.monotonic() < deadline):
+      time.sleep(0.01)
+    self.assertCountEqual(
+        adb_utils.adb_devices(),
+        [(DEVICE_ADB_SERIAL, adb_utils.AdbDeviceState.DEVICE),
+         ("04576ee5", adb_utils.AdbDeviceState.SIDELOAD),
+         ("04576bcd", adb_utils.AdbDeviceState.NO_PERMISSIONS)])
+    self.assertEqual(adb_utils.get_adb_devices(), [DEVICE_ADB_SERIAL])
+    self.mock_adb_command.assert_not_called()
+
+  def test_shell(self):
+    """Tests shell commands are run without running adb."""
+    self.server.shell_responses["echo hi"] = ("hi\n", "", 0)
+    self.assertEqual(adb_utils.shell(DEVICE_ADB_SERIAL, "echo hi"), "hi\n")
+    self.assertEqual(
+        adb_utils.shell(DEVICE_ADB_SERIAL, "echo hi", include_return_code=True),
+        ("hi\n", 0))
+    self.mock_adb_command.assert_not_called()
+
+  def test_shell_falls_back_to_adb(self):
+    """Tests adb is run if the client can't serve the command."""
+    self.server.set_device_state(DEVICE_ADB_SERIAL, "offline")
+    self.assertEqual(
+        adb_utils.shell(DEVICE_ADB_SERIAL, "echo hi", include_return_code=True),
+        ("adb output", 0))
+    self.mock_adb_command.assert_called_once_with(
+        ["shell", "echo hi"], DEVICE_ADB_SERIAL, adb_path=None, timeout=None,
+        retries=1, include_return_code=True)
+
+  def test_shell_connection_closed_falls_back_to_adb(self):
+    """Tests adb is run if the connection closes before the command exits."""
+    self.mock_adb_command.return_value = "adb output"
+    self.server.shell_responses["reboot"] = ("rebooting\n", "", None)
+    self.assertEqual(adb_utils.shell(DEVICE_ADB_SERIAL, "reboot", retries=2),
+                     "adb output")
+    self.assertEqual(
+        self.server.requests.count("shell,v2,raw:reboot"), 2)
+    self.mock_adb_command.assert_called_once_with(
+        ["shell", "reboot"], DEVICE_ADB_SERIAL, adb_path=None, timeout=None,
+        retries=2, include_return_code=False)
+
+  def test_shell_with_adb_path_runs_adb(self):
+    """Tests the given adb executable is run instead of the client."""
+    self.mock_adb_command.return_value = "adb output"
+    self.server.shell_responses["echo hi"] = ("hi\n", "", 0)
+    self.assertEqual(
+        adb_utils.shell(DEVICE_ADB_SERIAL, "echo hi", adb_path="/bin/adb"),
+        "adb output")
+    self.assertNotIn("shell,v2,raw:echo hi", self.server.requests)
+    self.mock_adb_command.assert_called_once_with(
+        ["shell", "echo hi"], DEVICE_ADB_SERIAL, adb_path="/bin/adb",
+        timeout=None, retries=1, include_return_code=False)
+
+  def test_adb_devices_falls_back_to_adb_without_server(self):
+    """Tests adb (which starts the server) is run if it is not running."""
+    self.server.close()
+    self.mock_adb_command.return_value = FAKE_ADB_DEVICES_OUTPUT
+    self.assertEqual(adb_utils.get_adb_devices(), ADB_DEVICES)
+    self.mock_adb_command.assert_called_once_with("devices", adb_path=None)
+
+  def test_push_and_pull(self):
+    """Tests files are transferred without running adb."""
+    source = os.path.join(self.temp_dir, "file.txt")
+    with open(source, "w") as source_file:
+      source_file.write("content")
+    output = adb_utils.push_to_device(DEVICE_ADB_SERIAL, source, "/sdcard")
+    self.assertIn("1 file pushed", output)
+    destination = os.path.join(self.temp_dir, "pulled.txt")
+    output = adb_utils.pull_from_device(
+        DEVICE_ADB_SERIAL, ["/sdcard/file.txt"], destination)
+    self.assertIn("1 file pulled", output)
+    with open(destination) as destination_file:
+      self.assertEqual(destination_file.read(), "content")
+    self.mock_adb_command.assert_not_called()
+
+  def test_install_package_on_device(self):
+    """Tests packages are installed without running adb."""
+    package_path = os.path.join(self.temp_dir, "app.apk")
+    with open(package_path, "w") as package_file:
+      package_file.write("apk")
+    adb_utils.install_package_on_device(
+        package_path, adb_serial=DEVICE_ADB_SERIAL, reinstall=True)
+    self.assertIn("exec:cmd package install -S 3 -r", self.server.requests)
+    self.mock_adb_command.assert_not_called()
+
+  def test_port_forwarding(self):
+    """Tests port forwarding is managed without running adb."""
+    adb_utils.add_port_forwarding(8080, 80, adb_serial=DEVICE_ADB_SERIAL)
+    self.assertEqual(adb_utils.list_port_forwarding(DEVICE_ADB_SERIAL),
+                     [(8080, 80)])
+    adb_utils.remove_port_forwarding(8080, adb_serial=DEVICE_ADB_SERIAL)
+    self.assertEqual(adb_utils.list_port_forwarding(), [])
+    self.mock_adb_command.assert_not_called()
+
+
 if __name__ == "__main__":
   unit_test_case.main()
@@ -0,0 +1,99 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.cambrionix_utils.py."""
+from unittest import mock
+
+from gazoo_device import errors
+from gazoo_device.tests.unit_tests.utils import fake_cambrionix_console
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import cambrionix_utils
+
+
+class CambrionixSessionTests(unit_test_case.UnitTestCase):
+  """Unit tests for cambrionix_utils.CambrionixSession."""
+
+  def setUp(self):
+    super().setUp()
+    self.console = fake_cambrionix_console.FakeCambrionixConsole()
+    self.addCleanup(self.console.close)
+    self.uut = cambrionix_utils.CambrionixSession(
+        self.console.serial_port, response_timeout=5)
+
+  def test_send_commands(self):
+    """Tests responses are returned without the echo and the prompt."""
+    self.assertEqual(
+        self.uut.send_commands(["system", "cef", "state 2"]),
+        [list(fake_cambrionix_console.SYSTEM_RESPONSE), [],
+         ["2, 0000, S, 0, 0, x, 0.00"]])
+    self.assertEqual(self.console.commands, ["system", "cef", "state 2"])
+
+  def test_send_commands_not_pipelined_by_default(self):
+    """Tests each command is written after the response to the previous one."""
+    self.console.delay = 0.05
+    with mock.patch.object(
+        self.uut, "_write", wraps=self.uut._write) as mock_write:
+      self.uut.send_commands(["cef", "crf"])
+    self.assertEqual(mock_write.call_args_list[-2:],
+                     [mock.call("cef\r"), mock.call("crf\r")])
+
+  def test_send_commands_pipelined(self):
+    """Tests commands are written without waiting for each response."""
+    uut = cambrionix_utils.CambrionixSession(
+        self.console.serial_port, max_pipelined_commands=15)
+    commands = [f"mode off {port}" for port in range(1, 16)]
+    self.assertEqual(uut.send_commands(commands), [[]] * 15)
+    self.assertEqual(set(self.console.modes.values()), {"off"})
+    self.assertEqual(self.console.commands, commands)
+
+  def test_session_synchronized_once(self):
+    """Tests CTRL-C is only sent when the session is first used."""
+    self.uut.send_commands(["cef"])
+    bytes_written = self.console.serial_port.bytes_written
+    self.uut.send_commands(["crf"])
+    self.assertEqual(self.console.serial_port.bytes_written - bytes_written,
+                     len("crf\r"))
+
+  def test_error_response(self):
+    """Tests error responses are returned as is."""
+    self.assertEqual(self.uut.send_commands(["dude"]),
+                     [["*E Unknown command: dude"]])
+
+  def test_response_without_echo(self):
+    """Tests an error is raised if a response is not preceded by its echo."""
+    self.uut.send_commands(["cef"])
+    self.console.send_output("\r\n>> ")  # Prompt printed for a stray "\n".
+    with self.assertRaisesRegex(errors.DeviceError, "does not start with"):
+      self.uut.send_commands(["state 1", "state 2"])
+    # The session is synchronized again before the next commands.
+    self.assertEqual(self.uut.send_commands(["state 2"]),
+                     [["2, 0000, S, 0, 0, x, 0.00"]])
+
+  def test_response_timeout(self):
+    """Tests an error is raised if the prompt is not received in time."""
+    uut = cambrionix_utils.CambrionixSession(
+        self.console.serial_port, response_timeout=0.05)
+    uut.send_commands(["cef"])
+    self.console.delay = 0.5
+    with self.assertRaisesRegex(errors.DeviceError, "Read timeout"):
+      uut.send_commands(["crf"])
+
+  def test_write_command_resynchronizes(self):
+    """Tests the session is synchronized again after write_command()."""
+    self.uut.write_command("cef")
+    self.assertEqual(self.uut.send_commands(["state 1"]),
+                     [["1, 0000, S, 0, 0, x, 0.00"]])
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -26,6 +26,8 @@ from gazoo_device.keys import raspberry_pi_key
 from gazoo_device.keys import unifi_poe_switch_key
 from gazoo_device.tests.unit_tests.utils import unit_test_case
 from gazoo_device.utility import host_utils
+from gazoo_device.utility import network_probe
+from gazoo_device.utility import ssh_connection_pool
 import immutabledict
 
 
@@ -339,6 +341,92 @@ class HostUtilsTests(unit_test_case.UnitTestCase):
     ]
     mock_check_output.assert_called_once_with(args, stderr=subprocess.STDOUT)
 
+  @mock.patch.object(host_utils, "verify_key", return_value=None)
+  @mock.patch.object(subprocess,
+                     "check_output",
+                     autospec=True,
+                     return_value=b"command output")
+  def test_ssh_and_scp_use_ssh_connection_pool(
+      self, mock_check_output, unused_mock_verify_key):
+    """Tests ssh and scp commands share the pooled connection."""
+    key_info = data_types.KeyInfo(
+        file_name="key", type=data_types.KeyType.SSH, package="package")
+    mock_pool = mock.create_autospec(
+        ssh_connection_pool.SshConnectionPool, instance=True)
+    mock_pool.get_ssh_options.return_value = ["pool_opt"]
+    with mock.patch.object(host_utils, "_ssh_connection_pool", mock_pool):
+      host_utils.ssh_command(
+          "192.168.0.1", ["whoami"], options=["opt1"], key_info=key_info)
+      host_utils.scp_to_device(
+          ip_address="192.168.0.1",
+          local_file_path="path/to/src",
+          remote_file_path="path/to/dest",
+          options=["opt1"],
+          key_info=key_info)
+    key_path = host_utils.get_key_path(key_info)
+    mock_pool.get_ssh_options.assert_has_calls(
+        [mock.call("192.168.0.1", "root", key_path)] * 2)
+    mock_check_output.assert_has_calls([
+        mock.call(["ssh", "opt1", "pool_opt", "-i", key_path,
+                   "root@192.168.0.1", "whoami"],
+                  stderr=subprocess.STDOUT, timeout=None),
+        mock.call(["scp", "-r", *host_utils._scp_use_legacy_option, "opt1",
+                   "pool_opt", "-i", key_path, "path/to/src",
+                   "root@192.168.0.1:path/to/dest"],
+                  stderr=subprocess.STDOUT),
+    ])
+
+  @mock.patch.object(ssh_connection_pool.SshConnectionPool, "close",
+                     autospec=True)
+  def test_ssh_connection_pool_is_reference_counted(self, mock_close):
+    """Tests the pool is closed and disabled by the last matching close."""
+    host_utils.enable_ssh_connection_pool()
+    pool = host_utils._ssh_connection_pool
+    host_utils.enable_ssh_connection_pool()
+    self.assertIs(host_utils._ssh_connection_pool, pool)
+
+    host_utils.close_ssh_connection_pool()
+    mock_close.assert_not_called()
+    self.assertIs(host_utils._ssh_connection_pool, pool)
+
+    host_utils.close_ssh_connection_pool()
+    mock_close.assert_called_once_with(pool)
+    self.assertIsNone(host_utils._ssh_connection_pool)
+    self.assertEqual(
+        host_utils._get_ssh_connection_pool_options("1.2.3.4", "root", None),
+        [])
+
+    host_utils.close_ssh_connection_pool()  # Unmatched calls are ignored.
+    mock_close.assert_called_once()
+
+  @mock.patch.object(host_utils, "is_sshable")
+  @mock.patch.object(host_utils, "is_pingable")
+  @mock.patch.object(network_probe, "probe_ssh", autospec=True, return_value={
+      "192.168.0.1": network_probe.ProbeResult.AVAILABLE,
+      "192.168.0.2": network_probe.ProbeResult.NOT_PINGABLE,
+      "192.168.0.3": network_probe.ProbeResult.DEADLINE_EXCEEDED,
+  })
+  def test_get_all_ssh_ips_with_network_probes(
+      self, mock_probe_ssh, mock_is_pingable, mock_is_sshable):
+    """Tests get_all_ssh_ips() probes the IPs while probes are enabled."""
+    static_ips = ["192.168.0.1", "192.168.0.2", "192.168.0.3"]
+    host_utils.enable_network_probes()
+    host_utils.enable_network_probes()
+    host_utils.disable_network_probes()
+    try:
+      self.assertEqual(
+          host_utils.get_all_ssh_ips(static_ips), ["192.168.0.1"])
+    finally:
+      host_utils.disable_network_probes()
+    mock_probe_ssh.assert_called_once_with(set(static_ips))
+    mock_is_pingable.assert_not_called()
+    mock_is_sshable.assert_not_called()
+
+    # The last disable_network_probes() call disables the probes.
+    mock_is_pingable.return_value = False
+    self.assertEqual(host_utils.get_all_ssh_ips(static_ips), [])
+    mock_probe_ssh.assert_called_once()
+
 
 class SnmpHostUtilsTests(unit_test_case.UnitTestCase):
   """Unit tests for SNMP methods in gazoo_device.utility.host_utils.py."""
@@ -409,6 +497,25 @@ class SnmpHostUtilsTests(unit_test_case.UnitTestCase):
     self.assertLen(snmp_ips, 1)
     self.assertContainsSubset(snmp_ips, static_ips)
 
+  @mock.patch.object(host_utils, "is_pingable")
+  @mock.patch.object(network_probe, "probe_snmp", autospec=True, return_value={
+      "0.0.0.0": network_probe.ProbeResult.AVAILABLE,
+      "1.1.1.1": network_probe.ProbeResult.SERVICE_UNAVAILABLE,
+      "2.2.2.2": network_probe.ProbeResult.NOT_PINGABLE,
+  })
+  def test_get_all_snmp_ips_with_network_probes(
+      self, mock_probe_snmp, mock_is_pingable):
+    """Tests get_all_snmp_ips() probes the IPs while probes are enabled."""
+    static_ips = ["0.0.0.0", "1.1.1.1", "2.2.2.2"]
+    host_utils.enable_network_probes()
+    try:
+      self.assertEqual(
+          host_utils.get_all_snmp_ips(static_ips=static_ips), ["0.0.0.0"])
+    finally:
+      host_utils.disable_network_probes()
+    mock_probe_snmp.assert_called_once_with(set(static_ips))
+    mock_is_pingable.assert_not_called()
+
   @mock.patch.object(subprocess, "check_output", autospec=True)
   def test_accepts_snmp__pass(self, mock_check_output):
     ip_address = "0.0.0.0"
@@ -0,0 +1,183 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.http_session_pool.py."""
+import concurrent.futures
+import time
+from unittest import mock
+
+from gazoo_device.tests.unit_tests.utils import fake_digest_auth_server
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import http_session_pool
+from gazoo_device.utility import http_utils
+import requests
+
+_USERNAME = fake_digest_auth_server.USERNAME
+_PASSWORD = fake_digest_auth_server.PASSWORD
+
+
+class HttpSessionPoolTests(unit_test_case.UnitTestCase):
+  """Unit tests for gazoo_device.utility.http_session_pool.py."""
+
+  def setUp(self):
+    super().setUp()
+    self.server = self._start_server()
+    self.pool = http_session_pool.HttpSessionPool()
+    self.addCleanup(self.pool.close)
+    self.auth = requests.auth.HTTPDigestAuth(_USERNAME, _PASSWORD)
+
+  def _start_server(self, delay=0):
+    server = fake_digest_auth_server.FakeDigestAuthServer(delay=delay)
+    self.addCleanup(server.close)
+    return server
+
+  def _send(self, url, method="get"):
+    with self.pool.session(url) as session:
+      response = getattr(session, method)(
+          url, auth=self.pool.get_auth(url, self.auth), timeout=5)
+    self.assertEqual(response.status_code, 200)
+    return response
+
+  def test_connection_and_nonce_reused(self):
+    """Tests requests to a host share a connection and a digest nonce."""
+    for _ in range(5):
+      self._send(self.server.url)
+      self._send(self.server.url, method="post")
+    self.assertEqual(self.server.connections, 1)
+    self.assertEqual(self.server.challenges, 1)
+
+  def test_expired_nonce_renewed(self):
+    """Tests a request with an expired nonce is resent once with a new one."""
+    self._send(self.server.url)
+    with self.server.lock:
+      self.server.nonce_counts.clear()  # Expires the nonce.
+    response = self._send(self.server.url)
+    self.assertLen(response.history, 1)
+    self.assertEqual(response.history[0].status_code, 401)
+    self.assertEqual(self.server.challenges, 2)
+    self._send(self.server.url)
+    self.assertEqual(self.server.challenges, 2)
+
+  def test_new_session_per_request_without_pool(self):
+    """Tests the baseline: a connection and a challenge per request."""
+    for _ in range(3):
+      http_utils.send_http_get(self.server.url, auth=self.auth)
+    self.assertEqual(self.server.connections, 3)
+    self.assertGreaterEqual(self.server.challenges, 1)
+
+  def test_sessions_per_host(self):
+    """Tests requests to other hosts use other sessions."""
+    other_server = self._start_server()
+    with self.pool.session(self.server.url) as session:
+      with self.pool.session(self.server.url + "1/state/") as same_session:
+        self.assertIs(session, same_session)
+      with self.pool.session(other_server.url) as other_session:
+        self.assertIsNot(session, other_session)
+    self.assertIsNot(
+        self.pool.get_auth(self.server.url, self.auth),
+        self.pool.get_auth(other_server.url, self.auth))
+
+  def test_parallel_requests(self):
+    """Tests parallel requests share the nonce and bounded connections."""
+    server = self._start_server(delay=0.05)
+    pool = http_session_pool.HttpSessionPool(max_connections_per_host=3)
+    self.addCleanup(pool.close)
+
+    def send(_):
+      with pool.session(server.url) as session:
+        return session.post(
+            server.url, auth=pool.get_auth(server.url, self.auth),
+            data={"value": "true"}, timeout=5).status_code
+
+    self.assertEqual(send(0), 200)  # Gets the nonce.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+      self.assertEqual(list(executor.map(send, range(16))), [200] * 16)
+    self.assertLessEqual(server.connections, 3)
+    # Only the first request is challenged: the threads share its nonce.
+    self.assertEqual(server.challenges, 1)
+
+  def test_get_auth_other_auth_unchanged(self):
+    """Tests authentication other than digest authentication is unchanged."""
+    basic_auth = requests.auth.HTTPBasicAuth(_USERNAME, _PASSWORD)
+    with self.pool.session(self.server.url):
+      self.assertIs(self.pool.get_auth(self.server.url, basic_auth),
+                    basic_auth)
+      self.assertIsNone(self.pool.get_auth(self.server.url, None))
+
+  def test_idle_sessions_closed(self):
+    """Tests sessions idle for longer than idle_timeout are closed."""
+    pool = http_session_pool.HttpSessionPool(idle_timeout=0)
+    self.addCleanup(pool.close)
+    with pool.session(self.server.url) as session:
+      pass
+    time.sleep(0.01)
+    with mock.patch.object(session, "close") as mock_close:
+      with pool.session(self.server.url) as new_session:
+        self.assertIsNot(new_session, session)
+    mock_close.assert_called_once()
+
+  def test_close(self):
+    """Tests close() closes all sessions."""
+    with self.pool.session(self.server.url) as session:
+      pass
+    with mock.patch.object(session, "close") as mock_close:
+      self.pool.close()
+    mock_close.assert_called_once()
+
+
+class HttpUtilsSessionPoolTests(unit_test_case.UnitTestCase):
+  """Unit tests for the session pool of gazoo_device.utility.http_utils.py."""
+
+  def setUp(self):
+    super().setUp()
+    self.server = fake_digest_auth_server.FakeDigestAuthServer()
+    self.addCleanup(self.server.close)
+    self.auth = requests.auth.HTTPDigestAuth(_USERNAME, _PASSWORD)
+
+  def test_send_http_requests_with_session_pool(self):
+    """Tests send_http_get/post reuse pooled sessions while enabled."""
+    http_utils.enable_session_pool()
+    self.addCleanup(http_utils.close_session_pool)
+    for _ in range(3):
+      http_utils.send_http_get(self.server.url, auth=self.auth)
+      http_utils.send_http_post(
+          self.server.url, auth=self.auth, data={"value": "true"})
+    self.assertEqual(self.server.connections, 1)
+    self.assertEqual(self.server.challenges, 1)
+
+  def test_session_factory_bypasses_pool(self):
+    """Tests an explicit session_factory is used instead of the pool."""
+    http_utils.enable_session_pool()
+    self.addCleanup(http_utils.close_session_pool)
+    mock_session_factory = mock.MagicMock(wraps=requests.Session)
+    http_utils.send_http_get(
+        self.server.url, auth=self.auth, session_factory=mock_session_factory)
+    mock_session_factory.assert_called_once()
+
+  def test_session_pool_reference_counting(self):
+    """Tests the pool is closed by the last close_session_pool() call."""
+    http_utils.enable_session_pool()
+    pool = http_utils._session_pool
+    http_utils.enable_session_pool()
+    self.assertIs(http_utils._session_pool, pool)
+    with mock.patch.object(pool, "close") as mock_close:
+      http_utils.close_session_pool()
+      mock_close.assert_not_called()
+      http_utils.close_session_pool()
+      mock_close.assert_called_once()
+    self.assertIsNone(http_utils._session_pool)
+    http_utils.close_session_pool()  # No-op without a matching enable call.
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
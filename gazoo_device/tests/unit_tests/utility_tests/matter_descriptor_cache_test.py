@@ -0,0 +1,97 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.matter_descriptor_cache.py."""
+import os
+import tempfile
+from unittest import mock
+
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import matter_descriptor_cache
+
+_DEVICE_NAME = "efr32matter-1234"
+_FIRMWARE_IDENTITY = "efr32matter:000440001234:1.0"
+_TOPOLOGY = {
+    "0": {"endpoint_class": "RootNodeEndpoint", "device_type_id": 22,
+          "clusters": ["BasicInformationClusterPwRpc"]},
+}
+
+
+class MatterDescriptorCacheTests(unit_test_case.UnitTestCase):
+  """Unit tests for matter_descriptor_cache."""
+
+  def setUp(self):
+    super().setUp()
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.directory = os.path.join(temp_dir.name, "matter_descriptor_cache")
+
+  def test_save_and_load(self):
+    """Tests the saved topology is loaded for the same firmware."""
+    matter_descriptor_cache.save(
+        self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY, _TOPOLOGY)
+    self.assertEqual(
+        matter_descriptor_cache.load(
+            self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY), _TOPOLOGY)
+    self.assertEqual(os.listdir(self.directory), [f"{_DEVICE_NAME}.json"])
+
+  def test_load_other_firmware(self):
+    """Tests the topology of another firmware is not loaded."""
+    matter_descriptor_cache.save(
+        self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY, _TOPOLOGY)
+    self.assertIsNone(
+        matter_descriptor_cache.load(
+            self.directory, _DEVICE_NAME, "efr32matter:000440001234:1.1"))
+
+  def test_load_missing(self):
+    """Tests None is returned if nothing was saved for the device."""
+    self.assertIsNone(
+        matter_descriptor_cache.load(
+            self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY))
+
+  def test_load_corrupted(self):
+    """Tests an unreadable cache file is ignored."""
+    os.makedirs(self.directory)
+    with open(os.path.join(self.directory, f"{_DEVICE_NAME}.json"), "w") as f:
+      f.write("{not json")
+    self.assertIsNone(
+        matter_descriptor_cache.load(
+            self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY))
+
+  def test_delete(self):
+    """Tests delete removes the saved topology and ignores missing ones."""
+    matter_descriptor_cache.save(
+        self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY, _TOPOLOGY)
+    matter_descriptor_cache.delete(self.directory, _DEVICE_NAME)
+    matter_descriptor_cache.delete(self.directory, _DEVICE_NAME)
+    self.assertIsNone(
+        matter_descriptor_cache.load(
+            self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY))
+
+
+  def test_save_failure_removes_temp_file(self):
+    """Tests a failed save leaves neither a cache file nor a temporary file."""
+    with mock.patch.object(os, "replace", side_effect=OSError("disk full")):
+      matter_descriptor_cache.save(
+          self.directory, _DEVICE_NAME, _FIRMWARE_IDENTITY, _TOPOLOGY)
+    self.assertEqual(os.listdir(self.directory), [])
+
+  def test_delete_failure_ignored(self):
+    """Tests delete logs and ignores errors other than a missing file."""
+    with mock.patch.object(
+        os, "remove", side_effect=PermissionError("read-only")):
+      matter_descriptor_cache.delete(self.directory, _DEVICE_NAME)
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -14,7 +14,10 @@
 
 """Unit tests for utility/multiprocessing_utils.py."""
 import multiprocessing
+import multiprocessing.connection
+import multiprocessing.forkserver
 import os
+import queue
 import sys
 from unittest import mock
 
@@ -44,6 +47,56 @@ class MultiprocessingUtilsTests(unit_test_case.UnitTestCase):
         multiprocessing_utils._get_multiprocessing_spawn_executable(),
         expected_executable)
 
+  def test_get_queue_reader(self):
+    """Tests get_queue_reader for multiprocessing and other queues."""
+    message_queue = multiprocessing_utils.get_context().Queue()
+    self.addCleanup(message_queue.close)
+    reader = multiprocessing_utils.get_queue_reader(message_queue)
+    self.assertIsNotNone(reader)
+    self.assertFalse(multiprocessing.connection.wait([reader], timeout=0))
+    message_queue.put("message")
+    self.assertEqual(
+        multiprocessing.connection.wait([reader], timeout=5), [reader])
+    self.assertIsNone(multiprocessing_utils.get_queue_reader(queue.Queue()))
+
+  @mock.patch.object(multiprocessing.forkserver, "ensure_running",
+                     autospec=True)
+  def test_enable_switchboard_forkserver(self, mock_ensure_running):
+    """Tests the forkserver is used until every enable call is matched."""
+    if multiprocessing_utils._FORKSERVER_CONTEXT is None:
+      self.skipTest("The forkserver start method isn't available.")
+    spawn_context = multiprocessing_utils.get_context()
+    forkserver_context = multiprocessing_utils._FORKSERVER_CONTEXT
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  spawn_context)
+    with mock.patch.object(forkserver_context, "set_forkserver_preload",
+                           autospec=True) as mock_set_preload:
+      self.assertTrue(multiprocessing_utils.enable_switchboard_forkserver(
+          preload_modules=["some_extension_package"]))
+      self.assertTrue(multiprocessing_utils.enable_switchboard_forkserver())
+    mock_ensure_running.assert_called()
+    preload_modules = mock_set_preload.call_args_list[0].args[0]
+    self.assertIn("gazoo_device", preload_modules)
+    self.assertIn("some_extension_package", preload_modules)
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  forkserver_context)
+    multiprocessing_utils.disable_switchboard_forkserver()
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  forkserver_context)
+    multiprocessing_utils.disable_switchboard_forkserver()
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  spawn_context)
+    multiprocessing_utils.disable_switchboard_forkserver()  # No-op.
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  spawn_context)
+
+  @mock.patch.object(multiprocessing_utils, "_FORKSERVER_CONTEXT", None)
+  def test_enable_switchboard_forkserver_unavailable(self):
+    """Tests processes are spawned where forkserver isn't available."""
+    self.assertFalse(multiprocessing_utils.enable_switchboard_forkserver())
+    self.assertIs(multiprocessing_utils.get_switchboard_process_context(),
+                  multiprocessing_utils.get_context())
+
 
 if __name__ == "__main__":
   unit_test_case.main()
@@ -0,0 +1,228 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.network_probe.py."""
+import asyncio
+import functools
+import socket
+import struct
+import time
+from unittest import mock
+
+from gazoo_device.tests.unit_tests.utils import fake_snmp_agent
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import network_probe
+from gazoo_device.utility import snmp_utils
+
+_AVAILABLE = network_probe.ProbeResult.AVAILABLE
+_NOT_PINGABLE = network_probe.ProbeResult.NOT_PINGABLE
+_SERVICE_UNAVAILABLE = network_probe.ProbeResult.SERVICE_UNAVAILABLE
+_DEADLINE_EXCEEDED = network_probe.ProbeResult.DEADLINE_EXCEEDED
+
+# Fake hosts which don't respond to pings.
+_UNPINGABLE_IPS = ("127.0.0.3",)
+_SYSTEM_DESCRIPTION = {snmp_utils.SYSTEM_DESCRIPTION_OID: b"Fake switch"}
+
+
+async def _fake_ping(unused_pinger, ip_address, unused_timeout):
+  return ip_address not in _UNPINGABLE_IPS
+
+
+class NetworkProbeTests(unit_test_case.UnitTestCase):
+  """Unit tests for gazoo_device.utility.network_probe.py."""
+
+  def setUp(self):
+    super().setUp()
+    # Fake SSH server of 127.0.0.1.
+    self.ssh_server = socket.socket()
+    self.addCleanup(self.ssh_server.close)
+    self.ssh_server.bind(("127.0.0.1", 0))
+    self.ssh_server.listen()
+    self.ssh_port = self.ssh_server.getsockname()[1]
+
+  def test_probe_ssh(self):
+    """Tests probing addresses with and without a reachable SSH port."""
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=_fake_ping):
+      results = network_probe.probe_ssh(
+          ["127.0.0.1", "127.0.0.2", "127.0.0.3"], port=self.ssh_port)
+    self.assertEqual(results, {
+        "127.0.0.1": _AVAILABLE,
+        "127.0.0.2": _SERVICE_UNAVAILABLE,
+        "127.0.0.3": _NOT_PINGABLE,
+    })
+
+  def test_probe_ssh_no_addresses(self):
+    """Tests probing no addresses."""
+    self.assertEqual(network_probe.probe_ssh([]), {})
+
+  def test_probe_snmp(self):
+    """Tests probing addresses with and without an SNMP agent."""
+    agent = fake_snmp_agent.FakeSnmpAgent(_SYSTEM_DESCRIPTION)
+    self.addCleanup(agent.close)
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=_fake_ping):
+      results = network_probe.probe_snmp(
+          ["127.0.0.1", "127.0.0.2", "127.0.0.3"], port=agent.port,
+          snmp_timeout=0.5)
+    self.assertEqual(results, {
+        "127.0.0.1": _AVAILABLE,
+        "127.0.0.2": _SERVICE_UNAVAILABLE,
+        "127.0.0.3": _NOT_PINGABLE,
+    })
+    self.assertLen(agent.requests, 1)
+    self.assertEqual(agent.requests[0].varbinds,
+                     ((snmp_utils.SYSTEM_DESCRIPTION_OID, None),))
+
+  def test_probe_snmp_wrong_community(self):
+    """Tests agents of other communities don't respond."""
+    agent = fake_snmp_agent.FakeSnmpAgent(
+        _SYSTEM_DESCRIPTION, community="public")
+    self.addCleanup(agent.close)
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=_fake_ping):
+      results = network_probe.probe_snmp(
+          ["127.0.0.1"], port=agent.port, snmp_timeout=0.2)
+    self.assertEqual(results, {"127.0.0.1": _SERVICE_UNAVAILABLE})
+
+  @mock.patch.object(network_probe, "_SNMP_RETRY_INTERVAL", new=0.05)
+  def test_probe_snmp_resends_requests(self):
+    """Tests requests without a response are resent."""
+    agent = fake_snmp_agent.FakeSnmpAgent(
+        _SYSTEM_DESCRIPTION, ignored_requests=2)
+    self.addCleanup(agent.close)
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=_fake_ping):
+      results = network_probe.probe_snmp(
+          ["127.0.0.1"], port=agent.port, snmp_timeout=5)
+    self.assertEqual(results, {"127.0.0.1": _AVAILABLE})
+    self.assertLen(agent.requests, 3)
+    self.assertLen({request.request_id for request in agent.requests}, 1)
+
+  def test_max_concurrency(self):
+    """Tests no more than max_concurrency addresses are probed at once."""
+    probes_in_progress = 0
+    max_probes_in_progress = 0
+
+    async def slow_ping(unused_pinger, unused_ip_address, unused_timeout):
+      nonlocal probes_in_progress, max_probes_in_progress
+      probes_in_progress += 1
+      max_probes_in_progress = max(max_probes_in_progress, probes_in_progress)
+      await asyncio.sleep(0.01)
+      probes_in_progress -= 1
+      return False
+
+    ip_addresses = [f"127.0.1.{i}" for i in range(20)]
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=slow_ping):
+      results = network_probe.probe_ssh(ip_addresses, max_concurrency=3)
+    self.assertEqual(results, dict.fromkeys(ip_addresses, _NOT_PINGABLE))
+    self.assertEqual(max_probes_in_progress, 3)
+
+  def test_deadline(self):
+    """Tests probes which don't finish before the deadline are abandoned."""
+
+    async def hanging_ping(unused_pinger, ip_address, unused_timeout):
+      if ip_address == "127.0.0.2":
+        await asyncio.sleep(60)
+      return True
+
+    start_time = time.monotonic()
+    with mock.patch.object(network_probe._IcmpPinger, "ping",
+                           new=hanging_ping):
+      results = network_probe.probe_ssh(
+          ["127.0.0.1", "127.0.0.2"], port=self.ssh_port, deadline=0.2)
+    self.assertLess(time.monotonic() - start_time, 5)
+    self.assertEqual(results, {
+        "127.0.0.1": _AVAILABLE,
+        "127.0.0.2": _DEADLINE_EXCEEDED,
+    })
+
+  def test_probe_from_running_event_loop(self):
+    """Tests probing from a coroutine of a running event loop."""
+
+    async def probe():
+      return network_probe.probe_ssh(["127.0.0.1"], port=self.ssh_port)
+
+    with mock.patch.object(network_probe._IcmpPinger, "ping", new=_fake_ping):
+      self.assertEqual(asyncio.run(probe()), {"127.0.0.1": _AVAILABLE})
+
+  @mock.patch.object(network_probe, "_open_icmp_socket",
+                     return_value=(None, False))
+  @mock.patch.object(network_probe, "_ping_with_subprocess", autospec=True,
+                     side_effect=functools.partial(_fake_ping, None))
+  def test_ping_without_icmp_socket(self, mock_ping_with_subprocess, _):
+    """Tests pings run ping subprocesses if ICMP sockets can't be opened."""
+    results = network_probe.probe_ssh(
+        ["127.0.0.1", "127.0.0.3"], port=self.ssh_port, ping_timeout=1)
+    self.assertEqual(results, {
+        "127.0.0.1": _AVAILABLE,
+        "127.0.0.3": _NOT_PINGABLE,
+    })
+    mock_ping_with_subprocess.assert_has_calls(
+        [mock.call("127.0.0.1", 1), mock.call("127.0.0.3", 1)],
+        any_order=True)
+
+  def test_ping_loopback(self):
+    """Tests pinging loopback addresses from an ICMP socket."""
+    icmp_socket, _ = network_probe._open_icmp_socket()
+    if icmp_socket is None:
+      self.skipTest("This process may not open ICMP sockets.")
+    icmp_socket.close()
+
+    async def ping(ip_address):
+      with network_probe._IcmpPinger() as pinger:
+        return await pinger.ping(ip_address, timeout=1)
+
+    self.assertTrue(asyncio.run(ping("127.0.0.1")))
+    self.assertFalse(asyncio.run(ping("not an IP address")))
+
+  @mock.patch.object(network_probe, "_PING_RETRY_INTERVAL", new=0.05)
+  def test_ping_resends_echo_requests(self):
+    """Tests echo requests without a reply are resent until the timeout."""
+    # A UDP socket stands in for the ICMP socket: nothing replies to it.
+    fake_icmp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    fake_icmp_socket.setblocking(False)
+    sent_requests = []
+
+    async def ping():
+      with mock.patch.object(network_probe, "_open_icmp_socket",
+                             return_value=(fake_icmp_socket, False)):
+        pinger = network_probe._IcmpPinger()
+      with mock.patch.object(pinger, "_socket") as mock_socket:
+        mock_socket.sendto.side_effect = (
+            lambda request, address: sent_requests.append(request))
+        result = await pinger.ping("127.0.0.1", timeout=0.3)
+      pinger.close()
+      return result, pinger._waiters
+
+    result, waiters = asyncio.run(ping())
+    self.assertFalse(result)
+    self.assertGreaterEqual(len(sent_requests), 3)
+    self.assertLen(set(sent_requests), 1)
+    self.assertFalse(waiters)
+
+  def test_parse_echo_reply(self):
+    """Tests parsing echo replies with and without the IPv4 header."""
+    request = network_probe._create_echo_request(0x1234, 7)
+    self.assertEqual(network_probe._icmp_checksum(request), 0)
+    self.assertIsNone(network_probe._parse_echo_reply(request))
+
+    reply = bytes([network_probe._ICMP_ECHO_REPLY]) + request[1:]
+    self.assertEqual(network_probe._parse_echo_reply(reply), (0x1234, 7))
+    ipv4_header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(reply), 0, 0,
+                              64, socket.IPPROTO_ICMP, 0,
+                              socket.inet_aton("127.0.0.1"),
+                              socket.inet_aton("127.0.0.1"))
+    self.assertEqual(
+        network_probe._parse_echo_reply(ipv4_header + reply), (0x1234, 7))
+    self.assertIsNone(network_probe._parse_echo_reply(b""))
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
@@ -0,0 +1,233 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.snmp_utils.py."""
+import socket
+import threading
+
+from absl.testing import parameterized
+from gazoo_device import errors
+from gazoo_device.tests.unit_tests.utils import fake_snmp_agent
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import snmp_utils
+
+# "snmpget -v 2c -c private <ip> 1.3.6.1.2.1.1.1.0" with request ID 1234.
+_SYSTEM_DESCRIPTION_GET_REQUEST = bytes.fromhex(
+    "3028020101040770726976617465a01a020204d2020100020100300e300c06082b06"
+    "0102010101000500")
+# Response to a GET request of ifAdminStatus.2 and ifAdminStatus.3 with
+# request ID 5. Port 3 doesn't exist (noSuchInstance).
+_PORT_MODE_GET_RESPONSE = bytes.fromhex(
+    "303a020101040770726976617465a22c0201050201000201003021300f060a2b0601"
+    "02010202010702020101300e060a2b0601020102020107038100")
+_PORT_MODE_OIDS = [f"1.3.6.1.2.1.2.2.1.7.{port}" for port in range(1, 51)]
+
+
+class SnmpUtilsTests(unit_test_case.UnitTestCase):
+  """Unit tests for gazoo_device.utility.snmp_utils.py."""
+
+  def test_encode_get_request(self):
+    """Tests encoding a GET request."""
+    self.assertEqual(
+        snmp_utils.encode_get_request(
+            "private", 1234, [snmp_utils.SYSTEM_DESCRIPTION_OID]),
+        _SYSTEM_DESCRIPTION_GET_REQUEST)
+
+  def test_decode_get_request(self):
+    """Tests decoding a GET request."""
+    self.assertEqual(
+        snmp_utils.decode_message(_SYSTEM_DESCRIPTION_GET_REQUEST),
+        snmp_utils.SnmpMessage(
+            community="private",
+            pdu_type=snmp_utils.GET_REQUEST,
+            request_id=1234,
+            error_status=0,
+            error_index=0,
+            varbinds=((snmp_utils.SYSTEM_DESCRIPTION_OID, None),)))
+
+  def test_decode_response_without_value(self):
+    """Tests decoding a response with values and a noSuchInstance varbind."""
+    message = snmp_utils.decode_message(_PORT_MODE_GET_RESPONSE)
+    self.assertEqual(message.pdu_type, snmp_utils.GET_RESPONSE)
+    self.assertEqual(message.request_id, 5)
+    self.assertEqual(message.varbinds, (("1.3.6.1.2.1.2.2.1.7.2", 1),
+                                        ("1.3.6.1.2.1.2.2.1.7.3", None)))
+
+  def test_encode_and_decode_values(self):
+    """Tests encoding and decoding varbinds of all supported value types."""
+    varbinds = (
+        ("1.3.6.1.2.1.2.2.1.7.2", 1),
+        ("1.3.6.1.2.1.2.2.1.7.300", -129),
+        ("1.3.6.1.2.1.1.1.0", b"x" * 300),  # Long form length.
+        ("1.3.6.1.2.1.1.2.0", "1.3.6.1.4.1.171.10.153"),
+        ("2.999.3", None),
+    )
+    message = snmp_utils.decode_message(
+        snmp_utils.encode_message(
+            "public", snmp_utils.GET_RESPONSE, 2**31 - 1, varbinds,
+            error_status=3, error_index=2))
+    self.assertEqual(
+        message,
+        snmp_utils.SnmpMessage(
+            community="public",
+            pdu_type=snmp_utils.GET_RESPONSE,
+            request_id=2**31 - 1,
+            error_status=3,
+            error_index=2,
+            varbinds=varbinds))
+
+  def test_encode_unsupported_value(self):
+    """Tests encoding a value of an unsupported type raises TypeError."""
+    with self.assertRaisesRegex(TypeError, "Unsupported SNMP value type"):
+      snmp_utils.encode_message(
+          "private", snmp_utils.SET_REQUEST, 1, [("1.3.6.1", True)])
+
+  @parameterized.named_parameters(
+      ("empty", b"", "Truncated"),
+      ("truncated", _SYSTEM_DESCRIPTION_GET_REQUEST[:-1], "Invalid BER length"),
+      ("trailing_data", _SYSTEM_DESCRIPTION_GET_REQUEST + b"\x00",
+       "Invalid BER length"),
+      ("not_a_sequence", b"\x04\x00", "Expected BER tag 0x30"),
+      ("snmp_v1", bytes.fromhex("3003020100"), "Unsupported SNMP version 0"),
+      ("unsupported_pdu", bytes.fromhex("300d020101040770726976617465a4"),
+       "Unsupported SNMP PDU type 164"))
+  def test_decode_invalid_message(self, data, error_regex):
+    """Tests decoding invalid messages raises ValueError."""
+    with self.assertRaisesRegex(ValueError, error_regex):
+      snmp_utils.decode_message(data)
+
+
+class SnmpClientTests(unit_test_case.UnitTestCase):
+  """Unit tests for snmp_utils.SnmpClient."""
+
+  def setUp(self):
+    super().setUp()
+    self.agent = fake_snmp_agent.FakeSnmpAgent(
+        dict.fromkeys(_PORT_MODE_OIDS, 1))
+    self.addCleanup(self.agent.close)
+    self.client = snmp_utils.SnmpClient(
+        "127.0.0.1", "private", port=self.agent.port, timeout=2,
+        retry_interval=0.05)
+    self.addCleanup(self.client.close)
+
+  def test_get(self):
+    """Tests getting values, including a missing one."""
+    self.agent.values[_PORT_MODE_OIDS[1]] = 2
+    self.assertEqual(
+        self.client.get(_PORT_MODE_OIDS[:2] + ["1.3.6.1.2.1.1.1.0"]),
+        [1, 2, None])
+    self.assertLen(self.agent.requests, 1)
+
+  def test_get_and_set_batches_varbinds(self):
+    """Tests OIDs are sent in batches of _MAX_VARBINDS_PER_REQUEST."""
+    self.assertEqual(
+        self.client.set([(oid, 2) for oid in _PORT_MODE_OIDS]), [2] * 50)
+    self.assertEqual(self.client.get(_PORT_MODE_OIDS), [2] * 50)
+    self.assertEqual(
+        [(request.pdu_type, len(request.varbinds))
+         for request in self.agent.requests],
+        [(snmp_utils.SET_REQUEST, 24), (snmp_utils.SET_REQUEST, 24),
+         (snmp_utils.SET_REQUEST, 2), (snmp_utils.GET_REQUEST, 24),
+         (snmp_utils.GET_REQUEST, 24), (snmp_utils.GET_REQUEST, 2)])
+
+  def test_socket_reused(self):
+    """Tests requests are sent from the same socket until closed."""
+    self.client.get(_PORT_MODE_OIDS[:1])
+    endpoints = dict(self.client._transport._endpoints)
+    self.client.get(_PORT_MODE_OIDS[:1])
+    self.assertEqual(self.client._transport._endpoints, endpoints)
+    self.client.close()
+    self.assertEmpty(self.client._transport._endpoints)
+    self.assertEqual(self.client.get(_PORT_MODE_OIDS[:1]), [1])
+
+  def test_request_ids(self):
+    """Tests each request has a new request ID."""
+    self.client.get(_PORT_MODE_OIDS[:1])
+    self.client.get(_PORT_MODE_OIDS[:1])
+    self.assertLen({request.request_id for request in self.agent.requests}, 2)
+
+  def test_resends_requests(self):
+    """Tests requests without a response are resent with the same ID."""
+    self.agent._ignored_requests = 2
+    self.assertEqual(self.client.get(_PORT_MODE_OIDS[:1]), [1])
+    self.assertLen(self.agent.requests, 3)
+    self.assertLen({request.request_id for request in self.agent.requests}, 1)
+
+  def test_timeout(self):
+    """Tests a CommunicationTimeoutError is raised without a response."""
+    client = snmp_utils.SnmpClient(
+        "127.0.0.1", "public", port=self.agent.port, timeout=0.2,
+        retry_interval=0.05)
+    self.addCleanup(client.close)
+    with self.assertRaisesRegex(errors.CommunicationTimeoutError,
+                                "did not respond within 0.2s"):
+      client.get(_PORT_MODE_OIDS[:1])
+    self.assertGreaterEqual(len(self.agent.requests), 3)
+
+  def test_error_status(self):
+    """Tests a DeviceError is raised for responses with an error status."""
+    with self.assertRaisesRegex(errors.DeviceError,
+                                "error noSuchName for varbind 2"):
+      self.client.set([(_PORT_MODE_OIDS[0], 2), ("1.3.6.1.2.1.1.1.0", 1)])
+
+  def test_stale_responses_ignored(self):
+    """Tests responses to other requests and other data are dropped."""
+    agent_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.addCleanup(agent_socket.close)
+    agent_socket.bind(("127.0.0.1", 0))
+    client = snmp_utils.SnmpClient(
+        "127.0.0.1", "private", port=agent_socket.getsockname()[1])
+    self.addCleanup(client.close)
+
+    def respond():
+      data, address = agent_socket.recvfrom(2048)
+      request = snmp_utils.decode_message(data)
+      for request_id, value in ((request.request_id - 1, 2),
+                                (request.request_id, 1)):
+        agent_socket.sendto(b"not SNMP", address)
+        agent_socket.sendto(
+            snmp_utils.encode_message(
+                "private", snmp_utils.GET_RESPONSE, request_id,
+                [(_PORT_MODE_OIDS[0], value)]),
+            address)
+
+    responder = threading.Thread(target=respond, daemon=True)
+    responder.start()
+    self.assertEqual(client.get(_PORT_MODE_OIDS[:1]), [1])
+    responder.join()
+
+  def test_unexpected_oids(self):
+    """Tests a DeviceError is raised if the response has other OIDs."""
+    agent_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.addCleanup(agent_socket.close)
+    agent_socket.bind(("127.0.0.1", 0))
+    client = snmp_utils.SnmpClient(
+        "127.0.0.1", "private", port=agent_socket.getsockname()[1])
+    self.addCleanup(client.close)
+
+    def respond():
+      data, address = agent_socket.recvfrom(2048)
+      request = snmp_utils.decode_message(data)
+      agent_socket.sendto(
+          snmp_utils.encode_message(
+              "private", snmp_utils.GET_RESPONSE, request.request_id,
+              [(_PORT_MODE_OIDS[1], 1)]),
+          address)
+
+    threading.Thread(target=respond, daemon=True).start()
+    with self.assertRaisesRegex(errors.DeviceError, "responded with OIDs"):
+      client.get(_PORT_MODE_OIDS[:1])
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
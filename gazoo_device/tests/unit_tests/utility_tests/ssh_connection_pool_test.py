@@ -0,0 +1,136 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for gazoo_device.utility.ssh_connection_pool.py."""
+import os
+import subprocess
+import time
+from unittest import mock
+
+from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import ssh_connection_pool
+
+
+def _get_control_path(ssh_options: list[str]) -> str:
+  """Returns the ControlPath value from the ssh options."""
+  for option in ssh_options:
+    if option.startswith("ControlPath="):
+      return option[len("ControlPath="):]
+  raise ValueError(f"No ControlPath in {ssh_options}")
+
+
+class SshConnectionPoolTests(unit_test_case.UnitTestCase):
+  """Unit tests for gazoo_device.utility.ssh_connection_pool.py."""
+
+  def setUp(self):
+    super().setUp()
+    self.pool = ssh_connection_pool.SshConnectionPool(
+        idle_timeout=60, health_check_interval=10)
+    self.addCleanup(self.pool.close)
+    self.mock_run = self.enter_context(
+        mock.patch.object(subprocess, "run", autospec=True))
+    self.mock_run.return_value = subprocess.CompletedProcess([], 0)
+
+  def test_get_ssh_options_uses_one_master_per_connection(self):
+    """Tests connections are keyed by user, address and key."""
+    options = self.pool.get_ssh_options("1.2.3.4", "root", "/key")
+    self.assertIn("ControlMaster=auto", options)
+    self.assertIn("ControlPersist=60", options)
+    control_path = _get_control_path(options)
+    self.assertTrue(os.path.isdir(os.path.dirname(control_path)))
+    self.assertEqual(
+        _get_control_path(self.pool.get_ssh_options("1.2.3.4", "root", "/key")),
+        control_path)
+    other_control_paths = {
+        _get_control_path(self.pool.get_ssh_options(*connection))
+        for connection in (("1.2.3.5", "root", "/key"),
+                           ("1.2.3.4", "pi", "/key"),
+                           ("1.2.3.4", "root", None))}
+    self.assertLen(other_control_paths, 3)
+    self.assertNotIn(control_path, other_control_paths)
+    self.mock_run.assert_not_called()
+
+  def test_get_ssh_options_removes_stale_control_socket(self):
+    """Tests the master is checked after the health check interval."""
+    with mock.patch.object(time, "monotonic", return_value=100):
+      control_path = _get_control_path(
+          self.pool.get_ssh_options("1.2.3.4", "root"))
+    open(control_path, "w").close()
+    self.mock_run.return_value = subprocess.CompletedProcess([], 255)
+
+    with mock.patch.object(time, "monotonic", return_value=105):
+      self.pool.get_ssh_options("1.2.3.4", "root")
+    self.mock_run.assert_not_called()
+    with mock.patch.object(time, "monotonic", return_value=111):
+      self.pool.get_ssh_options("1.2.3.4", "root")
+    self.mock_run.assert_called_once()
+    self.assertEqual(self.mock_run.call_args[0][0][:3], ["ssh", "-O", "check"])
+    self.assertFalse(os.path.exists(control_path))
+
+  def test_get_ssh_options_keeps_running_master(self):
+    """Tests the control socket of a running master is kept."""
+    with mock.patch.object(time, "monotonic", return_value=100):
+      control_path = _get_control_path(
+          self.pool.get_ssh_options("1.2.3.4", "root"))
+    open(control_path, "w").close()
+    with mock.patch.object(time, "monotonic", return_value=111):
+      self.pool.get_ssh_options("1.2.3.4", "root")
+    self.mock_run.assert_called_once()
+    self.assertTrue(os.path.exists(control_path))
+
+  def test_idle_connections_without_master_are_forgotten(self):
+    """Tests idle connections whose master exited are not checked again."""
+    with mock.patch.object(time, "monotonic", return_value=100):
+      self.pool.get_ssh_options("1.2.3.4", "root")
+    with mock.patch.object(time, "monotonic", return_value=200):
+      self.pool.get_ssh_options("1.2.3.5", "root")
+      # A new master is started for the forgotten connection without a check.
+      self.pool.get_ssh_options("1.2.3.4", "root")
+    self.mock_run.assert_not_called()
+
+  def test_idle_connections_with_master_are_stopped_by_close(self):
+    """Tests masters used by long running commands are tracked until close."""
+    with mock.patch.object(time, "monotonic", return_value=100):
+      control_path = _get_control_path(
+          self.pool.get_ssh_options("1.2.3.4", "root"))
+    open(control_path, "w").close()
+    with mock.patch.object(time, "monotonic", return_value=1000):
+      self.pool.get_ssh_options("1.2.3.5", "root")
+    self.mock_run.assert_not_called()
+
+    self.pool.close()
+    self.mock_run.assert_called_once()
+    self.assertEqual(self.mock_run.call_args[0][0][:3], ["ssh", "-O", "exit"])
+    self.assertIn(f"ControlPath={control_path}", self.mock_run.call_args[0][0])
+
+  def test_close_stops_masters(self):
+    """Tests close() stops running masters and removes the sockets."""
+    control_path = _get_control_path(
+        self.pool.get_ssh_options("1.2.3.4", "root"))
+    self.pool.get_ssh_options("1.2.3.5", "root")  # Master isn't running.
+    open(control_path, "w").close()
+
+    self.pool.close()
+    self.mock_run.assert_called_once()
+    self.assertEqual(self.mock_run.call_args[0][0],
+                     ["ssh", "-O", "exit", "-o", f"ControlPath={control_path}",
+                      "root@1.2.3.4"])
+    self.assertFalse(os.path.exists(os.path.dirname(control_path)))
+    # The pool is still usable after close().
+    new_control_path = _get_control_path(
+        self.pool.get_ssh_options("1.2.3.4", "root"))
+    self.assertTrue(os.path.isdir(os.path.dirname(new_control_path)))
+
+
+if __name__ == "__main__":
+  unit_test_case.main()
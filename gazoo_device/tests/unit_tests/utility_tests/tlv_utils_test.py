@@ -19,6 +19,7 @@ This is a mirror of
 https://github.com/project-chip/connectedhomeip/blob/master/src/controller/python/test/unit_tests/test_tlv.py
 """
 from gazoo_device.utility import tlv_utils
+import struct
 import unittest
 
 tlvUint = tlv_utils.uint
@@ -116,6 +117,35 @@ class TestTLVWriter(unittest.TestCase):
             pass
 
 
+    def test_tags(self):
+        writer = tlv_utils.TLVWriter(implicitProfile=0x235A0000)
+        writer.put(None, {(0x235A0000, 1): 'a', (0, 2): b'\x01',
+                          (0xFFF10001, 3): 1.5, 5: None, 4: [True, False],
+                          (None, 70000): tlv_utils.float32(0.5)})
+        self.assertEqual(
+            writer.encoding,
+            bytearray(b'\x156\x04\t\x08\x184\x05\xaap\x11\x01\x00'
+                      b'\x00\x00\x00?P\x02\x00\x01\x01\x8c\x01\x00\x01a'
+                      b'\xcb\xf1\xff\x01\x00\x03\x00\x00\x00\x00\x00\x00'
+                      b'\x00\xf8?\x18'))
+
+    def test_invalid_tags(self):
+        writer = tlv_utils.TLVWriter()
+        with self.assertRaises(ValueError):
+            writer.put(1, 1)
+        writer.startStructure(None)
+        with self.assertRaises(ValueError):
+            writer.put(None, 1)
+        writer.startArray(1)
+        with self.assertRaises(ValueError):
+            writer.put(2, 1)
+        with self.assertRaises(ValueError):
+            writer.put((0, 2), 1)
+        writer.endContainer()
+        writer.endContainer()
+        self.assertEqual(writer.encoding, bytearray(b'\x15\x36\x01\x18\x18'))
+
+
 class TestTLVReader(unittest.TestCase):
     def _read_case(self, input, answer):
         decoded = tlv_utils.TLVReader(bytearray(input)).get()["Any"]
@@ -163,5 +193,70 @@ class TestTLVReader(unittest.TestCase):
             self._read_case(tlv_bytes, answer)
 
 
+    def test_strings(self):
+        self._read_case(b'\x0c\x05hello', 'hello')
+        self._read_case(b'\x0c\x02\xff\xfe', b'\xff\xfe')
+        self._read_case(b'\x11\x03\x00abc', b'abc')
+
+    def test_decoding(self):
+        reader = tlv_utils.TLVReader(b'\x15\x2c\x01\x02hi\x18')
+        self.assertEqual(reader.get(), {'Any': {1: 'hi'}})
+        self.assertEqual(reader.decoding, [{
+            'tagControl': 'Anonymous', 'type': 'Structure', 'tag': None,
+            'tagLen': 0, 'strDataLen': 0, 'strDataLenLen': 0,
+            'value': {1: 'hi'},
+            'Structure': [
+                {'tagControl': 'Context 1-byte',
+                 'type': 'UTF-8 String 1-byte length', 'tag': 1, 'tagLen': 1,
+                 'strDataLen': 2, 'strDataLenLen': 1, 'value': 'hi'},
+                {'tagControl': 'Anonymous', 'type': 'End of Collection',
+                 'tag': None, 'tagLen': 0, 'strDataLen': 0,
+                 'strDataLenLen': 0, 'value': None}]}])
+
+    def test_get_values(self):
+        tlv_bytes = b'\x15\x2c\x01\x02hi\x44\x02\x00\x09\x18'
+        reader = tlv_utils.TLVReader(tlv_bytes)
+        self.assertEqual(reader.getValues(),
+                         tlv_utils.TLVReader(tlv_bytes).get())
+        self.assertEqual(reader.decoding, [])
+
+    def test_invalid(self):
+        with self.assertRaises(struct.error):
+            tlv_utils.TLVReader(b'\x0c\x05hell').get()
+        with self.assertRaises(struct.error):
+            tlv_utils.TLVReader(b'\x02\x01\x02').getValues()
+        with self.assertRaises(KeyError):
+            tlv_utils.TLVReader(b'\x19').get()
+
+
+class TestTLVStreamReader(unittest.TestCase):
+    def test_chunks(self):
+        writer = tlv_utils.TLVWriter()
+        writer.put(None, {1: [1, 2], 2: 'abc'})
+        writer.put((None, 3), b'\x00' * 300)
+        writer.put(None, tlvUint(7))
+        reader = tlv_utils.TLVStreamReader()
+        elements = []
+        for i in range(len(writer.encoding)):
+            elements.extend(reader.feed(writer.encoding[i:i + 1]))
+        self.assertEqual(elements, [(None, {1: [1, 2], 2: 'abc'}),
+                                    ((None, 3), b'\x00' * 300),
+                                    (None, 7)])
+        self.assertEqual(type(elements[2][1]), tlvUint)
+        self.assertEqual(reader.bytesPending, 0)
+
+    def test_incomplete_container(self):
+        reader = tlv_utils.TLVStreamReader()
+        self.assertEqual(reader.feed(b'\x16\x00\x01'), [])
+        self.assertEqual(reader.bytesPending, 3)
+        self.assertEqual(reader.feed(b'\x18\x00'), [(None, [1])])
+        self.assertEqual(reader.bytesPending, 1)
+
+    def test_end_of_collection(self):
+        reader = tlv_utils.TLVStreamReader()
+        self.assertEqual(reader.feed(b'\x09\x18\x08'), [(None, True)])
+        self.assertTrue(reader.ended)
+        self.assertEqual(reader.feed(b'\x08'), [])
+
 if __name__ == "__main__":
   unittest.main()
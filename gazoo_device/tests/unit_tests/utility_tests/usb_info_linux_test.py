@@ -16,7 +16,9 @@
 from unittest import mock
 from absl.testing import parameterized
 from gazoo_device.tests.unit_tests.utils import unit_test_case
+from gazoo_device.utility import usb_config
 from gazoo_device.utility import usb_info_linux
+import pyudev
 
 
 class UsbInfoTests(parameterized.TestCase):
@@ -51,5 +53,65 @@ class UsbInfoTests(parameterized.TestCase):
               "be {} but is {}".format(address, key, expected_value,
                                        actual_value))
 
+class UsbInventoryTests(unit_test_case.UnitTestCase):
+  """Tests the USB inventory cache."""
+
+  def setUp(self):
+    super().setUp()
+    mock.patch.object(pyudev, "Context", autospec=True).start()
+    self.mock_monitor = mock.patch.object(
+        pyudev.Monitor, "from_netlink", autospec=True).start().return_value
+    self.mock_observer_class = mock.patch.object(
+        pyudev, "MonitorObserver", autospec=True).start()
+    self.mock_get_info = mock.patch.object(
+        usb_info_linux, "get_address_to_usb_info_dict", autospec=True,
+        side_effect=lambda: {"/dev/ttyUSB0": usb_config.UsbInfo()}).start()
+    self.addCleanup(mock.patch.stopall)
+    self.uut = usb_info_linux.UsbInventory()
+    self.addCleanup(self.uut.close)
+
+  def _send_udev_event(self):
+    callback = self.mock_observer_class.call_args.kwargs["callback"]
+    callback(mock.MagicMock(spec=pyudev.Device))
+
+  def test_monitor_started_before_first_snapshot(self):
+    """Tests the udev monitor watches the relevant subsystems."""
+    self.mock_monitor.filter_by.assert_has_calls(
+        [mock.call("usb"), mock.call("tty"), mock.call("block")])
+    self.mock_observer_class.return_value.start.assert_called_once()
+    self.mock_get_info.assert_not_called()
+
+  def test_snapshot_is_reused_until_udev_event(self):
+    """Tests the snapshot is rebuilt only after a udev event."""
+    snapshot = self.uut.get_snapshot()
+    self.assertEqual(snapshot.version, 0)
+    self.assertIn("/dev/ttyUSB0", snapshot.address_to_usb_info)
+    self.assertIs(self.uut.get_snapshot(), snapshot)
+    self.mock_get_info.assert_called_once()
+
+    self._send_udev_event()
+    self._send_udev_event()
+    self.assertEqual(self.uut.version, 2)
+    new_snapshot = self.uut.get_snapshot()
+    self.assertEqual(new_snapshot.version, 2)
+    self.assertIs(self.uut.get_snapshot(), new_snapshot)
+    self.assertEqual(self.mock_get_info.call_count, 2)
+
+  def test_event_while_building_snapshot_invalidates_it(self):
+    """Tests an event during a snapshot build causes another build."""
+    def get_info_with_event():
+      self._send_udev_event()
+      return {}
+    self.mock_get_info.side_effect = get_info_with_event
+    snapshot = self.uut.get_snapshot()
+    self.assertEqual(snapshot.version, 0)
+    self.assertEqual(self.uut.get_snapshot().version, 1)
+
+  def test_close_stops_monitor(self):
+    """Tests closing the inventory stops the udev monitor thread."""
+    self.uut.close()
+    self.mock_observer_class.return_value.stop.assert_called()
+
+
 if __name__ == "__main__":
   unit_test_case.main()
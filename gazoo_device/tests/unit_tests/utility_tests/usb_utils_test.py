@@ -240,6 +240,56 @@ class UsbUtilsTests(unit_test_case.UnitTestCase):
       usb_utils.get_usb_device_from_serial_number("123")
       usb_find.assert_called_once()
 
+  @mock.patch("sys.platform", "linux")
+  @mock.patch.object(usb_info_linux, "UsbInventory", autospec=True)
+  def test_090_usb_inventory_lookups(self, mock_inventory_class):
+    """Tests lookups read the inventory snapshot while it's enabled."""
+    mock_inventory = mock_inventory_class.return_value
+    mock_inventory.get_snapshot.return_value = (
+        usb_info_linux.UsbInventorySnapshot(
+            version=1, address_to_usb_info=USB_INFO_DICT_LINUX))
+    self.assertIsNone(usb_utils.get_usb_inventory_snapshot())
+    self.assertTrue(usb_utils.enable_usb_inventory())
+    self.assertTrue(usb_utils.enable_usb_inventory())
+    try:
+      with mock.patch.object(
+          usb_info_linux, "get_address_to_usb_info_dict") as mock_get_info:
+        self.assertEqual(
+            usb_utils.get_serial_number_from_path(CAMBRIONIX_SYMLINK),
+            "DJ00JMN0")
+        self.assertEqual(
+            usb_utils.get_usb_hub_info(CHILD_DEVICE_SYMLINK_3),
+            {"device_usb_hub_name": CAMBRIONIX_SYMLINK, "device_usb_port": 2})
+        self.assertEqual(
+            usb_utils.get_other_ftdi_line(CHILD_DEVICE_SYMLINK_0, 3),
+            CHILD_DEVICE_SYMLINK_3)
+        address_to_usb_info = usb_utils.get_address_to_usb_info_dict()
+        mock_get_info.assert_not_called()
+      mock_inventory_class.assert_called_once()
+      self.assertEqual(usb_utils.get_usb_inventory_snapshot().version, 1)
+      # Callers get copies of the shared snapshot entries.
+      self.assertCountEqual(address_to_usb_info, USB_INFO_DICT_LINUX)
+      self.assertIsNot(address_to_usb_info[CAMBRIONIX_SYMLINK],
+                       USB_INFO_DICT_LINUX[CAMBRIONIX_SYMLINK])
+      self.assertIsNot(usb_utils.get_device_info(CAMBRIONIX_SYMLINK),
+                       USB_INFO_DICT_LINUX[CAMBRIONIX_SYMLINK])
+      usb_utils.close_usb_inventory()
+      mock_inventory.close.assert_not_called()
+    finally:
+      usb_utils.close_usb_inventory()
+    mock_inventory.close.assert_called_once()
+    self.assertIsNone(usb_utils.get_usb_inventory_snapshot())
+    usb_utils.close_usb_inventory()  # No-op.
+    mock_inventory.close.assert_called_once()
+
+  @mock.patch("sys.platform", "darwin")
+  @mock.patch.object(usb_info_linux, "UsbInventory", autospec=True)
+  def test_091_usb_inventory_not_supported_on_mac(self, mock_inventory_class):
+    """Tests the inventory isn't enabled on MacOS."""
+    self.assertFalse(usb_utils.enable_usb_inventory())
+    mock_inventory_class.assert_not_called()
+    self.assertIsNone(usb_utils.get_usb_inventory_snapshot())
+
 
 if __name__ == "__main__":
   unit_test_case.main()
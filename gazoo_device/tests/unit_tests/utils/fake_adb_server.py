@@ -0,0 +1,329 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake adb server speaking the host protocol on 127.0.0.1.
+
+Serves the requests sent by adb_client.AdbClient for the devices in
+self.devices: host:devices, host:track-devices, features, shell v2 commands
+(answered from self.shell_responses), sync STAT, SEND and RECV (files are kept
+in self.files), streamed package installs and port forwarding. Counts the
+connections it accepts.
+
+Usage (typically in test setup):
+  self.server = fake_adb_server.FakeAdbServer()
+  self.addCleanup(self.server.close)
+  client = adb_client.AdbClient(self.server.address)
+"""
+import socketserver
+import stat
+import struct
+import threading
+from typing import Optional
+
+_POLL_INTERVAL = 0.01
+_SHELL_HEADER = struct.Struct("<BI")
+_SHELL_STDIN = 0
+_SHELL_STDOUT = 1
+_SHELL_STDERR = 2
+_SHELL_EXIT = 3
+_SYNC_HEADER = struct.Struct("<4sI")
+_SYNC_STAT_RESPONSE = struct.Struct("<4sIII")
+_DEFAULT_FEATURES = "shell_v2,cmd,stat_v2"
+
+
+class _ConnectionClosed(Exception):
+  """The client closed the connection."""
+
+
+class _AdbRequestHandler(socketserver.BaseRequestHandler):
+  """Serves one connection from an adb client."""
+  server: "FakeAdbServer"
+
+  def setup(self):
+    with self.server.lock:
+      self.server.connections += 1
+
+  def handle(self):
+    try:
+      self._handle_host_request()
+    except (_ConnectionClosed, OSError):
+      pass
+
+  def _handle_host_request(self):
+    request = self._read_request()
+    with self.server.lock:
+      self.server.requests.append(request)
+    if request == "host:devices":
+      self._send_okay()
+      self._send_length_prefixed(self.server.get_device_list())
+    elif request == "host:track-devices":
+      self._send_okay()
+      self._track_devices()
+    elif request == "host:list-forward":
+      self._send_okay()
+      with self.server.lock:
+        forwards = "".join(f"{serial} {local} {remote}\n"
+                           for local, (serial, remote)
+                           in self.server.forwards.items())
+      self._send_length_prefixed(forwards)
+    elif request.startswith(("host:transport:", "host:transport-any")):
+      serial = self._get_device(request.partition("host:transport:")[2])
+      if serial is not None:
+        self._send_okay()
+        self._handle_device_service(serial, self._read_request())
+    elif request.startswith(("host-serial:", "host:")):
+      self._handle_device_host_request(request)
+    else:
+      self._send_fail(f"unknown host service {request!r}")
+
+  def _handle_device_host_request(self, request: str):
+    """Serves host-serial:<serial>:<request> and host:<request> requests."""
+    if request.startswith("host-serial:"):
+      # Serials can contain colons ("12.34.56.78:5555").
+      serial_and_request = request[len("host-serial:"):]
+      with self.server.lock:
+        serials = list(self.server.devices)
+      serial, device_request = serial_and_request, ""
+      for known_serial in serials:
+        if serial_and_request.startswith(known_serial + ":"):
+          serial = known_serial
+          device_request = serial_and_request[len(known_serial) + 1:]
+    else:
+      serial, device_request = "", request[len("host:"):]
+    serial = self._get_device(serial)
+    if serial is None:
+      return
+    if device_request == "features":
+      self._send_okay()
+      self._send_length_prefixed(self.server.features)
+    elif device_request.startswith("forward:"):
+      local, _, remote = device_request[len("forward:"):].partition(";")
+      with self.server.lock:
+        self.server.forwards[local] = (serial, remote)
+      self._send_okay()
+      self._send_okay()
+    elif device_request.startswith("killforward:"):
+      local = device_request[len("killforward:"):]
+      with self.server.lock:
+        removed = self.server.forwards.pop(local, None)
+      self._send_okay()
+      if removed is None:
+        self._send_fail(f"listener '{local}' not found")
+      else:
+        self._send_okay()
+    else:
+      self._send_fail(f"unknown host service {device_request!r}")
+
+  def _get_device(self, serial: str) -> Optional[str]:
+    """Returns the serial of the online device, or sends FAIL."""
+    with self.server.lock:
+      devices = dict(self.server.devices)
+    if not serial:
+      if len(devices) != 1:
+        self._send_fail("more than one device/emulator")
+        return None
+      serial = next(iter(devices))
+    if serial not in devices:
+      self._send_fail(f"device '{serial}' not found")
+      return None
+    if devices[serial] != "device":
+      self._send_fail(f"device {devices[serial]}")
+      return None
+    return serial
+
+  def _handle_device_service(self, serial: str, service: str):
+    with self.server.lock:
+      self.server.requests.append(service)
+    if service.startswith("shell,v2,raw:"):
+      self._send_okay()
+      self._shell(service[len("shell,v2,raw:"):])
+    elif service == "sync:":
+      self._send_okay()
+      self._sync(serial)
+    elif service.startswith("exec:cmd package install -S "):
+      self._send_okay()
+      size = int(service.split()[4])
+      self.server.installed_packages.append(self._read_exactly(size))
+      self.request.sendall(b"Success\n")
+    else:
+      self._send_fail(f"unknown service {service!r}")
+
+  def _shell(self, command: str):
+    response = self.server.shell_responses.get(command)
+    if response is None:
+      response = ("", f"/system/bin/sh: {command}: not found\n", 127)
+    stdout, stderr, exit_code = response
+    packet_id, _ = _SHELL_HEADER.unpack(self._read_exactly(_SHELL_HEADER.size))
+    with self.server.lock:
+      self.server.stdin_closed.append(packet_id != _SHELL_STDIN)
+    self.server.wait(self.server.shell_delay)
+    for packet_id, data in ((_SHELL_STDOUT, stdout), (_SHELL_STDERR, stderr)):
+      if data:
+        self._send_shell_packet(packet_id, data.encode())
+    if exit_code is not None:
+      self._send_shell_packet(_SHELL_EXIT, bytes([exit_code]))
+
+  def _send_shell_packet(self, packet_id: int, data: bytes):
+    self.request.sendall(_SHELL_HEADER.pack(packet_id, len(data)) + data)
+
+  def _sync(self, serial: str):
+    """Serves sync requests until QUIT."""
+    files = self.server.files.setdefault(serial, {})
+    while True:
+      request_id, length = _SYNC_HEADER.unpack(
+          self._read_exactly(_SYNC_HEADER.size))
+      if request_id == b"QUIT":
+        return
+      path = self._read_exactly(length).decode()
+      if request_id == b"STAT":
+        path = path.rstrip("/") or "/"
+        if path in files:
+          mode = stat.S_IFREG | 0o644
+        elif path in self.server.directories:
+          mode = stat.S_IFDIR | 0o755
+        else:
+          mode = 0
+        self.request.sendall(_SYNC_STAT_RESPONSE.pack(b"STAT", mode, 0, 0))
+      elif request_id == b"SEND":
+        remote_path = path.rpartition(",")[0]
+        data = bytearray()
+        while True:
+          data_id, data_length = _SYNC_HEADER.unpack(
+              self._read_exactly(_SYNC_HEADER.size))
+          if data_id == b"DONE":
+            break
+          data += self._read_exactly(data_length)
+        if remote_path.rpartition("/")[0] in self.server.read_only_directories:
+          message = b"Read-only file system"
+          self.request.sendall(
+              _SYNC_HEADER.pack(b"FAIL", len(message)) + message)
+        else:
+          files[remote_path] = bytes(data)
+          self.request.sendall(_SYNC_HEADER.pack(b"OKAY", 0))
+      elif request_id == b"RECV":
+        if path not in files:
+          message = b"No such file or directory"
+          self.request.sendall(
+              _SYNC_HEADER.pack(b"FAIL", len(message)) + message)
+          continue
+        data = files[path]
+        for start in range(0, len(data), 1000):
+          chunk = data[start:start + 1000]
+          self.request.sendall(_SYNC_HEADER.pack(b"DATA", len(chunk)) + chunk)
+        self.request.sendall(_SYNC_HEADER.pack(b"DONE", 0))
+
+  def _track_devices(self):
+    """Sends the device list now and whenever it changes."""
+    sent = None
+    while not self.server.stopped:
+      device_list = self.server.get_device_list()
+      if device_list != sent:
+        self._send_length_prefixed(device_list)
+        sent = device_list
+      self.server.wait(_POLL_INTERVAL)
+
+  def _read_request(self) -> str:
+    length = int(self._read_exactly(4), 16)
+    return self._read_exactly(length).decode()
+
+  def _read_exactly(self, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+      chunk = self.request.recv(size - len(data))
+      if not chunk:
+        raise _ConnectionClosed()
+      data += chunk
+    return bytes(data)
+
+  def _send_okay(self):
+    self.request.sendall(b"OKAY")
+
+  def _send_fail(self, message: str):
+    self.request.sendall(b"FAIL")
+    self._send_length_prefixed(message)
+
+  def _send_length_prefixed(self, message: str):
+    data = message.encode()
+    self.request.sendall(b"%04x" % len(data) + data)
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+  """adb server on 127.0.0.1 with fake devices.
+
+  Attributes:
+    address: (host, port) the server listens on.
+    devices: Device state keyed by serial, such as {"abc123": "device"}.
+    features: Comma-separated features of the devices.
+    shell_responses: (stdout, stderr, exit code) keyed by shell command. An
+      exit code of None closes the connection without one.
+    shell_delay: Seconds before answering shell commands.
+    files: Device files: contents keyed by path, keyed by serial.
+    directories: Directory paths on the devices.
+    read_only_directories: Directory paths which files can't be pushed to.
+    forwards: (serial, remote socket) keyed by local socket.
+    installed_packages: Contents of the packages installed.
+    connections: Number of connections accepted.
+    requests: Host requests and device services received.
+    stdin_closed: Whether each shell command closed stdin first.
+  """
+  daemon_threads = True
+  allow_reuse_address = True
+
+  def __init__(self):
+    super().__init__(("127.0.0.1", 0), _AdbRequestHandler)
+    self.address = self.server_address
+    self.lock = threading.Lock()
+    self.devices = {}
+    self.features = _DEFAULT_FEATURES
+    self.shell_responses = {}
+    self.shell_delay = 0
+    self.files = {}
+    self.directories = {"/sdcard", "/data/local/tmp"}
+    self.read_only_directories = {"/system"}
+    self.forwards = {}
+    self.installed_packages = []
+    self.connections = 0
+    self.requests = []
+    self.stdin_closed = []
+    self.stopped = False
+    self._stopped_event = threading.Event()
+    self._thread = threading.Thread(
+        target=self.serve_forever, args=(_POLL_INTERVAL,), daemon=True)
+    self._thread.start()
+
+  def set_device_state(self, serial: str, state: Optional[str]) -> None:
+    """Changes the state of a device, or removes it if state is None."""
+    with self.lock:
+      if state is None:
+        self.devices.pop(serial, None)
+      else:
+        self.devices[serial] = state
+
+  def get_device_list(self) -> str:
+    with self.lock:
+      return "".join(f"{serial}\t{state}\n"
+                     for serial, state in self.devices.items())
+
+  def wait(self, seconds: float) -> None:
+    """Waits for the given time or until the server is closed."""
+    if seconds:
+      self._stopped_event.wait(seconds)
+
+  def close(self) -> None:
+    """Stops the server."""
+    self.stopped = True
+    self._stopped_event.set()
+    self.shutdown()
+    self._thread.join()
+    self.server_close()
@@ -0,0 +1,154 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake serial console of a Cambrionix hub.
+
+The console runs in a thread on one end of a socket pair. Like a real hub, it
+processes one command line at a time: it echoes the line, waits for delay
+seconds, prints the response and the ">> " prompt. Both "\r" and "\n" end a
+line, so "\r\n" runs the command and then an empty line, which prints another
+prompt. CTRL-C discards the current line and prints a prompt. Supports "mode <mode> <port>",
+"state <port>", "system", "cef" and "crf"; other commands get an error.
+
+Usage (typically in test setup):
+  self.console = fake_cambrionix_console.FakeCambrionixConsole()
+  self.addCleanup(self.console.close)
+  session = cambrionix_utils.CambrionixSession(self.console.serial_port)
+"""
+import fcntl
+import socket
+import termios
+import threading
+import time
+
+SYSTEM_RESPONSE = (
+    "cambrionix PP15S 15 Port USB Charge+Sync", "Hardware: PP15S",
+    "Firmware: 1.68", "Compiled: Feb 14 2017 17:30:26", "Group: -",
+    "Panel ID: Absent")
+_MODE_FLAGS = {"off": "O", "sync": "S", "charge": "C"}
+_CTRL_C = "\x03"
+
+
+class FakeSerialPort:
+  """Client end of the console with the serial.Serial methods used by GDM."""
+
+  def __init__(self, sock: socket.socket):
+    self._socket = sock
+    self.is_open = True
+    self.bytes_written = 0
+
+  def fileno(self) -> int:
+    return self._socket.fileno()
+
+  @property
+  def in_waiting(self) -> int:
+    return int.from_bytes(
+        fcntl.ioctl(self._socket, termios.FIONREAD, bytes(4)), "little")
+
+  def read(self, size: int = 1) -> bytes:
+    return self._socket.recv(size)
+
+  def write(self, data: bytes) -> int:
+    self.bytes_written += len(data)
+    self._socket.sendall(data)
+    return len(data)
+
+  def open(self) -> None:
+    self.is_open = True
+
+  def close(self) -> None:
+    self.is_open = False
+
+
+class FakeCambrionixConsole:
+  """Fake Cambrionix console serving commands from a thread.
+
+  Attributes:
+    serial_port: Serial port to send commands to the console.
+    commands: Commands received, in order.
+    modes: Mode of each port.
+    delay: Seconds the console takes to process each command.
+  """
+
+  def __init__(self, total_ports: int = 15, delay: float = 0):
+    """Starts the console.
+
+    Args:
+      total_ports: Number of ports of the hub. All ports start in sync mode.
+      delay: Seconds the console takes to process each command.
+    """
+    self._socket, client_socket = socket.socketpair()
+    self.serial_port = FakeSerialPort(client_socket)
+    self.commands = []
+    self.modes = {port: "sync" for port in range(1, total_ports + 1)}
+    self.delay = delay
+    self._thread = threading.Thread(target=self._serve, daemon=True)
+    self._thread.start()
+
+  def close(self) -> None:
+    """Stops the console."""
+    self._socket.shutdown(socket.SHUT_RDWR)
+    self._thread.join()
+    self._socket.close()
+    self.serial_port._socket.close()  # pylint: disable=protected-access
+
+  def send_output(self, output: str) -> None:
+    """Sends output which is not the response to a command."""
+    self._socket.sendall(output.encode("utf-8"))
+
+  def _serve(self) -> None:
+    try:
+      self._serve_commands()
+    except OSError:  # The client closed its end while the console responded.
+      pass
+
+  def _serve_commands(self) -> None:
+    line = ""
+    while True:
+      data = self._socket.recv(4096)
+      if not data:
+        return
+      for char in data.decode("utf-8"):
+        if char == _CTRL_C:
+          line = ""
+          self._socket.sendall(b"\r\n>> ")
+        elif char in ("\r", "\n"):
+          self._process(line)
+          line = ""
+        else:
+          line += char
+
+  def _process(self, command: str) -> None:
+    """Echoes the command and sends its response and the prompt."""
+    if command:
+      self.commands.append(command)
+    if self.delay:
+      time.sleep(self.delay)
+    response = [command] + self._respond(command)
+    self._socket.sendall(("\r\n".join(response) + "\r\n>> ").encode("utf-8"))
+
+  def _respond(self, command: str) -> list[str]:
+    """Returns the response lines of the command."""
+    words = command.split()
+    if not words or words[0] in ("cef", "crf"):
+      return []
+    if words[0] == "system":
+      return list(SYSTEM_RESPONSE)
+    if words[0] == "mode" and len(words) == 3 and words[1] in _MODE_FLAGS:
+      self.modes[int(words[2])] = words[1]
+      return []
+    if words[0] == "state" and len(words) == 2:
+      port = int(words[1])
+      return [f"{port}, 0000, {_MODE_FLAGS[self.modes[port]]}, 0, 0, x, 0.00"]
+    return [f"*E Unknown command: {command}"]
@@ -219,6 +219,7 @@ def create_mock_manager(
   # pylint: enable=protected-access
   mock_manager.other_devices = {}
   mock_manager.log_directory = artifacts_directory
+  mock_manager.use_event_index = False
   return mock_manager
 
 
@@ -0,0 +1,156 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake HTTP server which requires digest authentication, like DLI switches.
+
+Counts the connections it accepts and the authentication challenges (401
+responses) it sends. Each challenge has a new nonce; replayed nonce counts are
+rejected.
+
+Usage (typically in test setup):
+  self.server = fake_digest_auth_server.FakeDigestAuthServer()
+  self.addCleanup(self.server.close)
+  http_utils.send_http_get(
+      self.server.url,
+      auth=requests.auth.HTTPDigestAuth(fake_digest_auth_server.USERNAME,
+                                        fake_digest_auth_server.PASSWORD))
+"""
+import hashlib
+import http.server
+import secrets
+import socket
+import threading
+
+USERNAME = "admin"
+PASSWORD = "1234"
+_REALM = "test"
+_POLL_INTERVAL = 0.01
+
+
+def _md5(text: str) -> str:
+  return hashlib.md5(text.encode()).hexdigest()
+
+
+class _DigestAuthHandler(http.server.BaseHTTPRequestHandler):
+  """Serves GET and POST requests authenticated with digest authentication."""
+  protocol_version = "HTTP/1.1"  # Keeps connections alive.
+  server: "FakeDigestAuthServer"
+
+  def setup(self):
+    super().setup()
+    # Headers and body are written separately: don't delay the body until the
+    # client acknowledges the headers.
+    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    with self.server.lock:
+      self.server.connections += 1
+    self.server.wait(self.server.rtt)  # TCP handshake.
+
+  def log_message(self, *args):
+    del args  # Unused.
+
+  def do_GET(self):  # pylint: disable=invalid-name
+    self._respond()
+
+  def do_POST(self):  # pylint: disable=invalid-name
+    self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    self._respond()
+
+  def _respond(self):
+    """Responds with 401 unless the request has valid credentials."""
+    self.server.wait(self.server.rtt)
+    if not self._is_authorized():
+      nonce = secrets.token_hex(8)
+      with self.server.lock:
+        self.server.challenges += 1
+        self.server.nonce_counts[nonce] = set()
+      self.send_response(401)
+      self.send_header(
+          "WWW-Authenticate",
+          f'Digest realm="{_REALM}", nonce="{nonce}", qop="auth", '
+          "algorithm=MD5")
+      self.send_header("Content-Length", "0")
+      self.end_headers()
+      return
+    self.server.wait(self.server.delay)
+    body = b"true"
+    self.send_response(200)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def _is_authorized(self):
+    """Returns whether the digest authorization header is valid."""
+    header = self.headers.get("Authorization", "")
+    if not header.startswith("Digest "):
+      return False
+    fields = dict(
+        field.strip().split("=", 1) for field in header[7:].split(","))
+    fields = {key: value.strip('"') for key, value in fields.items()}
+    with self.server.lock:
+      nonce_counts = self.server.nonce_counts.get(fields.get("nonce"))
+      if nonce_counts is None or fields["nc"] in nonce_counts:
+        return False  # Unknown nonce or replayed nonce count.
+      nonce_counts.add(fields["nc"])
+    ha1 = _md5(f"{USERNAME}:{_REALM}:{PASSWORD}")
+    ha2 = _md5(f"{self.command}:{fields['uri']}")
+    expected = _md5(f"{ha1}:{fields['nonce']}:{fields['nc']}:"
+                    f"{fields['cnonce']}:{fields['qop']}:{ha2}")
+    return fields["response"] == expected
+
+
+class FakeDigestAuthServer(http.server.ThreadingHTTPServer):
+  """HTTP server on 127.0.0.1 which requires digest authentication.
+
+  Attributes:
+    url: URL of a resource of the server.
+    connections: Number of connections accepted.
+    challenges: Number of 401 responses sent.
+    delay: Seconds to wait before responding to authenticated requests.
+    rtt: Simulated network round trip time in seconds. Each new connection
+      and each response is delayed by this much.
+  """
+  daemon_threads = True
+
+  def __init__(self, delay: float = 0, rtt: float = 0):
+    """Starts the server.
+
+    Args:
+      delay: Seconds to wait before responding to authenticated requests.
+      rtt: Simulated network round trip time in seconds.
+    """
+    super().__init__(("127.0.0.1", 0), _DigestAuthHandler)
+    self.lock = threading.Lock()
+    self.connections = 0
+    self.challenges = 0
+    # Nonce -> nonce counts used with the nonce.
+    self.nonce_counts: dict[str, set[str]] = {}
+    self.url = f"http://127.0.0.1:{self.server_address[1]}/outlets/"
+    self.delay = delay
+    self.rtt = rtt
+    self._stopped = threading.Event()
+    self._thread = threading.Thread(
+        target=self.serve_forever, args=(_POLL_INTERVAL,), daemon=True)
+    self._thread.start()
+
+  def wait(self, seconds: float) -> None:
+    """Waits for the given time or until the server is closed."""
+    if seconds:
+      self._stopped.wait(seconds)
+
+  def close(self) -> None:
+    """Stops the server."""
+    self._stopped.set()
+    self.shutdown()
+    self._thread.join()
+    self.server_close()
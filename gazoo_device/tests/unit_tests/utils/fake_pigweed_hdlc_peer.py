@@ -0,0 +1,177 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake Matter device serving Pigweed RPC services over HDLC.
+
+The device runs in a thread on one end of a socket pair and answers
+Attributes.Read, Attributes.Write and Descriptor.PartsList (server streaming)
+requests. Each response is sent latency seconds after its request was
+received, like a link with that round trip time: pipelined requests are
+answered after one round trip, not one each. Reading an attribute which was
+never written returns empty AttributeData. Like Matter firmware, the device
+logs the new data version of a cluster when one of its attributes changes.
+
+Usage (typically in test setup):
+  self.peer = fake_pigweed_hdlc_peer.FakePigweedHdlcPeer()
+  self.addCleanup(self.peer.close)
+  client = pigweed_rpc_transport.PwHdlcRpcClient(
+      self.peer.client_socket, ["gazoo_device.protos.attributes_service_pb2"])
+"""
+import heapq
+import select
+import socket
+import threading
+import time
+
+from gazoo_device.protos import attributes_service_pb2
+from gazoo_device.protos import descriptor_service_pb2
+from pw_hdlc import decode
+from pw_hdlc import encode
+from pw_rpc import ids
+from pw_rpc import packets
+from pw_rpc.internal import packet_pb2
+
+_RPC_ADDRESS = ord("R")
+_STDOUT_ADDRESS = 1
+_ATTRIBUTES_SERVICE_ID = ids.calculate("chip.rpc.Attributes")
+_DESCRIPTOR_SERVICE_ID = ids.calculate("chip.rpc.Descriptor")
+_READ_METHOD_ID = ids.calculate("Read")
+_WRITE_METHOD_ID = ids.calculate("Write")
+_PARTS_LIST_METHOD_ID = ids.calculate("PartsList")
+_NOT_FOUND = 5  # pw_status NOT_FOUND
+_READ_SIZE = 4096
+
+
+class FakePigweedHdlcPeer:
+  """Fake Matter device answering Attributes RPCs from a thread.
+
+  Attributes:
+    client_socket: Socket to connect the PwHdlcRpcClient to.
+    attributes: Attribute data keyed by (endpoint, cluster, attribute ID).
+    endpoints: Endpoint IDs streamed by Descriptor.PartsList.
+    requests: Number of RPC requests received.
+    max_pending: Maximum number of requests awaiting a response at once.
+  """
+
+  def __init__(self, latency: float = 0):
+    """Starts the device.
+
+    Args:
+      latency: Seconds between a request and its response.
+    """
+    self._socket, self.client_socket = socket.socketpair()
+    self._latency = latency
+    self._stop_event = threading.Event()
+    self._send_lock = threading.Lock()
+    self.attributes = {}
+    self.endpoints = [1]
+    self.data_version = 0
+    self.requests = 0
+    self.max_pending = 0
+    self._thread = threading.Thread(target=self._serve, daemon=True)
+    self._thread.start()
+
+  def set_attribute(self, endpoint: int, cluster: int, attribute_id: int,
+                    data: attributes_service_pb2.AttributeData) -> None:
+    """Changes an attribute on the device side, like a button press."""
+    self.attributes[(endpoint, cluster, attribute_id)] = data
+    self._log_attribute_change(endpoint, cluster, attribute_id)
+
+  def log(self, line: str) -> None:
+    """Logs a line, like the firmware does all the time."""
+    self._send(_STDOUT_ADDRESS, line.encode())
+
+  def close(self) -> None:
+    """Stops the device."""
+    self._stop_event.set()
+    self._thread.join()
+    self._socket.close()
+    self.client_socket.close()
+
+  def _serve(self) -> None:
+    decoder = decode.FrameDecoder()
+    pending = []  # Heap of (due time, sequence number, response packets).
+    sequence_number = 0
+    while not self._stop_event.is_set():
+      timeout = 0.1
+      if pending:
+        timeout = min(timeout, max(0, pending[0][0] - time.time()))
+      if select.select([self._socket], [], [], timeout)[0]:
+        data = self._socket.recv(_READ_SIZE)
+        if not data:
+          return
+        for frame in decoder.process_valid_frames(data):
+          responses = self._handle_packet(packets.decode(frame.data))
+          if responses:
+            sequence_number += 1
+            heapq.heappush(pending, (time.time() + self._latency,
+                                     sequence_number, responses))
+            self.max_pending = max(self.max_pending, len(pending))
+      while pending and pending[0][0] <= time.time():
+        for response in heapq.heappop(pending)[2]:
+          self._send(_RPC_ADDRESS, response)
+
+  def _send(self, address: int, data: bytes) -> None:
+    with self._send_lock:
+      self._socket.sendall(encode.ui_frame(address, data))
+
+  def _log_attribute_change(self, endpoint: int, cluster: int,
+                            attribute_id: int) -> None:
+    del attribute_id  # Data versions are per cluster.
+    self.data_version += 1
+    self.log(f"<inf> chip: [DMG]Endpoint {endpoint:x}, Cluster "
+             f"0x{cluster >> 16:04X}_{cluster & 0xFFFF:04X} update version to "
+             f"{self.data_version:x}")
+
+  def _handle_packet(self, packet: packet_pb2.RpcPacket) -> list[bytes]:
+    """Returns the encoded response packets of the request."""
+    if (packet.type != packet_pb2.PacketType.REQUEST or
+        packet.service_id not in (_ATTRIBUTES_SERVICE_ID,
+                                  _DESCRIPTOR_SERVICE_ID)):
+      return []
+    self.requests += 1
+    response = packet_pb2.RpcPacket(
+        type=packet_pb2.PacketType.RESPONSE,
+        channel_id=packet.channel_id,
+        service_id=packet.service_id,
+        method_id=packet.method_id,
+        call_id=packet.call_id)
+    stream_responses = []
+    if packet.service_id == _DESCRIPTOR_SERVICE_ID:
+      if packet.method_id == _PARTS_LIST_METHOD_ID:
+        for endpoint in self.endpoints:
+          stream_response = packet_pb2.RpcPacket()
+          stream_response.CopyFrom(response)
+          stream_response.type = packet_pb2.PacketType.SERVER_STREAM
+          stream_response.payload = descriptor_service_pb2.Endpoint(
+              endpoint=endpoint).SerializeToString()
+          stream_responses.append(stream_response.SerializeToString())
+      else:
+        response.status = _NOT_FOUND
+    elif packet.method_id == _READ_METHOD_ID:
+      metadata = packets.decode_payload(
+          packet, attributes_service_pb2.AttributeMetadata)
+      key = (metadata.endpoint, metadata.cluster, metadata.attribute_id)
+      response.payload = self.attributes.get(
+          key, attributes_service_pb2.AttributeData()).SerializeToString()
+    elif packet.method_id == _WRITE_METHOD_ID:
+      write = packets.decode_payload(
+          packet, attributes_service_pb2.AttributeWrite)
+      key = (write.metadata.endpoint, write.metadata.cluster,
+             write.metadata.attribute_id)
+      self.attributes[key] = write.data
+      self._log_attribute_change(*key)
+    else:
+      response.status = _NOT_FOUND
+    return stream_responses + [response.SerializeToString()]
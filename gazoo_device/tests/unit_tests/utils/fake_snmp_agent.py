@@ -0,0 +1,103 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake SNMP v2c agent which serves a dictionary of OID values over UDP.
+
+Usage (typically in test setup):
+  self.agent = fake_snmp_agent.FakeSnmpAgent({"1.3.6.1.2.1.1.1.0": b"Switch"})
+  self.addCleanup(self.agent.close)
+  client = snmp_utils.SnmpClient("127.0.0.1", "private", port=self.agent.port)
+"""
+import socket
+import threading
+from typing import Optional
+
+from gazoo_device.utility import snmp_utils
+
+# "noSuchName" error status.
+_NO_SUCH_NAME = 2
+
+
+class FakeSnmpAgent:
+  """Responds to SNMP GET and SET requests on a local UDP port.
+
+  Attributes:
+    values: OID values served by the agent. SET requests update them.
+    requests: Decoded requests received by the agent.
+    port: UDP port the agent listens on (on 127.0.0.1).
+  """
+
+  def __init__(self,
+               values: dict[str, snmp_utils.VarbindValue],
+               community: str = "private",
+               ignored_requests: int = 0,
+               set_values: Optional[dict[str, snmp_utils.VarbindValue]] = None):
+    """Starts the agent.
+
+    Args:
+      values: OID values served by the agent.
+      community: Community of the requests the agent responds to.
+      ignored_requests: Number of the first requests not to respond to.
+      set_values: Values the agent reports (and keeps) for SET requests of
+        these OIDs instead of the requested values.
+    """
+    self.values = dict(values)
+    self.requests = []
+    self._community = community
+    self._ignored_requests = ignored_requests
+    self._set_values = set_values or {}
+    self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self._socket.bind(("127.0.0.1", 0))
+    self.port = self._socket.getsockname()[1]
+    self._thread = threading.Thread(target=self._respond, daemon=True)
+    self._thread.start()
+
+  def close(self) -> None:
+    """Stops the agent."""
+    self._socket.close()
+
+  def _respond(self) -> None:
+    """Responds to requests until the agent is closed."""
+    while True:
+      try:
+        data, address = self._socket.recvfrom(65535)
+      except OSError:  # Closed.
+        return
+      request = snmp_utils.decode_message(data)
+      self.requests.append(request)
+      if (request.community != self._community
+          or len(self.requests) <= self._ignored_requests):
+        continue
+      error_status, error_index, varbinds = self._handle(request)
+      self._socket.sendto(
+          snmp_utils.encode_message(
+              request.community, snmp_utils.GET_RESPONSE, request.request_id,
+              varbinds, error_status=error_status, error_index=error_index),
+          address)
+
+  def _handle(
+      self, request: snmp_utils.SnmpMessage
+  ) -> tuple[int, int, list[tuple[str, snmp_utils.VarbindValue]]]:
+    """Returns the error status, error index and varbinds of the response."""
+    if request.pdu_type == snmp_utils.GET_REQUEST:
+      # Missing OIDs are reported as noSuchInstance (encoded here as NULL).
+      return 0, 0, [(oid, self.values.get(oid))
+                    for oid, _ in request.varbinds]
+    for index, (oid, _) in enumerate(request.varbinds, start=1):
+      if oid not in self.values:
+        return _NO_SUCH_NAME, index, list(request.varbinds)
+    varbinds = [(oid, self._set_values.get(oid, value))
+                for oid, value in request.varbinds]
+    self.values.update(varbinds)
+    return 0, 0, varbinds
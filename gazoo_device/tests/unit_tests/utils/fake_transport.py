@@ -186,6 +186,10 @@ class FakeTransport:
              self._raw_data_queue_enabled_method is not None and
              self._raw_data_queue_enabled_method()))
 
+  def fileno(self):
+    """Returns None as reads are from a queue rather than a file descriptor."""
+    return None
+
   def read(self, size=1, timeout=None):
     """Reads from mock read queue or raises an error if fail_read is True."""
     try:
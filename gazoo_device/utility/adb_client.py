@@ -0,0 +1,551 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process client of the local adb server.
+
+Every 'adb' command runs a new adb client process, which connects to the adb
+server (listening on localhost:5037) and exits once the command completes.
+AdbClient speaks the adb server's host protocol from this process instead:
+  - device list: a host:track-devices connection stays open and receives the
+    device list every time it changes, so listing devices sends no request;
+  - shell commands: host:transport:<serial> followed by the shell v2 protocol,
+    which reports the exit code of the command;
+  - file transfers: the sync protocol (STAT, SEND, RECV);
+  - package installs: streamed to 'cmd package install' on the device;
+  - port forwarding: forward, killforward and list-forward requests.
+
+The server closes the connection after answering each host request and
+dedicates transport connections to a single device service, so every other
+request opens a new localhost connection (much cheaper than an adb process).
+
+AdbClient does not start the adb server and does not support every request
+variant (such as pushing directories or devices without shell v2): it raises
+AdbClientError instead, and callers (see adb_utils) run the adb binary.
+
+Protocol reference:
+https://android.googlesource.com/platform/packages/modules/adb/+/refs/heads/master/SERVICES.TXT
+"""
+import os
+import signal
+import socket
+import stat
+import struct
+import threading
+import time
+from typing import Optional, Sequence
+
+from gazoo_device import gdm_logger
+
+logger = gdm_logger.get_logger()
+
+DEFAULT_PORT = 5037
+_SERVER_PORT_ENVIRONMENT_VARIABLE = "ANDROID_ADB_SERVER_PORT"
+_CONNECT_TIMEOUT_S = 2
+_RESPONSE_TIMEOUT_S = 10
+_TRACKER_JOIN_TIMEOUT_S = 1
+# Return code of an adb process terminated by adb_utils on timeout.
+_TIMEOUT_RETURN_CODE = -signal.SIGTERM
+
+_FEATURE_SHELL_V2 = "shell_v2"
+_FEATURE_CMD = "cmd"
+
+# Shell v2 packets: packet ID (1 byte) and payload length (4 bytes).
+_SHELL_HEADER = struct.Struct("<BI")
+_SHELL_STDOUT = 1
+_SHELL_STDERR = 2
+_SHELL_EXIT = 3
+_SHELL_CLOSE_STDIN = 4
+
+# Sync requests and responses: ID (4 bytes) and length or value (4 bytes).
+_SYNC_HEADER = struct.Struct("<4sI")
+# Response to STAT: "STAT", mode, size and modification time.
+_SYNC_STAT_RESPONSE = struct.Struct("<4sIII")
+_SYNC_MAX_DATA_SIZE = 64 * 1024
+_READ_SIZE = 64 * 1024
+
+
+class AdbClientError(Exception):
+  """The adb server is not reachable or did not serve the request."""
+
+
+class AdbClient:
+  """Client of the adb server's host protocol.
+
+  Thread-safe: each request uses its own connection.
+  """
+
+  def __init__(self, address: Optional[tuple[str, int]] = None):
+    """Initializes the client.
+
+    Args:
+      address: (host, port) of the adb server. Defaults to localhost and the
+        port in ANDROID_ADB_SERVER_PORT (5037 if unset), like 'adb'.
+    """
+    if address is None:
+      address = ("127.0.0.1", int(
+          os.environ.get(_SERVER_PORT_ENVIRONMENT_VARIABLE, DEFAULT_PORT)))
+    self._address = address
+    self._lock = threading.Lock()
+    self._features: dict[Optional[str], frozenset[str]] = {}
+    self._tracker_socket: Optional[socket.socket] = None
+    self._tracker_thread: Optional[threading.Thread] = None
+    # Latest host:track-devices device list while tracking.
+    self._tracked_devices: Optional[str] = None
+
+  def close(self) -> None:
+    """Closes the device tracking connection."""
+    with self._lock:
+      tracker_socket, self._tracker_socket = self._tracker_socket, None
+      tracker_thread, self._tracker_thread = self._tracker_thread, None
+      self._tracked_devices = None
+    if tracker_socket is not None:
+      _close_socket(tracker_socket)
+    if tracker_thread is not None:
+      tracker_thread.join(timeout=_TRACKER_JOIN_TIMEOUT_S)
+
+  def devices(self) -> str:
+    """Returns the device list, one "<identifier>\\t<state>" line per device.
+
+    The first call starts tracking the device list: later calls return the
+    latest list pushed by the server.
+
+    Raises:
+      AdbClientError: if the server is not reachable.
+    """
+    with self._lock:
+      if self._tracked_devices is None:
+        self._start_tracking()
+      return self._tracked_devices
+
+  def shell(self,
+            adb_serial: Optional[str],
+            command: str,
+            timeout: Optional[float] = None) -> tuple[str, int]:
+    """Runs a shell command on the device.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      command: Command to run.
+      timeout: Seconds to wait for the command to complete.
+
+    Returns:
+      The command output (stdout and stderr) and its exit code. On timeout,
+      the output received so far and the return code of an 'adb' process
+      terminated on timeout.
+
+    Raises:
+      AdbClientError: if the server is not reachable, the device is not
+        available or does not support shell v2, or if the connection closes
+        before the command exits.
+    """
+    self._require_feature(adb_serial, _FEATURE_SHELL_V2)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    output = []
+    with self._open_transport(adb_serial, f"shell,v2,raw:{command}") as sock:
+      try:
+        sock.sendall(_SHELL_HEADER.pack(_SHELL_CLOSE_STDIN, 0))
+        while True:
+          if deadline is not None:
+            sock.settimeout(max(deadline - time.monotonic(), 0.001))
+          packet_id, length = _SHELL_HEADER.unpack(
+              _read_exactly(sock, _SHELL_HEADER.size))
+          payload = _read_exactly(sock, length)
+          if packet_id in (_SHELL_STDOUT, _SHELL_STDERR):
+            output.append(payload)
+          elif packet_id == _SHELL_EXIT:
+            return_code = payload[0]
+            break
+      except socket.timeout:
+        return_code = _TIMEOUT_RETURN_CODE
+      except (AdbClientError, OSError) as e:
+        raise AdbClientError(
+            f"adb shell {command!r} on {adb_serial} closed without exit code: "
+            f"{e!r}") from e
+    return b"".join(output).decode("utf-8", "replace"), return_code
+
+  def push(self, adb_serial: Optional[str], sources: Sequence[str],
+           destination: str) -> str:
+    """Copies files from the host to the device, like 'adb push'.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      sources: Paths of the files on the host.
+      destination: Path of the file or directory on the device. Must be a
+        directory if there are several sources.
+
+    Returns:
+      One line per file pushed.
+
+    Raises:
+      AdbClientError: if a source is a directory or the transfer failed.
+    """
+    for source in sources:
+      if not os.path.isfile(source):
+        raise AdbClientError(f"Pushing {source!r} is not supported.")
+    lines = []
+    with self._open_transport(adb_serial, "sync:") as sock:
+      to_directory = stat.S_ISDIR(_sync_stat(sock, destination))
+      if len(sources) > 1 and not to_directory:
+        raise AdbClientError(
+            f"Destination {destination!r} of {len(sources)} files is not a "
+            "directory.")
+      for source in sources:
+        remote_path = destination
+        if to_directory:
+          remote_path = _join_remote_path(destination,
+                                          os.path.basename(source))
+        start = time.monotonic()
+        size = _sync_send(sock, source, remote_path)
+        lines.append(f"{source}: 1 file pushed, 0 skipped. "
+                     f"({size} bytes in {time.monotonic() - start:.3f}s)\n")
+      _sync_quit(sock)
+    return "".join(lines)
+
+  def pull(self, adb_serial: Optional[str], sources: Sequence[str],
+           destination: str) -> str:
+    """Copies files from the device to the host, like 'adb pull'.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      sources: Paths of the files on the device.
+      destination: Path of the file or directory on the host. Must be a
+        directory if there are several sources.
+
+    Returns:
+      One line per file pulled.
+
+    Raises:
+      AdbClientError: if a source is not a regular file or the transfer
+        failed.
+    """
+    to_directory = os.path.isdir(destination)
+    if len(sources) > 1 and not to_directory:
+      raise AdbClientError(
+          f"Destination {destination!r} of {len(sources)} files is not a "
+          "directory.")
+    lines = []
+    with self._open_transport(adb_serial, "sync:") as sock:
+      for source in sources:
+        if not stat.S_ISREG(_sync_stat(sock, source)):
+          raise AdbClientError(f"Pulling {source!r} is not supported.")
+      for source in sources:
+        local_path = destination
+        if to_directory:
+          local_path = os.path.join(destination, os.path.basename(source))
+        start = time.monotonic()
+        size = _sync_receive(sock, source, local_path)
+        lines.append(f"{source}: 1 file pulled, 0 skipped. "
+                     f"({size} bytes in {time.monotonic() - start:.3f}s)\n")
+      _sync_quit(sock)
+    return "".join(lines)
+
+  def install(self, adb_serial: Optional[str], package_path: str,
+              options: Sequence[str] = ()) -> str:
+    """Installs an APK on the device, like 'adb install'.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      package_path: Path of the APK on the host.
+      options: 'adb install' options, such as "-r".
+
+    Returns:
+      The output of the package manager ("Success\\n" if installed).
+
+    Raises:
+      AdbClientError: if the device does not support streamed installs.
+    """
+    self._require_feature(adb_serial, _FEATURE_CMD)
+    size = os.path.getsize(package_path)
+    service = " ".join(
+        ["exec:cmd package install", "-S", str(size), *options])
+    with self._open_transport(adb_serial, service) as sock:
+      with open(package_path, "rb") as package_file:
+        sock.sendfile(package_file)
+      sock.shutdown(socket.SHUT_WR)
+      return _read_until_closed(sock).decode("utf-8", "replace")
+
+  def forward(self, adb_serial: Optional[str], local: str,
+              remote: str) -> str:
+    """Forwards connections to the local socket to the device socket.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      local: Host socket, such as "tcp:8080".
+      remote: Device socket, such as "tcp:8080".
+
+    Returns:
+      The output of 'adb forward': the port allocated for "tcp:0", empty
+      otherwise.
+
+    Raises:
+      AdbClientError: if the server refused the request.
+    """
+    request = f"{_host_prefix(adb_serial)}:forward:{local};{remote}"
+    with self._connect() as sock:
+      _send_request(sock, request)
+      _read_status(sock)  # Device found.
+      _read_status(sock)  # Forwarding set up.
+      if local == "tcp:0":
+        return _read_length_prefixed(sock).decode("utf-8", "replace") + "\n"
+    return ""
+
+  def kill_forward(self, adb_serial: Optional[str], local: str) -> str:
+    """Removes the forwarding of the local socket.
+
+    Args:
+      adb_serial: Device identifier. None for the only connected device.
+      local: Host socket, such as "tcp:8080".
+
+    Returns:
+      The output of 'adb forward --remove' (empty).
+
+    Raises:
+      AdbClientError: if the server refused the request.
+    """
+    request = f"{_host_prefix(adb_serial)}:killforward:{local}"
+    with self._connect() as sock:
+      _send_request(sock, request)
+      _read_status(sock)  # Device found.
+      _read_status(sock)  # Forwarding removed.
+    return ""
+
+  def list_forward(self) -> str:
+    """Returns the forwardings, one "<serial> <local> <remote>" line each."""
+    return self._query("host:list-forward")
+
+  def _connect(self) -> socket.socket:
+    """Returns a new connection to the server."""
+    try:
+      sock = socket.create_connection(self._address,
+                                      timeout=_CONNECT_TIMEOUT_S)
+    except OSError as e:
+      raise AdbClientError(
+          f"Unable to connect to the adb server at {self._address}: {e!r}")
+    sock.settimeout(_RESPONSE_TIMEOUT_S)
+    return sock
+
+  def _query(self, request: str) -> str:
+    """Returns the response of a host request."""
+    with self._connect() as sock:
+      _send_request(sock, request)
+      _read_status(sock)
+      return _read_length_prefixed(sock).decode("utf-8", "replace")
+
+  def _open_transport(self, adb_serial: Optional[str],
+                      service: str) -> socket.socket:
+    """Returns a connection to the service of the device."""
+    if adb_serial is None:
+      transport_request = "host:transport-any"
+    else:
+      transport_request = f"host:transport:{adb_serial}"
+    sock = self._connect()
+    try:
+      _send_request(sock, transport_request)
+      _read_status(sock)
+      _send_request(sock, service)
+      _read_status(sock)
+    except BaseException:
+      _close_socket(sock)
+      raise
+    sock.settimeout(None)
+    return sock
+
+  def _require_feature(self, adb_serial: Optional[str], feature: str) -> None:
+    """Raises AdbClientError if the device does not support the feature."""
+    with self._lock:
+      features = self._features.get(adb_serial)
+    if features is None:
+      features = frozenset(
+          self._query(f"{_host_prefix(adb_serial)}:features").split(","))
+      if adb_serial is not None:  # "Any" device may differ on the next call.
+        with self._lock:
+          self._features[adb_serial] = features
+    if feature not in features:
+      raise AdbClientError(
+          f"Device {adb_serial} does not support the {feature} feature.")
+
+  def _start_tracking(self) -> None:
+    """Starts tracking the device list. Must be called with the lock held."""
+    sock = self._connect()
+    try:
+      _send_request(sock, "host:track-devices")
+      _read_status(sock)
+      self._tracked_devices = _read_length_prefixed(sock).decode(
+          "utf-8", "replace")
+    except BaseException:
+      _close_socket(sock)
+      raise
+    sock.settimeout(None)
+    self._tracker_socket = sock
+    self._tracker_thread = threading.Thread(
+        target=self._track_devices, args=(sock,), name="adb-track-devices",
+        daemon=True)
+    self._tracker_thread.start()
+
+  def _track_devices(self, sock: socket.socket) -> None:
+    """Receives device list updates until the connection closes."""
+    try:
+      while True:
+        devices = _read_length_prefixed(sock).decode("utf-8", "replace")
+        with self._lock:
+          if self._tracker_socket is not sock:
+            return
+          self._tracked_devices = devices
+    except (AdbClientError, OSError) as e:
+      logger.debug(f"Stopped tracking adb devices: {e!r}")
+    with self._lock:
+      if self._tracker_socket is sock:
+        self._tracker_socket = None
+        self._tracker_thread = None
+        self._tracked_devices = None
+    _close_socket(sock)
+
+
+def _host_prefix(adb_serial: Optional[str]) -> str:
+  """Returns the prefix of host requests to the device."""
+  if adb_serial is None:
+    return "host"
+  return f"host-serial:{adb_serial}"
+
+
+def _join_remote_path(directory: str, name: str) -> str:
+  return directory.rstrip("/") + "/" + name
+
+
+def _close_socket(sock: socket.socket) -> None:
+  try:
+    sock.shutdown(socket.SHUT_RDWR)
+  except OSError:
+    pass
+  sock.close()
+
+
+def _send_request(sock: socket.socket, request: str) -> None:
+  """Sends a request prefixed with its length (4 hexadecimal digits)."""
+  data = request.encode("utf-8")
+  sock.sendall(b"%04x" % len(data) + data)
+
+
+def _read_status(sock: socket.socket) -> None:
+  """Reads an OKAY status.
+
+  Raises:
+    AdbClientError: if the status is FAIL (with the server's message).
+  """
+  status = _read_exactly(sock, 4)
+  if status == b"OKAY":
+    return
+  if status == b"FAIL":
+    message = _read_length_prefixed(sock).decode("utf-8", "replace")
+    raise AdbClientError(f"adb server error: {message}")
+  raise AdbClientError(f"Unexpected adb server status {status!r}.")
+
+
+def _read_length_prefixed(sock: socket.socket) -> bytes:
+  """Reads data prefixed with its length (4 hexadecimal digits)."""
+  length = _read_exactly(sock, 4)
+  try:
+    return _read_exactly(sock, int(length, 16))
+  except ValueError:
+    raise AdbClientError(f"Invalid adb server response length {length!r}.")
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytes:
+  """Reads size bytes.
+
+  Raises:
+    AdbClientError: if the connection closes first.
+  """
+  data = bytearray()
+  while len(data) < size:
+    chunk = sock.recv(min(size - len(data), _READ_SIZE))
+    if not chunk:
+      raise AdbClientError("adb server closed the connection.")
+    data += chunk
+  return bytes(data)
+
+
+def _read_until_closed(sock: socket.socket) -> bytes:
+  chunks = []
+  while True:
+    chunk = sock.recv(_READ_SIZE)
+    if not chunk:
+      return b"".join(chunks)
+    chunks.append(chunk)
+
+
+def _sync_request(sock: socket.socket, request_id: bytes,
+                  data: bytes = b"") -> None:
+  sock.sendall(_SYNC_HEADER.pack(request_id, len(data)) + data)
+
+
+def _read_sync_failure(sock: socket.socket, response_id: bytes, length: int,
+                       path: str) -> AdbClientError:
+  """Returns the error of a FAIL (or unexpected) sync response."""
+  if response_id == b"FAIL":
+    message = _read_exactly(sock, length).decode("utf-8", "replace")
+    return AdbClientError(f"{path}: {message}")
+  return AdbClientError(
+      f"{path}: unexpected sync response {response_id!r}.")
+
+
+def _sync_stat(sock: socket.socket, path: str) -> int:
+  """Returns the mode of the file on the device (0 if it does not exist)."""
+  _sync_request(sock, b"STAT", path.encode("utf-8"))
+  response_id, mode, _, _ = _SYNC_STAT_RESPONSE.unpack(
+      _read_exactly(sock, _SYNC_STAT_RESPONSE.size))
+  if response_id != b"STAT":
+    raise AdbClientError(f"{path}: unexpected sync response {response_id!r}.")
+  return mode
+
+
+def _sync_send(sock: socket.socket, local_path: str,
+               remote_path: str) -> int:
+  """Sends the file and returns its size."""
+  file_stat = os.stat(local_path)
+  _sync_request(sock, b"SEND",
+                f"{remote_path},{file_stat.st_mode}".encode("utf-8"))
+  with open(local_path, "rb") as local_file:
+    while True:
+      data = local_file.read(_SYNC_MAX_DATA_SIZE)
+      if not data:
+        break
+      _sync_request(sock, b"DATA", data)
+  sock.sendall(_SYNC_HEADER.pack(b"DONE", int(file_stat.st_mtime)))
+  response_id, length = _SYNC_HEADER.unpack(
+      _read_exactly(sock, _SYNC_HEADER.size))
+  if response_id != b"OKAY":
+    raise _read_sync_failure(sock, response_id, length, remote_path)
+  return file_stat.st_size
+
+
+def _sync_receive(sock: socket.socket, remote_path: str,
+                  local_path: str) -> int:
+  """Receives the file and returns its size."""
+  _sync_request(sock, b"RECV", remote_path.encode("utf-8"))
+  size = 0
+  with open(local_path, "wb") as local_file:
+    while True:
+      response_id, length = _SYNC_HEADER.unpack(
+          _read_exactly(sock, _SYNC_HEADER.size))
+      if response_id == b"DONE":
+        return size
+      if response_id != b"DATA":
+        raise _read_sync_failure(sock, response_id, length, remote_path)
+      local_file.write(_read_exactly(sock, length))
+      size += length
+
+
+def _sync_quit(sock: socket.socket) -> None:
+  _sync_request(sock, b"QUIT")
@@ -18,12 +18,14 @@ import json
 import os
 import re
 import subprocess
+import threading
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, TypeVar
 
 from gazoo_device import config
 from gazoo_device import errors
 from gazoo_device import gdm_logger
+from gazoo_device.utility import adb_client
 from gazoo_device.utility import host_utils
 from gazoo_device.utility import retry
 
@@ -55,6 +57,81 @@ class AdbDeviceState(enum.Enum):
 
 logger = gdm_logger.get_logger()
 
+_ResultType = TypeVar("_ResultType")
+
+# Set by enable_adb_client() and cleared by the disable_adb_client() call
+# matching the last enable call.
+_adb_client: Optional[adb_client.AdbClient] = None
+_adb_client_users = 0
+_adb_client_lock = threading.Lock()
+
+
+def enable_adb_client() -> None:
+  """Makes adb commands talk to the adb server from this process.
+
+  Applies to shell(), adb_devices() (and the functions listing devices, such
+  as is_adb_mode()), push_to_device(), pull_from_device(),
+  install_package_on_device() and the port forwarding functions: they use
+  adb_client.AdbClient instead of running an 'adb' process. They still run
+  'adb' if they are given an adb_path or if the client cannot serve the
+  command (for example, if the adb server is not running yet or the
+  connection closes before the command completes). The setting is shared by the whole process: each call
+  must be matched by a disable_adb_client() call, and the client stays
+  enabled until every caller has disabled it.
+  """
+  global _adb_client, _adb_client_users
+  with _adb_client_lock:
+    if _adb_client is None:
+      _adb_client = adb_client.AdbClient()
+    _adb_client_users += 1
+
+
+def disable_adb_client() -> None:
+  """Releases the client enabled by an enable_adb_client() call.
+
+  The last matching call closes the client: adb commands run 'adb' again.
+  """
+  global _adb_client, _adb_client_users
+  with _adb_client_lock:
+    if _adb_client_users == 0:
+      return
+    _adb_client_users -= 1
+    if _adb_client_users:
+      return
+    client, _adb_client = _adb_client, None
+  client.close()
+
+
+def _call_adb_client(
+    function: Callable[[adb_client.AdbClient], _ResultType],
+    adb_path: Optional[str] = None,
+    retries: int = 1) -> Optional[_ResultType]:
+  """Calls the function with the adb client if enabled.
+
+  Args:
+    function: Function sending the command through the client.
+    adb_path: Alternative path to the adb executable requested by the caller.
+      The client only talks to the default adb server, so the command is left
+      to that executable.
+    retries: Number of times to try the command with the client.
+
+  Returns:
+    The function result, or None if the client is disabled, adb_path is
+    provided or the client could not serve the command in any of the tries
+    (callers then run 'adb').
+  """
+  client = _adb_client
+  if client is None or adb_path is not None:
+    return None
+  for attempt in range(1, retries + 1):
+    try:
+      return function(client)
+    except (adb_client.AdbClientError, OSError) as e:
+      logger.debug(f"adb client did not serve the command "
+                   f"(try {attempt}/{retries}): {e!r}")
+  logger.debug("Running adb for the command.")
+  return None
+
 
 def bugreport(adb_identifier: str,
               destination_path: str = "./",
@@ -308,20 +385,22 @@ def adb_devices(
     'adb devices'. The device identifiers are either serial numbers
     ("abcde123") or IP addresses and ports ("12.34.56.78:5555").
   """
-  try:
-    output = _adb_command("devices", adb_path=adb_path)
-  except RuntimeError as err:
-    logger.warning(repr(err))
-    return []
+  output_lines = _call_adb_client(
+      lambda client: client.devices().splitlines(), adb_path=adb_path)
+  if output_lines is None:
+    try:
+      output = _adb_command("devices", adb_path=adb_path)
+    except RuntimeError as err:
+      logger.warning(repr(err))
+      return []
 
-  output_lines = output.splitlines()
-  output_start_marker = "List of devices attached"
-  if output_start_marker not in output_lines:
-    return []
+    output_lines = output.splitlines()
+    output_start_marker = "List of devices attached"
+    if output_start_marker not in output_lines:
+      return []
+    output_lines = output_lines[output_lines.index(output_start_marker) + 1:]
 
-  output_start_index = output_lines.index(output_start_marker) + 1
-  device_lines = [line for line in output_lines[output_start_index:]
-                  if line and "\t" in line]
+  device_lines = [line for line in output_lines if line and "\t" in line]
 
   identifiers_and_states = []
   for device_line in device_lines:
@@ -635,6 +714,15 @@ def shell(adb_serial: str,
     Response string if include_return_code is False; (response, return code)
       tuple otherwise.
   """
+  result = _call_adb_client(
+      lambda client: client.shell(adb_serial, command, timeout=timeout),
+      adb_path=adb_path,
+      retries=retries)
+  if result is not None:
+    output, return_code = result
+    logger.debug(f"adb shell {command!r} to {adb_serial} returned {output!r} "
+                 f"with return code {return_code}")
+    return result if include_return_code else output
   return _adb_command(["shell", command], adb_serial,
                       adb_path=adb_path, timeout=timeout, retries=retries,
                       include_return_code=include_return_code)
@@ -768,6 +856,11 @@ def pull_from_device(adb_serial, sources, destination_path="./", adb_path=None):
       args.append(source_path)
   else:
     args.append(sources)
+  output = _call_adb_client(
+      lambda client: client.pull(adb_serial, args[1:], destination_path),
+      adb_path=adb_path)
+  if output is not None:
+    return output
   args.append(destination_path)
   output, returncode = _adb_command(
       args, adb_serial, adb_path=adb_path, include_return_code=True)
@@ -816,6 +909,11 @@ def push_to_device(adb_serial, sources, destination_path, adb_path=None):
       raise ValueError(
           "The source file {} appears to be invalid.".format(sources))
 
+  output = _call_adb_client(
+      lambda client: client.push(adb_serial, args[1:], destination_path),
+      adb_path=adb_path)
+  if output is not None:
+    return output
   args.append(destination_path)
   output, returncode = _adb_command(
       args, adb_serial, adb_path=adb_path, include_return_code=True)
@@ -1128,8 +1226,12 @@ def install_package_on_device(package_path: str,
   flags = sorted([flag for flag, value in flags_map.items() if value])
   command_list.extend(flags)
   command_list.append(package_path)
-  response = _adb_command(
-      tuple(command_list), adb_serial=adb_serial, adb_path=adb_path)
+  response = _call_adb_client(
+      lambda client: client.install(adb_serial, package_path, flags),
+      adb_path=adb_path)
+  if response is None:
+    response = _adb_command(
+        tuple(command_list), adb_serial=adb_serial, adb_path=adb_path)
   if "Success\n" not in response:
     raise errors.DeviceError(
         "install_package_on_device failed: {}".format(response))
@@ -1172,6 +1274,12 @@ def add_port_forwarding(host_port: int,
   Returns:
       The command output.
   """
+  output = _call_adb_client(
+      lambda client: client.forward(
+          adb_serial, f"tcp:{host_port}", f"tcp:{device_port}"),
+      adb_path=adb_path)
+  if output is not None:
+    return output
   commands = ("forward", f"tcp:{host_port}", f"tcp:{device_port}")
   output, returncode = _adb_command(commands,
                                     adb_serial=adb_serial,
@@ -1200,6 +1308,11 @@ def remove_port_forwarding(host_port: int,
   Returns:
       The command output.
   """
+  output = _call_adb_client(
+      lambda client: client.kill_forward(adb_serial, f"tcp:{host_port}"),
+      adb_path=adb_path)
+  if output is not None:
+    return output
   commands = ("forward", "--remove", f"tcp:{host_port}")
   output, returncode = _adb_command(commands,
                                     adb_serial=adb_serial,
@@ -1229,13 +1342,16 @@ def list_port_forwarding(
     A list of (host_port, device_port) forwarding connection rules.
   """
   commands = ("forward", "--list")
-  # The forward --list always return all rules so no need to pass the serial.
-  output, returncode = _adb_command(commands,
-                                    adb_serial=None,
-                                    adb_path=adb_path,
-                                    include_return_code=True)
-  if returncode != 0:
-    raise RuntimeError("Failed to list adb port forwarding rules")
+  output = _call_adb_client(
+      lambda client: client.list_forward(), adb_path=adb_path)
+  if output is None:
+    # The forward --list always return all rules so no need to pass the serial.
+    output, returncode = _adb_command(commands,
+                                      adb_serial=None,
+                                      adb_path=adb_path,
+                                      include_return_code=True)
+    if returncode != 0:
+      raise RuntimeError("Failed to list adb port forwarding rules")
 
   output_lines = output.splitlines()
   result = []
@@ -0,0 +1,176 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Command session with the serial console of a Cambrionix hub.
+
+The Cambrionix console echoes each command line, prints the response and ends
+it with the ">> " prompt. A session is synchronized once (CTRL-C and a wait
+for the prompt) and then reused for any number of commands. By default, each
+command is written once the response to the previous one has been received.
+Sessions can opt in to pipelining (max_pipelined_commands > 1): commands are
+then written without waiting for the previous responses and the responses are
+split at the prompts. Each response must start with the echo of its command:
+otherwise the responses can no longer be matched to commands, and an error is
+raised.
+"""
+import select
+import time
+from typing import Any, Sequence
+
+from gazoo_device import errors
+
+PROMPT = ">> "
+# Only "\r": a "\n" may print an extra prompt, which would shift responses.
+_LINE_ENDING = "\r"
+_CTRL_C = "\x03"
+# A new line followed by the prompt ends each response.
+_RESPONSE_END = "\n" + PROMPT
+_MAX_PIPELINED_COMMANDS = 1
+_RESPONSE_TIMEOUT = 25
+# Time without output after which the console is considered idle after CTRL-C.
+_SYNC_QUIET_TIME = 0.05
+
+
+class CambrionixSession:
+  """Command session over an open Cambrionix serial port."""
+
+  def __init__(self,
+               serial_port: Any,
+               response_timeout: float = _RESPONSE_TIMEOUT,
+               max_pipelined_commands: int = _MAX_PIPELINED_COMMANDS):
+    """Initializes the session. The console is synchronized on first use.
+
+    Args:
+      serial_port: Open serial port (serial.Serial) of the hub's console.
+      response_timeout: Seconds to wait for output from the hub.
+      max_pipelined_commands: Maximum number of commands sent without having
+        received their responses. 1 (the default) disables pipelining.
+    """
+    self._serial_port = serial_port
+    self._response_timeout = response_timeout
+    self._max_pipelined_commands = max(1, max_pipelined_commands)
+    self._buffer = ""
+    self._synchronized = False
+
+  def send_commands(self, commands: Sequence[str]) -> list[list[str]]:
+    """Sends the commands and returns their responses.
+
+    Args:
+      commands: Commands to send, without line endings.
+
+    Returns:
+      Lines of the response to each command, without the command echo and
+      the prompt.
+
+    Raises:
+      DeviceError: if the hub does not respond in time or a response does not
+        start with the echo of its command. The session is synchronized again
+        before the next commands.
+    """
+    if not self._synchronized:
+      self._synchronize()
+    try:
+      return self._send_commands(commands)
+    except errors.DeviceError:
+      self._synchronized = False
+      raise
+
+  def _send_commands(self, commands: Sequence[str]) -> list[list[str]]:
+    """Sends the commands on the synchronized session."""
+    responses = []
+    sent = 0
+    while len(responses) < len(commands):
+      window_end = min(
+          len(responses) + self._max_pipelined_commands, len(commands))
+      if sent < window_end:
+        self._write("".join(
+            command + _LINE_ENDING for command in commands[sent:window_end]))
+        sent = window_end
+      command = commands[len(responses)]
+      responses.append(_parse_response(command, self._read_response(command)))
+    return responses
+
+  def write_command(self, command: str) -> None:
+    """Writes a command without waiting for a response (for example, reboot).
+
+    Args:
+      command: Command to send, without line endings.
+    """
+    if not self._synchronized:
+      self._synchronize()
+    self._write(command + _LINE_ENDING)
+    self._synchronized = False
+
+  def _synchronize(self) -> None:
+    """Cancels any partial input and discards the pending output."""
+    self._buffer = ""
+    self._write(_CTRL_C + _LINE_ENDING)
+    self._read_response("CTRL-C")
+    # CTRL-C and the line ending may each print a prompt: drain the rest.
+    while self._read(timeout=_SYNC_QUIET_TIME):
+      pass
+    self._buffer = ""
+    self._synchronized = True
+
+  def _write(self, data: str) -> None:
+    self._serial_port.write(data.encode("utf-8"))
+
+  def _read(self, timeout: float) -> bool:
+    """Reads the available output into the buffer.
+
+    Args:
+      timeout: Seconds to wait for output.
+
+    Returns:
+      Whether any output was read.
+    """
+    if not select.select([self._serial_port], [], [], timeout)[0]:
+      return False
+    data = self._serial_port.read(max(1, self._serial_port.in_waiting))
+    self._buffer += data.decode("utf-8", "replace")
+    return bool(data)
+
+  def _read_response(self, command: str) -> str:
+    """Returns the output up to the next prompt and removes it from the buffer.
+
+    Args:
+      command: Command the response belongs to, for error messages.
+
+    Raises:
+      DeviceError: if no prompt is received in time.
+    """
+    deadline = time.time() + self._response_timeout
+    while _RESPONSE_END not in self._buffer:
+      remaining = deadline - time.time()
+      if remaining <= 0 or not self._read(timeout=remaining):
+        raise errors.DeviceError(
+            "Device cambrionix get response failed. Read timeout on serial "
+            f"port: {self._serial_port} waiting for the response to "
+            f"{command!r}")
+    response, self._buffer = self._buffer.split(_RESPONSE_END, 1)
+    return response
+
+
+def _parse_response(command: str, response: str) -> list[str]:
+  """Returns the lines of the response without the command echo.
+
+  Raises:
+    DeviceError: if the response does not start with the command echo.
+  """
+  lines = response.splitlines()
+  if not lines or lines[0].strip() != command.strip():
+    raise errors.DeviceError(
+        "Device cambrionix get response failed. The response to "
+        f"{command!r} does not start with its echo: {response!r}")
+  return lines[1:]
@@ -12,11 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Utility module for local host commands."""
+import collections
 import ipaddress
 import os
 import re
 import shutil
 import subprocess
+import threading
 from typing import Any
 from typing import Collection, Optional, Sequence
 
@@ -25,6 +27,8 @@ from gazoo_device import data_types
 from gazoo_device import errors
 from gazoo_device import extensions
 from gazoo_device import gdm_logger
+from gazoo_device.utility import network_probe
+from gazoo_device.utility import ssh_connection_pool
 
 _LOGGER = gdm_logger.get_logger()
 
@@ -57,6 +61,81 @@ _gcloud_cli = None  # Set by _set_gcloud_cli().
 # Set by _get_scp_command().
 _scp_use_legacy_option: Optional[tuple[str, ...]] = None
 
+# Set by enable_ssh_connection_pool() and cleared by the
+# close_ssh_connection_pool() call matching the last enable call.
+_ssh_connection_pool: Optional[ssh_connection_pool.SshConnectionPool] = None
+_ssh_connection_pool_users = 0
+_ssh_connection_pool_lock = threading.Lock()
+
+# Number of enable_network_probes() calls without a matching
+# disable_network_probes() call.
+_network_probes_users = 0
+_network_probes_lock = threading.Lock()
+
+
+def enable_ssh_connection_pool() -> None:
+  """Makes ssh and scp commands to devices reuse persistent connections.
+
+  Applies to ssh_command(), scp_to_device(), scp_from_device() and SSH
+  transports created after the call. The pool is shared by the whole process:
+  each call must be matched by a close_ssh_connection_pool() call, and the
+  pool stays enabled until every caller has closed it.
+  """
+  global _ssh_connection_pool, _ssh_connection_pool_users
+  with _ssh_connection_pool_lock:
+    if _ssh_connection_pool is None:
+      _ssh_connection_pool = ssh_connection_pool.SshConnectionPool()
+    _ssh_connection_pool_users += 1
+
+
+def close_ssh_connection_pool() -> None:
+  """Releases the pool enabled by an enable_ssh_connection_pool() call.
+
+  The last matching call closes all pooled SSH connections and disables the
+  pool: new commands open their own connections.
+  """
+  global _ssh_connection_pool, _ssh_connection_pool_users
+  with _ssh_connection_pool_lock:
+    if _ssh_connection_pool_users == 0:
+      return
+    _ssh_connection_pool_users -= 1
+    if _ssh_connection_pool_users:
+      return
+    pool, _ssh_connection_pool = _ssh_connection_pool, None
+  pool.close()
+
+
+def enable_network_probes() -> None:
+  """Makes get_all_ssh_ips() and get_all_snmp_ips() probe IPs concurrently.
+
+  The IPs are probed at once from this process (see network_probe) instead of
+  by ping, nc and snmpget subprocesses for one IP at a time. The setting is
+  shared by the whole process: each call must be matched by a
+  disable_network_probes() call, and probes stay enabled until every caller
+  has disabled them.
+  """
+  global _network_probes_users
+  with _network_probes_lock:
+    _network_probes_users += 1
+
+
+def disable_network_probes() -> None:
+  """Releases the probes enabled by an enable_network_probes() call."""
+  global _network_probes_users
+  with _network_probes_lock:
+    if _network_probes_users:
+      _network_probes_users -= 1
+
+
+def _get_ssh_connection_pool_options(
+    ip_address: str, user: str,
+    key_info: Optional[data_types.KeyInfo]) -> list[str]:
+  """Returns ssh options to use the pooled connection (if pool is enabled)."""
+  if _ssh_connection_pool is None:
+    return []
+  key_path = get_key_path(key_info) if key_info else None
+  return _ssh_connection_pool.get_ssh_options(ip_address, user, key_path)
+
 
 def get_key_path(key_info: data_types.KeyInfo) -> str:
   """Returns the file path corresponding to the key."""
@@ -108,9 +187,13 @@ def generate_ssh_args(ip_address: str,
       options: Extra SSH command line options.
       key_info: SSH key info to use. If None, don't use an SSH key.
   """
+  # ssh uses the first value given for an option: explicit options take
+  # precedence over the connection pool options.
+  options = [*options,
+             *_get_ssh_connection_pool_options(ip_address, user, key_info)]
   if key_info:
     verify_key(key_info)
-    options = list(options) + ["-i", get_key_path(key_info)]
+    options = options + ["-i", get_key_path(key_info)]
   return [*options, f"{user}@{ip_address}", *command]
 
 
@@ -167,6 +250,9 @@ def get_all_ssh_ips(static_ips: Optional[Collection[str]] = None) -> list[str]:
   """Returns all IPs that respond to ping and accept SSH connections."""
   static_ips = static_ips or []
   ssh_ips = set(static_ips)
+  if _network_probes_users:
+    return _get_available_ips(
+        network_probe.probe_ssh(ssh_ips), "accept incoming SSH connections")
 
   unpingable_ips = {ip for ip in ssh_ips if not is_pingable(ip)}
   if unpingable_ips:
@@ -187,6 +273,9 @@ def get_all_snmp_ips(static_ips: Optional[Sequence[str]] = None) -> list[str]:
   """Returns all IPs that respond to ping and accept snmp protocol."""
   static_ips = static_ips or []
   snmp_ips = set(static_ips)
+  if _network_probes_users:
+    return _get_available_ips(
+        network_probe.probe_snmp(snmp_ips), "accept snmp protocol")
   snmp_ips = {ip for ip in snmp_ips if is_pingable(ip)}
   non_snmp_ips = {ip for ip in snmp_ips if not accepts_snmp(ip)}
   if non_snmp_ips:
@@ -195,6 +284,26 @@ def get_all_snmp_ips(static_ips: Optional[Sequence[str]] = None) -> list[str]:
   return list(snmp_ips)
 
 
+def _get_available_ips(
+    results: dict[str, network_probe.ProbeResult],
+    service_description: str) -> list[str]:
+  """Logs the IPs which failed network probes and returns the others."""
+  ips_by_result = collections.defaultdict(set)
+  for ip, result in results.items():
+    ips_by_result[result].add(ip)
+  failure_messages = {
+      network_probe.ProbeResult.NOT_PINGABLE: "do not respond to ping",
+      network_probe.ProbeResult.SERVICE_UNAVAILABLE:
+          f"do not {service_description}",
+      network_probe.ProbeResult.DEADLINE_EXCEEDED:
+          "were not probed before the deadline",
+  }
+  for result, message in failure_messages.items():
+    if ips_by_result[result]:
+      _LOGGER.info(f"ip_address(es) {ips_by_result[result]} {message}.")
+  return list(ips_by_result[network_probe.ProbeResult.AVAILABLE])
+
+
 def get_all_yepkit_serials():
   """Returns all Yepkit serials."""
   if not has_command("ykushcmd"):
@@ -551,6 +660,8 @@ def scp_to_device(ip_address: str,
   Returns:
       "scp" command output.
   """
+  options = [*options,
+             *_get_ssh_connection_pool_options(ip_address, user, key_info)]
   if ipaddress.ip_address(ip_address).version == 6:  # If ip_address is Ipv6.
     ip_address = "[" + ip_address + "]"
   remote_file_path = "{user}@{host}:{path}".format(
@@ -581,6 +692,8 @@ def scp_from_device(ip_address: str,
   Returns:
       "scp" command output.
   """
+  options = [*options,
+             *_get_ssh_connection_pool_options(ip_address, user, key_info)]
   if ipaddress.ip_address(ip_address).version == 6:  # If ip_address is Ipv6.
     ip_address = "[" + ip_address + "]"
   remote_file_path = "{user}@{host}:{path}".format(
@@ -0,0 +1,327 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pool of persistent HTTP sessions, one per host.
+
+Sending each request from a new requests.Session opens a new TCP (and TLS)
+connection per request and repeats the digest authentication handshake (a 401
+response followed by the authenticated request) every time. The pool keeps one
+session per (scheme, host, port, SSL version) whose connections are kept alive
+between requests, bounds the number of connections to each host and shares the
+digest authentication nonce between the requests (and threads) using the same
+credentials. Sessions which have not been used for idle_timeout seconds are
+closed.
+
+The pool is thread-safe: requests to the same host from multiple threads share
+the session and run in parallel on up to max_connections_per_host connections.
+"""
+import contextlib
+import dataclasses
+import hashlib
+import secrets
+import threading
+import time
+from typing import Any, Iterator, Optional
+import urllib.parse
+
+from gazoo_device import gdm_logger
+import requests
+from requests import adapters
+from requests import auth as requests_auth
+import requests.cookies
+import requests.utils
+
+logger = gdm_logger.get_logger()
+
+_MAX_CONNECTIONS_PER_HOST = 8
+_IDLE_TIMEOUT = 60
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# Digest authentication algorithm -> hash function.
+_DIGEST_HASH_FUNCTIONS = {
+    "MD5": hashlib.md5,
+    "MD5-SESS": hashlib.md5,
+    "SHA": hashlib.sha1,
+    "SHA-256": hashlib.sha256,
+    "SHA-512": hashlib.sha512,
+}
+
+# (scheme, host, port, SSL version).
+_SessionKey = tuple[str, str, Optional[int], Optional[int]]
+
+
+class SharedNonceDigestAuth(requests_auth.AuthBase):
+  """Digest authentication which shares the server nonce between threads.
+
+  requests.auth.HTTPDigestAuth reuses the nonce of the last challenge only
+  within the thread which received it: the first request of every thread
+  gets a 401 response before being resent with credentials. This class keeps
+  the latest challenge and nonce count of all threads. It only supports the
+  "auth" quality of protection (or none) and request bodies which can be
+  sent again, such as strings and bytes.
+  """
+
+  def __init__(self, username: str, password: str):
+    self.username = username
+    self.password = password
+    self._lock = threading.Lock()
+    self._challenge: dict[str, str] = {}
+    self._nonce_count = 0
+
+  def __call__(
+      self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+    """Authenticates the request with the latest challenge, if any."""
+    header = self.build_digest_header(request.method, request.url)
+    if header:
+      request.headers["Authorization"] = header
+    request.register_hook("response", self.handle_401)
+    return request
+
+  def build_digest_header(self, method: str, url: str) -> Optional[str]:
+    """Returns the authorization header for the latest challenge.
+
+    Args:
+      method: HTTP method of the request.
+      url: URL of the request.
+
+    Returns:
+      The header or None if no challenge was received yet or the challenge
+      uses an unsupported algorithm or quality of protection.
+    """
+    with self._lock:
+      if not self._challenge:
+        return None
+      challenge = self._challenge
+      # Nonce counts must increase across all requests using the nonce.
+      self._nonce_count += 1
+      nonce_count = self._nonce_count
+    algorithm = challenge.get("algorithm")
+    hash_function = _DIGEST_HASH_FUNCTIONS.get((algorithm or "MD5").upper())
+    qop = challenge.get("qop")
+    if hash_function is None or (qop and "auth" not in qop.split(",")):
+      return None
+
+    def digest(text: str) -> str:
+      return hash_function(text.encode("utf-8")).hexdigest()
+
+    realm = challenge.get("realm", "")
+    nonce = challenge.get("nonce", "")
+    parsed_url = urllib.parse.urlsplit(url)
+    path = parsed_url.path or "/"
+    if parsed_url.query:
+      path += f"?{parsed_url.query}"
+    nc_value = f"{nonce_count:08x}"
+    cnonce = secrets.token_hex(8)
+    ha1 = digest(f"{self.username}:{realm}:{self.password}")
+    if (algorithm or "").upper() == "MD5-SESS":
+      ha1 = digest(f"{ha1}:{nonce}:{cnonce}")
+    ha2 = digest(f"{method}:{path}")
+    if qop:
+      response = digest(f"{ha1}:{nonce}:{nc_value}:{cnonce}:auth:{ha2}")
+    else:
+      response = digest(f"{ha1}:{nonce}:{ha2}")
+
+    header = (f'username="{self.username}", realm="{realm}", '
+              f'nonce="{nonce}", uri="{path}", response="{response}"')
+    if challenge.get("opaque"):
+      header += f', opaque="{challenge["opaque"]}"'
+    if algorithm:
+      header += f', algorithm="{algorithm}"'
+    if qop:
+      header += f', qop="auth", nc={nc_value}, cnonce="{cnonce}"'
+    return f"Digest {header}"
+
+  def handle_401(self, response: requests.Response,
+                 **kwargs: Any) -> requests.Response:
+    """Resends the request once with credentials for a digest challenge.
+
+    Args:
+      response: Response to the request.
+      **kwargs: Arguments the request was sent with.
+
+    Returns:
+      The response to the resent request, or the original response if it
+      isn't a digest challenge.
+    """
+    authenticate = response.headers.get("www-authenticate", "")
+    if (response.status_code != 401 or
+        not authenticate.lower().startswith("digest ")):
+      return response
+    challenge = requests.utils.parse_dict_header(authenticate[len("digest "):])
+    with self._lock:
+      if challenge.get("nonce") != self._challenge.get("nonce"):
+        self._nonce_count = 0
+      self._challenge = challenge
+
+    # Consume the content and release the connection so that the resent
+    # request can reuse it.
+    _ = response.content
+    response.close()
+    request = response.request.copy()
+    cookie_jar = requests.cookies.RequestsCookieJar()
+    requests.cookies.extract_cookies_to_jar(
+        cookie_jar, response.request, response.raw)
+    request.prepare_cookies(cookie_jar)
+    header = self.build_digest_header(request.method, request.url)
+    if not header:
+      return response
+    request.headers["Authorization"] = header
+    # Sent by the adapter directly: the resent request's hooks don't run.
+    new_response = response.connection.send(request, **kwargs)
+    new_response.history.append(response)
+    new_response.request = request
+    return new_response
+
+
+@dataclasses.dataclass
+class _PooledSession:
+  """A session of the pool and its bookkeeping."""
+  session: requests.Session
+  last_used: float
+  users: int = 0
+  # (username, password) -> digest authentication of the host.
+  digest_auths: dict[tuple[Any, Any], SharedNonceDigestAuth] = (
+      dataclasses.field(default_factory=dict))
+
+
+class HttpSessionPool:
+  """Pool of persistent HTTP sessions, one per host."""
+
+  def __init__(self,
+               max_connections_per_host: int = _MAX_CONNECTIONS_PER_HOST,
+               idle_timeout: float = _IDLE_TIMEOUT):
+    """Initializes the pool.
+
+    Args:
+      max_connections_per_host: Maximum number of open connections to each
+        host. Requests beyond this number wait for a connection to be free.
+      idle_timeout: Seconds after which unused sessions (and their
+        connections) are closed.
+    """
+    self._max_connections_per_host = max_connections_per_host
+    self._idle_timeout = idle_timeout
+    self._lock = threading.Lock()
+    self._sessions: dict[_SessionKey, _PooledSession] = {}
+
+  def close(self) -> None:
+    """Closes all sessions of the pool."""
+    with self._lock:
+      sessions = list(self._sessions.values())
+      self._sessions.clear()
+    for pooled_session in sessions:
+      pooled_session.session.close()
+
+  @contextlib.contextmanager
+  def session(
+      self,
+      url: str,
+      ssl_version: Optional[int] = None) -> Iterator[requests.Session]:
+    """Yields the session of the host of the URL.
+
+    The session must not be closed or modified (for example, by mounting
+    adapters) by the caller.
+
+    Args:
+      url: URL of the request to send.
+      ssl_version: SSL version to use for HTTPS requests. For example,
+        ssl.PROTOCOL_TLSv1_2.
+
+    Yields:
+      The session of the host.
+    """
+    pooled_session = self._acquire(_get_session_key(url, ssl_version))
+    try:
+      yield pooled_session.session
+    finally:
+      with self._lock:
+        pooled_session.users -= 1
+        pooled_session.last_used = time.monotonic()
+
+  def get_auth(
+      self, url: str, auth: Optional[requests_auth.AuthBase],
+      ssl_version: Optional[int] = None) -> Optional[requests_auth.AuthBase]:
+    """Returns the authentication to use for a request to the URL.
+
+    Digest authentication is replaced by the SharedNonceDigestAuth of the
+    host and credentials, which keeps the nonce of the host between
+    requests. Other authentication is returned unchanged.
+
+    Args:
+      url: URL of the request to send.
+      auth: Authentication passed by the caller.
+      ssl_version: SSL version of the request.
+    """
+    if not isinstance(auth, requests_auth.HTTPDigestAuth):
+      return auth
+    credentials = (auth.username, auth.password)
+    with self._lock:
+      pooled_session = self._sessions.get(_get_session_key(url, ssl_version))
+      if pooled_session is None:
+        return auth
+      if credentials not in pooled_session.digest_auths:
+        pooled_session.digest_auths[credentials] = SharedNonceDigestAuth(
+            *credentials)
+      return pooled_session.digest_auths[credentials]
+
+  def _acquire(self, key: _SessionKey) -> _PooledSession:
+    """Returns the session of the key, creating it if necessary."""
+    now = time.monotonic()
+    with self._lock:
+      idle_sessions = self._pop_idle_sessions(now)
+      pooled_session = self._sessions.get(key)
+      if pooled_session is None:
+        pooled_session = _PooledSession(
+            session=self._create_session(key[3]), last_used=now)
+        self._sessions[key] = pooled_session
+      pooled_session.users += 1
+    for idle_session in idle_sessions:
+      idle_session.session.close()
+    return pooled_session
+
+  def _pop_idle_sessions(self, now: float) -> list[_PooledSession]:
+    """Removes and returns the sessions which have been idle for too long."""
+    idle_keys = [
+        key for key, pooled_session in self._sessions.items()
+        if not pooled_session.users
+        and now - pooled_session.last_used > self._idle_timeout
+    ]
+    if idle_keys:
+      logger.debug("Closing idle HTTP sessions of %s.", idle_keys)
+    return [self._sessions.pop(key) for key in idle_keys]
+
+  def _create_session(self, ssl_version: Optional[int]) -> requests.Session:
+    """Returns a new session with bounded connection pools."""
+    # Imported here: http_utils imports this module.
+    from gazoo_device.utility import http_utils  # pylint: disable=g-import-not-at-top
+    session = requests.Session()
+    adapter_kwargs = {
+        "pool_connections": 1,
+        "pool_maxsize": self._max_connections_per_host,
+        "pool_block": True,
+    }
+    session.mount("http://", adapters.HTTPAdapter(**adapter_kwargs))
+    if ssl_version:
+      session.mount("https://",
+                    http_utils.SSLAdapter(ssl_version, **adapter_kwargs))
+    else:
+      session.mount("https://", adapters.HTTPAdapter(**adapter_kwargs))
+    return session
+
+
+def _get_session_key(url: str, ssl_version: Optional[int]) -> _SessionKey:
+  """Returns the key of the session to use for the URL."""
+  parsed_url = urllib.parse.urlsplit(url)
+  scheme = parsed_url.scheme.lower()
+  return (scheme, (parsed_url.hostname or "").lower(),
+          parsed_url.port or _DEFAULT_PORTS.get(scheme), ssl_version)
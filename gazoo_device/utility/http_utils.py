@@ -16,10 +16,12 @@ import contextlib
 import json
 import socket
 import ssl
-from typing import Any, Callable, ContextManager, Mapping, Optional, Union
+import threading
+from typing import Any, Callable, ContextManager, Iterator, Mapping, Optional, Union
 import urllib
 
 from gazoo_device import gdm_logger
+from gazoo_device.utility import http_session_pool
 import requests
 from requests import adapters
 from requests.auth import AuthBase
@@ -32,6 +34,46 @@ MAX_URL_RETRY = 3
 
 logger = gdm_logger.get_logger()
 
+# Set by enable_session_pool() and cleared by the close_session_pool() call
+# matching the last enable call.
+_session_pool: Optional[http_session_pool.HttpSessionPool] = None
+_session_pool_users = 0
+_session_pool_lock = threading.Lock()
+
+
+def enable_session_pool() -> None:
+  """Sends HTTP requests from persistent sessions shared by all callers.
+
+  While enabled, send_http_get() and send_http_post() calls without a
+  session_factory send their requests from the session of the host in a
+  process-wide http_session_pool.HttpSessionPool: connections are kept alive
+  between requests and digest authentication nonces are reused. Calls nest:
+  each call must be matched by a close_session_pool() call, and the sessions
+  are closed by the last one.
+  """
+  global _session_pool, _session_pool_users
+  with _session_pool_lock:
+    if _session_pool is None:
+      _session_pool = http_session_pool.HttpSessionPool()
+    _session_pool_users += 1
+
+
+def close_session_pool() -> None:
+  """Releases the pool enabled by an enable_session_pool() call.
+
+  The sessions are closed when the last user releases the pool. Calls without
+  a matching enable_session_pool() call are no-ops.
+  """
+  global _session_pool, _session_pool_users
+  with _session_pool_lock:
+    if _session_pool_users == 0:
+      return
+    _session_pool_users -= 1
+    if _session_pool_users:
+      return
+    pool, _session_pool = _session_pool, None
+  pool.close()
+
 
 class SSLAdapter(adapters.HTTPAdapter):
   """An HTTPS Transport Adapter that uses an arbitrary SSL version."""
@@ -60,7 +102,7 @@ def send_http_get(url: str,
                   ssl_version: Optional[int] = None,
                   valid_return_codes: Optional[list[int]] = None,
                   session_factory: Optional[Callable[
-                      [], ContextManager[requests.Session]]] = requests.Session,
+                      [], ContextManager[requests.Session]]] = None,
                   timeout: int = 10,
                   tries: int = 1,
                   verify: bool = True) -> requests.Response:
@@ -75,7 +117,10 @@ def send_http_get(url: str,
       ssl_version: SSL version to be used for secure http (https) requests. For
         example, ssl.PROTOCOL_TLSv1_2.
       valid_return_codes: List of valid HTTP return codes.
-      session_factory: A context manager to yield a session to be used.
+      session_factory: A context manager to yield a session to be used. If
+        None, the session of the host in the session pool is used if the pool
+        is enabled (see enable_session_pool()) and a new requests.Session
+        otherwise.
       timeout: request timeout in seconds
       tries: how many times to try sending the request.
       verify: Enables SSL certificate verification. Only set this to `False`
@@ -99,10 +144,8 @@ def send_http_get(url: str,
         f"Expecting headers to be a Mapping type but received: {type(headers)}"
     )
   try:
-    with session_factory() as session:
-      session: requests.Session
-      if ssl_version:
-        session.mount("https://", SSLAdapter(ssl_version))
+    with _open_session(
+        url, ssl_version, session_factory, auth) as (session, auth):
       if data and isinstance(data, dict):
         data = json.dumps(data)
 
@@ -148,8 +191,7 @@ def send_http_post(url: str,
                    ssl_version: Optional[int] = None,
                    valid_return_codes: Optional[list[int]] = None,
                    session_factory: Optional[Callable[
-                       [],
-                       ContextManager[requests.Session]]] = requests.Session,
+                       [], ContextManager[requests.Session]]] = None,
                    timeout: int = 10,
                    tries: int = 1,
                    verify: bool = True) -> requests.Response:
@@ -165,7 +207,10 @@ def send_http_post(url: str,
       ssl_version: SSL version to be used for secure http (https) requests. For
         example, ssl.PROTOCOL_TLSv1_2
       valid_return_codes: List of valid HTTP return codes.
-      session_factory: A context manager to yield a session to be used.
+      session_factory: A context manager to yield a session to be used. If
+        None, the session of the host in the session pool is used if the pool
+        is enabled (see enable_session_pool()) and a new requests.Session
+        otherwise.
       timeout: request timeout in seconds
       tries: how many times to try sending the request.
       verify: Enables SSL certificate verification. Only set this to `False`
@@ -196,11 +241,8 @@ def send_http_post(url: str,
     )
 
   try:
-    with session_factory() as session:
-      session: requests.Session
-      if ssl_version:
-        session.mount("https://", SSLAdapter(ssl_version))
-
+    with _open_session(
+        url, ssl_version, session_factory, auth) as (session, auth):
       for attempt in range(tries):
         try:
           response: requests.Response = session.post(
@@ -238,6 +280,36 @@ def send_http_post(url: str,
   return response
 
 
+@contextlib.contextmanager
+def _open_session(
+    url: str,
+    ssl_version: Optional[int],
+    session_factory: Optional[Callable[[], ContextManager[requests.Session]]],
+    auth: Optional[AuthBase],
+) -> Iterator[tuple[requests.Session, Optional[AuthBase]]]:
+  """Yields the session and authentication to use for a request.
+
+  Args:
+    url: URL of the request.
+    ssl_version: SSL version to use for HTTPS requests.
+    session_factory: Factory of the session passed by the caller, if any.
+    auth: Authentication passed by the caller.
+
+  Yields:
+    The session and the authentication to send the request with.
+  """
+  pool = _session_pool
+  if session_factory is None and pool is not None:
+    with pool.session(url, ssl_version=ssl_version) as session:
+      yield session, pool.get_auth(url, auth, ssl_version=ssl_version)
+    return
+  with (session_factory or requests.Session)() as session:
+    session: requests.Session
+    if ssl_version:
+      session.mount("https://", SSLAdapter(ssl_version))
+    yield session, auth
+
+
 def is_valid_ip_address(address: str, is_ipv6: bool = False) -> bool:
   """Checks if valid IP address.
 
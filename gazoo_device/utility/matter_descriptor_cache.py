@@ -0,0 +1,121 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of the Matter endpoint topology read from descriptor clusters.
+
+Discovering the endpoints and clusters of a Matter device takes 1 + 2 x N
+descriptor cluster reads (N = number of endpoints). The topology only changes
+when the firmware changes, so it is persisted per device together with the
+identity of the firmware it was read from (device type, serial number and
+software version). Each device has its own file, which is replaced atomically,
+so several GDM processes can share the cache.
+
+The topology is a JSON-serializable dictionary; its format is defined by the
+matter_endpoints capability.
+"""
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+from gazoo_device import config
+from gazoo_device import gdm_logger
+
+DEFAULT_DIRECTORY = os.path.join(config.DATA_DIRECTORY,
+                                 "matter_descriptor_cache")
+
+logger = gdm_logger.get_logger()
+
+
+def _get_path(directory: str, device_name: str) -> str:
+  return os.path.join(directory, f"{device_name}.json")
+
+
+def load(directory: str, device_name: str,
+         firmware_identity: str) -> Optional[dict[str, Any]]:
+  """Returns the topology persisted for the device's firmware.
+
+  Args:
+    directory: Directory of the cache.
+    device_name: Name of the device.
+    firmware_identity: Identity of the firmware running on the device.
+
+  Returns:
+    The topology or None if there is no cached topology for this firmware.
+  """
+  path = _get_path(directory, device_name)
+  try:
+    with open(path) as cache_file:
+      entry = json.load(cache_file)
+  except FileNotFoundError:
+    return None
+  except (OSError, ValueError) as e:
+    logger.debug(f"{device_name} ignoring unreadable Matter descriptor cache "
+                 f"{path}: {e!r}")
+    return None
+  if (not isinstance(entry, dict) or
+      entry.get("firmware_identity") != firmware_identity):
+    return None
+  return entry.get("topology")
+
+
+def save(directory: str, device_name: str, firmware_identity: str,
+         topology: dict[str, Any]) -> None:
+  """Persists the topology of the device's firmware.
+
+  Failures are logged and ignored: the cache is an optimization.
+
+  Args:
+    directory: Directory of the cache.
+    device_name: Name of the device.
+    firmware_identity: Identity of the firmware running on the device.
+    topology: Topology to persist.
+  """
+  entry = {"firmware_identity": firmware_identity, "topology": topology}
+  temp_path = None
+  try:
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, prefix=f".{device_name}.", delete=False
+    ) as temp_file:
+      temp_path = temp_file.name
+      json.dump(entry, temp_file)
+    os.replace(temp_path, _get_path(directory, device_name))
+    temp_path = None
+  except (OSError, TypeError, ValueError) as e:
+    logger.warning(
+        f"{device_name} failed to save the Matter descriptor cache: {e!r}")
+  finally:
+    if temp_path is not None:
+      try:
+        os.remove(temp_path)
+      except OSError:
+        pass
+
+
+def delete(directory: str, device_name: str) -> None:
+  """Deletes the topology persisted for the device, if any.
+
+  Args:
+    directory: Directory of the cache.
+    device_name: Name of the device.
+  """
+  path = _get_path(directory, device_name)
+  try:
+    os.remove(path)
+  except FileNotFoundError:
+    pass
+  except OSError as e:
+    logger.warning(f"{device_name} failed to delete the Matter descriptor "
+                   f"cache {path}: {e!r}")
@@ -16,12 +16,30 @@
 import contextlib
 import logging
 import multiprocessing
+import multiprocessing.connection
+import multiprocessing.forkserver
 import os
 import sys
-from typing import Generator, Optional
+import threading
+from typing import Any, Generator, Optional, Sequence
 from gazoo_device import config
 
 _MP_CONTEXT = multiprocessing.get_context("spawn")
+_FORKSERVER_CONTEXT = (
+    multiprocessing.get_context("forkserver")
+    if "forkserver" in multiprocessing.get_all_start_methods() else None)
+# Modules imported by the forkserver process before it forks any processes.
+# Processes forked from it don't import them again.
+_FORKSERVER_PRELOAD_MODULES = (
+    "gazoo_device",
+    "gazoo_device.switchboard.log_process",
+    "gazoo_device.switchboard.switchboard_host",
+    "gazoo_device.switchboard.switchboard_process",
+    "gazoo_device.switchboard.transport_process",
+)
+
+_switchboard_forkserver_lock = threading.Lock()
+_switchboard_forkserver_users = 0
 
 
 def _get_logger() -> logging.Logger:
@@ -37,6 +55,89 @@ def get_context() -> multiprocessing.context.SpawnContext:
   return _MP_CONTEXT
 
 
+def get_switchboard_process_context() -> multiprocessing.context.BaseContext:
+  """Returns the multiprocessing context to start Switchboard processes with.
+
+  The forkserver context while enabled by enable_switchboard_forkserver(),
+  otherwise the same spawn context as get_context(). Queues, events and other
+  multiprocessing objects should still be created with get_context().
+  """
+  if _switchboard_forkserver_users:
+    return _FORKSERVER_CONTEXT
+  return _MP_CONTEXT
+
+
+def enable_switchboard_forkserver(preload_modules: Sequence[str] = ()) -> bool:
+  """Makes Switchboard processes fork from a pre-warmed forkserver process.
+
+  A spawned process imports GDM and extension packages before running, which
+  takes seconds. The forkserver process imports them once and forks a process
+  for each Switchboard process, which takes milliseconds. The forkserver
+  process is started in the background by this call, is shared by the whole
+  process and runs until the main process exits. Each call must be matched by
+  a disable_switchboard_forkserver() call: Switchboard processes are spawned
+  again after the last one.
+
+  Args:
+    preload_modules: Modules to import in the forkserver process in addition
+      to GDM, such as extension packages. Only used by the call which starts
+      the forkserver process.
+
+  Returns:
+    True if enabled, False if the platform doesn't support forkserver.
+  """
+  global _switchboard_forkserver_users
+  if _FORKSERVER_CONTEXT is None:
+    _get_logger().warning(
+        "The forkserver start method isn't available on %s. "
+        "Switchboard processes are spawned.", sys.platform)
+    return False
+  with _switchboard_forkserver_lock:
+    _FORKSERVER_CONTEXT.set_forkserver_preload(
+        list(dict.fromkeys(
+            [*_FORKSERVER_PRELOAD_MODULES, *preload_modules])))
+    with configure_switchboard_multiprocessing():
+      multiprocessing.forkserver.ensure_running()
+    _switchboard_forkserver_users += 1
+  return True
+
+
+def disable_switchboard_forkserver() -> None:
+  """Releases the forkserver enabled by enable_switchboard_forkserver().
+
+  After the last matching call, get_switchboard_process_context() returns the
+  spawn context again. The forkserver process itself is not stopped: it runs
+  until the main process exits. Processes forked from it report their exit
+  status through it, so stopping it would make Switchboard processes which
+  are still running appear to have exited. multiprocessing also has no public
+  API to stop it.
+  """
+  global _switchboard_forkserver_users
+  with _switchboard_forkserver_lock:
+    if _switchboard_forkserver_users:
+      _switchboard_forkserver_users -= 1
+
+
+def get_queue_reader(
+    message_queue: Any) -> Optional[multiprocessing.connection.Connection]:
+  """Returns the connection which is readable when message_queue has messages.
+
+  The connection can be waited on with multiprocessing.connection.wait(), as
+  concurrent.futures.ProcessPoolExecutor does for its result queue.
+
+  Args:
+    message_queue: A multiprocessing queue.
+
+  Returns:
+    The reading end of the queue pipe or None if message_queue isn't a
+    multiprocessing queue (for example a queue.Queue or a manager proxy).
+  """
+  reader = getattr(message_queue, "_reader", None)
+  if isinstance(reader, multiprocessing.connection.Connection):
+    return reader
+  return None
+
+
 def if_spawn_run_and_exit():
   """If this is a spawned process, hijacks process execution logic via exec().
 
@@ -0,0 +1,397 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent discovery of SSH and SNMP hosts among IP addresses.
+
+Probes many IP addresses at once from an asyncio event loop instead of running
+ping, nc and snmpget for one address at a time:
+  * pings are ICMP echo requests sent from a single ICMP socket. Unprivileged
+    ICMP sockets are used if the host allows them (see the
+    net.ipv4.ping_group_range sysctl on Linux), otherwise raw sockets if the
+    process may open them. Only if neither is possible (or for IPv6
+    addresses) does every ping run a ping subprocess.
+  * SSH probes connect to the SSH port.
+  * SNMP probes send SNMP v2c GET requests for sysDescr.0 from a single UDP
+    socket (see snmp_utils.SnmpTransport).
+
+Usage:
+  results = network_probe.probe_ssh(["192.168.1.2", "192.168.1.3"])
+  ssh_ips = [ip for ip, result in results.items()
+             if result == network_probe.ProbeResult.AVAILABLE]
+"""
+import asyncio
+import concurrent.futures
+import enum
+import ipaddress
+import itertools
+import os
+import socket
+import struct
+import subprocess
+from typing import Any, Awaitable, Callable, Collection, Coroutine, Optional
+
+from gazoo_device import errors
+from gazoo_device import gdm_logger
+from gazoo_device.utility import snmp_utils
+
+logger = gdm_logger.get_logger()
+
+DEFAULT_MAX_CONCURRENCY = 256
+# Match the timeouts of host_utils.is_pingable(), host_utils.is_sshable() and
+# host_utils.accepts_snmp().
+DEFAULT_PING_TIMEOUT = 2
+DEFAULT_CONNECT_TIMEOUT = 2
+DEFAULT_SNMP_TIMEOUT = 3
+SSH_PORT = 22
+# Interval at which SNMP requests without a response are resent.
+_SNMP_RETRY_INTERVAL = 1
+_SNMP_COMMUNITY = "private"
+
+# Interval at which echo requests without a reply are resent.
+_PING_RETRY_INTERVAL = 1
+_ICMP_ECHO_REPLY = 0
+_ICMP_ECHO_REQUEST = 8
+_ICMP_RECEIVE_SIZE = 2048
+# Replies to hundreds of concurrent pings overflow the default receive buffer
+# (raw sockets also receive the echo requests sent to local addresses).
+_ICMP_RECEIVE_BUFFER_SIZE = 2**20
+
+
+class ProbeResult(enum.Enum):
+  """Result of probing an IP address."""
+  AVAILABLE = "available"
+  # The address doesn't respond to pings.
+  NOT_PINGABLE = "not pingable"
+  # The address responds to pings but doesn't provide the probed service.
+  SERVICE_UNAVAILABLE = "service unavailable"
+  # The probe didn't finish before the deadline.
+  DEADLINE_EXCEEDED = "deadline exceeded"
+
+
+def probe_ssh(
+    ip_addresses: Collection[str],
+    port: int = SSH_PORT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ping_timeout: float = DEFAULT_PING_TIMEOUT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    deadline: Optional[float] = None) -> dict[str, ProbeResult]:
+  """Checks which IP addresses respond to pings and accept SSH connections.
+
+  Args:
+    ip_addresses: IP addresses to probe.
+    port: SSH port to connect to.
+    max_concurrency: Maximum number of addresses probed at once.
+    ping_timeout: Seconds to wait for a ping response.
+    connect_timeout: Seconds to wait for the SSH port to accept a connection.
+    deadline: Seconds after which unfinished probes are abandoned. No
+      deadline if None.
+
+  Returns:
+    IP address -> result of the probe.
+  """
+
+  async def probe_address(
+      ip_address: str, pinger: "_IcmpPinger") -> ProbeResult:
+    if not await pinger.ping(ip_address, ping_timeout):
+      return ProbeResult.NOT_PINGABLE
+    if not await _accepts_tcp_connections(ip_address, port, connect_timeout):
+      return ProbeResult.SERVICE_UNAVAILABLE
+    return ProbeResult.AVAILABLE
+
+  async def probe_all() -> dict[str, ProbeResult]:
+    with _IcmpPinger() as pinger:
+      return await _probe_all(
+          ip_addresses,
+          lambda ip_address: probe_address(ip_address, pinger),
+          max_concurrency, deadline)
+
+  return _run(probe_all())
+
+
+def probe_snmp(
+    ip_addresses: Collection[str],
+    port: int = snmp_utils.SNMP_PORT,
+    community: str = _SNMP_COMMUNITY,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ping_timeout: float = DEFAULT_PING_TIMEOUT,
+    snmp_timeout: float = DEFAULT_SNMP_TIMEOUT,
+    deadline: Optional[float] = None) -> dict[str, ProbeResult]:
+  """Checks which IP addresses respond to pings and to SNMP v2c requests.
+
+  Args:
+    ip_addresses: IP addresses to probe.
+    port: SNMP port to send requests to.
+    community: SNMP community of the requests.
+    max_concurrency: Maximum number of addresses probed at once.
+    ping_timeout: Seconds to wait for a ping response.
+    snmp_timeout: Seconds to wait for a response to the SNMP GET request of
+      sysDescr.0.
+    deadline: Seconds after which unfinished probes are abandoned. No
+      deadline if None.
+
+  Returns:
+    IP address -> result of the probe.
+  """
+
+  async def probe_address(
+      ip_address: str, pinger: "_IcmpPinger",
+      snmp_transport: snmp_utils.SnmpTransport) -> ProbeResult:
+    if not await pinger.ping(ip_address, ping_timeout):
+      return ProbeResult.NOT_PINGABLE
+    try:
+      await snmp_transport.request(
+          ip_address, port, community, snmp_utils.GET_REQUEST,
+          [(snmp_utils.SYSTEM_DESCRIPTION_OID, None)], snmp_timeout)
+    except (errors.CommunicationTimeoutError, ValueError, OSError):
+      return ProbeResult.SERVICE_UNAVAILABLE
+    return ProbeResult.AVAILABLE
+
+  async def probe_all() -> dict[str, ProbeResult]:
+    snmp_transport = snmp_utils.SnmpTransport(
+        retry_interval=_SNMP_RETRY_INTERVAL)
+    try:
+      with _IcmpPinger() as pinger:
+        return await _probe_all(
+            ip_addresses,
+            lambda ip_address: probe_address(
+                ip_address, pinger, snmp_transport),
+            max_concurrency, deadline)
+    finally:
+      snmp_transport.close()
+
+  return _run(probe_all())
+
+
+def _run(
+    coroutine: Coroutine[Any, Any, dict[str, ProbeResult]]
+) -> dict[str, ProbeResult]:
+  """Runs the coroutine in a new event loop and returns its result."""
+  try:
+    asyncio.get_running_loop()
+  except RuntimeError:  # No event loop is running in this thread.
+    return asyncio.run(coroutine)
+  # asyncio.run() can't be called from a running event loop.
+  with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+    return executor.submit(asyncio.run, coroutine).result()
+
+
+async def _probe_all(
+    ip_addresses: Collection[str],
+    probe_address: Callable[[str], Awaitable[ProbeResult]],
+    max_concurrency: int,
+    deadline: Optional[float]) -> dict[str, ProbeResult]:
+  """Probes the IP addresses concurrently."""
+  semaphore = asyncio.Semaphore(max_concurrency)
+
+  async def probe_with_limit(ip_address: str) -> ProbeResult:
+    async with semaphore:
+      return await probe_address(ip_address)
+
+  tasks = {
+      ip_address: asyncio.ensure_future(probe_with_limit(ip_address))
+      for ip_address in ip_addresses
+  }
+  if not tasks:
+    return {}
+  _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+  for task in pending:
+    task.cancel()
+  await asyncio.gather(*pending, return_exceptions=True)
+  return {
+      ip_address: (ProbeResult.DEADLINE_EXCEEDED if task in pending
+                   else task.result())
+      for ip_address, task in tasks.items()
+  }
+
+
+async def _accepts_tcp_connections(
+    ip_address: str, port: int, timeout: float) -> bool:
+  """Returns whether the port of the IP address accepts TCP connections."""
+  try:
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(ip_address, port), timeout)
+  except (OSError, asyncio.TimeoutError):
+    return False
+  writer.close()
+  try:
+    await writer.wait_closed()
+  except OSError:
+    pass
+  return True
+
+
+def _icmp_checksum(data: bytes) -> int:
+  """Returns the internet checksum (RFC 1071) of the data."""
+  if len(data) % 2:
+    data += b"\x00"
+  total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+  total = (total >> 16) + (total & 0xFFFF)
+  total += total >> 16
+  return ~total & 0xFFFF
+
+
+def _create_echo_request(identifier: int, sequence: int) -> bytes:
+  """Returns an ICMP echo request packet."""
+  header = struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+  payload = b"gazoo_device"
+  checksum = _icmp_checksum(header + payload)
+  return struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, checksum, identifier,
+                     sequence) + payload
+
+
+def _parse_echo_reply(packet: bytes) -> Optional[tuple[int, int]]:
+  """Returns (identifier, sequence) of an ICMP echo reply, None otherwise.
+
+  Args:
+    packet: Packet received from an ICMP socket. Packets received from raw
+      sockets (and from unprivileged ICMP sockets on macOS) start with the
+      IPv4 header.
+  """
+  if packet and packet[0] >> 4 == 4:  # Starts with the IPv4 header.
+    packet = packet[(packet[0] & 0x0F) * 4:]
+  if len(packet) < 8 or packet[0] != _ICMP_ECHO_REPLY:
+    return None
+  identifier, sequence = struct.unpack("!HH", packet[4:8])
+  return identifier, sequence
+
+
+def _open_icmp_socket() -> tuple[Optional[socket.socket], bool]:
+  """Opens an ICMP socket.
+
+  Returns:
+    The socket (None if the process may not open ICMP sockets) and whether
+    it's a raw socket.
+  """
+  for socket_type, is_raw in ((socket.SOCK_DGRAM, False),
+                              (socket.SOCK_RAW, True)):
+    try:
+      icmp_socket = socket.socket(
+          socket.AF_INET, socket_type, socket.IPPROTO_ICMP)
+    except OSError:
+      continue
+    icmp_socket.setblocking(False)
+    # Capped by net.core.rmem_max.
+    icmp_socket.setsockopt(
+        socket.SOL_SOCKET, socket.SO_RCVBUF, _ICMP_RECEIVE_BUFFER_SIZE)
+    return icmp_socket, is_raw
+  return None, False
+
+
+class _IcmpPinger:
+  """Pings IPv4 addresses from a single ICMP socket.
+
+  Must be created and used from the event loop which runs the pings.
+  """
+
+  def __init__(self):
+    self._loop = asyncio.get_running_loop()
+    self._socket, self._is_raw = _open_icmp_socket()
+    # The kernel replaces the identifier of echo requests sent from
+    # unprivileged ICMP sockets and only delivers the replies to them.
+    self._identifier = os.getpid() & 0xFFFF
+    self._sequences = itertools.count()
+    # (IP address, sequence) -> future of the reply.
+    self._waiters: dict[tuple[str, int], asyncio.Future[None]] = {}
+    if self._socket is None:
+      logger.debug("Unable to open an ICMP socket. Pinging with ping "
+                   "subprocesses.")
+    else:
+      self._loop.add_reader(self._socket.fileno(), self._receive_replies)
+
+  def __enter__(self) -> "_IcmpPinger":
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    self.close()
+
+  def close(self) -> None:
+    """Closes the ICMP socket."""
+    if self._socket is not None:
+      self._loop.remove_reader(self._socket.fileno())
+      self._socket.close()
+      self._socket = None
+
+  async def ping(self, ip_address: str, timeout: float) -> bool:
+    """Returns whether the IP address responds to a ping within the timeout.
+
+    The echo request is resent every _PING_RETRY_INTERVAL seconds until a
+    reply is received or the timeout expires.
+
+    Args:
+      ip_address: IP address to ping.
+      timeout: Seconds to wait for a reply.
+    """
+    try:
+      address = ipaddress.ip_address(ip_address)
+    except ValueError:
+      return False
+    if self._socket is None or address.version != 4:
+      return await _ping_with_subprocess(ip_address, timeout)
+
+    # Sequences of outstanding pings must differ per IP address.
+    sequence = next(self._sequences) & 0xFFFF
+    key = (ip_address, sequence)
+    request = _create_echo_request(self._identifier, sequence)
+    waiter = self._loop.create_future()
+    self._waiters[key] = waiter
+    end_time = self._loop.time() + timeout
+    try:
+      while True:
+        self._socket.sendto(request, (ip_address, 0))
+        try:
+          await asyncio.wait_for(
+              asyncio.shield(waiter),
+              min(_PING_RETRY_INTERVAL, end_time - self._loop.time()))
+          return True
+        except asyncio.TimeoutError:
+          if self._loop.time() >= end_time:
+            return False
+    except OSError:
+      return False
+    finally:
+      del self._waiters[key]
+      waiter.cancel()
+
+  def _receive_replies(self) -> None:
+    """Resolves the futures of the pings for all echo replies received."""
+    while True:
+      try:
+        packet, (ip_address, _) = self._socket.recvfrom(_ICMP_RECEIVE_SIZE)
+      except (BlockingIOError, InterruptedError):
+        return
+      except OSError as err:
+        logger.debug("Failed to receive an ICMP packet: %r", err)
+        return
+      reply = _parse_echo_reply(packet)
+      if reply is None:
+        continue
+      identifier, sequence = reply
+      # Raw sockets receive all ICMP packets of the host.
+      if self._is_raw and identifier != self._identifier:
+        continue
+      waiter = self._waiters.get((ip_address, sequence))
+      if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+
+
+async def _ping_with_subprocess(ip_address: str, timeout: float) -> bool:
+  """Returns whether the IP address responds to a ping subprocess."""
+  try:
+    process = await asyncio.create_subprocess_exec(
+        "ping", "-c", "1", "-W", str(timeout), ip_address,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  except OSError as err:
+    logger.debug("Failed to run ping: %r", err)
+    return False
+  return await process.wait() == 0
@@ -33,6 +33,8 @@ _RPC_TIMEOUT_SEC = 1
 MATTER_LINUX_APP_NAME = "matter-linux-app"
 MATTER_LINUX_APP_DEFAULT_PORT = 33000
 RPC_METHOD_NAME = "rpc"  # Pigweed RPC method name for switchboard call
+# Pipelined Pigweed RPCs method name for switchboard call
+RPC_BATCH_METHOD_NAME = "rpc_batch"
 
 logger = gdm_logger.get_logger()
 
@@ -0,0 +1,560 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encoding and decoding of SNMP v2c messages.
+
+Supports the subset of ASN.1 BER used by SNMP v2c messages (RFC 3416):
+INTEGER, OCTET STRING, NULL, OBJECT IDENTIFIER and SEQUENCE values, the
+application types of SNMPv2-SMI (IpAddress, Counter32, Gauge32, TimeTicks,
+Opaque and Counter64) and the noSuchObject, noSuchInstance and endOfMibView
+exceptions.
+
+SnmpTransport sends requests to many SNMP agents at once from an asyncio event
+loop. SnmpClient uses it to send GET and SET requests to an SNMP agent without
+spawning snmpget or snmpset processes.
+"""
+import asyncio
+import dataclasses
+import ipaddress
+import itertools
+import random
+import socket
+import threading
+from typing import Any, Optional, Sequence, Union
+
+from gazoo_device import errors
+
+SNMP_PORT = 161
+VERSION_2C = 1
+# SNMPv2-MIB::sysDescr.0.
+SYSTEM_DESCRIPTION_OID = "1.3.6.1.2.1.1.1.0"
+
+# PDU types.
+GET_REQUEST = 0xA0
+GET_NEXT_REQUEST = 0xA1
+GET_RESPONSE = 0xA2
+SET_REQUEST = 0xA3
+
+_INTEGER = 0x02
+_OCTET_STRING = 0x04
+_NULL = 0x05
+_OBJECT_IDENTIFIER = 0x06
+_SEQUENCE = 0x30
+_IP_ADDRESS = 0x40
+_COUNTER32 = 0x41
+_GAUGE32 = 0x42
+_TIME_TICKS = 0x43
+_OPAQUE = 0x44
+_COUNTER64 = 0x46
+# Varbind values which report that there's no value for the OID.
+_NO_SUCH_OBJECT = 0x80
+_NO_SUCH_INSTANCE = 0x81
+_END_OF_MIB_VIEW = 0x82
+
+# Agents must accept messages of up to 484 bytes (RFC 3417). GET and SET
+# requests of this many varbinds of table entries (such as ifAdminStatus.<port>)
+# and their responses stay below that size.
+_MAX_VARBINDS_PER_REQUEST = 24
+_ERROR_STATUS_NAMES = {
+    1: "tooBig",
+    2: "noSuchName",
+    3: "badValue",
+    4: "readOnly",
+    5: "genErr",
+    6: "noAccess",
+    7: "wrongType",
+    8: "wrongLength",
+    9: "wrongEncoding",
+    10: "wrongValue",
+    11: "noCreation",
+    12: "inconsistentValue",
+    13: "resourceUnavailable",
+    14: "commitFailed",
+    15: "undoFailed",
+    16: "authorizationError",
+    17: "notWritable",
+    18: "inconsistentName",
+}
+
+_UNSIGNED_INTEGER_TYPES = (_COUNTER32, _GAUGE32, _TIME_TICKS, _COUNTER64)
+_NO_VALUE_TYPES = (_NULL, _NO_SUCH_OBJECT, _NO_SUCH_INSTANCE, _END_OF_MIB_VIEW)
+
+# None encodes NULL (the value of varbinds of GET requests).
+VarbindValue = Union[None, int, bytes, str]
+
+
+@dataclasses.dataclass(frozen=True)
+class SnmpMessage:
+  """A decoded SNMP v2c message.
+
+  Attributes:
+    community: Community string of the message.
+    pdu_type: Type of the PDU (such as GET_RESPONSE).
+    request_id: Request ID which matches responses to requests.
+    error_status: Error status of a response. 0 means no error.
+    error_index: Index (1-based) of the varbind which caused the error.
+    varbinds: (OID, value) pairs. Values are int for INTEGER and unsigned
+      integer types, bytes for OCTET STRING, IpAddress and Opaque values, str
+      for OBJECT IDENTIFIER values and None for NULL values and varbinds
+      without a value (noSuchObject, noSuchInstance and endOfMibView).
+  """
+  community: str
+  pdu_type: int
+  request_id: int
+  error_status: int
+  error_index: int
+  varbinds: tuple[tuple[str, VarbindValue], ...]
+
+
+def encode_message(
+    community: str,
+    pdu_type: int,
+    request_id: int,
+    varbinds: Sequence[tuple[str, VarbindValue]],
+    error_status: int = 0,
+    error_index: int = 0) -> bytes:
+  """Returns an encoded SNMP v2c message.
+
+  Args:
+    community: Community string of the message.
+    pdu_type: Type of the PDU (such as GET_REQUEST).
+    request_id: Request ID which matches responses to requests.
+    varbinds: (OID, value) pairs. Values are encoded as NULL (None), INTEGER
+      (int), OCTET STRING (bytes) or OBJECT IDENTIFIER (str).
+    error_status: Error status of a response.
+    error_index: Index (1-based) of the varbind which caused the error.
+
+  Returns:
+    The message, ready to be sent in a UDP datagram.
+  """
+  encoded_varbinds = b"".join(
+      _encode_tlv(_SEQUENCE, _encode_oid(oid) + _encode_value(value))
+      for oid, value in varbinds)
+  pdu = _encode_tlv(
+      pdu_type,
+      _encode_integer(request_id) + _encode_integer(error_status) +
+      _encode_integer(error_index) + _encode_tlv(_SEQUENCE, encoded_varbinds))
+  return _encode_tlv(
+      _SEQUENCE,
+      _encode_integer(VERSION_2C) +
+      _encode_tlv(_OCTET_STRING, community.encode()) + pdu)
+
+
+def encode_get_request(
+    community: str, request_id: int, oids: Sequence[str]) -> bytes:
+  """Returns an encoded SNMP v2c GET request for the given OIDs."""
+  return encode_message(
+      community, GET_REQUEST, request_id, [(oid, None) for oid in oids])
+
+
+def decode_message(data: bytes) -> SnmpMessage:
+  """Decodes an SNMP v2c message.
+
+  Args:
+    data: Contents of the UDP datagram.
+
+  Returns:
+    The decoded message.
+
+  Raises:
+    ValueError: The data isn't a valid SNMP v2c message.
+  """
+  message, _ = _decode_tlv(data, 0, expected_tag=_SEQUENCE, end=len(data))
+  version, offset = _decode_integer(message, 0)
+  if version != VERSION_2C:
+    raise ValueError(f"Unsupported SNMP version {version}.")
+  community, offset = _decode_tlv(
+      message, offset, expected_tag=_OCTET_STRING)
+  pdu_type = message[offset] if offset < len(message) else None
+  if pdu_type not in (GET_REQUEST, GET_NEXT_REQUEST, GET_RESPONSE,
+                      SET_REQUEST):
+    raise ValueError(f"Unsupported SNMP PDU type {pdu_type}.")
+  pdu, _ = _decode_tlv(message, offset, expected_tag=pdu_type)
+  request_id, offset = _decode_integer(pdu, 0)
+  error_status, offset = _decode_integer(pdu, offset)
+  error_index, offset = _decode_integer(pdu, offset)
+  encoded_varbinds, _ = _decode_tlv(pdu, offset, expected_tag=_SEQUENCE)
+  varbinds = []
+  offset = 0
+  while offset < len(encoded_varbinds):
+    varbind, offset = _decode_tlv(
+        encoded_varbinds, offset, expected_tag=_SEQUENCE)
+    oid, value_offset = _decode_tlv(varbind, 0, expected_tag=_OBJECT_IDENTIFIER)
+    varbinds.append((_decode_oid(oid), _decode_value(varbind, value_offset)))
+  return SnmpMessage(
+      community=community.decode(errors="replace"),
+      pdu_type=pdu_type,
+      request_id=request_id,
+      error_status=error_status,
+      error_index=error_index,
+      varbinds=tuple(varbinds))
+
+
+class _SnmpProtocol(asyncio.DatagramProtocol):
+  """Resolves the futures of SNMP requests with their responses."""
+
+  def __init__(self):
+    # Request ID -> (IP address, future of the response).
+    self.waiters: dict[int, tuple[str, asyncio.Future[SnmpMessage]]] = {}
+
+  def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+    try:
+      response = decode_message(data)
+    except ValueError:
+      return
+    ip_address, waiter = self.waiters.get(response.request_id, (None, None))
+    # Responses to earlier requests which timed out are dropped.
+    if (waiter is not None and not waiter.done()
+        and response.pdu_type == GET_RESPONSE
+        and ip_address == _normalize_ip_address(addr[0])):
+      waiter.set_result(response)
+
+
+class SnmpTransport:
+  """Sends SNMP v2c requests from one UDP socket per address family.
+
+  Requests to any number of agents can be outstanding at once. Requests
+  without a response are resent with the same request ID every retry_interval
+  seconds until the timeout expires. The sockets are opened on first use and
+  reused until close() is called. Must only be used from one event loop.
+  """
+
+  def __init__(self, retry_interval: float = 1):
+    """Initializes the transport.
+
+    Args:
+      retry_interval: Seconds after which unanswered requests are resent.
+    """
+    self._retry_interval = retry_interval
+    self._request_ids = itertools.count(random.randrange(2**30))
+    # Created in the event loop by the first request.
+    self._endpoints_lock: Optional[asyncio.Lock] = None
+    # Address family -> (transport, protocol).
+    self._endpoints: dict[
+        int, tuple[asyncio.DatagramTransport, _SnmpProtocol]] = {}
+
+  def close(self) -> None:
+    """Closes the sockets. They're reopened by the next request."""
+    for transport, _ in self._endpoints.values():
+      transport.close()
+    self._endpoints.clear()
+
+  async def request(
+      self,
+      ip_address: str,
+      port: int,
+      community: str,
+      pdu_type: int,
+      varbinds: Sequence[tuple[str, VarbindValue]],
+      timeout: float) -> SnmpMessage:
+    """Sends a request and returns its response.
+
+    Args:
+      ip_address: IP address of the agent.
+      port: UDP port of the agent.
+      community: Community string configured on the agent.
+      pdu_type: Type of the request PDU (such as GET_REQUEST).
+      varbinds: (OID, value) pairs of the request.
+      timeout: Seconds to wait for the response.
+
+    Returns:
+      The response, which may have an error status.
+
+    Raises:
+      CommunicationTimeoutError: The agent didn't respond in time.
+      ValueError: The IP address is invalid.
+      OSError: The request could not be sent.
+    """
+    ip_address = _normalize_ip_address(ip_address)
+    family = (socket.AF_INET6 if ipaddress.ip_address(ip_address).version == 6
+              else socket.AF_INET)
+    transport, protocol = await self._get_endpoint(family)
+    loop = asyncio.get_running_loop()
+    request_id = next(self._request_ids) % 2**31
+    request = encode_message(community, pdu_type, request_id, varbinds)
+    waiter = loop.create_future()
+    protocol.waiters[request_id] = (ip_address, waiter)
+    end_time = loop.time() + timeout
+    try:
+      while True:
+        transport.sendto(request, (ip_address, port))
+        try:
+          return await asyncio.wait_for(
+              asyncio.shield(waiter),
+              min(self._retry_interval, end_time - loop.time()))
+        except asyncio.TimeoutError:
+          if loop.time() >= end_time:
+            raise errors.CommunicationTimeoutError(
+                f"SNMP agent {ip_address}:{port} did not respond within "
+                f"{timeout}s.") from None
+    finally:
+      del protocol.waiters[request_id]
+      waiter.cancel()
+
+  async def _get_endpoint(
+      self, family: int) -> tuple[asyncio.DatagramTransport, _SnmpProtocol]:
+    """Returns the UDP endpoint of the address family."""
+    if self._endpoints_lock is None:
+      self._endpoints_lock = asyncio.Lock()
+    async with self._endpoints_lock:
+      if family not in self._endpoints:
+        self._endpoints[family] = (
+            await asyncio.get_running_loop().create_datagram_endpoint(
+                _SnmpProtocol, family=family))
+      return self._endpoints[family]
+
+
+class SnmpClient:
+  """SNMP v2c client of a single agent.
+
+  Requests are sent through an SnmpTransport run by an event loop private to
+  the client, so the UDP socket is reused until close() is called. The
+  varbinds of a call are sent in as few PDUs as possible (one round trip per
+  _MAX_VARBINDS_PER_REQUEST varbinds). Calls from multiple threads are
+  serialized. Must not be called from a running event loop.
+  """
+
+  def __init__(self,
+               ip_address: str,
+               community: str,
+               port: int = SNMP_PORT,
+               timeout: float = 10,
+               retry_interval: float = 1):
+    """Initializes the client.
+
+    Args:
+      ip_address: IP address of the agent.
+      community: Community string configured on the agent.
+      port: UDP port of the agent.
+      timeout: Seconds to wait for the response to a request.
+      retry_interval: Seconds after which unanswered requests are resent.
+    """
+    self._address = (ip_address, port)
+    self._community = community
+    self._timeout = timeout
+    self._lock = threading.Lock()
+    self._transport = SnmpTransport(retry_interval=retry_interval)
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+  def close(self) -> None:
+    """Closes the socket. It's reopened by the next request."""
+    with self._lock:
+      if self._loop is not None:
+        self._transport.close()
+        # Lets the transports finish closing their sockets.
+        self._loop.run_until_complete(asyncio.sleep(0))
+        self._loop.close()
+        self._loop = None
+
+  def get(self, oids: Sequence[str]) -> list[VarbindValue]:
+    """Gets the values of the OIDs.
+
+    Args:
+      oids: OIDs to get, such as "1.3.6.1.2.1.2.2.1.7.2".
+
+    Returns:
+      The values of the OIDs, in order. None for OIDs without a value.
+
+    Raises:
+      CommunicationTimeoutError: The agent didn't respond in time.
+      DeviceError: The agent responded with an error.
+    """
+    return self._request_batches(GET_REQUEST, [(oid, None) for oid in oids])
+
+  def set(self,
+          varbinds: Sequence[tuple[str, VarbindValue]]) -> list[VarbindValue]:
+    """Sets the values of the OIDs.
+
+    Args:
+      varbinds: (OID, value) pairs to set.
+
+    Returns:
+      The values reported by the agent, in order.
+
+    Raises:
+      CommunicationTimeoutError: The agent didn't respond in time.
+      DeviceError: The agent responded with an error.
+    """
+    return self._request_batches(SET_REQUEST, varbinds)
+
+  def _request_batches(
+      self, pdu_type: int,
+      varbinds: Sequence[tuple[str, VarbindValue]]) -> list[VarbindValue]:
+    """Sends the varbinds in batches and returns the values of the responses."""
+    values = []
+    for start in range(0, len(varbinds), _MAX_VARBINDS_PER_REQUEST):
+      batch = varbinds[start:start + _MAX_VARBINDS_PER_REQUEST]
+      response_varbinds = self._request(pdu_type, batch)
+      if [oid for oid, _ in response_varbinds] != [oid for oid, _ in batch]:
+        raise errors.DeviceError(
+            f"SNMP agent {self._address[0]}:{self._address[1]} responded "
+            f"with OIDs {[oid for oid, _ in response_varbinds]}, expected "
+            f"{[oid for oid, _ in batch]}.")
+      values.extend(value for _, value in response_varbinds)
+    return values
+
+  def _request(
+      self, pdu_type: int, varbinds: Sequence[tuple[str, VarbindValue]]
+  ) -> tuple[tuple[str, VarbindValue], ...]:
+    """Sends a request and returns the varbinds of its response."""
+    with self._lock:
+      if self._loop is None:
+        self._loop = asyncio.new_event_loop()
+      response = self._loop.run_until_complete(
+          self._transport.request(
+              self._address[0], self._address[1], self._community, pdu_type,
+              varbinds, self._timeout))
+
+    if response.error_status:
+      error = _ERROR_STATUS_NAMES.get(
+          response.error_status, str(response.error_status))
+      raise errors.DeviceError(
+          f"SNMP agent {self._address[0]}:{self._address[1]} responded with "
+          f"error {error} for varbind {response.error_index} of "
+          f"{list(varbinds)}.")
+    return response.varbinds
+
+
+def _normalize_ip_address(ip_address: str) -> str:
+  """Returns the IP address in the form reported by received datagrams."""
+  try:
+    return str(ipaddress.ip_address(ip_address))
+  except ValueError:
+    return ip_address
+
+
+def _encode_length(length: int) -> bytes:
+  """Returns the BER encoding of a content length."""
+  if length < 0x80:
+    return bytes([length])
+  encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+  return bytes([0x80 | len(encoded)]) + encoded
+
+
+def _encode_tlv(tag: int, content: bytes) -> bytes:
+  """Returns the BER encoding of a value with the given tag and content."""
+  return bytes([tag]) + _encode_length(len(content)) + content
+
+
+def _encode_integer(value: int) -> bytes:
+  """Returns the BER encoding of an INTEGER."""
+  length = max(1, (value.bit_length() + 8) // 8)
+  return _encode_tlv(_INTEGER, value.to_bytes(length, "big", signed=True))
+
+
+def _encode_oid(oid: str) -> bytes:
+  """Returns the BER encoding of an OBJECT IDENTIFIER such as "1.3.6.1"."""
+  arcs = [int(arc) for arc in oid.strip(".").split(".")]
+  if len(arcs) < 2:
+    raise ValueError(f"OID {oid!r} has fewer than 2 arcs.")
+  content = bytearray()
+  for arc in [arcs[0] * 40 + arcs[1]] + arcs[2:]:
+    encoded_arc = [arc & 0x7F]
+    arc >>= 7
+    while arc:
+      encoded_arc.append(0x80 | (arc & 0x7F))
+      arc >>= 7
+    content.extend(reversed(encoded_arc))
+  return _encode_tlv(_OBJECT_IDENTIFIER, bytes(content))
+
+
+def _encode_value(value: VarbindValue) -> bytes:
+  """Returns the BER encoding of a varbind value."""
+  if value is None:
+    return _encode_tlv(_NULL, b"")
+  if isinstance(value, int) and not isinstance(value, bool):
+    return _encode_integer(value)
+  if isinstance(value, bytes):
+    return _encode_tlv(_OCTET_STRING, value)
+  if isinstance(value, str):
+    return _encode_oid(value)
+  raise TypeError(f"Unsupported SNMP value type {type(value)}.")
+
+
+def _decode_tlv(
+    data: bytes,
+    offset: int,
+    expected_tag: Optional[int] = None,
+    end: Optional[int] = None) -> tuple[bytes, int]:
+  """Decodes the BER value at the offset.
+
+  Args:
+    data: Data containing the value.
+    offset: Offset of the tag of the value in data.
+    expected_tag: Tag the value must have. Any tag if None.
+    end: If provided, offset at which the value must end.
+
+  Returns:
+    The content of the value and the offset after the value.
+
+  Raises:
+    ValueError: The value is truncated or doesn't have the expected tag.
+  """
+  if offset + 2 > len(data):
+    raise ValueError(f"Truncated BER value at offset {offset}.")
+  tag = data[offset]
+  if expected_tag is not None and tag != expected_tag:
+    raise ValueError(f"Expected BER tag 0x{expected_tag:02x} at offset "
+                     f"{offset}, found 0x{tag:02x}.")
+  length = data[offset + 1]
+  offset += 2
+  if length & 0x80:
+    length_size = length & 0x7F
+    if not length_size or offset + length_size > len(data):
+      raise ValueError(f"Invalid BER length at offset {offset - 1}.")
+    length = int.from_bytes(data[offset:offset + length_size], "big")
+    offset += length_size
+  value_end = offset + length
+  if value_end > len(data) or (end is not None and value_end != end):
+    raise ValueError(f"Invalid BER length {length} at offset {offset}.")
+  return data[offset:value_end], value_end
+
+
+def _decode_integer(data: bytes, offset: int) -> tuple[int, int]:
+  """Decodes the INTEGER at the offset and returns it and the next offset."""
+  content, offset = _decode_tlv(data, offset, expected_tag=_INTEGER)
+  return int.from_bytes(content, "big", signed=True), offset
+
+
+def _decode_oid(content: bytes) -> str:
+  """Decodes the content of an OBJECT IDENTIFIER."""
+  if not content:
+    raise ValueError("Empty OID.")
+  arcs = []
+  arc = 0
+  for byte in content:
+    arc = (arc << 7) | (byte & 0x7F)
+    if not byte & 0x80:
+      arcs.append(arc)
+      arc = 0
+  first = min(arcs[0] // 40, 2)
+  second = arcs[0] - first * 40
+  return ".".join(str(arc) for arc in [first, second] + arcs[1:])
+
+
+def _decode_value(data: bytes, offset: int) -> Any:
+  """Decodes the varbind value at the offset."""
+  tag = data[offset] if offset < len(data) else None
+  content, _ = _decode_tlv(data, offset, end=len(data))
+  if tag == _INTEGER:
+    return int.from_bytes(content, "big", signed=True)
+  if tag in _UNSIGNED_INTEGER_TYPES:
+    return int.from_bytes(content, "big")
+  if tag in (_OCTET_STRING, _IP_ADDRESS, _OPAQUE):
+    return content
+  if tag == _OBJECT_IDENTIFIER:
+    return _decode_oid(content)
+  if tag in _NO_VALUE_TYPES:
+    return None
+  raise ValueError(f"Unsupported SNMP value type 0x{tag:02x}.")
@@ -0,0 +1,189 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Pool of persistent SSH connections shared by ssh and scp commands.
+
+Uses OpenSSH connection multiplexing. The first ssh or scp command to a device
+starts a master connection in the background. Later commands with the same
+user, address and key reuse the master connection through a control socket
+instead of doing a new TCP and key handshake. Master connections exit by
+themselves once they have been idle (without any ssh or scp command using
+them) for the pool idle timeout.
+
+The process-wide pool is managed by host_utils.enable_ssh_connection_pool() and
+is used by SSH commands, scp file transfers, SSH transports and detection
+queries alike.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from gazoo_device import gdm_logger
+
+logger = gdm_logger.get_logger()
+
+_IDLE_TIMEOUT_S = 60
+_HEALTH_CHECK_INTERVAL_S = 10
+_CONTROL_COMMAND_TIMEOUT_S = 3
+# Master connections to unresponsive devices exit after
+# _SERVER_ALIVE_INTERVAL_S * _SERVER_ALIVE_COUNT_MAX seconds.
+_SERVER_ALIVE_INTERVAL_S = 10
+_SERVER_ALIVE_COUNT_MAX = 3
+
+# (user, address, key path or None).
+_ConnectionKey = tuple[str, str, Optional[str]]
+
+
+class SshConnectionPool:
+  """Persistent SSH master connections keyed by (user, address, key)."""
+
+  def __init__(self,
+               idle_timeout: float = _IDLE_TIMEOUT_S,
+               health_check_interval: float = _HEALTH_CHECK_INTERVAL_S):
+    """Initializes the pool.
+
+    Args:
+      idle_timeout: Seconds after which an unused master connection exits.
+      health_check_interval: Seconds after which a master connection is checked
+        before it is used again. Stale control sockets of master connections
+        which are no longer running are removed.
+    """
+    self._idle_timeout = idle_timeout
+    self._health_check_interval = health_check_interval
+    self._lock = threading.Lock()
+    self._control_directory: Optional[str] = None
+    self._last_used: dict[_ConnectionKey, float] = {}
+    self._last_checked: dict[_ConnectionKey, float] = {}
+
+  def get_ssh_options(self,
+                      address: str,
+                      user: str,
+                      key_path: Optional[str] = None) -> list[str]:
+    """Returns ssh or scp options which use the pooled master connection.
+
+    Args:
+      address: IP address of the device.
+      user: Username to log in as.
+      key_path: Path to the SSH key used to log in, if any.
+
+    Returns:
+      Command line options to add to the ssh or scp command.
+    """
+    key = (user, address, key_path)
+    now = time.monotonic()
+    with self._lock:
+      self._forget_exited_connections(now)
+      control_path = self._get_control_path(key)
+      last_checked = self._last_checked.get(key)
+      check_health = (last_checked is not None and
+                      now - last_checked >= self._health_check_interval)
+      if last_checked is None or check_health:
+        self._last_checked[key] = now
+      self._last_used[key] = now
+    if check_health and not self._is_master_running(key, control_path):
+      self._remove_control_socket(control_path)
+    return [
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={control_path}",
+        "-o", f"ControlPersist={int(self._idle_timeout)}",
+        "-o", f"ServerAliveInterval={_SERVER_ALIVE_INTERVAL_S}",
+        "-o", f"ServerAliveCountMax={_SERVER_ALIVE_COUNT_MAX}",
+    ]
+
+  def close(self) -> None:
+    """Stops all master connections and removes their control sockets."""
+    with self._lock:
+      connections = list(self._last_used)
+      control_directory = self._control_directory
+      self._last_used.clear()
+      self._last_checked.clear()
+      self._control_directory = None
+    if control_directory is None:
+      return
+    for key in connections:
+      control_path = os.path.join(control_directory, _get_socket_name(key))
+      if os.path.exists(control_path):
+        self._run_control_command("exit", key, control_path)
+    shutil.rmtree(control_directory, ignore_errors=True)
+
+  def _forget_exited_connections(self, now: float) -> None:
+    """Forgets idle connections whose master connection has exited.
+
+    Master connections are not stopped here: ControlPersist stops them once no
+    ssh or scp command (including long running ones such as SSH transports)
+    has used them for the idle timeout, and removes their control socket.
+    Connections with a control socket are tracked until a health check fails
+    or close() stops their master.
+
+    Args:
+      now: Current time.monotonic() value.
+    """
+    for key, last_used in list(self._last_used.items()):
+      if (now - last_used > self._idle_timeout and
+          not os.path.exists(self._get_control_path(key))):
+        del self._last_used[key]
+        del self._last_checked[key]
+
+  def _get_control_path(self, key: _ConnectionKey) -> str:
+    """Returns the control socket path of the connection."""
+    if self._control_directory is None:
+      # Unix socket paths are limited to ~100 characters: keep them short.
+      self._control_directory = tempfile.mkdtemp(prefix="gdm-ssh-")
+    return os.path.join(self._control_directory, _get_socket_name(key))
+
+  def _is_master_running(self, key: _ConnectionKey, control_path: str) -> bool:
+    """Returns whether the master connection is running."""
+    if not os.path.exists(control_path):
+      return False
+    return self._run_control_command("check", key, control_path)
+
+  def _remove_control_socket(self, control_path: str) -> None:
+    """Removes a stale control socket so that a new master can start."""
+    try:
+      os.remove(control_path)
+      logger.debug("Removed stale SSH control socket %s", control_path)
+    except FileNotFoundError:
+      pass
+
+  def _run_control_command(self, command: str, key: _ConnectionKey,
+                           control_path: str) -> bool:
+    """Sends a control command to the master connection.
+
+    Args:
+      command: "check" or "exit".
+      key: Connection of the master.
+      control_path: Control socket path of the master.
+
+    Returns:
+      Whether the command succeeded.
+    """
+    user, address, _ = key
+    try:
+      return subprocess.run(
+          ["ssh", "-O", command, "-o", f"ControlPath={control_path}",
+           f"{user}@{address}"],
+          capture_output=True,
+          timeout=_CONTROL_COMMAND_TIMEOUT_S,
+          check=False).returncode == 0
+    except subprocess.TimeoutExpired:
+      return False
+
+
+def _get_socket_name(key: _ConnectionKey) -> str:
+  """Returns a short unique control socket name for the connection."""
+  return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
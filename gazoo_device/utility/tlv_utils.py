@@ -24,7 +24,6 @@ This is a mirror of
 https://github.com/project-chip/connectedhomeip/blob/master/src/controller/python/chip/tlv/__init__.py
 """
 
-import collections
 from collections.abc import Mapping, Sequence
 import enum
 import struct
@@ -134,6 +133,204 @@ class float32(float):
   pass
 
 
+# Precompiled formats shared by the writer and the reader.
+_INT8 = struct.Struct("<b")
+_INT16 = struct.Struct("<h")
+_INT32 = struct.Struct("<l")
+_INT64 = struct.Struct("<q")
+_UINT8 = struct.Struct("<B")
+_UINT16 = struct.Struct("<H")
+_UINT32 = struct.Struct("<L")
+_UINT64 = struct.Struct("<Q")
+_FLOAT32 = struct.Struct("<f")
+_FLOAT64 = struct.Struct("<d")
+_NATIVE_FLOAT32 = struct.Struct("f")
+_NATIVE_FLOAT64 = struct.Struct("d")
+
+# One-byte encodings of every control byte.
+_CONTROL_BYTES = tuple(bytes((controlByte,)) for controlByte in range(256))
+
+# Lower bits of the element type for 2, 4 and 8-byte values or lengths.
+_LENGTH_FIELD_CODES = {2: 1, 4: 2, 8: 3}
+
+# Encoders of control bytes followed by tags.
+_CONTROL_AND_CONTEXT_TAG = struct.Struct("<BB")
+_CONTROL_AND_TAG_2Bytes = struct.Struct("<BH")
+_CONTROL_AND_TAG_4Bytes = struct.Struct("<BL")
+_CONTROL_AND_FULLY_QUALIFIED_TAG_6Bytes = struct.Struct("<BHHH")
+_CONTROL_AND_FULLY_QUALIFIED_TAG_8Bytes = struct.Struct("<BHHL")
+
+# Tag decoders: (kind, format of the tag field, "tagLen" of decodings, profile).
+_TAG_ANONYMOUS = 0
+_TAG_CONTEXT = 1
+_TAG_PROFILE = 2
+_TAG_FULLY_QUALIFIED = 3
+_TAG_DECODERS = {
+    TLV_TAG_CONTROL_ANONYMOUS: (_TAG_ANONYMOUS, None, 0, None),
+    TLV_TAG_CONTROL_CONTEXT_SPECIFIC: (_TAG_CONTEXT, _UINT8, 1, None),
+    TLV_TAG_CONTROL_COMMON_PROFILE_2Bytes: (_TAG_PROFILE, _UINT16, 2, 0),
+    TLV_TAG_CONTROL_COMMON_PROFILE_4Bytes: (_TAG_PROFILE, _UINT32, 4, 0),
+    TLV_TAG_CONTROL_IMPLICIT_PROFILE_2Bytes: (_TAG_PROFILE, _UINT16, 2, None),
+    TLV_TAG_CONTROL_IMPLICIT_PROFILE_4Bytes: (_TAG_PROFILE, _UINT32, 4, None),
+    TLV_TAG_CONTROL_FULLY_QUALIFIED_6Bytes: (
+        _TAG_FULLY_QUALIFIED, struct.Struct("<HHH"), 2, None),
+    TLV_TAG_CONTROL_FULLY_QUALIFIED_8Bytes: (
+        _TAG_FULLY_QUALIFIED, struct.Struct("<HHL"), 4, None),
+}
+
+# Value decoders: (kind, format of the value or length field, converter).
+# Containers have the key of their nested decodings instead of a format.
+_VALUE_FIXED = 0
+_VALUE_UTF8_STRING = 1
+_VALUE_BYTE_STRING = 2
+_VALUE_CONSTANT = 3
+_VALUE_STRUCTURE = 4
+_VALUE_LIST = 5
+_VALUE_END_OF_COLLECTION = 6
+_VALUE_DECODERS = {
+    0x00: (_VALUE_FIXED, _INT8, None),
+    0x01: (_VALUE_FIXED, _INT16, None),
+    0x02: (_VALUE_FIXED, _INT32, None),
+    0x03: (_VALUE_FIXED, _INT64, None),
+    0x04: (_VALUE_FIXED, _UINT8, uint),
+    0x05: (_VALUE_FIXED, _UINT16, uint),
+    0x06: (_VALUE_FIXED, _UINT32, uint),
+    0x07: (_VALUE_FIXED, _UINT64, uint),
+    0x08: (_VALUE_CONSTANT, None, False),
+    0x09: (_VALUE_CONSTANT, None, True),
+    0x0A: (_VALUE_FIXED, _FLOAT32, float32),
+    0x0B: (_VALUE_FIXED, _FLOAT64, None),
+    0x0C: (_VALUE_UTF8_STRING, _UINT8, None),
+    0x0D: (_VALUE_UTF8_STRING, _UINT16, None),
+    0x0E: (_VALUE_UTF8_STRING, _UINT32, None),
+    0x0F: (_VALUE_UTF8_STRING, _UINT64, None),
+    0x10: (_VALUE_BYTE_STRING, _UINT8, None),
+    0x11: (_VALUE_BYTE_STRING, _UINT16, None),
+    0x12: (_VALUE_BYTE_STRING, _UINT32, None),
+    0x13: (_VALUE_BYTE_STRING, _UINT64, None),
+    0x14: (_VALUE_CONSTANT, None, None),
+    0x15: (_VALUE_STRUCTURE, "Structure", None),
+    0x16: (_VALUE_LIST, "Array", None),
+    0x17: (_VALUE_LIST, "Path", None),
+    0x18: (_VALUE_END_OF_COLLECTION, None, None),
+}
+
+
+def _makeControlByteDecoder(controlByte):
+  elementTypeIndex = controlByte & 0x1F
+  if elementTypeIndex not in ElementTypes:
+    return None
+  tagControlIndex = controlByte & 0xE0
+  return ((TagControls[tagControlIndex], ElementTypes[elementTypeIndex]) +
+          _TAG_DECODERS[tagControlIndex] + _VALUE_DECODERS[elementTypeIndex])
+
+
+# Decoders of all elements indexed by their control byte, None for invalid
+# element types.
+_CONTROL_BYTE_DECODERS = tuple(
+    _makeControlByteDecoder(controlByte) for controlByte in range(256))
+
+
+def _decodeElements(view, offset, out, decodings, oneElement=False,
+                    completeContainers=False):
+  """Decode elements from a memoryview into out until the end of a container.
+
+  The decodings of the elements are appended to decodings unless it is None.
+  Returns the offset after the last element decoded and whether it was an End
+  of Collection. Raises struct.error if the data ends within an element, which
+  includes containers without an End of Collection if completeContainers, and
+  KeyError if an element has an invalid element type.
+  """
+  size = len(view)
+  isMapping = isinstance(out, Mapping)
+  while offset < size:
+    controlByte = view[offset]
+    decoder = _CONTROL_BYTE_DECODERS[controlByte]
+    if decoder is None:
+      raise KeyError("invalid TLV element type 0x%02X" % (controlByte & 0x1F))
+    (tagControl, elementType, tagKind, tagFormat, tagLen, profile, valueKind,
+     valueFormat, converter) = decoder
+    offset += 1
+
+    if tagKind == _TAG_ANONYMOUS:
+      tag = None
+    elif tagKind == _TAG_CONTEXT:
+      (tag,) = tagFormat.unpack_from(view, offset)
+      offset += 1
+    elif tagKind == _TAG_PROFILE:
+      tag = (profile, tagFormat.unpack_from(view, offset)[0])
+      offset += tagLen
+    else:
+      (vendorId, profileNum, tagNum) = tagFormat.unpack_from(view, offset)
+      tag = ((vendorId << 16) | profileNum, tagNum)
+      offset += tagFormat.size
+
+    strDataLen = 0
+    strDataLenLen = 0
+    nestedDecodings = None
+    if valueKind == _VALUE_FIXED:
+      (value,) = valueFormat.unpack_from(view, offset)
+      offset += valueFormat.size
+      if converter is not None:
+        value = converter(value)
+    elif valueKind == _VALUE_CONSTANT:
+      value = converter
+    elif valueKind == _VALUE_UTF8_STRING or valueKind == _VALUE_BYTE_STRING:
+      (strDataLen,) = valueFormat.unpack_from(view, offset)
+      strDataLenLen = valueFormat.size
+      offset += strDataLenLen
+      valueEnd = offset + strDataLen
+      if valueEnd > size:
+        raise struct.error(
+            "string of %d bytes exceeds the TLV data" % strDataLen)
+      value = None
+      if valueKind == _VALUE_UTF8_STRING:
+        try:
+          value = str(view[offset:valueEnd], "utf-8")
+        except UnicodeDecodeError:
+          pass
+      if value is None:
+        value = bytes(view[offset:valueEnd])
+      offset = valueEnd
+    elif valueKind == _VALUE_END_OF_COLLECTION:
+      value = None
+    else:
+      value = {} if valueKind == _VALUE_STRUCTURE else []
+      if decodings is not None:
+        nestedDecodings = []
+      offset, ended = _decodeElements(
+          view, offset, value, nestedDecodings,
+          completeContainers=completeContainers)
+      if completeContainers and not ended:
+        raise struct.error("container is not ended within the TLV data")
+
+    if decodings is not None:
+      decoding = {"tagControl": tagControl, "type": elementType}
+      if tagKind >= _TAG_PROFILE:
+        decoding["profileTag"] = tag
+      else:
+        decoding["tag"] = tag
+      decoding["tagLen"] = tagLen
+      decoding["strDataLen"] = strDataLen
+      decoding["strDataLenLen"] = strDataLenLen
+      decoding["value"] = value
+      if nestedDecodings is not None:
+        decoding[valueFormat] = nestedDecodings
+      decodings.append(decoding)
+
+    if valueKind == _VALUE_END_OF_COLLECTION:
+      return offset, True
+    if tagKind >= _TAG_PROFILE:
+      out[tag] = value
+    elif isMapping:
+      out[tag if tag is not None else "Any"] = value
+    else:
+      out.append(value)
+    if oneElement:
+      break
+  return offset, False
+
+
 class TLVWriter:
 
   def __init__(self, encoding=None, implicitProfile=None):
@@ -205,6 +402,11 @@ class TLVWriter:
     """
     if val is None:
       self.putNull(tag)
+      return
+    # Values of the builtin types skip the isinstance() checks below.
+    putMethodName = _PUT_METHOD_NAMES.get(type(val))
+    if putMethodName is not None:
+      getattr(self, putMethodName)(tag, val)
     elif isinstance(val, enum.Enum):
       self.putUnsignedInt(tag, val)
     elif isinstance(val, bool):
@@ -223,11 +425,10 @@ class TLVWriter:
       self.putBytes(tag, val)
     elif isinstance(val, Mapping):
       self.startStructure(tag)
+      items = val.items()
       if type(val) == dict:
-        val = collections.OrderedDict(
-            sorted(val.items(), key=lambda item: tlvTagToSortKey(item[0]))
-        )
-      for containedTag, containedVal in val.items():
+        items = sorted(items, key=_itemToSortKey)
+      for containedTag, containedVal in items:
         self.put(containedTag, containedVal)
       self.endContainer()
     elif isinstance(val, tlv_list.TLVList):
@@ -245,22 +446,21 @@ class TLVWriter:
 
   def putSignedInt(self, tag, val):
     """Write a value as a TLV signed integer with the specified TLV tag."""
-    if val >= INT8_MIN and val <= INT8_MAX:
-      format = "<b"
-    elif val >= INT16_MIN and val <= INT16_MAX:
-      format = "<h"
-    elif val >= INT32_MIN and val <= INT32_MAX:
-      format = "<l"
-    elif val >= INT64_MIN and val <= INT64_MAX:
-      format = "<q"
+    if INT8_MIN <= val <= INT8_MAX:
+      valFormat = _INT8
+    elif INT16_MIN <= val <= INT16_MAX:
+      valFormat = _INT16
+    elif INT32_MIN <= val <= INT32_MAX:
+      valFormat = _INT32
+    elif INT64_MIN <= val <= INT64_MAX:
+      valFormat = _INT64
     else:
       raise ValueError("Integer value out of range")
-    val = struct.pack(format, val)
+    val = valFormat.pack(val)
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_SIGNED_INTEGER, tag, lenOfLenOrVal=len(val)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(val)
+    self._encoding.extend(controlAndTag + val)
 
   def putUnsignedInt(self, tag, val):
     """Write a value as a TLV unsigned integer with the specified TLV tag."""
@@ -268,26 +468,23 @@ class TLVWriter:
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_UNSIGNED_INTEGER, tag, lenOfLenOrVal=len(val)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(val)
+    self._encoding.extend(controlAndTag + val)
 
   def putFloat(self, tag, val):
     """Write a value as a TLV float with the specified TLV tag."""
-    val = struct.pack("f", val)
+    val = _NATIVE_FLOAT32.pack(val)
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_FLOATING_POINT_NUMBER, tag, lenOfLenOrVal=len(val)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(val)
+    self._encoding.extend(controlAndTag + val)
 
   def putDouble(self, tag, val):
     """Write a value as a TLV double with the specified TLV tag."""
-    val = struct.pack("d", val)
+    val = _NATIVE_FLOAT64.pack(val)
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_FLOATING_POINT_NUMBER, tag, lenOfLenOrVal=len(val)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(val)
+    self._encoding.extend(controlAndTag + val)
 
   def putString(self, tag, val):
     """Write a value as a TLV string with the specified TLV tag."""
@@ -296,8 +493,7 @@ class TLVWriter:
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_UTF8_STRING, tag, lenOfLenOrVal=len(valLen)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(valLen)
+    self._encoding.extend(controlAndTag + valLen)
     self._encoding.extend(val)
 
   def putBytes(self, tag, val):
@@ -306,8 +502,7 @@ class TLVWriter:
     controlAndTag = self._encodeControlAndTag(
         TLV_TYPE_BYTE_STRING, tag, lenOfLenOrVal=len(valLen)
     )
-    self._encoding.extend(controlAndTag)
-    self._encoding.extend(valLen)
+    self._encoding.extend(controlAndTag + valLen)
     self._encoding.extend(val)
 
   def putBool(self, tag, val):
@@ -333,7 +528,7 @@ class TLVWriter:
     self._verifyValidContainerType(containerType)
     controlAndTag = self._encodeControlAndTag(containerType, tag)
     self._encoding.extend(controlAndTag)
-    self._containerStack.insert(0, containerType)
+    self._containerStack.append(containerType)
 
   def startStructure(self, tag):
     """Start writing a TLV structure with the specified TLV tag."""
@@ -349,40 +544,29 @@ class TLVWriter:
 
   def endContainer(self):
     """End writing the current TLV container."""
-    self._containerStack.pop(0)
-    controlAndTag = self._encodeControlAndTag(TLVEndOfContainer, None)
-    self._encoding.extend(controlAndTag)
+    self._containerStack.pop()
+    self._encoding.extend(_CONTROL_BYTES[TLVEndOfContainer])
 
   def _encodeControlAndTag(self, type, tag, lenOfLenOrVal=0):
-    controlByte = type
-    if lenOfLenOrVal == 2:
-      controlByte |= 1
-    elif lenOfLenOrVal == 4:
-      controlByte |= 2
-    elif lenOfLenOrVal == 8:
-      controlByte |= 3
+    controlByte = type | _LENGTH_FIELD_CODES.get(lenOfLenOrVal, 0)
+    containerType = self._containerStack[-1] if self._containerStack else None
     if tag is None:
-      if (
-          type != TLVEndOfContainer
-          and len(self._containerStack) != 0
-          and self._containerStack[0] == TLV_TYPE_STRUCTURE
-      ):
+      if type != TLVEndOfContainer and containerType == TLV_TYPE_STRUCTURE:
         raise ValueError("Attempt to encode anonymous tag within TLV structure")
-      controlByte |= TLV_TAG_CONTROL_ANONYMOUS
-      return struct.pack("<B", controlByte)
+      return _CONTROL_BYTES[controlByte | TLV_TAG_CONTROL_ANONYMOUS]
     if isinstance(tag, int):
       if tag < 0 or tag > UINT8_MAX:
         raise ValueError("Context-specific TLV tag number out of range")
-      if len(self._containerStack) == 0:
+      if containerType is None:
         raise ValueError(
             "Attempt to encode context-specific TLV tag at top level"
         )
-      if self._containerStack[0] == TLV_TYPE_ARRAY:
+      if containerType == TLV_TYPE_ARRAY:
         raise ValueError(
             "Attempt to encode context-specific tag within TLV array"
         )
-      controlByte |= TLV_TAG_CONTROL_CONTEXT_SPECIFIC
-      return struct.pack("<BB", controlByte, tag)
+      return _CONTROL_AND_CONTEXT_TAG.pack(
+          controlByte | TLV_TAG_CONTROL_CONTEXT_SPECIFIC, tag)
     if isinstance(tag, tuple):
       (profile, tagNum) = tag
       if not isinstance(tagNum, int):
@@ -394,37 +578,35 @@ class TLVWriter:
           raise ValueError("Invalid object given for TLV profile id")
         if profile < 0 or profile > UINT32_MAX:
           raise ValueError("TLV profile id value out of range")
-      if (
-          len(self._containerStack) != 0
-          and self._containerStack[0] == TLV_TYPE_ARRAY
-      ):
+      if containerType == TLV_TYPE_ARRAY:
         raise ValueError(
             "Attempt to encode profile-specific tag within TLV array"
         )
       if profile is None or profile == self._implicitProfile:
         if tagNum <= UINT16_MAX:
           controlByte |= TLV_TAG_CONTROL_IMPLICIT_PROFILE_2Bytes
-          return struct.pack("<BH", controlByte, tagNum)
+          return _CONTROL_AND_TAG_2Bytes.pack(controlByte, tagNum)
         else:
           controlByte |= TLV_TAG_CONTROL_IMPLICIT_PROFILE_4Bytes
-          return struct.pack("<BL", controlByte, tagNum)
+          return _CONTROL_AND_TAG_4Bytes.pack(controlByte, tagNum)
       elif profile == 0:
         if tagNum <= UINT16_MAX:
           controlByte |= TLV_TAG_CONTROL_COMMON_PROFILE_2Bytes
-          return struct.pack("<BH", controlByte, tagNum)
+          return _CONTROL_AND_TAG_2Bytes.pack(controlByte, tagNum)
         else:
           controlByte |= TLV_TAG_CONTROL_COMMON_PROFILE_4Bytes
-          return struct.pack("<BL", controlByte, tagNum)
+          return _CONTROL_AND_TAG_4Bytes.pack(controlByte, tagNum)
       else:
         vendorId = (profile >> 16) & 0xFFFF
         profileNum = (profile >> 0) & 0xFFFF
         if tagNum <= UINT16_MAX:
           controlByte |= TLV_TAG_CONTROL_FULLY_QUALIFIED_6Bytes
-          return struct.pack("<BHHH", controlByte, vendorId, profileNum, tagNum)
+          return _CONTROL_AND_FULLY_QUALIFIED_TAG_6Bytes.pack(
+              controlByte, vendorId, profileNum, tagNum)
         else:
           controlByte |= TLV_TAG_CONTROL_FULLY_QUALIFIED_8Bytes
-          return struct.pack(
-              "<BHHL", controlByte, vendorId, profileNum, profile, tagNum
+          return _CONTROL_AND_FULLY_QUALIFIED_TAG_8Bytes.pack(
+              controlByte, vendorId, profileNum, profile, tagNum
           )
     raise ValueError("Invalid object given for TLV tag")
 
@@ -433,16 +615,16 @@ class TLVWriter:
     if val < 0:
       raise ValueError("Integer value out of range")
     if val <= UINT8_MAX:
-      format = "<B"
+      valFormat = _UINT8
     elif val <= UINT16_MAX:
-      format = "<H"
+      valFormat = _UINT16
     elif val <= UINT32_MAX:
-      format = "<L"
+      valFormat = _UINT32
     elif val <= UINT64_MAX:
-      format = "<Q"
+      valFormat = _UINT64
     else:
       raise ValueError("Integer value out of range")
-    return struct.pack(format, val)
+    return valFormat.pack(val)
 
   @staticmethod
   def _verifyValidContainerType(containerType):
@@ -454,6 +636,19 @@ class TLVWriter:
       raise ValueError("Invalid TLV container type")
 
 
+# TLVWriter methods encoding values of exactly these types.
+_PUT_METHOD_NAMES = {
+    bool: "putBool",
+    uint: "putUnsignedInt",
+    int: "putSignedInt",
+    float32: "putFloat",
+    float: "putDouble",
+    str: "putString",
+    bytes: "putBytes",
+    bytearray: "putBytes",
+}
+
+
 class TLVReader:
 
   def __init__(self, tlv):
@@ -467,251 +662,90 @@ class TLVReader:
 
   def get(self):
     """Get the dictionary representation of tlv data"""
-    out = {}
-    self._get(self._tlv, self._decodings, out)
-    return out
+    return self._get(self._decodings)
 
-  def _decodeControlByte(self, tlv, decoding):
-    (controlByte,) = struct.unpack(
-        "<B", tlv[self._bytesRead : self._bytesRead + 1]
-    )
-    controlTypeIndex = controlByte & 0xE0
-    decoding["tagControl"] = TagControls[controlTypeIndex]
-    elementtypeIndex = controlByte & 0x1F
-    decoding["type"] = ElementTypes[elementtypeIndex]
-    self._bytesRead += 1
-
-  def _decodeControlAndTag(self, tlv, decoding):
-    """The control byte specifies the type of a TLV element and how its tag, length and value fields are encoded.
-
-    The control byte consists of two subfields: an element type field which
-    occupies the lower 5 bits, and a tag control field which occupies the upper
-    3 bits. The element type field encodes the element’s type as well as how the
-    corresponding length and value fields are encoded.  In the case of Booleans
-    and the null value, the element type field also encodes the value itself.
+  def getValues(self):
+    """Get the dictionary representation of tlv data without its decodings.
+
+    Returns the same values as get() but does not record the decoding of each
+    element, which is faster when the decodings are not needed.
     """
+    return self._get(None)
 
-    self._decodeControlByte(tlv, decoding)
+  def _get(self, decodings):
+    out = {}
+    # The memoryview is released right away so that the caller can still
+    # resize a bytearray which was decoded.
+    with memoryview(self._tlv) as view:
+      self._bytesRead, _ = _decodeElements(
+          view, self._bytesRead, out, decodings)
+    return out
 
-    if decoding["tagControl"] == "Anonymous":
-      decoding["tag"] = None
-      decoding["tagLen"] = 0
-    elif decoding["tagControl"] == "Context 1-byte":
-      (decoding["tag"],) = struct.unpack(
-          "<B", tlv[self._bytesRead : self._bytesRead + 1]
-      )
-      decoding["tagLen"] = 1
-      self._bytesRead += 1
-    elif decoding["tagControl"] == "Common Profile 2-byte":
-      profile = 0
-      (tag,) = struct.unpack("<H", tlv[self._bytesRead : self._bytesRead + 2])
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 2
-      self._bytesRead += 2
-    elif decoding["tagControl"] == "Common Profile 4-byte":
-      profile = 0
-      (tag,) = struct.unpack("<L", tlv[self._bytesRead : self._bytesRead + 4])
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 4
-      self._bytesRead += 4
-    elif decoding["tagControl"] == "Implicit Profile 2-byte":
-      profile = None
-      (tag,) = struct.unpack("<H", tlv[self._bytesRead : self._bytesRead + 2])
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 2
-      self._bytesRead += 2
-    elif decoding["tagControl"] == "Implicit Profile 4-byte":
-      profile = None
-      (tag,) = struct.unpack("<L", tlv[self._bytesRead : self._bytesRead + 4])
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 4
-      self._bytesRead += 4
-    elif decoding["tagControl"] == "Fully Qualified 6-byte":
-      (vendorId, profileNum) = struct.unpack(
-          "<HH", tlv[self._bytesRead : self._bytesRead + 4]
-      )
-      profile = (vendorId << 16) | profileNum
-      (tag,) = struct.unpack(
-          "<H", tlv[self._bytesRead + 4 : self._bytesRead + 6]
-      )
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 2
-      self._bytesRead += 6
-    elif decoding["tagControl"] == "Fully Qualified 8-byte":
-      (vendorId, profileNum) = struct.unpack(
-          "<HH", tlv[self._bytesRead : self._bytesRead + 4]
-      )
-      profile = (vendorId << 16) | profileNum
-      (tag,) = struct.unpack(
-          "<L", tlv[self._bytesRead + 4 : self._bytesRead + 8]
-      )
-      decoding["profileTag"] = (profile, tag)
-      decoding["tagLen"] = 4
-      self._bytesRead += 8
 
-  def _decodeStrLength(self, tlv, decoding):
-    """UTF-8 or Byte StringLength fields are encoded in 0, 1, 2 or 4 byte widths, as specified by
+class TLVStreamReader:
+  """Decodes top-level TLV elements incrementally as their bytes arrive.
 
-    the element type field. If the element type needs a length field grab the
-    next bytes as length
-    """
-    if "length" in decoding["type"]:
-      if "1-byte" in decoding["type"]:
-        (decoding["strDataLen"],) = struct.unpack(
-            "<B", tlv[self._bytesRead : self._bytesRead + 1]
-        )
-        decoding["strDataLenLen"] = 1
-        self._bytesRead += 1
-      elif "2-byte" in decoding["type"]:
-        (decoding["strDataLen"],) = struct.unpack(
-            "<H", tlv[self._bytesRead : self._bytesRead + 2]
-        )
-        decoding["strDataLenLen"] = 2
-        self._bytesRead += 2
-      elif "4-byte" in decoding["type"]:
-        (decoding["strDataLen"],) = struct.unpack(
-            "<L", tlv[self._bytesRead : self._bytesRead + 4]
-        )
-        decoding["strDataLenLen"] = 4
-        self._bytesRead += 4
-      elif "8-byte" in decoding["type"]:
-        (decoding["strDataLen"],) = struct.unpack(
-            "<Q", tlv[self._bytesRead : self._bytesRead + 8]
-        )
-        decoding["strDataLenLen"] = 8
-        self._bytesRead += 8
-    else:
-      decoding["strDataLen"] = 0
-      decoding["strDataLenLen"] = 0
+  Data can be fed in chunks of any size, such as reads from a transport. Each
+  top-level element is returned as soon as all of its bytes were fed. The bytes
+  of an incomplete element are kept until the next feed and decoded again then.
 
-  def _decodeVal(self, tlv, decoding):
-    """decode primitive tlv value to the corresponding python value, tlv array and path are decoded as
+  e.g.
+  ```
+  reader = TLVStreamReader()
+  reader.feed(b"\\x0c\\x05hel")  # Returns [].
+  reader.feed(b"lo\\x24")  # Returns [(None, "hello")].
+  ```
 
-    python list, tlv structure is decoded as python dictionary
-    """
-    if decoding["type"] == "Structure":
-      decoding["value"] = {}
-      decoding["Structure"] = []
-      self._get(tlv, decoding["Structure"], decoding["value"])
-    elif decoding["type"] == "Array":
-      decoding["value"] = []
-      decoding["Array"] = []
-      self._get(tlv, decoding["Array"], decoding["value"])
-    elif decoding["type"] == "Path":
-      decoding["value"] = []
-      decoding["Path"] = []
-      self._get(tlv, decoding["Path"], decoding["value"])
-    elif decoding["type"] == "Null":
-      decoding["value"] = None
-    elif decoding["type"] == "End of Collection":
-      decoding["value"] = None
-    elif decoding["type"] == "Boolean True":
-      decoding["value"] = True
-    elif decoding["type"] == "Boolean False":
-      decoding["value"] = False
-    elif decoding["type"] == "Unsigned Integer 1-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<B", tlv[self._bytesRead : self._bytesRead + 1]
-      )
-      decoding["value"] = uint(decoding["value"])
-      self._bytesRead += 1
-    elif decoding["type"] == "Signed Integer 1-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<b", tlv[self._bytesRead : self._bytesRead + 1]
-      )
-      self._bytesRead += 1
-    elif decoding["type"] == "Unsigned Integer 2-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<H", tlv[self._bytesRead : self._bytesRead + 2]
-      )
-      decoding["value"] = uint(decoding["value"])
-      self._bytesRead += 2
-    elif decoding["type"] == "Signed Integer 2-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<h", tlv[self._bytesRead : self._bytesRead + 2]
-      )
-      self._bytesRead += 2
-    elif decoding["type"] == "Unsigned Integer 4-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<L", tlv[self._bytesRead : self._bytesRead + 4]
-      )
-      decoding["value"] = uint(decoding["value"])
-      self._bytesRead += 4
-    elif decoding["type"] == "Signed Integer 4-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<l", tlv[self._bytesRead : self._bytesRead + 4]
-      )
-      self._bytesRead += 4
-    elif decoding["type"] == "Unsigned Integer 8-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<Q", tlv[self._bytesRead : self._bytesRead + 8]
-      )
-      decoding["value"] = uint(decoding["value"])
-      self._bytesRead += 8
-    elif decoding["type"] == "Signed Integer 8-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<q", tlv[self._bytesRead : self._bytesRead + 8]
-      )
-      self._bytesRead += 8
-    elif decoding["type"] == "Floating Point 4-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<f", tlv[self._bytesRead : self._bytesRead + 4]
-      )
-      decoding["value"] = float32(decoding["value"])
-      self._bytesRead += 4
-    elif decoding["type"] == "Floating Point 8-byte value":
-      (decoding["value"],) = struct.unpack(
-          "<d", tlv[self._bytesRead : self._bytesRead + 8]
-      )
-      self._bytesRead += 8
-    elif "UTF-8 String" in decoding["type"]:
-      (val,) = struct.unpack(
-          "<%ds" % decoding["strDataLen"],
-          tlv[self._bytesRead : self._bytesRead + decoding["strDataLen"]],
-      )
-      try:
-        decoding["value"] = str(val, "utf-8")
-      except Exception:
-        decoding["value"] = val
-      self._bytesRead += decoding["strDataLen"]
-    elif "Byte String" in decoding["type"]:
-      (val,) = struct.unpack(
-          "<%ds" % decoding["strDataLen"],
-          tlv[self._bytesRead : self._bytesRead + decoding["strDataLen"]],
-      )
+  Like TLVReader.get(), decoding stops at a top-level End of Collection: the
+  data fed afterwards is ignored.
+  """
 
-      decoding["value"] = val
-      self._bytesRead += decoding["strDataLen"]
-    else:
-      raise ValueError("Attempt to decode unsupported TLV type")
+  def __init__(self):
+    self._buffer = bytearray()
+    self._ended = False
 
-  def _get(self, tlv, decodings, out):
-    endOfEncoding = False
+  @property
+  def bytesPending(self):
+    """The number of bytes fed which do not form a complete element yet."""
+    return len(self._buffer)
 
-    while len(tlv[self._bytesRead :]) and endOfEncoding == False:
-      decoding = {}
-      self._decodeControlAndTag(tlv, decoding)
-      self._decodeStrLength(tlv, decoding)
-      self._decodeVal(tlv, decoding)
-      decodings.append(decoding)
+  @property
+  def ended(self):
+    """Whether a top-level End of Collection was decoded."""
+    return self._ended
 
-      if decoding["type"] == "End of Collection":
-        endOfEncoding = True
-      else:
-        if "profileTag" in list(decoding.keys()):
-          out[decoding["profileTag"]] = decoding["value"]
-        elif "tag" in list(decoding.keys()):
-          if isinstance(out, Mapping):
-            tag = decoding["tag"] if decoding["tag"] is not None else "Any"
-            out[tag] = decoding["value"]
-          elif isinstance(out, tlv_list.TLVList):
-            tag = decoding["tag"] if decoding["tag"] is not None else None
-            out.append(tag, decoding["value"])
-          else:
-            out.append(decoding["value"])
-        else:
-          raise ValueError("Attempt to decode unsupported TLV tag")
+  def feed(self, data):
+    """Add data and return the elements it completed.
 
+    Returns a list of (tag, value) tuples, with tags as accepted by
+    TLVWriter.put() (None for anonymous tags) and values as returned by
+    TLVReader.get().
+    """
+    if self._ended:
+      return []
+    self._buffer.extend(data)
+    elements = []
+    offset = 0
+    with memoryview(self._buffer) as view:
+      while offset < len(view):
+        out = {}
+        try:
+          offset, self._ended = _decodeElements(
+              view, offset, out, None, oneElement=True,
+              completeContainers=True)
+        except struct.error:
+          break  # The element is not complete yet.
+        if self._ended:
+          offset = len(view)
+          break
+        (tag, value) = out.popitem()
+        elements.append((None if tag == "Any" else tag, value))
+    del self._buffer[:offset]
+    return elements
+
+
+def _itemToSortKey(item):
+  return tlvTagToSortKey(item[0])
 
 def tlvTagToSortKey(tag):
   if tag is None:
@@ -23,7 +23,8 @@ It processes just adb devices and those that show up in /dev/serial/by-id
 import dataclasses
 import re
 import sys
-from typing import Optional
+import threading
+from typing import Mapping, Optional
 
 from gazoo_device.utility import usb_config
 import immutabledict
@@ -37,6 +38,9 @@ ADB_SERIAL_REGEX = (
     r'\/dev\/disk\/by-id\/usb-Linux_File-CD_Gadget_([\da-z]+)-0:0')
 ANDROID_DEVICE_PRODUCT_NAME = 'File-CD Gadget'
 
+# udev subsystems of the devices whose events can change the USB inventory.
+_INVENTORY_SUBSYSTEMS = ('usb', 'tty', 'block')
+
 # Type aliases
 _AddressStr = str
 _AddressUsbInfoDict = dict[_AddressStr, usb_config.UsbInfo]
@@ -316,6 +320,71 @@ def get_address_to_usb_info_dict() -> _AddressUsbInfoDict:
   return address_to_usb_info_dict
 
 
+@dataclasses.dataclass(frozen=True)
+class UsbInventorySnapshot:
+  """USB devices connected at one point in time.
+
+  Attributes:
+    version: version of the inventory the snapshot was built at. It increases
+      with every udev event which may have changed the connected USB devices.
+    address_to_usb_info: address to the usb information of each device. The
+      UsbInfo instances are shared by all users of the snapshot and must not
+      be modified.
+  """
+  version: int
+  address_to_usb_info: Mapping[_AddressStr, usb_config.UsbInfo]
+
+
+class UsbInventory:
+  """Process-wide cache of get_address_to_usb_info_dict().
+
+  A pyudev monitor thread counts the udev events of USB, tty and block
+  devices. The snapshot of the connected USB devices is built on first use
+  and rebuilt on the first use after any such event. Derived information
+  (Cambrionix ports and disk paths) depends on other devices, so a change
+  rebuilds the whole snapshot once rather than patching the changed device.
+  """
+
+  def __init__(self):
+    self._build_lock = threading.Lock()
+    self._version_lock = threading.Lock()
+    self._version = 0
+    self._snapshot = None
+    monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+    for subsystem in _INVENTORY_SUBSYSTEMS:
+      monitor.filter_by(subsystem)
+    # Started before the first snapshot is built so that no event is missed.
+    self._observer = pyudev.MonitorObserver(
+        monitor, callback=self._handle_event, name='usb_inventory_monitor')
+    self._observer.start()
+
+  @property
+  def version(self) -> int:
+    """Version of the inventory. Increases with every relevant udev event."""
+    return self._version
+
+  def get_snapshot(self) -> UsbInventorySnapshot:
+    """Returns the snapshot of the current version of the inventory."""
+    with self._build_lock:
+      version = self._version
+      if self._snapshot is None or self._snapshot.version != version:
+        self._snapshot = UsbInventorySnapshot(
+            version=version,
+            address_to_usb_info=immutabledict.immutabledict(
+                get_address_to_usb_info_dict()))
+      return self._snapshot
+
+  def close(self) -> None:
+    """Stops the udev monitor thread."""
+    self._observer.stop()
+
+  def _handle_event(self, device: pyudev.Device) -> None:
+    """Invalidates the snapshot on a udev event."""
+    del device  # Unused: the whole snapshot is rebuilt.
+    with self._version_lock:
+      self._version += 1
+
+
 def get_pyudev_list_of_devices(
     subsystem: Optional[str] = None,
     devtype: Optional[str] = None
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 """Utility module for usb information."""
+import copy
 import re
 import sys
+import threading
 
 from typing import Mapping, Optional, Union
 
@@ -26,6 +28,66 @@ import usb
 
 MatchCriteria = Mapping[str, Mapping[str, str]]
 
+_usb_inventory = None
+_usb_inventory_lock = threading.Lock()
+_usb_inventory_users = 0
+
+
+def enable_usb_inventory() -> bool:
+  """Makes USB lookups use a process-wide inventory updated by udev events.
+
+  Without the inventory every lookup enumerates all udev devices. With it,
+  lookups read a snapshot which is rebuilt only after udev reports a change
+  (see usb_info_linux.UsbInventory). Each call must be matched by a
+  close_usb_inventory() call, and the inventory stays enabled until every
+  caller has closed it.
+
+  Returns:
+    True if enabled, False if not supported on this platform (only Linux is).
+  """
+  global _usb_inventory, _usb_inventory_users
+  if sys.platform == "darwin":
+    return False
+  with _usb_inventory_lock:
+    if _usb_inventory is None:
+      _usb_inventory = usb_info_linux.UsbInventory()
+    _usb_inventory_users += 1
+  return True
+
+
+def close_usb_inventory() -> None:
+  """Releases the inventory enabled by an enable_usb_inventory() call."""
+  global _usb_inventory, _usb_inventory_users
+  with _usb_inventory_lock:
+    if _usb_inventory_users == 0:
+      return
+    _usb_inventory_users -= 1
+    if _usb_inventory_users:
+      return
+    inventory, _usb_inventory = _usb_inventory, None
+  inventory.close()
+
+
+def get_usb_inventory_snapshot(
+) -> Optional[usb_info_linux.UsbInventorySnapshot]:
+  """Returns the current USB inventory snapshot or None if not enabled.
+
+  The snapshot version can be compared with that of an earlier snapshot to
+  check whether the connected USB devices may have changed.
+  """
+  inventory = _usb_inventory
+  if inventory is None:
+    return None
+  return inventory.get_snapshot()
+
+
+def _get_address_to_usb_info() -> Mapping[str, usb_config.UsbInfo]:
+  """Returns usb info by address. The entries must not be modified."""
+  snapshot = get_usb_inventory_snapshot()
+  if snapshot is not None:
+    return snapshot.address_to_usb_info
+  return get_address_to_usb_info_dict()
+
 
 def find_matching_connections(
     match_criteria: MatchCriteria) -> list[usb_config.UsbInfo]:
@@ -49,7 +111,7 @@ def find_matching_connections(
   Raises:
       ValueError: If match criteria contains bad key(s).
   """
-  instances = list(get_address_to_usb_info_dict().values())
+  instances = list(_get_address_to_usb_info().values())
   allowed_keys = usb_config.UsbInfo.get_properties()
   bad_keys = [key for key in match_criteria.keys() if key not in allowed_keys]
   if bad_keys:
@@ -66,11 +128,17 @@ def find_matching_connections(
           instance for instance in instances
           if re.search(entry["include_regex"], str(getattr(instance, attr)))
       ]
-  return instances
+  return [copy.copy(instance) for instance in instances]
 
 
 def get_address_to_usb_info_dict() -> dict[str, usb_config.UsbInfo]:
   """Gets a dictionary of usb devices with all relevent information."""
+  snapshot = get_usb_inventory_snapshot()
+  if snapshot is not None:
+    return {
+        address: copy.copy(entry)
+        for address, entry in snapshot.address_to_usb_info.items()
+    }
   if sys.platform == "darwin":
     module = usb_info_mac
   else:
@@ -80,7 +148,7 @@ def get_address_to_usb_info_dict() -> dict[str, usb_config.UsbInfo]:
 
 def get_all_serial_connections() -> list[str]:
   """Returns a list of all serial connections."""
-  usb_info = get_address_to_usb_info_dict()
+  usb_info = _get_address_to_usb_info()
   return [
       key for key, entry in usb_info.items()
       if entry.product_name not in usb_config.ANDROID_NAMES
@@ -96,9 +164,9 @@ def get_device_info(address: str) -> usb_config.UsbInfo:
   Returns:
       UsbInfo instance encoding information for that specific address.
   """
-  address_to_info_dict = get_address_to_usb_info_dict()
+  address_to_info_dict = _get_address_to_usb_info()
   if address in address_to_info_dict:
-    return address_to_info_dict[address]
+    return copy.copy(address_to_info_dict[address])
 
   return usb_config.UsbInfo()
 